@@ -3,77 +3,937 @@ API Routes for Scientific Calculator
 All endpoints handle JSON requests and responses
 """
 
-from flask import request, jsonify
+import os
+
+from flask import request, jsonify, Response
 from . import api
 from calculator.parser import ExpressionParser
 from calculator.memory import Memory
 from calculator.config import CalculatorConfig
+from calculator.table import evaluate_table
+from calculator.sampling import sample_function, DEFAULT_MAX_POINTS
+from calculator.encoding import pack_columns, MEDIA_TYPE
+from calculator.stats import RunningStats, iter_numbers
+from calculator import solver
+from calculator.rendering import is_big_integer, summarize, render_value, iter_digits
+from calculator.linalg import is_matrix, to_list
+from calculator.preview import Previewer
+from calculator.recorder import HistoryRecorder, JsonLinesSink
 
 
 # Global instances (shared across requests)
 parser = ExpressionParser()
 memory = Memory()
 config = CalculatorConfig()
+parser.use_functions(memory.functions)
+parser.use_cells(memory.cells.values)
+parser.use_random(memory.random)
+previewer = Previewer(parser)
+# History is recorded on a background thread; set CALCULATOR_HISTORY_FILE
+# to also append it to a JSON-lines file
+_history_file = os.environ.get('CALCULATOR_HISTORY_FILE')
+recorder = HistoryRecorder(memory, sink=JsonLinesSink(_history_file) if _history_file else None)
+
+
+def _wants_binary():
+    """True if the client prefers packed float64 over JSON for bulk results"""
+    if request.args.get('format') == 'binary':
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', MEDIA_TYPE])
+    return best == MEDIA_TYPE
+
+
+def _binary_response(names, columns, errors):
+    """Packed float64 columns with an error bitmap (see calculator.encoding)"""
+    return Response(pack_columns(names, columns, errors), mimetype=MEDIA_TYPE)
+
+
+def _renderable(entries):
+    """History entries with big-integer results replaced by their summaries"""
+    return [dict(entry, result=render_value(entry['result'])) for entry in entries]
+
+
+@api.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint to verify API is running"""
+    return jsonify({
+        'status': 'healthy',
+        'message': 'Scientific Calculator API is running',
+        'version': '1.0.0'
+    }), 200
+
+
+@api.route('/calculate', methods=['POST'])
+def calculate():
+    """
+    Calculate a mathematical expression
+    
+    Request JSON:
+    {
+        "expression": "2 + 3 * 4"
+    }
+    
+    Response:
+    {
+        "result": 14.0,
+        "expression": "2 + 3 * 4",
+        "success": true
+    }
+    
+    Integer results with more than 1000 digits are returned as a
+    summary string (e.g. "4.02387260077093e+2567") with a "big_integer"
+    object holding the digit count, leading digits and exponent. Send
+    "full_digits": true to stream every digit as text/plain instead.
+    
+    In adaptive precision mode (PUT /api/config/precision-mode), results
+    re-evaluated with decimal arithmetic are returned as strings, e.g.
+    "0.333333333333333333333333333333", so no digits are lost to JSON
+    floats.
+    
+    Vector and matrix results (e.g. "inv([[1, 2], [3, 4]])") are
+    returned as nested lists with a "shape" field:
+    {
+        "result": [[-2.0, 1.0], [1.5, -0.5]],
+        "shape": [2, 2],
+        ...
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'expression' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required field: expression'
+            }), 400
+        
+        expression = str(data['expression']).strip()
+        
+        if not expression:
+            return jsonify({
+                'success': False,
+                'error': 'Expression cannot be empty'
+            }), 400
+        
+        # Evaluate expression
+        result = parser.evaluate(expression)
+        
+        # Queue for history; recorded off the request path
+        recorder.record(expression, result)
+        
+        # Full digits are only produced on request, streamed in chunks
+        if data.get('full_digits') and isinstance(result, int):
+            return Response(iter_digits(result), mimetype='text/plain')
+        
+        # Format result according to config
+        formatted_result = config.format_result(result)
+        
+        response = {
+            'success': True,
+            'expression': expression,
+            'result': result,
+            'formatted_result': formatted_result
+        }
+        if is_big_integer(result):
+            summary = summarize(result)
+            response['result'] = summary.text
+            response['big_integer'] = summary.to_dict()
+        elif is_matrix(result):
+            response['result'] = to_list(result)
+            response['shape'] = list(result.shape)
+        
+        return jsonify(response), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/validate', methods=['POST'])
+def validate():
+    """
+    Check an expression without evaluating it, for live feedback as the
+    user types. History, 'ans' and memory are not changed, and results
+    are cached, so repeated checks of the same text are lookups.
+    
+    Request JSON:
+    {
+        "expression": "2 * (3 + "
+    }
+    
+    Response:
+    {
+        "success": true,
+        "valid": false,
+        "error": "Invalid expression: Unbalanced parentheses",
+        "position": 4
+    }
+    
+    "position" is the 0-based index of the offending character, or null
+    when the error is not at a single character.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'expression' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required field: expression'
+            }), 400
+        
+        error, position = parser.check(data['expression'])
+        return jsonify({
+            'success': True,
+            'valid': error is None,
+            'error': error,
+            'position': position
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/preview', methods=['POST'])
+def preview():
+    """
+    Evaluate an expression as it is typed, for a live result preview
+    
+    Trailing operators are dropped and open brackets closed before
+    evaluating, so "2 + 3 * (4" previews "2 + 3 * (4)". Nothing is
+    recorded: history, 'ans' and memory are unchanged. Tokenizing resumes
+    from the previous text of the same session, so each keystroke only
+    scans the new characters.
+    
+    Request JSON:
+    {
+        "session": "tab-3f9a",
+        "expression": "2 + 3 * (4"
+    }
+    
+    Response:
+    {
+        "success": true,
+        "expression": "2 + 3 * (4)",
+        "result": 14,
+        "formatted_result": "14",
+        "complete": false,
+        "error": null,
+        "position": null
+    }
+    
+    "result" is null when there is nothing to preview (an error, an
+    unfinished function name, an expression drawing random numbers or
+    one that may be slow, such as fact(n) or 9^9^9). "error" and
+    "position" locate a syntax error for the input hint.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'expression' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required field: expression'
+            }), 400
+        
+        result = previewer.preview(str(data.get('session', '')), data['expression'])
+        value = result['result']
+        response = dict(result, success=True, formatted_result=None)
+        if value is not None:
+            response['formatted_result'] = config.format_result(value)
+            response['result'] = render_value(value)
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/table', methods=['POST'])
+def table():
+    """
+    Evaluate one expression over many variable bindings
+    
+    Each variable takes a list of values or a range (stop inclusive);
+    the table is the cartesian product of all variables. The expression
+    is compiled once and evaluated in bulk. History and 'ans' are not
+    affected. Clients sending "Accept: application/octet-stream" (or
+    ?format=binary) get packed float64 columns with an error bitmap
+    for the result column instead of JSON.
+    
+    Request JSON:
+    {
+        "expression": "x^2 + y",
+        "variables": {
+            "x": {"start": 0, "stop": 2, "step": 1},
+            "y": [10, 20]
+        }
+    }
+    
+    Response:
+    {
+        "success": true,
+        "variables": ["x", "y"],
+        "count": 6,
+        "error_count": 0,
+        "rows": [[0.0, 10.0, 10.0], [0.0, 20.0, 20.0], ...]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'expression' not in data or 'variables' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: expression, variables'
+            }), 400
+        
+        if not isinstance(data['variables'], dict):
+            return jsonify({
+                'success': False,
+                'error': 'variables must be an object mapping names to values'
+            }), 400
+        
+        result = evaluate_table(parser, str(data['expression']), data['variables'])
+        
+        if _wants_binary():
+            columns = [result.columns[name] for name in result.names] + [result.results.values]
+            return _binary_response(result.names + ['result'], columns, result.results.errors)
+        
+        return jsonify({
+            'success': True,
+            'expression': result.expression,
+            'variables': result.names,
+            'count': len(result),
+            'error_count': result.results.error_count(),
+            'rows': result.rows()
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/plot', methods=['POST'])
+def plot():
+    """
+    Adaptively sample an expression in one variable for plotting
+    
+    More points are placed where the curve bends or jumps (e.g. tan
+    asymptotes) and fewer where it is flat, within a point budget.
+    Clients sending "Accept: application/octet-stream" (or ?format=binary)
+    get packed float64 x and y columns with an error bitmap for y.
+    
+    Request JSON:
+    {
+        "expression": "tan(x)",
+        "variable": "x",
+        "start": 0,
+        "stop": 360,
+        "max_points": 500,
+        "tolerance": 0.001
+    }
+    
+    Response:
+    {
+        "success": true,
+        "count": 241,
+        "evaluations": 241,
+        "discontinuities": [90.0, 270.0],
+        "points": [[0.0, 0.0], [11.25, 0.1989], ...]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not all(k in data for k in ('expression', 'start', 'stop')):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: expression, start, stop'
+            }), 400
+        
+        variable = str(data.get('variable', 'x'))
+        
+        try:
+            start = float(data['start'])
+            stop = float(data['stop'])
+            max_points = int(data.get('max_points', DEFAULT_MAX_POINTS))
+            tolerance = float(data.get('tolerance', 1e-3))
+        except (ValueError, TypeError):
+            return jsonify({
+                'success': False,
+                'error': 'start, stop, max_points and tolerance must be numbers'
+            }), 422
+        
+        if not variable.isidentifier() or variable in parser.builtin_names():
+            return jsonify({
+                'success': False,
+                'error': f"Invalid variable name: '{variable}'"
+            }), 422
+        
+        compiled = parser.compile(str(data['expression']), [variable])
+        curve = sample_function(compiled, variable, start, stop, max_points, tolerance)
+        
+        if _wants_binary():
+            errors = [y != y for y in curve.ys]
+            return _binary_response([variable, 'y'], [curve.xs, curve.ys], errors)
+        
+        return jsonify({
+            'success': True,
+            'expression': compiled.expression,
+            'variable': variable,
+            'count': len(curve),
+            'evaluations': curve.evaluations,
+            'discontinuities': curve.discontinuities,
+            'points': curve.points()
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/solve', methods=['POST'])
+def solve():
+    """
+    Find a root of an expression (or equation) in one variable
+    
+    The expression is compiled once and every iteration runs
+    in-process: Brent's method when the expression changes sign over
+    [start, stop], Newton's method from the midpoint otherwise.
+    "converged" is false if max_evaluations ran out first.
+    
+    Request JSON:
+    {
+        "expression": "x^2 = 2",
+        "variable": "x",
+        "start": 0,
+        "stop": 2,
+        "tolerance": 1e-12,
+        "max_evaluations": 200
+    }
+    
+    Response:
+    {
+        "success": true,
+        "root": 1.4142135623731,
+        "value": 1.17e-13,
+        "evaluations": 9,
+        "converged": true,
+        "method": "brent"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not all(k in data for k in ('expression', 'start', 'stop')):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: expression, start, stop'
+            }), 400
+        
+        try:
+            start = float(data['start'])
+            stop = float(data['stop'])
+            tolerance = float(data.get('tolerance', solver.SOLVE_TOLERANCE))
+            max_evaluations = int(data.get('max_evaluations', solver.SOLVE_MAX_EVALUATIONS))
+        except (ValueError, TypeError):
+            return jsonify({
+                'success': False,
+                'error': 'start, stop, tolerance and max_evaluations must be numbers'
+            }), 422
+        
+        variable = str(data.get('variable', 'x'))
+        compiled = solver.compile_function(parser, data['expression'], variable)
+        result = solver.find_root(compiled, variable, start, stop, tolerance, max_evaluations)
+        
+        return jsonify(dict(
+            success=True,
+            expression=compiled.expression,
+            variable=variable,
+            **result.to_dict()
+        )), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/integrate', methods=['POST'])
+def integrate():
+    """
+    Integrate an expression in one variable over [start, stop]
+    
+    The expression is compiled once and integrated in-process with
+    adaptive 7/15-point Gauss-Kronrod quadrature until the error
+    estimate is below tolerance (relative for integrals above 1) or
+    max_evaluations is spent.
+    
+    Request JSON:
+    {
+        "expression": "exp(-x^2)",
+        "variable": "x",
+        "start": -10,
+        "stop": 10,
+        "tolerance": 1e-10,
+        "max_evaluations": 10000
+    }
+    
+    Response:
+    {
+        "success": true,
+        "value": 1.7724538509055163,
+        "error_estimate": 5.3e-11,
+        "evaluations": 285,
+        "converged": true
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not all(k in data for k in ('expression', 'start', 'stop')):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: expression, start, stop'
+            }), 400
+        
+        try:
+            start = float(data['start'])
+            stop = float(data['stop'])
+            tolerance = float(data.get('tolerance', solver.INTEGRATE_TOLERANCE))
+            max_evaluations = int(data.get('max_evaluations', solver.INTEGRATE_MAX_EVALUATIONS))
+        except (ValueError, TypeError):
+            return jsonify({
+                'success': False,
+                'error': 'start, stop, tolerance and max_evaluations must be numbers'
+            }), 422
+        
+        variable = str(data.get('variable', 'x'))
+        compiled = solver.compile_function(parser, data['expression'], variable)
+        result = solver.integrate(compiled, variable, start, stop, tolerance, max_evaluations)
+        
+        return jsonify(dict(
+            success=True,
+            expression=compiled.expression,
+            variable=variable,
+            **result.to_dict()
+        )), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/derivative', methods=['POST'])
+def derivative():
+    """
+    Evaluate an expression and its gradient at a point
+    
+    Uses forward-mode automatic differentiation (dual numbers), so the
+    value and every partial derivative come from one evaluation pass
+    and are exact up to rounding. In degree mode, trig derivatives
+    include the pi/180 chain-rule factor.
+    
+    Request JSON:
+    {
+        "expression": "x^2 * y",
+        "variables": {"x": 3, "y": 2}
+    }
+    
+    Response:
+    {
+        "success": true,
+        "value": 18.0,
+        "gradient": {"x": 12.0, "y": 9.0}
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'expression' not in data or 'variables' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: expression, variables'
+            }), 400
+        
+        variables = data['variables']
+        if not isinstance(variables, dict):
+            return jsonify({
+                'success': False,
+                'error': 'variables must map names to numbers'
+            }), 422
+        
+        for name in variables:
+            if not name.isidentifier() or name in parser.builtin_names():
+                return jsonify({
+                    'success': False,
+                    'error': f"Invalid variable name: '{name}'"
+                }), 422
+        
+        try:
+            point = {name: float(value) for name, value in variables.items()}
+        except (ValueError, TypeError):
+            return jsonify({
+                'success': False,
+                'error': 'variables must map names to numbers'
+            }), 422
+        
+        expression = str(data['expression']).replace('^', '**')
+        compiled = parser.compile(expression, list(point))
+        value, gradient = compiled.gradient(point)
+        
+        return jsonify({
+            'success': True,
+            'expression': compiled.expression,
+            'value': value,
+            'gradient': gradient
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/stats', methods=['POST'])
+def stats():
+    """
+    Summarise a series of numbers in a single pass
+    
+    A text body (numbers separated by whitespace, commas or newlines)
+    is read from the request stream in chunks and folded into running
+    accumulators, so arbitrarily long series use constant memory. A JSON
+    body with a "values" list is also accepted. Variance and standard
+    deviation use the sample (n - 1) definition and are null for fewer
+    than two values.
+    
+    Request body (text/plain):
+    2 4 4 4
+    5 5 7 9
+    
+    Response:
+    {
+        "success": true,
+        "count": 8,
+        "sum": 40.0,
+        "mean": 5.0,
+        "variance": 4.571428571428571,
+        "stdev": 2.138089935299395,
+        "min": 2.0,
+        "max": 9.0
+    }
+    """
+    try:
+        if request.is_json:
+            data = request.get_json()
+            if not data or 'values' not in data:
+                return jsonify({
+                    'success': False,
+                    'error': 'Missing required field: values'
+                }), 400
+            if not isinstance(data['values'], list):
+                return jsonify({
+                    'success': False,
+                    'error': 'values must be a list of numbers'
+                }), 422
+            values = data['values']
+        else:
+            values = iter_numbers(request.stream)
+        
+        try:
+            summary = RunningStats().extend(values)
+        except TypeError:
+            return jsonify({
+                'success': False,
+                'error': 'values must be a list of numbers'
+            }), 422
+        
+        return jsonify(dict(success=True, **summary.to_dict())), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
 
 
-@api.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint to verify API is running"""
-    return jsonify({
-        'status': 'healthy',
-        'message': 'Scientific Calculator API is running',
-        'version': '1.0.0'
-    }), 200
+@api.route('/functions', methods=['GET'])
+def get_functions():
+    """
+    List user-defined functions
+    
+    Response:
+    {
+        "success": true,
+        "count": 1,
+        "functions": [
+            {"name": "f", "parameters": ["x", "y"], "body": "x**2 + y"}
+        ]
+    }
+    """
+    try:
+        functions = memory.get_functions()
+        return jsonify({
+            'success': True,
+            'count': len(functions),
+            'functions': functions
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 
-@api.route('/calculate', methods=['POST'])
-def calculate():
+@api.route('/functions', methods=['POST'])
+def define_function():
     """
-    Calculate a mathematical expression
+    Define (or replace) a function usable in later expressions
+    
+    The body is compiled once; calls such as "f(3, 4)" in
+    /api/calculate only bind the arguments.
     
     Request JSON:
     {
-        "expression": "2 + 3 * 4"
+        "definition": "f(x, y) = x^2 + y"
     }
     
     Response:
     {
-        "result": 14.0,
-        "expression": "2 + 3 * 4",
-        "success": true
+        "success": true,
+        "name": "f",
+        "parameters": ["x", "y"],
+        "body": "x**2 + y",
+        "updated": []
     }
+    
+    "updated" lists the cells calling the function, recomputed in
+    dependency order.
     """
     try:
         data = request.get_json()
         
-        if not data or 'expression' not in data:
+        if not data or 'definition' not in data:
             return jsonify({
                 'success': False,
-                'error': 'Missing required field: expression'
+                'error': 'Missing required field: definition'
             }), 400
         
-        expression = str(data['expression']).strip()
+        name, function = parser.define(str(data['definition']))
+        memory.define_function(name, function)
+        updated = memory.cells.functions_changed(parser, [name])
         
-        if not expression:
+        return jsonify({
+            'success': True,
+            'name': name,
+            'parameters': list(function.variables),
+            'body': function.expression,
+            'updated': [cell.to_dict() for cell in updated]
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except SyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Syntax error: {str(e)}'
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+
+@api.route('/functions/<name>', methods=['DELETE'])
+def delete_function(name):
+    """
+    Delete a user-defined function; cells calling it are recomputed
+    (and now fail)
+    
+    Response:
+    {
+        "success": true,
+        "message": "Function 'f' deleted",
+        "updated": [...]
+    }
+    """
+    try:
+        memory.delete_function(name)
+        updated = memory.cells.functions_changed(parser, [name])
+        return jsonify({
+            'success': True,
+            'message': f"Function '{name}' deleted",
+            'updated': [cell.to_dict() for cell in updated]
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/cells', methods=['GET'])
+def get_cells():
+    """
+    List named cells with their formulas and current values
+    
+    Response:
+    {
+        "success": true,
+        "count": 2,
+        "cells": [
+            {"name": "rate", "formula": "0.05", "value": 0.05,
+             "error": null, "dependencies": []},
+            ...
+        ]
+    }
+    """
+    try:
+        cells = memory.cells.get_cells()
+        return jsonify({
+            'success': True,
+            'count': len(cells),
+            'cells': cells
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/cells', methods=['POST'])
+def set_cell():
+    """
+    Create or update a named cell
+    
+    Only the cell and the cells that depend on it (directly or through
+    other cells) are recomputed, in dependency order. Cell values can be
+    used by name in /api/calculate.
+    
+    Request JSON:
+    {
+        "name": "price",
+        "formula": "120"
+    }
+    
+    Response:
+    {
+        "success": true,
+        "cell": {"name": "price", "formula": "120", "value": 120, ...},
+        "updated": [
+            {"name": "price", ...},
+            {"name": "total", "formula": "price * (1 + rate)", "value": 126.0, ...}
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'name' not in data or 'formula' not in data:
             return jsonify({
                 'success': False,
-                'error': 'Expression cannot be empty'
+                'error': 'Missing required fields: name and formula'
             }), 400
         
-        # Evaluate expression
-        result = parser.evaluate(expression)
-        
-        # Format result according to config
-        formatted_result = config.format_result(result)
-        
-        # Store in memory
-        memory.add_to_history(expression, result)
+        updated = memory.cells.set(parser, data['name'], data['formula'])
         
         return jsonify({
             'success': True,
-            'expression': expression,
-            'result': result,
-            'formatted_result': formatted_result
+            'cell': updated[0].to_dict(),
+            'updated': [cell.to_dict() for cell in updated]
         }), 200
         
     except ValueError as e:
@@ -93,6 +953,40 @@ def calculate():
         }), 500
 
 
+@api.route('/cells/<name>', methods=['DELETE'])
+def delete_cell(name):
+    """
+    Delete a named cell; cells that read it are recomputed
+    
+    Response:
+    {
+        "success": true,
+        "message": "Cell 'price' deleted",
+        "updated": [
+            {"name": "total", "value": null, "error": "...", ...}
+        ]
+    }
+    """
+    try:
+        updated = memory.cells.delete(parser, name)
+        return jsonify({
+            'success': True,
+            'message': f"Cell '{name}' deleted",
+            'updated': [cell.to_dict() for cell in updated]
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @api.route('/history', methods=['GET'])
 def get_history():
     """
@@ -117,12 +1011,13 @@ def get_history():
     """
     try:
         limit = request.args.get('limit', type=int)
+        recorder.flush()
         history = memory.get_history(limit=limit)
         
         return jsonify({
             'success': True,
             'count': len(history),
-            'history': history
+            'history': _renderable(history)
         }), 200
         
     except Exception as e:
@@ -144,6 +1039,7 @@ def clear_history():
     }
     """
     try:
+        recorder.flush()
         memory.clear_history()
         return jsonify({
             'success': True,
@@ -187,13 +1083,14 @@ def search_history():
                 'error': 'Missing required parameter: query'
             }), 400
         
+        recorder.flush()
         results = memory.get_history_by_expression(query)
         
         return jsonify({
             'success': True,
             'query': query,
             'count': len(results),
-            'results': results
+            'results': _renderable(results)
         }), 200
         
     except Exception as e:
@@ -431,6 +1328,7 @@ def set_decimal_places():
             }), 422
         
         config.set_decimal_places(places)
+        parser.set_decimal_places(places)
         
         return jsonify({
             'success': True,
@@ -499,6 +1397,137 @@ def set_angle_mode():
         }), 500
 
 
+@api.route('/config/precision-mode', methods=['PUT'])
+def set_precision_mode():
+    """
+    Set precision mode (float or adaptive)
+    
+    In adaptive mode, a float result that cannot support the configured
+    decimal places (more than about 15 significant digits, or digits
+    lost to cancellation) is re-evaluated with decimal arithmetic and
+    returned as a string holding every digit.
+    
+    Request JSON:
+    {
+        "precision_mode": "adaptive"
+    }
+    
+    Response:
+    {
+        "success": true,
+        "precision_mode": "adaptive",
+        "message": "Precision mode updated"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'precision_mode' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required field: precision_mode'
+            }), 400
+        
+        mode = data['precision_mode']
+        
+        config.set_precision_mode(mode)
+        parser.set_precision_mode(mode)
+        
+        return jsonify({
+            'success': True,
+            'precision_mode': mode,
+            'message': 'Precision mode updated successfully'
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/units', methods=['GET'])
+def get_units():
+    """
+    List the units accepted by conversions such as "5 km to mi"
+    
+    Response:
+    {
+        "success": true,
+        "units": {"length": ["m", "km", ...], "mass": [...], ...}
+    }
+    """
+    from calculator.units import get_units as list_units
+    return jsonify({
+        'success': True,
+        'units': list_units()
+    }), 200
+
+
+@api.route('/random/seed', methods=['GET'])
+def get_seed():
+    """
+    Get the seed of the session's random stream
+    
+    Response:
+    {
+        "success": true,
+        "seed": 42
+    }
+    """
+    return jsonify({
+        'success': True,
+        'seed': memory.random.seed
+    }), 200
+
+
+@api.route('/random/seed', methods=['PUT'])
+def set_seed():
+    """
+    Restart the session's random stream from a seed, so the same
+    sequence of rand(), randint() and normal() calls replays the same
+    values
+    
+    Request JSON:
+    {
+        "seed": 42        (omit or null for a fresh random seed)
+    }
+    
+    Response:
+    {
+        "success": true,
+        "seed": 42,
+        "message": "Random seed updated"
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        seed = memory.random.reseed(data.get('seed'))
+        
+        return jsonify({
+            'success': True,
+            'seed': seed,
+            'message': 'Random seed updated successfully'
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @api.route('/config/notation', methods=['PUT'])
 def set_notation():
     """
@@ -34,6 +34,20 @@ def create_app():
             'endpoints': {
                 'health': 'GET /api/health',
                 'calculate': 'POST /api/calculate',
+                'validate': 'POST /api/validate',
+                'preview': 'POST /api/preview',
+                'table': 'POST /api/table',
+                'plot': 'POST /api/plot',
+                'solve': 'POST /api/solve',
+                'integrate': 'POST /api/integrate',
+                'derivative': 'POST /api/derivative',
+                'stats': 'POST /api/stats',
+                'functions': 'GET/POST /api/functions',
+                'function_delete': 'DELETE /api/functions/<name>',
+                'cells': 'GET/POST /api/cells',
+                'cell_delete': 'DELETE /api/cells/<name>',
+                'units': 'GET /api/units',
+                'random_seed': 'GET/PUT /api/random/seed',
                 'history': 'GET /api/history',
                 'history_search': 'GET /api/history/search',
                 'history_clear': 'DELETE /api/history/clear',
@@ -44,7 +58,8 @@ def create_app():
                 'config': 'GET /api/config',
                 'config_decimal': 'PUT /api/config/decimal-places',
                 'config_angle': 'PUT /api/config/angle-mode',
-                'config_notation': 'PUT /api/config/notation'
+                'config_notation': 'PUT /api/config/notation',
+                'config_precision': 'PUT /api/config/precision-mode'
             },
             'documentation': 'See README.md for detailed API documentation'
         }), 200
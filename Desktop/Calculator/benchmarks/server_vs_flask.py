@@ -0,0 +1,86 @@
+"""
+Throughput benchmark: asyncio line-protocol server vs Flask /api/calculate
+
+The Flask endpoint is driven through its WSGI test client, which skips
+the network entirely, so the comparison is conservative in Flask's
+favour. The asyncio server is measured over real local TCP connections
+with pipelined requests.
+
+Usage:
+    python benchmarks/server_vs_flask.py [requests] [connections]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from calculator.server import CalculatorServer  # noqa: E402
+
+EXPRESSIONS = ['2 + 3 * 4', 'sqrt(16) + sin(30)', 'ln(10) / log(10)', '(1 + 2) ** 3']
+
+
+def bench_flask(total):
+    """Return requests per second through the Flask test client"""
+    from app import create_app
+
+    client = create_app().test_client()
+    start = time.perf_counter()
+    for i in range(total):
+        response = client.post('/api/calculate', json={'expression': EXPRESSIONS[i % len(EXPRESSIONS)]})
+        assert response.status_code == 200
+    return total / (time.perf_counter() - start)
+
+
+async def _client(port, count):
+    """Send count pipelined requests on one connection and read all replies"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = ''.join(f"{i} {EXPRESSIONS[i % len(EXPRESSIONS)]}\n" for i in range(count))
+    writer.write(payload.encode('utf-8'))
+    await writer.drain()
+    for _ in range(count):
+        line = await reader.readline()
+        assert b' OK ' in line, line
+    writer.close()
+    await writer.wait_closed()
+
+
+async def _bench_server(total, connections):
+    server = CalculatorServer(port=0, workers=1)
+    await server.start()
+    try:
+        per_connection = total // connections
+        start = time.perf_counter()
+        await asyncio.gather(*(_client(server.port, per_connection) for _ in range(connections)))
+        return per_connection * connections / (time.perf_counter() - start)
+    finally:
+        await server.close()
+
+
+def bench_server(total, connections):
+    """Return requests per second through the asyncio server"""
+    return asyncio.run(_bench_server(total, connections))
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    server_rate = bench_server(total, connections)
+    print(f"asyncio server ({connections} connections): {server_rate:10.0f} req/s")
+
+    try:
+        flask_rate = bench_flask(total)
+    except ImportError:
+        print("Flask not installed; skipping /api/calculate comparison")
+        return 0
+    print(f"Flask /api/calculate (test client):   {flask_rate:10.0f} req/s")
+    print(f"speedup: {server_rate / flask_rate:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
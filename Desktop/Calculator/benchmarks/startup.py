@@ -0,0 +1,77 @@
+"""
+Startup benchmark for one-shot evaluation
+
+Measures, in fresh interpreters, the time spent importing the calculator
+and evaluating a single expression via ``python -m calculator``, and
+fails if the median exceeds the startup budget.
+
+Usage:
+    python benchmarks/startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Budget for importing the package and evaluating one expression,
+# excluding interpreter boot (milliseconds)
+STARTUP_BUDGET_MS = 25.0
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Timed inside the child so interpreter boot is excluded
+_PROBE = (
+    "import time, io, contextlib\n"
+    "start = time.perf_counter()\n"
+    "from calculator.__main__ import run_once\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    run_once(['2 + 3 * sqrt(16)'])\n"
+    "print((time.perf_counter() - start) * 1000)\n"
+)
+
+
+def measure_import_and_evaluate(runs):
+    """Return per-run import-plus-evaluate times in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip()))
+    return timings
+
+
+def measure_process(runs):
+    """Return per-run wall-clock times of a full one-shot process in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-m', 'calculator', '2 + 3 * sqrt(16)'],
+            cwd=PROJECT_ROOT, capture_output=True, check=True
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    inner = statistics.median(measure_import_and_evaluate(runs))
+    process = statistics.median(measure_process(runs))
+
+    print(f"import + evaluate: {inner:.2f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+    print(f"full process:      {process:.2f} ms")
+
+    if inner > STARTUP_BUDGET_MS:
+        print("FAIL: startup budget exceeded")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
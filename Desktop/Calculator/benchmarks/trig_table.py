@@ -0,0 +1,124 @@
+"""
+Degree-mode trig benchmark: exact-angle table vs radians conversion
+
+Compares AdvancedMath.sine/cosine/tangent in degree mode with the
+previous implementation (math.radians then math.sin/cos/tan) on
+multiples of 15 degrees, reporting the time per call and how many
+results differ from the exact value. Angles that miss the table are
+timed against the previous implementation too, since they pay for the
+argument reduction.
+
+Usage:
+    python benchmarks/trig_table.py [calls]
+"""
+
+import math
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from calculator.advanced import AdvancedMath, EXACT_DEGREE_TABLE  # noqa: E402
+
+TABLE_ANGLES = list(range(-720, 721, 15))
+OTHER_ANGLES = [angle + 0.3 for angle in TABLE_ANGLES]
+
+
+class _RadiansMath:
+    """The conversion-based degree trig AdvancedMath used before the table"""
+
+    angle_mode = 'degrees'
+
+    def _to_radians(self, angle):
+        if self.angle_mode == 'degrees':
+            return math.radians(angle)
+        return angle
+
+    def sine(self, angle):
+        return math.sin(self._to_radians(angle))
+
+    def cosine(self, angle):
+        return math.cos(self._to_radians(angle))
+
+    def tangent(self, angle):
+        return math.tan(self._to_radians(angle))
+
+
+def _radians_functions():
+    """The conversion-based degree trig used before the table"""
+    before = _RadiansMath()
+    return before.sine, before.cosine, before.tangent
+
+
+def _time_per_call(functions, angles, calls, repeats=5):
+    """
+    Return nanoseconds per call of each function (best of repeats),
+    skipping angles where any of them raises
+
+    The functions are timed in turn within each repeat, so the machine
+    speeding up or slowing down affects them alike.
+    """
+    usable = []
+    for angle in angles:
+        try:
+            for function in functions:
+                function(angle)
+            usable.append(angle)
+        except ValueError:
+            pass
+    rounds = max(calls // (len(usable) * repeats), 1)
+    best = [float('inf')] * len(functions)
+    for _ in range(repeats):
+        for position, function in enumerate(functions):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for angle in usable:
+                    function(angle)
+            best[position] = min(best[position], time.perf_counter() - start)
+    return [elapsed / (rounds * len(usable)) * 1e9 for elapsed in best]
+
+
+def _inexact_count(function, index):
+    """Number of table angles where function misses the exact value"""
+    misses = 0
+    for angle in TABLE_ANGLES:
+        expected = EXACT_DEGREE_TABLE[angle // 15 % 24][index]
+        try:
+            value = function(angle)
+        except ValueError:
+            value = None
+        if value != expected:
+            misses += 1
+    return misses
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+
+    advanced = AdvancedMath('degrees')
+    table_functions = (advanced.sine, advanced.cosine, advanced.tangent)
+
+    print(f"{'':5} {'radians ns':>11} {'table ns':>9} {'speedup':>8} "
+          f"{'inexact (radians/table)':>24} {'non-table ns (radians/table)':>29}")
+    faster = True
+    for index, name in enumerate(('sin', 'cos', 'tan')):
+        before = _radians_functions()[index]
+        after = table_functions[index]
+        before_ns, after_ns = _time_per_call((before, after), TABLE_ANGLES, calls)
+        before_other_ns, other_ns = _time_per_call((before, after), OTHER_ANGLES, calls)
+        misses = f"{_inexact_count(before, index)}/{_inexact_count(after, index)} of {len(TABLE_ANGLES)}"
+        print(f"{name:5} {before_ns:11.1f} {after_ns:9.1f} {before_ns / after_ns:7.2f}x "
+              f"{misses:>24} {before_other_ns:18.1f}/{other_ns:<10.1f}")
+        faster = faster and after_ns < before_ns
+
+    if not faster:
+        print("FAIL: table path slower than radians conversion")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
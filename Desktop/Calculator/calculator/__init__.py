@@ -1,14 +1,38 @@
 """
 Modern Scientific Calculator Package
 A comprehensive calculator with arithmetic, advanced math, and memory functions
+
+Submodules are imported lazily on first attribute access so that
+one-shot invocations (``python -m calculator "2 + 3"``) only pay for
+the modules they actually use.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "Calculator Team"
 
-from .arithmetic import Arithmetic
-from .advanced import AdvancedMath
-from .memory import Memory
-from .parser import ExpressionParser
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    'Arithmetic': '.arithmetic',
+    'AdvancedMath': '.advanced',
+    'Memory': '.memory',
+    'ExpressionParser': '.parser',
+}
 
 __all__ = ['Arithmetic', 'AdvancedMath', 'Memory', 'ExpressionParser']
+
+
+def __getattr__(name):
+    """Import public classes from their submodules on first access"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include lazily loaded names in dir()"""
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
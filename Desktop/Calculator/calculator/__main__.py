@@ -0,0 +1,54 @@
+"""
+Entry point for ``python -m calculator``
+
+With arguments, each argument is evaluated as a single expression and
+its formatted result printed on its own line (one-shot mode). No banner,
+history or REPL state is set up, so shell scripts can call the
+calculator in a tight loop. If a calculator daemon is running, the
+expressions are forwarded to it instead of being evaluated here.
+
+    python -m calculator "2 + 3"       one-shot evaluation
+    python -m calculator --daemon      run the warm daemon
+    python -m calculator               interactive REPL
+"""
+
+import sys
+
+
+def run_once(expressions):
+    """
+    Evaluate expressions without starting the interactive calculator
+
+    Args:
+        expressions: List of expression strings
+
+    Returns:
+        Process exit status (0 if every expression succeeded, 1 otherwise)
+    """
+    from .daemon import run_client
+    return run_client(expressions)
+
+
+def main(argv=None):
+    """Dispatch to one-shot mode, daemon mode or the interactive REPL"""
+    args = sys.argv[1:] if argv is None else argv
+
+    if args and args[0] == '--daemon':
+        from .daemon import serve
+        try:
+            serve(args[1] if len(args) > 1 else None)
+        except OSError as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args:
+        return run_once(args)
+
+    from .cli import main as cli_main
+    cli_main()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
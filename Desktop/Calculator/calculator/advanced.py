@@ -4,6 +4,94 @@ Handles: trigonometric, logarithmic, factorial, combinatorics functions
 """
 
 import math
+from . import combinatorics
+
+# Correctly rounded sin and tan of 0, 15, ..., 90 degrees
+_SIN_15 = (0.0, 0.25881904510252074, 0.5, 0.7071067811865476,
+           0.8660254037844386, 0.9659258262890683, 1.0)
+_TAN_15 = (0.0, 0.2679491924311227, 0.5773502691896257, 1.0,
+           1.7320508075688772, 3.732050807568877, None)
+
+
+def _build_exact_table():
+    """(sin, cos, tan) for every multiple of 15 degrees in [0, 360), tan None where undefined"""
+    sines = []
+    for k in range(24):
+        quadrant, step = divmod(k, 6)
+        value = _SIN_15[step] if quadrant % 2 == 0 else _SIN_15[6 - step]
+        sines.append(value if quadrant < 2 else -value)
+
+    table = []
+    for k in range(24):
+        quadrant, step = divmod(k, 6)
+        if quadrant % 2 == 0:
+            tan = _TAN_15[step]
+        else:
+            tan = None if step == 0 else -_TAN_15[6 - step]
+        # Avoid -0.0 so that e.g. sin(180) prints as 0
+        table.append((sines[k] + 0.0, sines[(k + 6) % 24] + 0.0, tan))
+    return tuple(table)
+
+
+# Exact results for angles that are multiples of 15 degrees, indexed by angle // 15
+EXACT_DEGREE_TABLE = _build_exact_table()
+
+# Direct lookups for multiples of 15 in [-720, 720] (tan omits undefined
+# angles), consulted for integral angles only
+_EXACT_SINE, _EXACT_COSINE, _EXACT_TANGENT = (
+    {angle: row[index]
+     for angle in range(-720, 721, 15)
+     for row in (EXACT_DEGREE_TABLE[angle // 15 % 24],)
+     if row[index] is not None}
+    for index in range(3)
+)
+
+
+def _degree_trig(angle, exact, function):
+    """
+    Evaluate a trig function of an angle in degrees
+    
+    Serves multiples of 15 from the exact table and converts other angles
+    to radians after reducing them into [-180, 180] in degrees. Only
+    integral angles are looked up, so other angles skip the table. The
+    remainder is exact for ints and floats alike, so no precision is lost
+    however large the angle is, and math.remainder keeps tiny angles tiny
+    (a floored modulo would round -1e-20 up to 360).
+    
+    Args:
+        angle: Angle in degrees
+        exact: The function's exact values, e.g. _EXACT_SINE
+        function: math function for angles not in the table
+        
+    Raises:
+        ValueError: If angle is infinite or NaN, or the tangent is undefined
+    """
+    if angle.__class__ is int:
+        value = exact.get(angle)
+        if value is not None:
+            return value
+        reduced = angle % 360
+        if reduced > 180:
+            reduced -= 360
+    else:
+        try:
+            reduced = math.remainder(angle, 360.0)
+        except ValueError:
+            # Vectors and matrices raise their own error from isinf()
+            if math.isinf(angle):
+                raise ValueError("Angle must be a finite number") from None
+            raise
+        # is_integer() is much cheaper than % 15 and rules out most angles
+        if not reduced.is_integer():
+            if reduced != reduced:
+                raise ValueError("Angle must be a finite number")
+            return function(math.radians(reduced))
+    if reduced % 15:
+        return function(math.radians(reduced))
+    value = exact.get(reduced)
+    if value is None:
+        raise ValueError(f"Tangent is undefined at {angle} degrees")
+    return value
 
 
 class AdvancedMath:
@@ -90,7 +178,9 @@ class AdvancedMath:
         Returns:
             Sine of angle
         """
-        return math.sin(self._to_radians(angle))
+        if self.angle_mode == 'degrees':
+            return _degree_trig(angle, _EXACT_SINE, math.sin)
+        return math.sin(angle)
 
     def cosine(self, angle):
         """
@@ -102,7 +192,9 @@ class AdvancedMath:
         Returns:
             Cosine of angle
         """
-        return math.cos(self._to_radians(angle))
+        if self.angle_mode == 'degrees':
+            return _degree_trig(angle, _EXACT_COSINE, math.cos)
+        return math.cos(angle)
 
     def tangent(self, angle):
         """
@@ -113,9 +205,13 @@ class AdvancedMath:
             
         Returns:
             Tangent of angle
+            
+        Raises:
+            ValueError: If the tangent is undefined (90, 270, ... degrees)
         """
-        rad_angle = self._to_radians(angle)
-        return math.tan(rad_angle)
+        if self.angle_mode == 'degrees':
+            return _degree_trig(angle, _EXACT_TANGENT, math.tan)
+        return math.tan(angle)
 
     def arcsine(self, x):
         """
@@ -262,9 +358,7 @@ class AdvancedMath:
         Raises:
             ValueError: If n is negative or not an integer
         """
-        if not isinstance(n, int) or n < 0:
-            raise ValueError("Factorial input must be a non-negative integer")
-        return math.factorial(n)
+        return combinatorics.factorial(n)
 
     def permutation(self, n, r):
         """
@@ -280,33 +374,24 @@ class AdvancedMath:
         Raises:
             ValueError: If inputs are invalid
         """
-        if not isinstance(n, int) or not isinstance(r, int):
-            raise ValueError("Permutation inputs must be integers")
-        if n < 0 or r < 0 or r > n:
-            raise ValueError("Invalid permutation parameters")
-        
-        return math.factorial(n) // math.factorial(n - r)
+        return combinatorics.permutation(n, r)
 
-    def combination(self, n, r):
+    def combination(self, n, r, modulus=None):
         """
         Calculate combinations C(n, r) = n! / (r! * (n-r)!)
         
         Args:
             n: Total items
             r: Items to choose
+            modulus: Prime modulus to reduce the result by (optional)
             
         Returns:
-            Number of combinations
+            Number of combinations (mod modulus if given)
             
         Raises:
             ValueError: If inputs are invalid
         """
-        if not isinstance(n, int) or not isinstance(r, int):
-            raise ValueError("Combination inputs must be integers")
-        if n < 0 or r < 0 or r > n:
-            raise ValueError("Invalid combination parameters")
-        
-        return math.factorial(n) // (math.factorial(r) * math.factorial(n - r))
+        return combinatorics.combination(n, r, modulus)
 
     def absolute_value(self, x):
         """
@@ -1,8 +1,38 @@
 """
 Arithmetic module for basic mathematical operations
-Handles: addition, subtraction, multiplication, division
+Handles: addition, subtraction, multiplication, division, and the
+integer functions of the number theory module (imported on first call)
 """
 
+import math
+
+# Largest integer power computed exactly, in estimated result bits
+# (exponent * log2(base)); 2^1000000 is allowed, 9^9^9 is not
+MAX_POWER_BITS = 1_000_000
+
+
+def as_integer(value, name='Input'):
+    """
+    Convert an integral number (e.g. 5 or 5.0) to int
+
+    Args:
+        value: Number to convert
+        name: Description used in the error message
+
+    Returns:
+        The value as int
+
+    Raises:
+        ValueError: If value is not an integer
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError(f"{name} must be an integer")
+
 
 class Arithmetic:
     """Basic arithmetic operations for the calculator"""
@@ -98,5 +128,113 @@ class Arithmetic:
             
         Returns:
             a raised to the power of b
+            
+        Raises:
+            ValueError: If both are integers and the result would exceed
+                MAX_POWER_BITS bits
         """
+        if (type(a) is int and type(b) is int and b > 0 and abs(a) > 1
+                and b * math.log2(abs(a)) > MAX_POWER_BITS):
+            raise ValueError(f"Integer power too large (over {MAX_POWER_BITS:,} bits)")
         return a ** b
+
+    @staticmethod
+    def powmod(base, exponent, modulus):
+        """
+        Raise to a power modulo m without building the full power
+        
+        Args:
+            base: Integer base
+            exponent: Integer exponent (negative uses the modular inverse)
+            modulus: Positive integer modulus
+            
+        Returns:
+            base ** exponent % modulus
+        """
+        from . import number_theory
+        return number_theory.powmod(base, exponent, modulus)
+
+    @staticmethod
+    def gcd(*values):
+        """
+        Greatest common divisor
+        
+        Args:
+            values: Integers
+            
+        Returns:
+            Their gcd
+        """
+        from . import number_theory
+        return number_theory.gcd(*values)
+
+    @staticmethod
+    def lcm(*values):
+        """
+        Least common multiple
+        
+        Args:
+            values: Integers
+            
+        Returns:
+            Their lcm
+        """
+        from . import number_theory
+        return number_theory.lcm(*values)
+
+    @staticmethod
+    def isprime(n):
+        """
+        Test primality (Miller-Rabin)
+        
+        Args:
+            n: Integer
+            
+        Returns:
+            1 if n is prime, 0 otherwise (so results can be summed)
+        """
+        from . import number_theory
+        return 1 if number_theory.is_prime(n) else 0
+
+    @staticmethod
+    def factor(n):
+        """
+        Factorise an integer (trial division and Pollard's rho)
+        
+        Args:
+            n: Nonzero integer
+            
+        Returns:
+            List of prime factors in ascending order, with multiplicity
+        """
+        from . import number_theory
+        return number_theory.factor(n)
+
+    @staticmethod
+    def primes(a, b):
+        """
+        List primes with a segmented sieve
+        
+        Args:
+            a: Lower bound (inclusive)
+            b: Upper bound (inclusive)
+            
+        Returns:
+            List of primes in [a, b]
+        """
+        from . import number_theory
+        return number_theory.primes(a, b)
+
+    @staticmethod
+    def prime_pi(n):
+        """
+        Count primes (the prime-counting function pi(n))
+        
+        Args:
+            n: Integer bound
+            
+        Returns:
+            Number of primes <= n
+        """
+        from . import number_theory
+        return number_theory.prime_pi(n)
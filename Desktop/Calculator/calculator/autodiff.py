@@ -0,0 +1,402 @@
+"""
+Forward-mode automatic differentiation for compiled expressions
+Evaluates a parser's compiled code with dual numbers (a value plus one
+partial derivative per variable), so the value and the full gradient
+come out of a single pass with no finite-difference error
+"""
+
+import math
+from collections import ChainMap
+
+from .linalg import flatten, is_matrix
+
+
+class Dual:
+    """A value with its partial derivatives with respect to each variable"""
+
+    __slots__ = ('value', 'grad')
+
+    def __init__(self, value, grad):
+        """
+        Initialize dual number
+
+        Args:
+            value: Float value
+            grad: Tuple of partial derivatives, one per variable
+        """
+        self.value = value
+        self.grad = grad
+
+    def _chain(self, value, derivative):
+        """Result of applying a function with the given local derivative"""
+        return Dual(value, tuple(derivative * g for g in self.grad))
+
+    def __float__(self):
+        return float(self.value)
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.grad!r})"
+
+    # Arithmetic
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, tuple(a + b for a, b in zip(self.grad, other.grad)))
+        return Dual(self.value + other, self.grad)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, tuple(a - b for a, b in zip(self.grad, other.grad)))
+        return Dual(self.value - other, self.grad)
+
+    def __rsub__(self, other):
+        return Dual(other - self.value, tuple(-g for g in self.grad))
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value,
+                        tuple(a * other.value + self.value * b for a, b in zip(self.grad, other.grad)))
+        return Dual(self.value * other, tuple(g * other for g in self.grad))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            value = self.value / other.value
+            return Dual(value, tuple((a - value * b) / other.value for a, b in zip(self.grad, other.grad)))
+        return Dual(self.value / other, tuple(g / other for g in self.grad))
+
+    def __rtruediv__(self, other):
+        value = other / self.value
+        return self._chain(value, -value / self.value)
+
+    def __mod__(self, other):
+        if isinstance(other, Dual):
+            quotient = math.floor(self.value / other.value)
+            return self - other * quotient
+        return Dual(self.value % other, self.grad)
+
+    def __rmod__(self, other):
+        return Dual(other % self.value, tuple(-math.floor(other / self.value) * g for g in self.grad))
+
+    def __pow__(self, other):
+        if isinstance(other, Dual):
+            value = self.value ** other.value
+            if self.value > 0:
+                log_base = math.log(self.value)
+            elif any(other.grad):
+                # d/dy x^y = x^y ln x needs x > 0
+                raise ValueError("x^y is not differentiable in y for x <= 0")
+            else:
+                log_base = 0.0
+            return Dual(value, tuple(
+                value * (b * log_base + other.value * a / self.value)
+                for a, b in zip(self.grad, other.grad)
+            ))
+        if other == 0:
+            return Dual(1.0, tuple(0.0 for _ in self.grad))
+        return self._chain(self.value ** other, other * self.value ** (other - 1))
+
+    def __rpow__(self, other):
+        value = other ** self.value
+        if other == 0 or not any(self.grad):
+            return Dual(value, tuple(0.0 for _ in self.grad))
+        if other < 0:
+            raise ValueError("x^y is not differentiable in y for x <= 0")
+        return self._chain(value, value * math.log(other))
+
+    def __neg__(self):
+        return Dual(-self.value, tuple(-g for g in self.grad))
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        sign = 1.0 if self.value > 0 else -1.0 if self.value < 0 else 0.0
+        return self._chain(abs(self.value), sign)
+
+    # Comparisons (by value, for min/max/median)
+
+    def __lt__(self, other):
+        return self.value < _value(other)
+
+    def __le__(self, other):
+        return self.value <= _value(other)
+
+    def __gt__(self, other):
+        return self.value > _value(other)
+
+    def __ge__(self, other):
+        return self.value >= _value(other)
+
+
+def _value(x):
+    """Plain value of a dual or a number"""
+    return x.value if isinstance(x, Dual) else x
+
+
+def _unary(value_function, derivative_function):
+    """Lift a scalar function with a known derivative to dual numbers"""
+    def lifted(x):
+        if not isinstance(x, Dual):
+            return value_function(x)
+        return x._chain(value_function(x.value), derivative_function(x.value))
+    return lifted
+
+
+def _not_differentiable(name, function):
+    """Allow constant arguments only, for functions of integers"""
+    def wrapped(*args):
+        for arg in args:
+            if isinstance(arg, Dual) and any(arg.grad):
+                raise ValueError(f"{name} is not differentiable")
+        return function(*(_value(arg) for arg in args))
+    return wrapped
+
+
+def _has_gradient(value):
+    """Check whether a value, or any element of a nested list, carries a derivative"""
+    if isinstance(value, Dual):
+        return any(value.grad)
+    if isinstance(value, (list, tuple)):
+        return any(_has_gradient(item) for item in value)
+    return False
+
+
+def _constant_matrices(message, function):
+    """
+    Allow constant vectors and matrices only: NumPy and Matrix hold floats,
+    so dual elements would lose their derivatives (a 0 gradient)
+    """
+    def wrapped(*args):
+        if any(_has_gradient(arg) for arg in args):
+            raise ValueError(message)
+        return function(*args)
+    return wrapped
+
+
+def _nonzero(x, name):
+    if x == 0:
+        raise ValueError(f"{name} is not differentiable at 0")
+    return x
+
+
+class _DualMath:
+    """Stand-in for the 'math' module inside differentiated expressions"""
+
+    pi = math.pi
+    e = math.e
+
+    def __init__(self):
+        self.log2 = _unary(math.log2, lambda v: 1 / (v * math.log(2)))
+        self.log10 = _unary(math.log10, lambda v: 1 / (v * math.log(10)))
+        self.sqrt = _unary(math.sqrt, lambda v: 0.5 / math.sqrt(_nonzero(v, "sqrt")))
+        self.exp = _unary(math.exp, math.exp)
+        self._ln = _unary(math.log, lambda v: 1 / v)
+
+    def log(self, x, base=None):
+        if base is None:
+            return self._ln(x)
+        return self._ln(x) / self._ln(base)
+
+
+def _trig(advanced):
+    """Trig functions honouring the angle mode, including the degree chain rule"""
+    def scale():
+        # d/dx sin(x degrees) = cos(x degrees) * pi / 180
+        return math.pi / 180 if advanced.angle_mode == 'degrees' else 1.0
+
+    def inverse_scale():
+        # asin etc. return degrees, so their derivatives scale by 180 / pi
+        return 180 / math.pi if advanced.angle_mode == 'degrees' else 1.0
+
+    def arc_derivative(v, sign):
+        root = math.sqrt(1 - v * v)
+        if root == 0:
+            raise ValueError("Inverse sine/cosine is not differentiable at +-1")
+        return sign * inverse_scale() / root
+
+    return {
+        'sin_deg': _unary(advanced.sine, lambda v: advanced.cosine(v) * scale()),
+        'cos_deg': _unary(advanced.cosine, lambda v: -advanced.sine(v) * scale()),
+        'tan_deg': _unary(advanced.tangent, lambda v: scale() / advanced.cosine(v) ** 2),
+        'asin_deg': _unary(advanced.arcsine, lambda v: arc_derivative(v, 1)),
+        'acos_deg': _unary(advanced.arccosine, lambda v: arc_derivative(v, -1)),
+        'atan_deg': _unary(advanced.arctangent, lambda v: inverse_scale() / (1 + v * v)),
+    }
+
+
+def _values(args, name):
+    if any(is_matrix(arg) for arg in args):
+        args = [x for arg in args for x in (flatten(arg) if is_matrix(arg) else (arg,))]
+    elif len(args) == 1 and isinstance(args[0], (list, tuple)):
+        args = args[0]
+    if not args:
+        raise ValueError(f"{name} requires at least one value")
+    return list(args)
+
+
+def _total(*args):
+    values = _values(args, "sum")
+    result = values[0]
+    for value in values[1:]:
+        result = result + value
+    return result
+
+
+def _product(*args):
+    values = _values(args, "prod")
+    result = values[0]
+    for value in values[1:]:
+        result = result * value
+    return result
+
+
+def _series(parser, namespace, kind):
+    """sum/prod series whose body is re-run on dual numbers"""
+    def call(source, variable, low, high, scope):
+        from .series import evaluate_series
+        if any(isinstance(bound, Dual) and any(bound.grad) for bound in (low, high)):
+            raise ValueError("Series bounds are not differentiable")
+        return evaluate_series(parser, kind, source, variable, _value(low), _value(high),
+                               scope, namespace)
+    return call
+
+
+def _mean(*args):
+    values = _values(args, "mean")
+    return _total(values) / len(values)
+
+
+def _variance(*args):
+    values = _values(args, "var")
+    if len(values) < 2:
+        raise ValueError("Variance requires at least two values")
+    mean = _mean(values)
+    return _total([(v - mean) * (v - mean) for v in values]) / (len(values) - 1)
+
+
+def _median(*args):
+    ordered = sorted(_values(args, "median"), key=_value)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _lifted_functions(parser, dual_math):
+    """Dual implementations of registered functions, by namespace name"""
+    functions = _trig(parser.advanced)
+    functions.update({
+        'sum': _total,
+        'prod': _product,
+        'mean': _mean,
+        'var': _variance,
+        'stdev': lambda *args: dual_math.sqrt(_variance(*args)),
+        'min': lambda *args: min(_values(args, "min"), key=_value),
+        'max': lambda *args: max(_values(args, "max"), key=_value),
+        'median': _median,
+    })
+    return functions
+
+
+def dual_namespace(parser):
+    """
+    Build the namespace that evaluates a parser's compiled code on dual numbers
+
+    Each function of the parser's registry keeps its implementation if
+    its spec is flagged dual, uses a lifted implementation from this
+    module if there is one, and otherwise accepts constant arguments only
+    (matrices for linear algebra), reporting itself as not differentiable.
+
+    Args:
+        parser: ExpressionParser whose scalar namespace to mirror
+
+    Returns:
+        Namespace dict
+    """
+    namespace = dict(parser.namespace)
+    dual_math = _DualMath()
+    lifted = _lifted_functions(parser, dual_math)
+    for spec in parser.registry.specs():
+        module, _, attribute = spec.target.rpartition('.')
+        if module == 'math':
+            if spec.dual:
+                setattr(dual_math, attribute, getattr(math, attribute))
+            elif not hasattr(dual_math, attribute):
+                setattr(dual_math, attribute, _not_differentiable(spec.name, getattr(math, attribute)))
+        elif spec.target not in namespace or spec.dual:
+            # Not loaded (so not called), or already works on dual numbers
+            continue
+        elif spec.target in lifted:
+            namespace[spec.target] = lifted[spec.target]
+        elif spec.pack == 'linalg':
+            message = ("Vectors and matrices are not differentiable" if spec.name == 'matrix'
+                       else f"{spec.name} is not differentiable")
+            namespace[spec.target] = _constant_matrices(message, namespace[spec.target])
+        else:
+            namespace[spec.target] = _not_differentiable(spec.name, namespace[spec.target])
+    namespace.update({
+        'math': dual_math,
+        'series_sum': _series(parser, namespace, 'sum'),
+        'series_prod': _series(parser, namespace, 'prod'),
+    })
+    return namespace
+
+
+def _dual_functions(parser, namespace):
+    """User-defined functions re-run on dual numbers with the same compiled code"""
+    functions = {}
+
+    def make(compiled):
+        def call(*args):
+            if len(args) != len(compiled.variables):
+                raise ValueError(f"Expected {len(compiled.variables)} values, got {len(args)}")
+            scope = {'ans': parser.last_result}
+            scope.update(zip(compiled.variables, args))
+            return eval(compiled.code, namespace, ChainMap(scope, functions, parser.cells))
+        return call
+
+    for name, compiled in parser.functions.items():
+        functions[name] = make(compiled)
+    return functions
+
+
+def evaluate_gradient(compiled, bindings):
+    """
+    Evaluate a compiled expression and its gradient in one pass
+
+    Args:
+        compiled: CompiledExpression whose variables are differentiated
+        bindings: Dict mapping every variable to a number
+
+    Returns:
+        Tuple (value, gradient) with gradient a dict of variable -> partial derivative
+
+    Raises:
+        ValueError: If a variable is unbound or a function is not
+            differentiable at the point
+    """
+    parser = compiled.parser
+    variables = compiled.variables
+    missing = [name for name in variables if name not in bindings]
+    if missing:
+        raise ValueError(f"Missing values for: {', '.join(missing)}")
+
+    scope = {'ans': parser.last_result}
+    for i, name in enumerate(variables):
+        seed = tuple(1.0 if j == i else 0.0 for j in range(len(variables)))
+        scope[name] = Dual(float(bindings[name]), seed)
+
+    namespace = dual_namespace(parser)
+    functions = _dual_functions(parser, namespace)
+    # Variables shadow user-defined functions, which shadow cells (as in
+    # ExpressionParser._run)
+    result = eval(compiled.code, namespace, ChainMap(scope, functions, parser.cells))
+
+    if isinstance(result, Dual):
+        return result.value, dict(zip(variables, result.grad))
+    # Constant expression
+    return result, {name: 0.0 for name in variables}
@@ -0,0 +1,331 @@
+"""
+Named cells module for spreadsheet-style calculations
+Handles: cells such as "rate = 0.05" and "total = price * (1 + rate)"
+kept with their dependency graph, so updating one cell recomputes only
+the cells that depend on it, in topological order, and circular
+references are rejected before anything changes
+
+A formula calling a user-defined function depends on the function and on
+the names its body reads, so "u = g(1)" with "g(x) = x + price" is
+recomputed when price or g changes.
+"""
+
+import re
+
+from .rendering import render_value
+
+# Maximum number of cells kept per session
+MAX_CELLS = 200
+
+# Maximum length of a cell formula
+MAX_FORMULA_LENGTH = 500
+
+_ASSIGNMENT = re.compile(r'^\s*([A-Za-z_]\w*)\s*=(?!=)\s*(.*)$', re.DOTALL)
+
+
+def parse_assignment(text):
+    """
+    Split a cell assignment such as "total = price * (1 + rate)"
+
+    Args:
+        text: Input text
+
+    Returns:
+        Tuple (name, formula), or None if text is not an assignment
+    """
+    match = _ASSIGNMENT.match(str(text))
+    if not match:
+        return None
+    return match.group(1), match.group(2).strip()
+
+
+class Cell:
+    """One named cell: its formula, compiled code and current value"""
+
+    def __init__(self, name, formula, compiled, dependencies):
+        """
+        Initialize cell
+
+        Args:
+            name: Cell name
+            formula: Formula text as entered
+            compiled: CompiledExpression of the formula
+            dependencies: Frozenset of names the formula reads, directly
+                or through user-defined functions (which are included)
+        """
+        self.name = name
+        self.formula = formula
+        self.compiled = compiled
+        self.dependencies = dependencies
+        self.value = None
+        self.error = None
+
+    def to_dict(self):
+        """Cell fields for JSON responses"""
+        return {
+            'name': self.name,
+            'formula': self.formula,
+            'value': render_value(self.value),
+            'error': self.error,
+            'dependencies': sorted(self.dependencies)
+        }
+
+
+class CellSheet:
+    """Named cells with a dependency graph and incremental recomputation"""
+
+    def __init__(self, max_cells=MAX_CELLS):
+        """
+        Initialize empty sheet
+
+        Args:
+            max_cells: Maximum number of cells (default: 200)
+        """
+        self.cells = {}
+        # Current values of cells that evaluated successfully, shared with
+        # ExpressionParser.use_cells so expressions can read them
+        self.values = {}
+        # Reverse edges: name -> cells whose formulas read that name
+        self.dependents = {}
+        self.max_cells = max_cells
+
+    def __contains__(self, name):
+        return name in self.cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def set(self, parser, name, formula):
+        """
+        Create or update a cell and recompute everything that depends on it
+
+        Args:
+            parser: ExpressionParser to compile and evaluate with
+            name: Cell name
+            formula: Formula text, e.g. "price * (1 + rate)"
+
+        Returns:
+            List of recomputed Cells in evaluation order, starting with
+            the cell itself
+
+        Raises:
+            ValueError: If the name is invalid or reserved, the formula
+                does not compile, the cell limit is reached or the
+                formula would create a circular reference
+            SyntaxError: If the formula has syntax errors
+        """
+        name = str(name).strip()
+        formula = str(formula).strip()
+        if not name.isidentifier():
+            raise ValueError(f"Invalid cell name: '{name}'")
+        if name in parser.reserved_names() or name in parser.functions:
+            raise ValueError(f"Cannot use '{name}' as a cell name")
+        if not formula:
+            raise ValueError("Cell formula cannot be empty")
+        if len(formula) > MAX_FORMULA_LENGTH:
+            raise ValueError(f"Cell formulas are limited to {MAX_FORMULA_LENGTH} characters")
+        if name not in self.cells and len(self.cells) >= self.max_cells:
+            raise ValueError(f"Cell limit reached ({self.max_cells}); delete one first")
+
+        compiled = parser.compile(formula)
+        dependencies = self._dependencies(parser, compiled)
+        cycle = self._find_path(dependencies, name)
+        if cycle is not None:
+            raise ValueError(f"Circular reference: {' -> '.join([name] + cycle)}")
+
+        previous = self.cells.get(name)
+        if previous is not None:
+            self._unlink(previous)
+        cell = Cell(name, formula, compiled, dependencies)
+        self.cells[name] = cell
+        self._link(cell)
+        return self._recompute(parser, [name])
+
+    def functions_changed(self, parser, names):
+        """
+        Recompute the cells calling user-defined functions that were
+        defined, redefined or deleted
+
+        A redefined body may read other names, so these cells' dependencies
+        are taken again first. A cell that now reads itself through a
+        function gets a circular reference error.
+
+        Args:
+            parser: ExpressionParser holding the functions as changed
+            names: Names of the changed functions
+
+        Returns:
+            List of recomputed Cells in evaluation order
+        """
+        readers = set()
+        for name in names:
+            readers.update(self.dependents.get(name, ()))
+        for reader in readers:
+            cell = self.cells[reader]
+            self._unlink(cell)
+            # Recompile: a new function may change how the formula translates
+            cell.compiled = parser.compile(cell.formula)
+            cell.dependencies = self._dependencies(parser, cell.compiled)
+            self._link(cell)
+        return self._recompute(parser, sorted(readers))
+
+    def delete(self, parser, name):
+        """
+        Remove a cell; cells that read it are recomputed (and now fail)
+
+        Args:
+            parser: ExpressionParser to evaluate dependents with
+            name: Cell name
+
+        Returns:
+            List of recomputed dependent Cells in evaluation order
+
+        Raises:
+            ValueError: If no such cell exists
+        """
+        cell = self.cells.pop(name, None)
+        if cell is None:
+            raise ValueError(f"Unknown cell: {name}")
+        self._unlink(cell)
+        self.values.pop(name, None)
+        return self._recompute(parser, sorted(self.dependents.get(name, ())))
+
+    def clear(self):
+        """Remove all cells"""
+        self.cells.clear()
+        self.values.clear()
+        self.dependents.clear()
+
+    def get(self, name):
+        """
+        Get one cell
+
+        Raises:
+            ValueError: If no such cell exists
+        """
+        if name not in self.cells:
+            raise ValueError(f"Unknown cell: {name}")
+        return self.cells[name]
+
+    def get_cells(self):
+        """
+        Get all cells
+
+        Returns:
+            List of cell dicts in definition order
+        """
+        return [cell.to_dict() for cell in self.cells.values()]
+
+    @staticmethod
+    def _dependencies(parser, compiled):
+        """Names a formula reads, expanding the bodies of the functions it calls"""
+        dependencies = set()
+        pending = [compiled]
+        while pending:
+            for name in parser.free_names(pending.pop()):
+                if name in dependencies:
+                    continue
+                dependencies.add(name)
+                if name in parser.functions:
+                    pending.append(parser.functions[name])
+        return frozenset(dependencies)
+
+    def _link(self, cell):
+        """Add the reverse edges of a cell's formula"""
+        for dependency in cell.dependencies:
+            self.dependents.setdefault(dependency, set()).add(cell.name)
+
+    def _unlink(self, cell):
+        """Drop the reverse edges of a cell's current formula"""
+        for dependency in cell.dependencies:
+            readers = self.dependents.get(dependency)
+            if readers is not None:
+                readers.discard(cell.name)
+                if not readers:
+                    del self.dependents[dependency]
+
+    def _find_path(self, starts, target):
+        """Dependency path from any of starts to target, or None"""
+        parents = {}
+        pending = list(starts)
+        for start in pending:
+            parents[start] = None
+        while pending:
+            current = pending.pop()
+            if current == target:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+            cell = self.cells.get(current)
+            if cell is None:
+                continue
+            for dependency in cell.dependencies:
+                if dependency not in parents:
+                    parents[dependency] = current
+                    pending.append(dependency)
+        return None
+
+    def _affected(self, roots):
+        """The roots and every cell that transitively reads one of them"""
+        affected = set(roots)
+        pending = list(roots)
+        while pending:
+            for reader in self.dependents.get(pending.pop(), ()):
+                if reader not in affected:
+                    affected.add(reader)
+                    pending.append(reader)
+        return affected
+
+    def _recompute(self, parser, roots):
+        """Re-evaluate roots and their transitive dependents in topological order"""
+        affected = self._affected(roots)
+        # Kahn's algorithm restricted to the affected subgraph: a cell is
+        # ready once none of its dependencies is still waiting
+        waiting = {
+            name: sum(1 for dependency in self.cells[name].dependencies if dependency in affected)
+            for name in affected
+        }
+        ready = sorted((name for name, count in waiting.items() if count == 0), reverse=True)
+
+        order = []
+        while ready:
+            cell = self.cells[ready.pop()]
+            self._evaluate(parser, cell)
+            order.append(cell)
+            for reader in sorted(self.dependents.get(cell.name, ()), reverse=True):
+                waiting[reader] -= 1
+                if waiting[reader] == 0:
+                    ready.append(reader)
+
+        # Cells never ready are on a cycle, which only a function
+        # redefinition can create (set() rejects circular formulas)
+        for name in sorted(affected - {cell.name for cell in order}):
+            cell = self.cells[name]
+            cell.value = None
+            cell.error = "Circular reference through a user-defined function"
+            self.values.pop(name, None)
+            order.append(cell)
+        return order
+
+    def _evaluate(self, parser, cell):
+        """Evaluate one cell, recording its value or error"""
+        failed = [d for d in sorted(cell.dependencies) if d in self.cells and self.cells[d].error]
+        if failed:
+            cell.value = None
+            cell.error = f"Depends on '{failed[0]}', which has an error"
+        else:
+            try:
+                value = cell.compiled.evaluate()
+                if callable(value):
+                    raise ValueError(f"'{cell.formula}' is a function; call it with arguments")
+                cell.value = value
+                cell.error = None
+            except (ValueError, SyntaxError) as e:
+                cell.value = None
+                cell.error = str(e)
+        if cell.error is None:
+            self.values[cell.name] = cell.value
+        else:
+            self.values.pop(cell.name, None)
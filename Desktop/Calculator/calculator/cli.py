@@ -7,8 +7,10 @@ import sys
 from .arithmetic import Arithmetic
 from .advanced import AdvancedMath
 from .memory import Memory
+from .cells import parse_assignment
 from .parser import ExpressionParser
 from .config import CalculatorConfig
+from .rendering import is_big_integer, digit_count, render_value, iter_digits
 
 
 class CalculatorCLI:
@@ -20,6 +22,9 @@ class CalculatorCLI:
         self.advanced = AdvancedMath()
         self.memory = Memory()
         self.parser = ExpressionParser()
+        self.parser.use_functions(self.memory.functions)
+        self.parser.use_cells(self.memory.cells.values)
+        self.parser.use_random(self.memory.random)
         self.config = CalculatorConfig()
         self.running = True
 
@@ -65,6 +70,51 @@ ADVANCED FUNCTIONS:
   exp(x)                - e^x
   abs(x)                - Absolute value
   fact(x)               - Factorial
+  nPr(n, r)             - Permutations P(n, r)
+  nCr(n, r)             - Combinations C(n, r)
+  nCr(n, r, p)          - Combinations modulo a prime p
+  sum(a, b, ...)        - Sum of the arguments
+  prod(a, b, ...)       - Product of the arguments
+  mean(a, b, ...)       - Arithmetic mean
+  var(a, b, ...)        - Sample variance
+  stdev(a, b, ...)      - Sample standard deviation
+  min(...), max(...)    - Smallest / largest argument
+  median(a, b, ...)     - Median
+
+SERIES:
+  sum(i^2, i, 1, 100)   - Sum of i^2 for i = 1..100
+  prod(1 + 1/i, i, 1, n) - Product over i = 1..n
+  (closed forms for polynomial and geometric terms; others are
+  limited to 10,000,000 terms)
+
+NUMBER THEORY:
+  powmod(a, b, m)       - a^b mod m without the full power
+  gcd(a, b, ...)        - Greatest common divisor
+  lcm(a, b, ...)        - Least common multiple
+  isprime(n)            - 1 if n is prime, 0 otherwise
+  factor(n)             - Prime factors of n
+  primes(a, b)          - Primes in [a, b]
+  pi(n)                 - Number of primes <= n (pi alone is the constant)
+
+MATRICES:
+  [1, 2, 3]             - Vector literal
+  [[1, 2], [3, 4]]      - Matrix literal (+ - * / ^ work elementwise)
+  dot(a, b)             - Dot product / matrix product
+  det(A), inv(A)        - Determinant / inverse of a square matrix
+  transpose(A)          - Transpose
+  solve(A, b)           - Solve the linear system A x = b
+
+UNITS:
+  5 km to mi            - Convert a value between units of one dimension
+  100 degC to degF      - (length, mass, time, temperature, data, angle)
+  units                 - List the known units
+
+RANDOM NUMBERS:
+  rand()                - Uniform in [0, 1)
+  randint(a, b)         - Integer in [a, b]
+  normal(mu, sigma)     - Normally distributed
+  rand(n), randint(a, b, n), normal(mu, sigma, n)
+                        - Vector of n draws in one call
 
 SPECIAL COMMANDS:
   history               - Show calculation history
@@ -79,9 +129,30 @@ SPECIAL COMMANDS:
   angle [mode]          - Set angle mode (degrees/radians)
   decimal [places]      - Set decimal places
   notation [type]       - Set notation (fixed/scientific)
+  precision [mode]      - float, or adaptive: exact Decimal digits when
+                          decimal places exceed float precision or
+                          digits cancel
+  seed [n]              - Show the random seed, or restart from seed n
+  table expr; x=a:b[:s]; y=v1,v2
+                        - Evaluate expr over all combinations of values
+  solve expr; x=a:b     - Find a root of expr (or an equation) in [a, b]
+  integrate expr; x=a:b - Integrate expr over [a, b]
+  diff(expr, x=a, ...)  - Value and partial derivatives at a point
+  digits                - Print every digit of a large integer result
+  f(x, y) = expr        - Define a function, then call it: f(3, 4)
+  functions             - List defined functions
+  clear_functions       - Remove all defined functions
+  name = expr           - Set a cell, e.g. rate = 0.05; cells that use it update
+  cells                 - List cells with their values
+  delete_cell [name]    - Remove a cell
+  clear_cells           - Remove all cells
   ans                   - Use previous result
   quit / exit           - Exit calculator
 
+COMMAND LINE:
+  --daemon [socket]     - Run a warm calculator daemon on a Unix socket
+  --client expr ...     - Evaluate via the daemon (in-process if none running)
+
 CONSTANTS:
   pi or π               - π (3.14159...)
   e                     - Euler's number (2.71828...)
@@ -143,7 +214,7 @@ EXAMPLES:
                     print(f"LAST {limit} CALCULATIONS")
                     print("=" * 60)
                     for i, entry in enumerate(history, 1):
-                        print(f"{i}. {entry['expression']} = {entry['result']}")
+                        print(f"{i}. {entry['expression']} = {render_value(entry['result'])}")
                     print("=" * 60 + "\n")
                 else:
                     print("No history available")
@@ -207,11 +278,34 @@ EXAMPLES:
             try:
                 places = int(user_input[8:].strip())
                 self.config.set_decimal_places(places)
+                self.parser.set_decimal_places(places)
                 print(f"Decimal places set to: {places}")
             except ValueError:
                 print("Invalid decimal places. Usage: decimal [number]")
             return True
         
+        if user_input.lower().startswith('precision '):
+            mode = user_input[10:].strip().lower()
+            try:
+                self.config.set_precision_mode(mode)
+                self.parser.set_precision_mode(mode)
+                print(f"Precision mode set to: {mode}")
+            except ValueError as e:
+                print(str(e))
+            return True
+        
+        if user_input.lower() == 'seed':
+            print(f"Random seed: {self.memory.random.seed}")
+            return True
+        
+        if user_input.lower().startswith('seed '):
+            try:
+                seed = self.memory.random.reseed(int(user_input[5:].strip()))
+                print(f"Random seed set to: {seed}")
+            except ValueError:
+                print("Invalid seed. Usage: seed [integer from 0 to 2^64 - 1]")
+            return True
+        
         if user_input.lower().startswith('notation '):
             notation = user_input[9:].strip().lower()
             if notation in ['fixed', 'scientific']:
@@ -221,6 +315,88 @@ EXAMPLES:
                 print("Notation must be 'fixed' or 'scientific'")
             return True
         
+        if user_input.lower().startswith('table '):
+            self.print_table(user_input[6:])
+            return True
+        
+        if user_input.lower().startswith('solve '):
+            self.print_solution('solve', user_input[6:])
+            return True
+        
+        if user_input.lower().startswith('integrate '):
+            self.print_solution('integrate', user_input[10:])
+            return True
+        
+        if user_input.lower().startswith('diff(') and user_input.endswith(')'):
+            self.print_derivative(user_input[5:-1])
+            return True
+        
+        if user_input.lower() == 'digits':
+            self.print_digits()
+            return True
+        
+        if user_input.lower() == 'functions':
+            self.print_functions()
+            return True
+        
+        if user_input.lower() == 'units':
+            self.print_units()
+            return True
+        
+        if user_input.lower() == 'clear_functions':
+            names = list(self.memory.functions)
+            self.memory.clear_functions()
+            print("Functions cleared!")
+            updated = self.memory.cells.functions_changed(self.parser, names)
+            if updated:
+                print()
+                self.print_cell_updates(updated)
+                print()
+            return True
+        
+        if self.parser.is_definition(user_input):
+            try:
+                name, function = self.parser.define(user_input)
+                self.memory.define_function(name, function)
+                print(f"\nDefined {name}({', '.join(function.variables)})\n")
+                updated = self.memory.cells.functions_changed(self.parser, [name])
+                if updated:
+                    self.print_cell_updates(updated)
+                    print()
+            except Exception as e:
+                print(f"\n❌ Error: {str(e)}\n")
+            return True
+        
+        if user_input.lower() == 'cells':
+            self.print_cells()
+            return True
+        
+        if user_input.lower() == 'clear_cells':
+            self.memory.cells.clear()
+            print("Cells cleared!")
+            return True
+        
+        if user_input.lower().startswith('delete_cell '):
+            try:
+                updated = self.memory.cells.delete(self.parser, user_input[12:].strip())
+                print()
+                self.print_cell_updates(updated)
+                print()
+            except Exception as e:
+                print(f"\n❌ Error: {str(e)}\n")
+            return True
+        
+        assignment = parse_assignment(user_input)
+        if assignment is not None:
+            try:
+                updated = self.memory.cells.set(self.parser, *assignment)
+                print()
+                self.print_cell_updates(updated)
+                print()
+            except Exception as e:
+                print(f"\n❌ Error: {str(e)}\n")
+            return True
+        
         # Handle mathematical expressions
         try:
             # Replace ^ with **
@@ -233,6 +409,8 @@ EXAMPLES:
             
             # Format and display result
             formatted_result = self.config.format_result(result)
+            if is_big_integer(result):
+                formatted_result += f"  ({digit_count(result)} digits, type 'digits' to print all)"
             print(f"\n{formatted_result}\n")
             
         except Exception as e:
@@ -240,6 +418,177 @@ EXAMPLES:
         
         return True
 
+    def print_solution(self, command, spec):
+        """
+        Find a root or integral of an expression over an interval and print it
+        
+        Args:
+            command: 'solve' or 'integrate'
+            spec: 'expression; name = start:stop'
+        """
+        from . import solver
+        
+        try:
+            expression, sep, interval = spec.partition(';')
+            name, sep2, bounds = interval.partition('=')
+            start, sep3, stop = bounds.partition(':')
+            if not (sep and sep2 and sep3):
+                raise ValueError(f"Usage: {command} expr; x = start:stop")
+            
+            variable = name.strip()
+            compiled = solver.compile_function(self.parser, expression.strip(), variable)
+            if command == 'solve':
+                result = solver.find_root(compiled, variable, float(start), float(stop))
+                value = result.root
+                note = f"{result.method}, {result.evaluations} evaluations"
+            else:
+                result = solver.integrate(compiled, variable, float(start), float(stop))
+                value = result.value
+                note = f"error ~{result.error_estimate:.1e}, {result.evaluations} evaluations"
+            if not result.converged:
+                note += ", did not converge"
+        except Exception as e:
+            print(f"\n❌ Error: {str(e)}\n")
+            return
+        
+        label = f"{variable} =" if command == 'solve' else "integral ="
+        print(f"\n{label} {self.config.format_result(value)}  ({note})\n")
+
+    def print_derivative(self, spec):
+        """
+        Evaluate an expression and its partial derivatives at a point
+        
+        Args:
+            spec: 'expression, name = value, ...' (values may be expressions)
+        """
+        try:
+            # Split on top-level commas only, so f(a, b) stays together
+            parts, depth, current = [], 0, ''
+            for char in spec:
+                if char == ',' and depth == 0:
+                    parts.append(current)
+                    current = ''
+                    continue
+                depth += {'(': 1, ')': -1}.get(char, 0)
+                current += char
+            parts.append(current)
+            
+            point = {}
+            for part in parts[1:]:
+                name, sep, value = part.partition('=')
+                if not sep or not name.strip().isidentifier():
+                    raise ValueError("Usage: diff(expr, x = value, y = value, ...)")
+                point[name.strip()] = float(self.parser.compile(value.strip().replace('^', '**')).evaluate())
+            if not point:
+                raise ValueError("Usage: diff(expr, x = value, y = value, ...)")
+            
+            compiled = self.parser.compile(parts[0].strip().replace('^', '**'), list(point))
+            value, gradient = compiled.gradient(point)
+        except Exception as e:
+            print(f"\n❌ Error: {str(e)}\n")
+            return
+        
+        print(f"\nvalue = {self.config.format_result(value)}")
+        for name, partial in gradient.items():
+            print(f"d/d{name} = {self.config.format_result(partial)}")
+        print()
+
+    def print_functions(self):
+        """Print the user-defined functions"""
+        functions = self.memory.get_functions()
+        if not functions:
+            print("No functions defined")
+            return
+        
+        print("\n" + "=" * 60)
+        print("USER-DEFINED FUNCTIONS")
+        print("=" * 60)
+        for function in functions:
+            print(f"{function['name']}({', '.join(function['parameters'])}) = {function['body']}")
+        print("=" * 60 + "\n")
+
+    def print_units(self):
+        """Print the units accepted by conversions, by dimension"""
+        from .units import get_units
+        print("\n" + "=" * 60)
+        print("UNITS")
+        print("=" * 60)
+        for dimension, units in get_units().items():
+            print(f"{dimension:12} {', '.join(units)}")
+        print("=" * 60 + "\n")
+
+    def print_cell_updates(self, cells):
+        """Print recomputed cells, one per line, in evaluation order"""
+        for cell in cells:
+            if cell.error is None:
+                print(f"{cell.name} = {self.config.format_result(cell.value)}")
+            else:
+                print(f"{cell.name}: ❌ {cell.error}")
+
+    def print_cells(self):
+        """Print every cell with its formula and value"""
+        cells = self.memory.cells.get_cells()
+        if not cells:
+            print("No cells defined")
+            return
+        
+        print("\n" + "=" * 60)
+        print("CELLS")
+        print("=" * 60)
+        for cell in cells:
+            if cell['error'] is None:
+                value = self.config.format_result(cell['value'])
+            else:
+                value = f"❌ {cell['error']}"
+            print(f"{cell['name']} = {cell['formula']}  ->  {value}")
+        print("=" * 60 + "\n")
+
+    def print_digits(self):
+        """Stream the full digits of the last result to stdout"""
+        result = self.parser.get_last_result()
+        if not isinstance(result, int):
+            print("Last result is not an integer")
+            return
+        
+        print()
+        for chunk in iter_digits(result):
+            sys.stdout.write(chunk)
+        print("\n")
+
+    def print_table(self, spec):
+        """
+        Evaluate an expression over variable ranges and print the table
+        
+        Args:
+            spec: 'expression; name = start:stop[:step]; name = v1,v2,...'
+        """
+        from .table import evaluate_table, parse_spec
+        
+        try:
+            parts = [p.strip() for p in spec.split(';')]
+            expression = parts[0].replace('^', '**')
+            variables = {}
+            for part in parts[1:]:
+                if not part:
+                    continue
+                name, sep, values = part.partition('=')
+                if not sep:
+                    raise ValueError(f"Invalid variable '{part}'. Use name = values")
+                variables[name.strip()] = parse_spec(values)
+            
+            result = evaluate_table(self.parser, expression, variables)
+        except Exception as e:
+            print(f"\n❌ Error: {str(e)}\n")
+            return
+        
+        headers = result.names + [parts[0]]
+        print("\n" + " | ".join(headers))
+        print("-" * 60)
+        for row in result.rows():
+            cells = [self.config.format_result(v) if v is not None else 'error' for v in row]
+            print(" | ".join(cells))
+        print()
+
     def run(self):
         """Run the calculator in interactive mode"""
         self.print_welcome()
@@ -268,6 +617,23 @@ EXAMPLES:
 
 def main():
     """Main entry point for the calculator"""
+    args = sys.argv[1:]
+    
+    if args and args[0] == '--daemon':
+        # Daemon mode: keep a warm parser listening on a Unix socket
+        from .daemon import serve
+        try:
+            serve(args[1] if len(args) > 1 else None)
+        except OSError as e:
+            print(f"❌ Error: {str(e)}")
+            sys.exit(1)
+        return
+    
+    if args and args[0] == '--client':
+        # Thin client mode: forward expressions to the daemon if one is running
+        from .daemon import run_client
+        sys.exit(run_client(args[1:]))
+    
     calculator = CalculatorCLI()
     
     if len(sys.argv) > 1:
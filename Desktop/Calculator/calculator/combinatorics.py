@@ -0,0 +1,284 @@
+"""
+Combinatorics module for factorials, permutations and combinations
+Handles: cached factorials, direct P(n, r) and C(n, r) without full
+factorial products, and C(n, r) mod p backed by precomputed factorial
+and inverse-factorial tables
+
+Exact results are limited to the same bit budget as integer powers,
+estimated from log-gamma before any multiplication is done.
+"""
+
+import math
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import compress
+
+from .arithmetic import MAX_POWER_BITS, as_integer
+
+# Number of distinct factorials kept in the cache
+FACTORIAL_CACHE_SIZE = 256
+
+# Largest n whose factorial is cached (10000! is about 15 KB)
+MAX_CACHED_FACTORIAL = 10_000
+
+# Largest factorial table built for one modulus
+MAX_TABLE_SIZE = 10_000_000
+
+# Total entries kept in the factorial tables of all moduli; the least
+# recently used tables are dropped beyond it
+MAX_TABLE_ENTRIES = 10_000_000
+
+# C(n, r) with n at most FACTORED_MAX_N and min(r, n - r) at least
+# FACTORED_MIN_R is built from its prime factorisation; math.comb slows
+# down sharply as r approaches n / 2 (11 s for C(10^6, 5 * 10^5))
+FACTORED_MAX_N = 4_000_000
+FACTORED_MIN_R = 1_000
+
+_LN2 = math.log(2)
+
+# Above this, floats cannot tell n from n - 1 and log-gamma is not used
+_LGAMMA_LIMIT = 2 ** 52
+
+# Cached ModularTables by modulus, least recently used first
+_tables = OrderedDict()
+
+
+@lru_cache(maxsize=FACTORIAL_CACHE_SIZE)
+def _cached_factorial(n):
+    return math.factorial(n)
+
+
+def _log2_falling(n, r):
+    """Estimated bits of n! / (n - r)!, the product of the r terms from n down"""
+    if r == 0:
+        return 0.0
+    if n < _LGAMMA_LIMIT:
+        return (math.lgamma(n + 1) - math.lgamma(n - r + 1)) / _LN2
+    # Every term is at least n / 2 > 2^51 unless more than half are taken
+    return r * math.log2(n - r + 1) if r <= n // 2 else math.inf
+
+
+def _product(values, low, high):
+    """Product of values[low:high], multiplying balanced halves"""
+    if high - low <= 16:
+        return math.prod(values[low:high])
+    middle = (low + high) // 2
+    return _product(values, low, middle) * _product(values, middle, high)
+
+
+def _factored_combination(n, k):
+    """C(n, k) as the product of its prime powers (Legendre's formula)"""
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(n) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, n + 1, i)))
+    rest = n - k
+    powers = []
+    for p in compress(range(n + 1), sieve):
+        exponent = 0
+        q = p
+        while q <= n:
+            exponent += n // q - k // q - rest // q
+            q *= p
+        if exponent:
+            powers.append(p ** exponent)
+    return _product(powers, 0, len(powers))
+
+
+def _check_bits(bits, name):
+    if bits > MAX_POWER_BITS:
+        raise ValueError(f"{name} too large (over {MAX_POWER_BITS:,} bits)")
+
+
+def factorial(n):
+    """
+    Calculate n! with a bounded cache of recent results
+
+    Args:
+        n: Non-negative integer
+
+    Returns:
+        n!
+
+    Raises:
+        ValueError: If n is negative or not an integer, or n! is too large
+    """
+    n = as_integer(n, "Factorial input")
+    if n < 0:
+        raise ValueError("Factorial input must be a non-negative integer")
+    if n <= MAX_CACHED_FACTORIAL:
+        return _cached_factorial(n)
+    _check_bits(_log2_falling(n, n), "Factorial")
+    return math.factorial(n)
+
+
+def permutation(n, r):
+    """
+    Calculate P(n, r) = n! / (n-r)! as the product of r terms
+
+    Args:
+        n: Total items
+        r: Items to arrange
+
+    Returns:
+        Number of permutations
+
+    Raises:
+        ValueError: If inputs are invalid or the result is too large
+    """
+    n = as_integer(n, "Permutation inputs")
+    r = as_integer(r, "Permutation inputs")
+    if n < 0 or r < 0 or r > n:
+        raise ValueError("Invalid permutation parameters")
+    _check_bits(_log2_falling(n, r), "Permutation")
+    return math.perm(n, r)
+
+
+def combination(n, r, modulus=None):
+    """
+    Calculate C(n, r) = n! / (r! * (n-r)!), optionally modulo a prime
+
+    Args:
+        n: Total items
+        r: Items to choose
+        modulus: Prime modulus (optional)
+
+    Returns:
+        Number of combinations (mod modulus if given)
+
+    Raises:
+        ValueError: If inputs are invalid or the result (without a
+            modulus) is too large
+    """
+    n = as_integer(n, "Combination inputs")
+    r = as_integer(r, "Combination inputs")
+    if n < 0 or r < 0 or r > n:
+        raise ValueError("Invalid combination parameters")
+    if modulus is not None:
+        return combination_mod(n, r, modulus)
+    k = min(r, n - r)
+    if k > MAX_POWER_BITS:
+        # C(n, k) >= 2^k for k <= n / 2
+        _check_bits(k, "Combination")
+    _check_bits(_log2_falling(n, k) - math.lgamma(k + 1) / _LN2, "Combination")
+    if FACTORED_MIN_R <= k and n <= FACTORED_MAX_N:
+        return _factored_combination(n, k)
+    return math.comb(n, r)
+
+
+class ModularTables:
+    """Factorials and inverse factorials modulo a prime, grown on demand"""
+
+    def __init__(self, p):
+        """
+        Initialize tables
+
+        Args:
+            p: Prime modulus
+        """
+        self.p = p
+        self.fact = [1]
+        self.inv_fact = [1]
+
+    def ensure(self, n):
+        """Extend the tables to cover 0..n (n < p)"""
+        size = len(self.fact)
+        if n < size:
+            return
+        if n >= MAX_TABLE_SIZE:
+            raise ValueError(f"Modular tables limited to {MAX_TABLE_SIZE} entries")
+
+        p = self.p
+        fact = self.fact
+        for i in range(size, n + 1):
+            fact.append(fact[-1] * i % p)
+
+        # One modular inverse, then walk downwards: inv(i-1)! = inv(i)! * i
+        inv = [0] * (n + 1 - size)
+        inv[-1] = pow(fact[n], -1, p)
+        for i in range(n, size, -1):
+            inv[i - 1 - size] = inv[i - size] * i % p
+        self.inv_fact.extend(inv)
+
+    def combination(self, n, r):
+        """C(n, r) mod p for 0 <= r <= n < p"""
+        self.ensure(n)
+        return self.fact[n] * self.inv_fact[r] % self.p * self.inv_fact[n - r] % self.p
+
+
+def modular_tables(p):
+    """
+    Get the (cached) factorial tables for a prime modulus
+
+    Tables of all moduli together keep at most MAX_TABLE_ENTRIES entries
+    (see combination_mod); the least recently used are dropped first.
+
+    Args:
+        p: Prime modulus
+
+    Returns:
+        ModularTables
+
+    Raises:
+        ValueError: If p is not prime
+    """
+    tables = _tables.get(p)
+    if tables is not None:
+        _tables.move_to_end(p)
+        return tables
+    from .number_theory import is_prime
+    if not is_prime(p):
+        raise ValueError("Modulus must be a prime number")
+    tables = _tables[p] = ModularTables(p)
+    return tables
+
+
+def _trim_tables():
+    """Drop least recently used tables while all of them hold over MAX_TABLE_ENTRIES"""
+    total = sum(len(tables.fact) for tables in _tables.values())
+    while total > MAX_TABLE_ENTRIES and len(_tables) > 1:
+        _, dropped = _tables.popitem(last=False)
+        total -= len(dropped.fact)
+
+
+def combination_mod(n, r, p):
+    """
+    Calculate C(n, r) mod p for a prime p
+
+    Uses the precomputed tables directly when n < p, and Lucas' theorem
+    (digit-by-digit in base p) otherwise.
+
+    Args:
+        n: Total items
+        r: Items to choose
+        p: Prime modulus
+
+    Returns:
+        C(n, r) mod p
+
+    Raises:
+        ValueError: If inputs are invalid or p is not prime
+    """
+    n = as_integer(n, "Combination inputs")
+    r = as_integer(r, "Combination inputs")
+    p = as_integer(p, "Modulus")
+    if n < 0 or r < 0 or r > n:
+        raise ValueError("Invalid combination parameters")
+
+    tables = modular_tables(p)
+    try:
+        if n < p:
+            return tables.combination(n, r)
+
+        result = 1
+        while n or r:
+            n_digit, r_digit = n % p, r % p
+            if r_digit > n_digit:
+                return 0
+            result = result * tables.combination(n_digit, r_digit) % p
+            n //= p
+            r //= p
+        return result
+    finally:
+        _trim_tables()
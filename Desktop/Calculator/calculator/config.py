@@ -2,6 +2,13 @@
 Configuration module for calculator settings
 """
 
+import math
+
+from .rendering import FLOAT_DIGITS, is_big_integer, is_decimal, is_matrix, summarize
+
+# Integers above this cannot be converted to float for formatting
+FLOAT_INTEGER_LIMIT = 10 ** 308
+
 
 class CalculatorConfig:
     """Configuration settings for the calculator"""
@@ -11,6 +18,7 @@ class CalculatorConfig:
         self.decimal_places = 10
         self.angle_mode = 'degrees'  # 'degrees' or 'radians'
         self.notation = 'fixed'  # 'fixed' or 'scientific'
+        self.precision_mode = 'float'  # 'float' or 'adaptive'
         self.max_history = 100
         self.show_timestamps = True
 
@@ -47,6 +55,18 @@ class CalculatorConfig:
             raise ValueError("Notation must be 'fixed' or 'scientific'")
         self.notation = notation
 
+    def set_precision_mode(self, mode):
+        """
+        Set precision mode
+        
+        Args:
+            mode: 'float' or 'adaptive' (Decimal re-evaluation when a float
+                result cannot support the decimal places)
+        """
+        if mode not in ['float', 'adaptive']:
+            raise ValueError("Precision mode must be 'float' or 'adaptive'")
+        self.precision_mode = mode
+
     def set_max_history(self, max_size):
         """
         Set maximum history size
@@ -68,25 +88,72 @@ class CalculatorConfig:
         Returns:
             Formatted result string
         """
+        if is_matrix(result):
+            return self._format_rows(result.tolist())
+        
+        if is_decimal(result):
+            return self._format_decimal(result)
+        
+        if isinstance(result, int) and not isinstance(result, bool):
+            # Integers are formatted exactly; huge ones (or ones beyond
+            # float range) are summarised rather than converted in full
+            if is_big_integer(result) or abs(result) > FLOAT_INTEGER_LIMIT:
+                return summarize(result, max(self.decimal_places + 1, 2)).text
+            if self.notation == 'fixed':
+                return str(result)
+
         try:
             result = float(result)
+            places = self._float_places(result)
             
             if self.notation == 'scientific':
-                return f"{result:.{self.decimal_places}e}"
+                return f"{result:.{places}e}"
             else:
                 # Fixed notation
                 if result == int(result):
                     return str(int(result))
-                return f"{result:.{self.decimal_places}f}".rstrip('0').rstrip('.')
-        except (TypeError, ValueError):
+                return f"{result:.{places}f}".rstrip('0').rstrip('.')
+        except (TypeError, ValueError, OverflowError):
             return str(result)
 
+    def _float_places(self, result):
+        """
+        Decimal places to show for a float result
+        
+        In adaptive precision mode a float that reaches formatting was not
+        refined with Decimal (e.g. an element of a vector or matrix, or an
+        expression Decimal cannot evaluate), so it is shown with at most
+        the digits a float holds instead of rounding noise.
+        """
+        if self.precision_mode != 'adaptive' or result == 0 or not math.isfinite(result):
+            return self.decimal_places
+        if self.notation == 'scientific':
+            return min(self.decimal_places, FLOAT_DIGITS - 1)
+        magnitude = math.floor(math.log10(abs(result))) + 1
+        return max(0, min(self.decimal_places, FLOAT_DIGITS - magnitude))
+
+    def _format_decimal(self, result):
+        """Format a Decimal to the configured places without a float round trip"""
+        if self.notation == 'scientific':
+            return f"{result:.{self.decimal_places}e}"
+        text = f"{result:.{self.decimal_places}f}"
+        if '.' in text:
+            text = text.rstrip('0').rstrip('.')
+        return '0' if text == '-0' else text
+
+    def _format_rows(self, rows):
+        """Format a vector or matrix as nested brackets of formatted elements"""
+        if isinstance(rows, list):
+            return '[' + ', '.join(self._format_rows(row) for row in rows) + ']'
+        return self.format_result(rows)
+
     def get_config(self):
         """Get all configuration settings"""
         return {
             'decimal_places': self.decimal_places,
             'angle_mode': self.angle_mode,
             'notation': self.notation,
+            'precision_mode': self.precision_mode,
             'max_history': self.max_history,
             'show_timestamps': self.show_timestamps
         }
@@ -0,0 +1,263 @@
+"""
+Calculator daemon and thin client over a Unix domain socket
+
+The daemon keeps warm ExpressionParsers (and their compiled-expression
+caches) alive so that batch scripts pay a socket round trip per
+expression instead of an interpreter start.
+
+Line protocol (UTF-8, one message per line):
+    client -> daemon:  <expression>
+    daemon -> client:  OK <formatted result>
+                       ERR <error message>
+Each connection has its own 'ans' value, starting at 0.
+"""
+
+import os
+import sys
+
+# Override with the CALCULATOR_SOCKET environment variable
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get('TMPDIR', '/tmp'),
+    f"calculator-{os.getuid() if hasattr(os, 'getuid') else 0}.sock"
+)
+
+
+def get_socket_path(socket_path=None):
+    """Resolve the socket path from argument, environment or default"""
+    return socket_path or os.environ.get('CALCULATOR_SOCKET') or DEFAULT_SOCKET_PATH
+
+
+def evaluate_line(parser, config, expression, ans=0):
+    """
+    Evaluate one expression into a protocol reply
+
+    Args:
+        parser: ExpressionParser to compile with
+        config: CalculatorConfig used to format results
+        expression: Expression string
+        ans: Value of 'ans' for this evaluation
+
+    Returns:
+        Tuple (ok, text, result) where result is None on error
+    """
+    try:
+        compiled = parser.compile(expression.replace('^', '**'))
+        result = compiled.evaluate({'ans': ans})
+        return True, config.format_result(result), result
+    except Exception as e:
+        # Keep the reply on a single protocol line
+        return False, ' '.join(str(e).split()), None
+
+
+def evaluate_local(expressions):
+    """
+    Evaluate expressions in-process, returning the same replies as the daemon
+
+    Args:
+        expressions: List of expression strings
+
+    Returns:
+        List of (ok, text) tuples
+    """
+    from .parser import ExpressionParser
+    from .config import CalculatorConfig
+
+    parser = ExpressionParser()
+    config = CalculatorConfig()
+    replies = []
+    ans = 0
+
+    for expr in expressions:
+        ok, text, result = evaluate_line(parser, config, expr, ans)
+        if ok:
+            ans = result
+        replies.append((ok, text))
+
+    return replies
+
+
+def _connect(socket_path=None, timeout=5.0):
+    """
+    Connect to a running daemon
+
+    Raises:
+        OSError: If no daemon is listening on the socket
+    """
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(get_socket_path(socket_path))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _exchange(sock, expressions):
+    """
+    Send expressions over a connected socket and read one reply per line
+
+    Raises:
+        OSError: If the connection fails, times out or closes early
+    """
+    import socket
+
+    payload = ''.join(expr.replace('\n', ' ') + '\n' for expr in expressions)
+    sock.sendall(payload.encode('utf-8'))
+    sock.shutdown(socket.SHUT_WR)
+
+    replies = []
+    with sock.makefile('r', encoding='utf-8') as stream:
+        for line in stream:
+            status, _, text = line.rstrip('\n').partition(' ')
+            replies.append((status == 'OK', text))
+
+    if len(replies) != len(expressions):
+        raise ConnectionError("Daemon closed the connection early")
+    return replies
+
+
+def evaluate_remote(expressions, socket_path=None, timeout=5.0):
+    """
+    Send expressions to a running daemon
+
+    Args:
+        expressions: List of expression strings
+        socket_path: Daemon socket path (optional)
+        timeout: Socket timeout in seconds
+
+    Returns:
+        List of (ok, text) tuples
+
+    Raises:
+        OSError: If no daemon is listening or the connection fails
+    """
+    with _connect(socket_path, timeout) as sock:
+        return _exchange(sock, expressions)
+
+
+def run_client(expressions, socket_path=None, timeout=5.0):
+    """
+    Evaluate expressions via the daemon, falling back to in-process
+    evaluation when no daemon accepts the connection
+
+    Once the expressions are sent, a failure is reported instead: the
+    daemon may already have evaluated some of them.
+
+    Args:
+        expressions: List of expression strings
+        socket_path: Daemon socket path (optional)
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Process exit status (0 if every expression succeeded, 1 otherwise)
+    """
+    path = get_socket_path(socket_path)
+    sock = None
+
+    # Skip the socket machinery entirely when no daemon has been started
+    if os.path.exists(path):
+        try:
+            sock = _connect(path, timeout)
+        except OSError:
+            sock = None
+
+    if sock is None:
+        replies = evaluate_local(expressions)
+    else:
+        try:
+            with sock:
+                replies = _exchange(sock, expressions)
+        except OSError as e:
+            print(f"Error: Calculator daemon at {path} failed: {e}", file=sys.stderr)
+            return 1
+
+    status = 0
+    for ok, text in replies:
+        if ok:
+            print(text)
+        else:
+            print(f"Error: {text}", file=sys.stderr)
+            status = 1
+    return status
+
+
+def serve(socket_path=None):
+    """
+    Run the calculator daemon until interrupted
+
+    Args:
+        socket_path: Path of the Unix domain socket to listen on (optional)
+
+    Raises:
+        OSError: If another daemon is already listening on the socket
+    """
+    import queue
+    import socketserver
+    from .parser import ExpressionParser
+    from .config import CalculatorConfig
+
+    path = get_socket_path(socket_path)
+    config = CalculatorConfig()
+    # Idle parsers with warm compile caches. A connection borrows one for
+    # its lifetime, so connections evaluate in parallel and never share one.
+    idle_parsers = queue.SimpleQueue()
+    idle_parsers.put(ExpressionParser())
+
+    class LineHandler(socketserver.StreamRequestHandler):
+        """Answer one reply line per expression line"""
+
+        def handle(self):
+            try:
+                parser = idle_parsers.get_nowait()
+            except queue.Empty:
+                parser = ExpressionParser()
+            try:
+                self._answer(parser)
+            finally:
+                idle_parsers.put(parser)
+
+        def _answer(self, parser):
+            ans = 0
+            for raw in self.rfile:
+                expression = raw.decode('utf-8', errors='replace').strip()
+                ok, text, result = evaluate_line(parser, config, expression, ans)
+                if ok:
+                    ans = result
+                    reply = f"OK {text}\n"
+                else:
+                    reply = f"ERR {text}\n"
+                self.wfile.write(reply.encode('utf-8'))
+
+    _remove_stale_socket(path)
+    server = socketserver.ThreadingUnixStreamServer(path, LineHandler)
+    server.daemon_threads = True
+
+    print(f"Calculator daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _remove_stale_socket(path):
+    """Remove a socket file left behind by a daemon that is no longer running"""
+    import socket
+
+    if not os.path.exists(path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise OSError(f"A calculator daemon is already listening on {path}")
@@ -0,0 +1,118 @@
+"""
+Compact binary encoding for bulk numeric results
+
+Layout (all integers little-endian):
+    magic        4 bytes   b'CALC'
+    version      uint16    1
+    columns      uint16    number of columns
+    rows         uint64    number of rows
+    names_size   uint32    size of the names block in bytes
+    names        UTF-8 column names separated by '\\n', zero-padded to 8 bytes
+    data         columns * rows float64 values, column by column
+    errors       ceil(rows / 8) bytes; bit i (LSB first) set if row i of
+                 the last column failed (its value is NaN)
+
+Values are copied as raw buffers, so encoding costs no per-element
+Python formatting when NumPy is installed.
+"""
+
+import struct
+import sys
+from array import array
+
+from .vectorized import HAS_NUMPY, np
+
+MEDIA_TYPE = 'application/octet-stream'
+MAGIC = b'CALC'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHQI')
+
+
+def _float64_bytes(values):
+    """Raw little-endian float64 bytes of a numeric sequence"""
+    if HAS_NUMPY:
+        return np.ascontiguousarray(values, dtype='<f8').tobytes()
+    packed = values if isinstance(values, array) and values.typecode == 'd' else array('d', values)
+    if sys.byteorder == 'big':
+        packed = array('d', packed)
+        packed.byteswap()
+    return memoryview(packed).tobytes()
+
+
+def _error_bitmap(errors, rows):
+    """Pack per-row error flags into an LSB-first bitmap"""
+    if HAS_NUMPY:
+        return np.packbits(np.asarray(errors, dtype=bool), bitorder='little').tobytes()
+    bitmap = bytearray((rows + 7) // 8)
+    for i, failed in enumerate(errors):
+        if failed:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    return bytes(bitmap)
+
+
+def pack_columns(names, columns, errors):
+    """
+    Encode equal-length float columns and an error bitmap
+
+    Args:
+        names: Column names
+        columns: Sequences of numbers, one per name
+        errors: Per-row error flags for the last column
+
+    Returns:
+        Encoded bytes
+    """
+    rows = len(columns[0]) if columns else 0
+    names_block = '\n'.join(names).encode('utf-8')
+    padding = b'\0' * (-(_HEADER.size + len(names_block)) % 8)
+
+    parts = [_HEADER.pack(MAGIC, VERSION, len(columns), rows, len(names_block)), names_block, padding]
+    for column in columns:
+        if len(column) != rows:
+            raise ValueError("All columns must have the same length")
+        parts.append(_float64_bytes(column))
+    parts.append(_error_bitmap(errors, rows))
+    return b''.join(parts)
+
+
+def unpack_columns(data):
+    """
+    Decode bytes produced by pack_columns
+
+    Args:
+        data: Encoded bytes
+
+    Returns:
+        Tuple (names, columns, errors) with columns as array('d') and
+        errors as a list of bools
+
+    Raises:
+        ValueError: If the data is not in this format
+    """
+    view = memoryview(data)
+    try:
+        magic, version, count, rows, names_size = _HEADER.unpack_from(view)
+    except struct.error:
+        raise ValueError("Data too short for header")
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unsupported binary format")
+
+    offset = _HEADER.size
+    names = bytes(view[offset:offset + names_size]).decode('utf-8').split('\n') if count else []
+    offset += names_size + (-(_HEADER.size + names_size) % 8)
+    if len(view) < offset + count * rows * 8 + (rows + 7) // 8:
+        raise ValueError("Data too short for its columns")
+
+    columns = []
+    for _ in range(count):
+        column = array('d')
+        column.frombytes(view[offset:offset + rows * 8])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns.append(column)
+        offset += rows * 8
+
+    bitmap = view[offset:offset + (rows + 7) // 8]
+    errors = [bool(bitmap[i >> 3] >> (i & 7) & 1) for i in range(rows)]
+    return names, columns, errors
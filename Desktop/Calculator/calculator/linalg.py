@@ -0,0 +1,445 @@
+"""
+Linear algebra module for vector and matrix expressions
+Handles: vector and matrix literals ([1, 2] and [[1, 2], [3, 4]]),
+elementwise arithmetic, dot, det, inv, transpose and solve
+
+NumPy is used when installed (imported on first use, so scalar-only
+sessions never pay for it). Without it, a small pure-Python Matrix
+class provides the same operations with Gaussian elimination. Both
+behave alike: elementwise arithmetic needs equal shapes or a scalar
+(no broadcasting), and division by zero, overflow and domain errors
+raise the errors of scalar arithmetic instead of giving inf or nan.
+"""
+
+import math
+import operator
+import sys
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """The numpy module, or None if it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# Message for vectors and matrices passed where a number is expected
+_NOT_A_NUMBER = "Expected a number, not a vector or matrix"
+
+# Elementwise operations (by ufunc name) that divide by their second operand
+_DIVISIONS = frozenset(('divide', 'floor_divide', 'remainder', 'fmod', 'divmod'))
+
+
+@lru_cache(maxsize=None)
+def _array_type():
+    """ndarray subclass for vector and matrix values (built with NumPy on first use)"""
+    numpy = _numpy()
+
+    class Array(numpy.ndarray):
+        """float64 array whose arithmetic matches Matrix"""
+
+        def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+            inputs = [x.view(numpy.ndarray) if isinstance(x, Array) else x for x in inputs]
+            if 'out' in kwargs:
+                kwargs['out'] = tuple(x.view(numpy.ndarray) if isinstance(x, Array) else x
+                                      for x in kwargs['out'])
+            if method == '__call__' and len(inputs) == 2:
+                shapes = [numpy.shape(x) for x in inputs]
+                if shapes[0] and shapes[1] and shapes[0] != shapes[1]:
+                    raise ValueError(f"Shapes {shapes[0]} and {shapes[1]} do not match")
+                if ufunc.__name__ in _DIVISIONS and not numpy.all(inputs[1]):
+                    raise ZeroDivisionError("division by zero")
+            try:
+                with numpy.errstate(divide='raise', over='raise', invalid='raise'):
+                    result = getattr(ufunc, method)(*inputs, **kwargs)
+            except FloatingPointError as e:
+                if 'overflow' in str(e):
+                    raise ValueError("Result overflowed")
+                raise ValueError("math domain error")
+            return _wrap(result)
+
+        def __float__(self):
+            raise ValueError(_NOT_A_NUMBER)
+
+        def __hash__(self):
+            raise ValueError(_NOT_A_NUMBER)
+
+    return Array
+
+
+def _wrap(value):
+    """A NumPy result as an Array when it is a vector or matrix"""
+    numpy = _numpy()
+    if isinstance(value, numpy.ndarray) and value.ndim:
+        return value.view(_array_type())
+    return value
+
+
+def _is_array(value):
+    """True for NumPy arrays (without importing NumPy)"""
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def is_matrix(value):
+    """
+    Check whether a value is a vector or matrix result
+
+    Args:
+        value: Any result
+
+    Returns:
+        True for NumPy arrays and Matrix instances
+    """
+    return isinstance(value, Matrix) or _is_array(value)
+
+
+def to_list(value):
+    """
+    Convert a vector or matrix to (nested) lists of floats for JSON
+
+    Args:
+        value: Vector or matrix
+
+    Returns:
+        List of floats, or list of rows for a matrix
+    """
+    return value.tolist()
+
+
+def flatten(value):
+    """All elements of a vector or matrix as a flat list of floats"""
+    if isinstance(value, Matrix):
+        return list(value.data)
+    return value.ravel().tolist()
+
+
+class Matrix:
+    """A vector (1-D) or matrix (2-D) of floats, used when NumPy is not installed"""
+
+    __slots__ = ('data', 'shape')
+
+    def __init__(self, data, shape):
+        """
+        Initialize matrix
+
+        Args:
+            data: Flat list of floats in row-major order
+            shape: (length,) for a vector or (rows, columns) for a matrix
+        """
+        self.data = data
+        self.shape = shape
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from a list of numbers (vector) or a list of equal-length rows"""
+        rows = [row.tolist() if isinstance(row, Matrix) else row for row in rows]
+        if not rows:
+            raise ValueError("Matrices cannot be empty")
+        if all(isinstance(row, list) for row in rows):
+            width = len(rows[0])
+            if not width or any(len(row) != width for row in rows):
+                raise ValueError("Matrix rows must all have the same length")
+            data = [_element(x) for row in rows for x in row]
+            return cls(data, (len(rows), width))
+        if any(isinstance(row, list) for row in rows):
+            raise ValueError("Matrix rows must all have the same length")
+        return cls([_element(x) for x in rows], (len(rows),))
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def tolist(self):
+        """Elements as a list (vector) or list of rows (matrix)"""
+        if self.ndim == 1:
+            return list(self.data)
+        columns = self.shape[1]
+        return [self.data[i:i + columns] for i in range(0, len(self.data), columns)]
+
+    def rows(self):
+        """Rows as lists (a vector is one row)"""
+        return self.tolist() if self.ndim == 2 else [list(self.data)]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, index):
+        item = self.tolist()[int(index)]
+        return Matrix(item, (len(item),)) if isinstance(item, list) else item
+
+    def __repr__(self):
+        return f"Matrix({self.tolist()!r})"
+
+    def _elementwise(self, other, function, reverse=False):
+        if isinstance(other, Matrix):
+            if other.shape != self.shape:
+                raise ValueError(f"Shapes {self.shape} and {other.shape} do not match")
+            pairs = zip(other.data, self.data) if reverse else zip(self.data, other.data)
+        else:
+            other = _element(other)
+            pairs = ((other, a) for a in self.data) if reverse else ((a, other) for a in self.data)
+        try:
+            data = [function(a, b) for a, b in pairs]
+        except OverflowError:
+            raise ValueError("Result overflowed")
+        for x in data:
+            # Python floats give inf on overflow and complex numbers for
+            # fractional powers of negatives, where NumPy arrays raise
+            if isinstance(x, complex):
+                raise ValueError("math domain error")
+            if not math.isfinite(x):
+                raise ValueError("Result overflowed")
+        return Matrix(data, self.shape)
+
+    def __add__(self, other):
+        return self._elementwise(other, operator.add)
+
+    def __radd__(self, other):
+        return self._elementwise(other, operator.add, reverse=True)
+
+    def __sub__(self, other):
+        return self._elementwise(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._elementwise(other, operator.sub, reverse=True)
+
+    def __mul__(self, other):
+        return self._elementwise(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._elementwise(other, operator.mul, reverse=True)
+
+    def __truediv__(self, other):
+        return self._elementwise(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self._elementwise(other, operator.truediv, reverse=True)
+
+    def __mod__(self, other):
+        return self._elementwise(other, operator.mod)
+
+    def __rmod__(self, other):
+        return self._elementwise(other, operator.mod, reverse=True)
+
+    def __pow__(self, other):
+        return self._elementwise(other, operator.pow)
+
+    def __rpow__(self, other):
+        return self._elementwise(other, operator.pow, reverse=True)
+
+    def __neg__(self):
+        return Matrix([-a for a in self.data], self.shape)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Matrix([abs(a) for a in self.data], self.shape)
+
+    def __float__(self):
+        raise ValueError(_NOT_A_NUMBER)
+
+    def __hash__(self):
+        raise ValueError(_NOT_A_NUMBER)
+
+
+def _element(value):
+    """One matrix element as a float"""
+    if isinstance(value, (list, Matrix)):
+        raise ValueError("Matrices have at most two dimensions")
+    return float(value)
+
+
+def matrix(rows):
+    """
+    Build a vector or matrix from a literal
+
+    Args:
+        rows: List of numbers (vector) or list of equal-length rows (matrix)
+
+    Returns:
+        float64 NumPy array (an Array), or Matrix without NumPy
+
+    Raises:
+        ValueError: If the literal is empty, ragged or has more than two dimensions
+    """
+    numpy = _numpy()
+    if numpy is None:
+        return Matrix.from_rows(rows)
+    try:
+        value = numpy.array(rows, dtype=numpy.float64)
+    except ValueError:
+        raise ValueError("Matrix rows must all have the same length")
+    if value.ndim not in (1, 2):
+        raise ValueError("Matrices have at most two dimensions")
+    if value.size == 0:
+        raise ValueError("Matrices cannot be empty")
+    return _wrap(value)
+
+
+def _square(value, name):
+    """Check that a value is a square matrix"""
+    if not is_matrix(value) or value.ndim != 2 or value.shape[0] != value.shape[1]:
+        raise ValueError(f"{name} requires a square matrix")
+    return value
+
+
+def _linalg_errors(function):
+    """Run a NumPy linear algebra call with its errors translated"""
+    numpy = _numpy()
+    try:
+        return function()
+    except numpy.linalg.LinAlgError as e:
+        if 'singular' in str(e).lower():
+            raise ValueError("Matrix is singular")
+        raise ValueError(str(e))
+
+
+def transpose(value):
+    """Transpose of a matrix (vectors are returned unchanged)"""
+    if _is_array(value):
+        return value.T
+    if not isinstance(value, Matrix):
+        raise ValueError("transpose requires a vector or matrix")
+    if value.ndim == 1:
+        return value
+    rows, columns = value.shape
+    data = [value.data[r * columns + c] for c in range(columns) for r in range(rows)]
+    return Matrix(data, (columns, rows))
+
+
+def dot(a, b):
+    """
+    Dot product of vectors, or matrix product of matrices and vectors
+
+    Raises:
+        ValueError: If the inner dimensions do not match
+    """
+    if _is_array(a) or _is_array(b):
+        return _wrap(_numpy().dot(a, b))
+    if not isinstance(a, Matrix) or not isinstance(b, Matrix):
+        return a * b
+
+    if a.ndim == 1 and b.ndim == 1:
+        if a.shape != b.shape:
+            raise ValueError(f"Shapes {a.shape} and {b.shape} do not match")
+        return math.fsum(x * y for x, y in zip(a.data, b.data))
+
+    left, right = a.rows(), transpose(b).rows() if b.ndim == 2 else [b.data]
+    if len(left[0]) != len(right[0]):
+        raise ValueError(f"Shapes {a.shape} and {b.shape} are not aligned")
+    data = [math.fsum(x * y for x, y in zip(row, column)) for row in left for column in right]
+    if a.ndim == 1:
+        return Matrix(data, (len(right),))
+    if b.ndim == 1:
+        return Matrix(data, (len(left),))
+    return Matrix(data, (len(left), len(right)))
+
+
+def _eliminate(rows, extra):
+    """
+    Gaussian elimination with partial pivoting on a square system
+
+    Reduces rows (with extra columns appended) to upper-triangular form
+    in place and returns the sign of the row permutation.
+    """
+    n = len(rows)
+    sign = 1.0
+    for k in range(n):
+        pivot = max(range(k, n), key=lambda i: abs(rows[i][k]))
+        if rows[pivot][k] == 0:
+            raise ValueError("Matrix is singular")
+        if pivot != k:
+            rows[k], rows[pivot] = rows[pivot], rows[k]
+            extra[k], extra[pivot] = extra[pivot], extra[k]
+            sign = -sign
+        for i in range(k + 1, n):
+            factor = rows[i][k] / rows[k][k]
+            if factor:
+                rows[i] = [x - factor * y for x, y in zip(rows[i], rows[k])]
+                extra[i] = [x - factor * y for x, y in zip(extra[i], extra[k])]
+    return sign
+
+
+def _back_substitute(rows, extra):
+    """Solve an upper-triangular system for each extra column"""
+    n = len(rows)
+    solution = [None] * n
+    for i in range(n - 1, -1, -1):
+        solution[i] = [
+            (value - math.fsum(rows[i][j] * solution[j][c] for j in range(i + 1, n))) / rows[i][i]
+            for c, value in enumerate(extra[i])
+        ]
+    return solution
+
+
+def det(value):
+    """
+    Determinant of a square matrix
+
+    Raises:
+        ValueError: If the matrix is not square
+    """
+    _square(value, "det")
+    if _is_array(value):
+        return float(_linalg_errors(lambda: _numpy().linalg.det(value)))
+    rows = value.rows()
+    try:
+        sign = _eliminate(rows, [[] for _ in rows])
+    except ValueError:
+        return 0.0
+    return sign * math.prod(rows[i][i] for i in range(len(rows)))
+
+
+def inv(value):
+    """
+    Inverse of a square matrix
+
+    Raises:
+        ValueError: If the matrix is not square or is singular
+    """
+    _square(value, "inv")
+    if _is_array(value):
+        return _wrap(_linalg_errors(lambda: _numpy().linalg.inv(value)))
+    n = value.shape[0]
+    rows = value.rows()
+    identity = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+    _eliminate(rows, identity)
+    solution = _back_substitute(rows, identity)
+    return Matrix([x for row in solution for x in row], (n, n))
+
+
+def solve(a, b):
+    """
+    Solve the linear system a x = b
+
+    Args:
+        a: Square coefficient matrix
+        b: Right-hand side vector (or matrix of several right-hand sides)
+
+    Returns:
+        Solution with the shape of b
+
+    Raises:
+        ValueError: If a is not square or singular, or b does not match
+    """
+    _square(a, "solve")
+    if not is_matrix(b) or b.shape[0] != a.shape[0]:
+        raise ValueError(f"solve needs a right-hand side with {a.shape[0]} rows")
+    if _is_array(a) or _is_array(b):
+        return _wrap(_linalg_errors(lambda: _numpy().linalg.solve(a, b)))
+    rows = a.rows()
+    extra = [[x] for x in b.data] if b.ndim == 1 else b.rows()
+    _eliminate(rows, extra)
+    solution = _back_substitute(rows, extra)
+    if b.ndim == 1:
+        return Matrix([row[0] for row in solution], b.shape)
+    return Matrix([x for row in solution for x in row], b.shape)
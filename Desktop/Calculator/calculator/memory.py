@@ -1,25 +1,40 @@
 """
 Memory module for calculator history and memory operations
-Handles: M+, M-, MC, MR, and calculation history
+Handles: M+, M-, MC, MR, calculation history, user-defined functions,
+named cells and the session's random stream
 """
 
 from collections import deque
 from datetime import datetime
 
+from .cells import CellSheet, MAX_CELLS
+from .rendering import render_value
+from .rng import RandomStream
+
+# Maximum number of user-defined functions kept per session
+MAX_FUNCTIONS = 50
+
 
 class Memory:
     """Memory and history management for the calculator"""
 
-    def __init__(self, max_history=100):
+    def __init__(self, max_history=100, max_functions=MAX_FUNCTIONS, max_cells=MAX_CELLS, seed=None):
         """
         Initialize memory system
         
         Args:
             max_history: Maximum number of history entries to keep (default: 100)
+            max_functions: Maximum number of user-defined functions (default: 50)
+            max_cells: Maximum number of named cells (default: 200)
+            seed: Seed of the session's random stream (default: a fresh random seed)
         """
         self.memory_value = 0
         self.history = deque(maxlen=max_history)
         self.max_history = max_history
+        self.functions = {}
+        self.max_functions = max_functions
+        self.cells = CellSheet(max_cells)
+        self.random = RandomStream(seed)
 
     def memory_add(self, value):
         """
@@ -86,6 +101,28 @@ class Memory:
         }
         self.history.append(history_entry)
 
+    def add_history_batch(self, records):
+        """
+        Add several calculations to history at once
+        
+        Args:
+            records: Iterable of (expression, result, time) tuples, with
+                time in seconds since the epoch
+            
+        Returns:
+            List of the history entries added
+        """
+        entries = [
+            {
+                'expression': str(expression),
+                'result': result,
+                'timestamp': datetime.fromtimestamp(moment).strftime("%Y-%m-%d %H:%M:%S")
+            }
+            for expression, result, moment in records
+        ]
+        self.history.extend(entries)
+        return entries
+
     def get_history(self, limit=None):
         """
         Get calculation history
@@ -136,6 +173,55 @@ class Memory:
         """
         return len(self.history)
 
+    def define_function(self, name, function):
+        """
+        Store a user-defined function, replacing any with the same name
+        
+        Args:
+            name: Function name
+            function: Compiled callable (CompiledExpression)
+            
+        Raises:
+            ValueError: If the function limit is reached
+        """
+        if name not in self.functions and len(self.functions) >= self.max_functions:
+            raise ValueError(f"Function limit reached ({self.max_functions}); delete one first")
+        self.functions[name] = function
+
+    def delete_function(self, name):
+        """
+        Remove a user-defined function
+        
+        Args:
+            name: Function name
+            
+        Raises:
+            ValueError: If no such function exists
+        """
+        if name not in self.functions:
+            raise ValueError(f"Unknown function: {name}")
+        del self.functions[name]
+
+    def clear_functions(self):
+        """Remove all user-defined functions"""
+        self.functions.clear()
+
+    def get_functions(self):
+        """
+        Get user-defined functions
+        
+        Returns:
+            List of dicts with name, parameters and body
+        """
+        return [
+            {
+                'name': name,
+                'parameters': list(function.variables),
+                'body': function.expression
+            }
+            for name, function in self.functions.items()
+        ]
+
     def print_history(self):
         """Print formatted history"""
         if not self.history:
@@ -148,7 +234,7 @@ class Memory:
         for i, entry in enumerate(self.history, 1):
             output += f"{i}. {entry['timestamp']}\n"
             output += f"   Expression: {entry['expression']}\n"
-            output += f"   Result: {entry['result']}\n"
+            output += f"   Result: {render_value(entry['result'])}\n"
             output += "-" * 60 + "\n"
         
         return output
@@ -0,0 +1,332 @@
+"""
+Number theory module for integer functions
+Handles: modular exponentiation, gcd and lcm, Miller-Rabin primality
+(deterministic below 3.3e24, which covers 64-bit, probabilistic beyond),
+Pollard-rho factorisation, and a cached segmented sieve behind primes(a, b)
+and pi(n), each with a limit on the work one call may do
+"""
+
+import math
+from functools import lru_cache
+from itertools import compress
+
+from .arithmetic import as_integer
+
+# Largest modulus and exponent accepted by powmod, in bits
+MAX_MODULUS_BITS = 4096
+MAX_EXPONENT_BITS = 65536
+
+# Largest number tested by isprime, in bits
+MAX_PRIME_BITS = 4096
+
+# Largest number factor() accepts, in bits, and its Pollard-rho step budget
+MAX_FACTOR_BITS = 256
+MAX_FACTOR_STEPS = 2_000_000
+
+# Sieve limits: primes(a, b) needs b <= MAX_SIEVE_LIMIT and b - a <=
+# MAX_PRIMES_SPAN; pi(n) needs n <= MAX_PRIME_PI
+MAX_SIEVE_LIMIT = 10 ** 12
+MAX_PRIMES_SPAN = 10 ** 6
+MAX_PRIME_PI = 10 ** 8
+
+# Numbers per sieve segment (odd numbers only are stored, one byte each)
+SEGMENT_SIZE = 1 << 18
+
+# Number of sieved segments kept
+SEGMENT_CACHE_SIZE = 32
+
+# Miller-Rabin bases that are deterministic for n < _DETERMINISTIC_LIMIT
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_DETERMINISTIC_LIMIT = 3317044064679887385961981
+
+# Extra random bases tested beyond the deterministic range
+PROBABLE_PRIME_ROUNDS = 20
+
+
+def _check_bits(n, limit, name):
+    if n.bit_length() > limit:
+        raise ValueError(f"{name} is limited to {limit} bits")
+
+
+def powmod(base, exponent, modulus):
+    """
+    Calculate base ** exponent % modulus without the full power
+
+    Args:
+        base: Integer base
+        exponent: Integer exponent (negative uses the modular inverse)
+        modulus: Positive integer modulus
+
+    Returns:
+        Result in [0, modulus)
+
+    Raises:
+        ValueError: If an input is not an integer, the modulus is not
+            positive, the inverse does not exist or a size limit is exceeded
+    """
+    base = as_integer(base, "powmod inputs")
+    exponent = as_integer(exponent, "powmod inputs")
+    modulus = as_integer(modulus, "powmod inputs")
+    if modulus <= 0:
+        raise ValueError("Modulus must be positive")
+    _check_bits(modulus, MAX_MODULUS_BITS, "Modulus")
+    _check_bits(exponent, MAX_EXPONENT_BITS, "Exponent")
+    try:
+        return pow(base, exponent, modulus)
+    except ValueError:
+        raise ValueError(f"{base} has no inverse modulo {modulus}")
+
+
+def gcd(*args):
+    """Greatest common divisor of integers"""
+    if not args:
+        raise ValueError("gcd requires at least one value")
+    return math.gcd(*(as_integer(arg, "gcd inputs") for arg in args))
+
+
+def lcm(*args):
+    """Least common multiple of integers"""
+    if not args:
+        raise ValueError("lcm requires at least one value")
+    return math.lcm(*(as_integer(arg, "lcm inputs") for arg in args))
+
+
+def _strong_probable_prime(n, a, d, s):
+    """One Miller-Rabin round: False if a proves n composite"""
+    x = pow(a, d, n)
+    if x in (1, n - 1):
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def is_prime(n):
+    """
+    Miller-Rabin primality test
+
+    Deterministic below 3.3e24 (every 64-bit integer); above that, a
+    composite passes with probability below 4 ** -PROBABLE_PRIME_ROUNDS.
+
+    Args:
+        n: Integer to test
+
+    Returns:
+        True if n is (very probably, above 3.3e24) prime
+
+    Raises:
+        ValueError: If n is not an integer or exceeds MAX_PRIME_BITS
+    """
+    n = as_integer(n, "isprime input")
+    if n < 2:
+        return False
+    for p in _WITNESSES:
+        if n % p == 0:
+            return n == p
+    _check_bits(n, MAX_PRIME_BITS, "isprime input")
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    if not all(_strong_probable_prime(n, a, d, s) for a in _WITNESSES):
+        return False
+    if n < _DETERMINISTIC_LIMIT:
+        return True
+
+    import random
+    # Seeded by n, so the same input always gets the same answer
+    rng = random.Random(n)
+    return all(_strong_probable_prime(n, rng.randrange(2, n - 1), d, s)
+               for _ in range(PROBABLE_PRIME_ROUNDS))
+
+
+def _pollard_brent(n, budget):
+    """A nontrivial factor of the odd composite n (Brent's variant of Pollard's rho)"""
+    batch = 128
+    for c in range(1, n):
+        y, r, q, g = 2, 1, 1, 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                steps = min(batch, r - k)
+                budget[0] -= steps
+                if budget[0] < 0:
+                    raise ValueError(f"Could not factor {n} within {MAX_FACTOR_STEPS} steps")
+                for _ in range(steps):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += batch
+            r *= 2
+        if g == n:
+            # The batched product overshot; step back one at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+    raise ValueError(f"Could not factor {n}")
+
+
+def factor(n):
+    """
+    Prime factorisation by trial division and Pollard's rho
+
+    Args:
+        n: Nonzero integer
+
+    Returns:
+        List of prime factors in ascending order, with multiplicity
+        (and -1 first for negative n)
+
+    Raises:
+        ValueError: If n is zero, exceeds MAX_FACTOR_BITS, or has factors
+            too large to find within MAX_FACTOR_STEPS
+    """
+    n = as_integer(n, "factor input")
+    if n == 0:
+        raise ValueError("Cannot factor 0")
+    _check_bits(n, MAX_FACTOR_BITS, "factor input")
+
+    factors = [-1] if n < 0 else []
+    n = abs(n)
+    for p in _small_primes(1024):
+        if p * p > n:
+            break
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+
+    budget = [MAX_FACTOR_STEPS]
+    pending = [n] if n > 1 else []
+    large = []
+    while pending:
+        m = pending.pop()
+        if is_prime(m):
+            large.append(m)
+        else:
+            d = _pollard_brent(m, budget)
+            pending.extend((d, m // d))
+    return factors + sorted(large)
+
+
+@lru_cache(maxsize=None)
+def _small_primes(limit):
+    """Primes up to limit by a plain sieve"""
+    flags = bytearray(b'\x01') * (limit + 1)
+    flags[:2] = b'\x00\x00'
+    for p in range(2, math.isqrt(limit) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    return tuple(compress(range(limit + 1), flags))
+
+
+def _base_primes(limit):
+    """Primes up to at least limit, from a cache keyed by the next power of two"""
+    return _small_primes(1 << max(limit, 2).bit_length())
+
+
+@lru_cache(maxsize=SEGMENT_CACHE_SIZE)
+def _segment(index):
+    """
+    Sieve one segment [index * SEGMENT_SIZE, (index + 1) * SEGMENT_SIZE)
+
+    Returns a bytearray with entry i set when low + 2 * i + 1 is prime.
+    """
+    low = index * SEGMENT_SIZE
+    high = low + SEGMENT_SIZE
+    half = SEGMENT_SIZE // 2
+    flags = bytearray(b'\x01') * half
+    if index == 0:
+        flags[0] = 0  # 1 is not prime
+    for p in _base_primes(math.isqrt(high))[1:]:
+        if p * p >= high:
+            break
+        start = max(p * p, -(-low // p) * p)
+        if start % 2 == 0:
+            start += p
+        i = (start - low - 1) // 2
+        if i < half:
+            flags[i::p] = bytes(len(range(i, half, p)))
+    return flags
+
+
+@lru_cache(maxsize=None)
+def _segment_count(index):
+    """Number of primes in one segment"""
+    return _segment(index).count(1) + (1 if index == 0 else 0)
+
+
+def _check_sieve_bound(n, limit, name):
+    if n > limit:
+        raise ValueError(f"{name} is limited to {limit:,}")
+
+
+def primes(a, b):
+    """
+    Primes in [a, b] from the segmented sieve
+
+    Args:
+        a: Lower bound (inclusive)
+        b: Upper bound (inclusive)
+
+    Returns:
+        List of primes in ascending order
+
+    Raises:
+        ValueError: If the bounds are not integers or exceed the sieve limits
+    """
+    a = max(as_integer(a, "primes bounds"), 0)
+    b = as_integer(b, "primes bounds")
+    _check_sieve_bound(b, MAX_SIEVE_LIMIT, "primes upper bound")
+    if b - a > MAX_PRIMES_SPAN:
+        raise ValueError(f"primes(a, b) is limited to spans of {MAX_PRIMES_SPAN} numbers")
+
+    result = [2] if a <= 2 <= b else []
+    half = SEGMENT_SIZE // 2
+    for index in range(a // SEGMENT_SIZE, b // SEGMENT_SIZE + 1):
+        low = index * SEGMENT_SIZE
+        first = max(0, (a - low) // 2)
+        last = min(half, (b - low - 1) // 2 + 1)
+        if first >= last:
+            continue
+        flags = _segment(index)
+        result.extend(low + 2 * i + 1
+                      for i in compress(range(first, last), flags[first:last]))
+    return result
+
+
+def prime_pi(n):
+    """
+    Number of primes <= n, from cached per-segment counts
+
+    Args:
+        n: Integer bound
+
+    Returns:
+        Prime count
+
+    Raises:
+        ValueError: If n is not an integer or exceeds MAX_PRIME_PI
+    """
+    n = as_integer(n, "pi input")
+    _check_sieve_bound(n, MAX_PRIME_PI, "pi(n)")
+    if n < 2:
+        return 0
+    full = (n + 1) // SEGMENT_SIZE
+    count = sum(_segment_count(index) for index in range(full))
+    low = full * SEGMENT_SIZE
+    if n >= low + 1:
+        count += _segment(full)[:(n - low - 1) // 2 + 1].count(1)
+    if full == 0:
+        count += 1  # 2, which the odd-only segments do not store
+    return count
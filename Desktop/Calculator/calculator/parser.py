@@ -5,30 +5,306 @@ Handles: PEMDAS order of operations, parentheses, function calls
 
 import re
 import math
+from collections import ChainMap, OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache, partial
 from .arithmetic import Arithmetic
 from .advanced import AdvancedMath
+from .registry import DEFAULT_REGISTRY
+from .rng import RANDOM_FUNCTIONS, RandomStream, calls_random
+from .tokenizer import ExpressionSyntaxError, tokenize
+
+# Limits on user-defined functions ("f(x, y) = x^2 + y")
+MAX_FUNCTION_PARAMETERS = 8
+MAX_FUNCTION_BODY_LENGTH = 500
+
+# Results of check() kept for live validation while typing
+CHECK_CACHE_SIZE = 256
+
+# Powers whose exponent is not a literal at most this large count as heavy
+HEAVY_EXPONENT = 1024
+
+# Namespace names that make an expression heavy besides registry functions
+_HEAVY_NAMES = frozenset(('series_sum', 'series_prod'))
+
+_DEFINITION = re.compile(r'^\s*([A-Za-z_]\w*)\s*\(([^()]*)\)\s*=\s*(.*)$', re.DOTALL)
+
+# A unit conversion such as "5 km to mi" (see calculator.units)
+_UNIT_CONVERSION = re.compile(r'\sto\s')
+
+# A call "name(" not preceded by "." or part of a longer name
+_FUNCTION_CALL = re.compile(r'(?<![\w.])([A-Za-z_]\w*)(\s*)\(')
+
+# sum( or prod( in translated source, possibly a series sum(expr, i, a, b)
+_SERIES_CALL = re.compile(r'(?<![\w.])(sum|prod)\s*\(')
+
+
+def _split_arguments(text, start):
+    """
+    Split the arguments of a call at top-level commas
+    
+    Args:
+        text: Source text
+        start: Index just after the opening parenthesis
+        
+    Returns:
+        Tuple (arguments, index after the closing parenthesis), or None
+        if the call is not closed
+    """
+    arguments = []
+    depth = 0
+    begin = start
+    for index in range(start, len(text)):
+        char = text[index]
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            if depth == 0:
+                arguments.append(text[begin:index])
+                return arguments, index + 1
+            depth -= 1
+        elif char == ',' and depth == 0:
+            arguments.append(text[begin:index])
+            begin = index + 1
+    return None
+
+
+@lru_cache(maxsize=None)
+def _power_guard():
+    """AST transformer turning a ** b into _pow(a, b) (built on first use)"""
+    import ast
+    
+    class PowerGuard(ast.NodeTransformer):
+        def visit_BinOp(self, node):
+            self.generic_visit(node)
+            if not isinstance(node.op, ast.Pow):
+                return node
+            call = ast.Call(ast.Name('_pow', ast.Load()), [node.left, node.right], [])
+            return ast.copy_location(call, node)
+    
+    return PowerGuard()
+
+
+def compile_source(source, filename='<expression>'):
+    """
+    Compile translated source, routing every ** through Arithmetic.power
+    
+    Python computes int ** int exactly and cannot be interrupted, so
+    9^9^9 would never return; the '_pow' namespace entry checks the
+    size of integer powers first (other operands use ** unchanged).
+    
+    Args:
+        source: Translated Python expression
+        filename: Name shown in tracebacks
+        
+    Returns:
+        Code object for eval()
+    """
+    if '**' not in source:
+        return compile(source, filename, 'eval')
+    import ast
+    tree = _power_guard().visit(ast.parse(source, mode='eval'))
+    return compile(ast.fix_missing_locations(tree), filename, 'eval')
+
+
+@lru_cache(maxsize=CHECK_CACHE_SIZE)
+def _large_power(source):
+    """Check whether translated source raises to a computed or large exponent"""
+    import ast
+    for node in ast.walk(ast.parse(source, mode='eval')):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            exponent = node.right
+            if not (isinstance(exponent, ast.Constant)
+                    and isinstance(exponent.value, (int, float))
+                    and abs(exponent.value) <= HEAVY_EXPONENT):
+                return True
+    return False
+
+
+class _ExpressionError(ValueError):
+    """A ValueError whose message has already been translated"""
+
+
+@contextmanager
+def _evaluation_errors():
+    """Translate low-level evaluation errors into the parser's error messages"""
+    try:
+        yield
+    except _ExpressionError:
+        # Raised by a nested evaluation (a user-defined function call)
+        raise
+    except ZeroDivisionError:
+        raise _ExpressionError("Cannot divide by zero")
+    except ValueError as e:
+        error = _ExpressionError(f"Invalid expression: {str(e)}")
+        # Keep the position of tokenizer and arity errors
+        error.position = getattr(e, 'position', None)
+        raise error
+    except SyntaxError as e:
+        raise SyntaxError(f"Syntax error in expression: {str(e)}")
+    except Exception as e:
+        raise _ExpressionError(f"Error evaluating expression: {str(e)}")
+
+
+class CompiledExpression:
+    """An expression translated and compiled once, evaluated many times"""
+
+    def __init__(self, expression, source, code, parser, variables=()):
+        """
+        Initialize compiled expression
+        
+        Args:
+            expression: Original expression text
+            source: Translated Python source
+            code: Compiled code object
+            parser: ExpressionParser providing the evaluation namespace
+            variables: Names of free variables, in positional order
+        """
+        self.expression = expression
+        self.source = source
+        self.code = code
+        self.parser = parser
+        self.variables = tuple(variables)
+        # (name, is_series) for each sum/prod read as a series or not by
+        # whether its index name was bound (see ExpressionParser._compile)
+        self.series_indices = ()
+
+    def evaluate(self, bindings=None):
+        """
+        Evaluate with variable bindings
+        
+        Args:
+            bindings: Dict mapping variable names to values (optional)
+            
+        Returns:
+            Result of evaluation
+        """
+        scope = {'ans': self.parser.last_result}
+        if bindings:
+            scope.update(bindings)
+        with _evaluation_errors():
+            return self.parser._run(self.code, scope)
+
+    def evaluate_array(self, bindings):
+        """
+        Evaluate elementwise over arrays of variable values in one call
+        
+        Args:
+            bindings: Dict mapping variable names to arrays (NumPy arrays,
+                array.array or lists) or scalars
+            
+        Returns:
+            ArrayResult with float64 values and an error mask
+        """
+        from .vectorized import evaluate_array
+        with _evaluation_errors():
+            return evaluate_array(self, bindings)
+
+    def gradient(self, bindings):
+        """
+        Evaluate together with the partial derivatives for every declared
+        variable, in one pass with forward-mode automatic differentiation
+        
+        Args:
+            bindings: Dict mapping each variable name to a number
+            
+        Returns:
+            Tuple (value, gradient) with gradient a dict of variable -> derivative
+        """
+        from .autodiff import evaluate_gradient
+        with _evaluation_errors():
+            return evaluate_gradient(self, bindings)
+
+    def __call__(self, *args):
+        """Evaluate with positional values for the declared variables"""
+        if len(args) != len(self.variables):
+            raise ValueError(
+                f"Expected {len(self.variables)} values, got {len(args)}"
+            )
+        return self.evaluate(dict(zip(self.variables, args)))
 
 
 class ExpressionParser:
     """Parse and evaluate mathematical expressions with proper order of operations"""
 
-    def __init__(self, angle_mode='degrees'):
+    def __init__(self, angle_mode='degrees', cache_size=256, registry=None):
         """
         Initialize parser with angle mode
         
         Args:
             angle_mode: 'degrees' or 'radians' (default: 'degrees')
+            cache_size: Maximum number of compiled expressions to keep (default: 256)
+            registry: FunctionRegistry of callable functions
+                (default: calculator.registry.DEFAULT_REGISTRY)
         """
+        self.registry = DEFAULT_REGISTRY if registry is None else registry
+        # Function packs installed in the namespace, in load order
+        self.loaded_packs = ()
         self.arithmetic = Arithmetic()
         self.advanced = AdvancedMath(angle_mode)
         self.angle_mode = angle_mode
         self.last_result = 0
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._checks = OrderedDict()
+        self.random = RandomStream()
+        self.namespace = self._build_namespace()
+        self.functions = {}
+        self.cells = {}
+        # 'float', or 'adaptive' to re-evaluate with Decimal when a float
+        # result cannot support decimal_places (see calculator.precision)
+        self.precision_mode = 'float'
+        self.decimal_places = 10
+        self.last_decimal = None
+
+    def _build_namespace(self):
+        """
+        Create the safe namespace compiled expressions are evaluated in
+        
+        Only core functions are bound here; function packs are added by
+        _load_pack the first time an expression calls one of them.
+        """
+        namespace = {
+            'math': math,
+            '_pow': self.arithmetic.power,
+            'series_sum': partial(self._series, 'sum'),
+            'series_prod': partial(self._series, 'prod'),
+            'pi': math.pi,
+            'e': math.e,
+            '__builtins__': {}
+        }
+        for spec in self.registry.core():
+            if spec.bind is not None:
+                namespace[spec.target] = spec.bind(self)
+        return namespace
+
+    def _load_pack(self, pack):
+        """Install a function pack's implementations in the namespace (once)"""
+        if pack not in self.loaded_packs:
+            self.namespace.update(self.registry.load_pack(pack))
+            self.loaded_packs += (pack,)
 
     def set_angle_mode(self, mode):
         """Set angle mode for trigonometric functions"""
         self.angle_mode = mode
         self.advanced.set_angle_mode(mode)
 
+    def set_precision_mode(self, mode):
+        """
+        Set precision mode
+        
+        Args:
+            mode: 'float' (always binary floats) or 'adaptive' (float first,
+                Decimal when the result needs more digits than a float holds)
+        """
+        if mode not in ('float', 'adaptive'):
+            raise ValueError("Precision mode must be 'float' or 'adaptive'")
+        self.precision_mode = mode
+
+    def set_decimal_places(self, places):
+        """Set the decimal places adaptive precision has to support"""
+        self.decimal_places = places
+
     def evaluate(self, expression):
         """
         Evaluate a mathematical expression
@@ -43,121 +319,476 @@ class ExpressionParser:
             ValueError: If expression is invalid
             SyntaxError: If expression has syntax errors
         """
-        try:
-            # Clean the expression
-            expression = str(expression).strip()
+        with _evaluation_errors():
+            compiled = self._compile(expression)
+            bindings = {'ans': self.last_result}
+            result = self._run(compiled.code, bindings)
+            if callable(result):
+                raise ValueError(f"'{expression}' is a function; call it with arguments")
             
-            if not expression:
-                raise ValueError("Empty expression")
+            previous_decimal = self.last_decimal
+            self.last_result = result
+            self.last_decimal = None
+            if (self.precision_mode == 'adaptive' and isinstance(result, float)
+                    and not self.uses_random(compiled)):
+                from .precision import refine
+                exact = {'ans': previous_decimal} if previous_decimal is not None else None
+                refined = refine(compiled, result, bindings, self.decimal_places, exact)
+                if refined is not None:
+                    # 'ans' stays a float for the fast path; the Decimal
+                    # is kept for later Decimal evaluations
+                    self.last_decimal = refined
+                    return refined
+            return result
+
+    def compile(self, expression, variables=()):
+        """
+        Translate and compile an expression once for repeated evaluation
+        
+        Compiled expressions are cached, so compiling the same expression
+        again is a dictionary lookup.
+        
+        Args:
+            expression: Mathematical expression as string
+            variables: Names of free variables the expression may use
             
-            # Replace function calls FIRST before replacing constants
-            expression = self._replace_functions(expression)
+        Returns:
+            CompiledExpression
             
-            # Replace 'ans' with last result
-            expression = expression.replace('ans', str(self.last_result))
+        Raises:
+            ValueError: If expression is invalid
+            SyntaxError: If expression has syntax errors
+        """
+        with _evaluation_errors():
+            return self._compile(expression, variables)
+
+    def _compile(self, expression, variables=()):
+        """Compile an expression, consulting the cache first"""
+        expression = str(expression).strip()
+        variables = tuple(variables)
+        key = (expression, variables)
+        
+        compiled = self._cache.get(key)
+        if compiled is not None and all(
+            self._is_bound(name, variables) != series for name, series in compiled.series_indices
+        ):
+            self._cache.move_to_end(key)
+            return compiled
+        
+        if not expression:
+            raise ValueError("Empty expression")
+        
+        # A cell or function defined since may turn a series into a list call
+        indices = []
+        source = self._translate(expression, variables, indices)
+        code = compile_source(source)
+        compiled = CompiledExpression(expression, source, code, self, variables)
+        compiled.series_indices = tuple(indices)
+        
+        self._cache[key] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def _translate(self, expression, variables=(), indices=None):
+        """
+        Translate calculator syntax into a validated Python expression
+        
+        Args:
+            expression: Expression text
+            variables: Names of free variables the expression may use
+            indices: Optional list receiving (name, is_series) for each
+                sum/prod call that may be a series (see _rewrite_series)
+        """
+        # Validate in one tokenizing pass, with positions in the original text
+        self._validate_expression(expression)
+        
+        if _UNIT_CONVERSION.search(expression):
+            expression = self._inline_conversions(expression)
+            self._validate_expression(expression)
+        
+        # Replace function calls FIRST so names like 'exp' survive
+        expression = self._replace_functions(expression)
+        
+        # '^' is exponentiation, not Python's bitwise XOR
+        expression = expression.replace('^', '**')
+        
+        # Constants and 'ans' are bound as names in the namespace
+        expression = expression.replace('π', 'pi')
+        
+        if '[' in expression:
+            self._load_pack('linalg')
+            expression = self._wrap_matrix_literals(expression)
+        if 'sum' in expression or 'prod' in expression:
+            expression = self._rewrite_series(expression, variables, indices)
+        return expression
+
+    def _is_bound(self, name, variables):
+        """Check whether a name reads a variable, user-defined function or cell"""
+        return name in variables or name in self.functions or name in self.cells
+
+    def _rewrite_series(self, expression, variables=(), indices=None):
+        """
+        Turn sum(expr, i, a, b) and prod(expr, i, a, b) into series calls
+        
+        The body is passed as source text (compiled on first use by
+        _series_body) together with the values of the other names it
+        reads, so it is never evaluated with the index unbound. Calls
+        whose second argument is not a free name (a built-in, variable,
+        user-defined function or cell) keep their list meaning, so with
+        cells x and y, sum(x, y, 1, 2) adds four numbers.
+        """
+        output = []
+        position = 0
+        for match in _SERIES_CALL.finditer(expression):
+            if match.start() < position:
+                continue
+            split = _split_arguments(expression, match.end())
+            if split is None:
+                continue
+            arguments, end = split
+            if len(arguments) != 4:
+                continue
+            body, variable, low, high = (argument.strip() for argument in arguments)
+            if not variable.isidentifier() or variable in self.reserved_names():
+                continue
+            bound = self._is_bound(variable, variables)
+            if indices is not None:
+                indices.append((variable, not bound))
+            if bound:
+                continue
             
-            # Replace mathematical constants
-            expression = expression.replace('pi', str(math.pi))
-            expression = expression.replace('π', str(math.pi))
-            # Only replace 'e' if it's not part of a function name
-            expression = re.sub(r'\be\b', str(math.e), expression)
+            body = self._rewrite_series(body, variables, indices)
+            import ast
+            captured = sorted({
+                node.id for node in ast.walk(ast.parse(body, mode='eval'))
+                if isinstance(node, ast.Name)
+                and node.id != variable and node.id not in self.namespace
+            })
+            scope = ', '.join(f"{name!r}: {name}" for name in captured)
+            output.append(expression[position:match.start()])
+            output.append(
+                f"series_{match.group(1)}({body!r}, {variable!r}, "
+                f"{self._rewrite_series(low, variables, indices)}, "
+                f"{self._rewrite_series(high, variables, indices)}, {{{scope}}})"
+            )
+            position = end
+        output.append(expression[position:])
+        return ''.join(output)
+
+    def _series_body(self, source, variable):
+        """Compile the translated body of a series once (cached with expressions)"""
+        key = ('series', source, variable)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            self._cache.move_to_end(key)
+            return compiled
+        
+        code = compile_source(source)
+        compiled = CompiledExpression(source, source, code, self, (variable,))
+        self._cache[key] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def _series(self, kind, source, variable, low, high, scope):
+        """Evaluate a rewritten series call (see calculator.series)"""
+        from .series import evaluate_series
+        return evaluate_series(self, kind, source, variable, low, high, scope)
+
+    def _inline_conversions(self, expression):
+        """
+        Replace each "value unit to unit" with arithmetic doing the conversion
+        
+        A conversion is either the whole expression or a whole bracketed
+        group or function argument, as in (5 km to m) * 2 or
+        sin(90 deg to rad). Units are resolved and their dimensions checked
+        here, once per compile; the compiled code only scales (and, for
+        temperatures, shifts) the value. The expression must already have
+        balanced brackets.
+        
+        Returns:
+            Expression text with the conversions inlined
             
-            # Validate expression
-            self._validate_expression(expression)
+        Raises:
+            ValueError: If a unit is unknown, the dimensions differ, or
+                "to" is used outside a whole expression, group or argument
+        """
+        from .units import conversion_source, split_conversion
+        
+        def convert(segment):
+            split = split_conversion(segment)
+            if split is None:
+                return segment
+            value, source, target = split
+            return conversion_source(value, source, target)
+        
+        # The open bracket and comma-separated segments of each open group
+        groups = [('', [[]])]
+        for char in expression:
+            if char in '([':
+                groups.append((char, [[]]))
+            elif char in ')]':
+                opener, segments = groups.pop()
+                inner = ','.join(convert(''.join(segment)) for segment in segments)
+                groups[-1][1][-1].append(opener + inner + char)
+            elif char == ',' and len(groups) > 1:
+                groups[-1][1].append([])
+            else:
+                groups[-1][1][-1].append(char)
+        
+        translated = convert(''.join(groups[0][1][0]))
+        if _UNIT_CONVERSION.search(translated):
+            raise ValueError(
+                "A unit conversion must be the whole expression or in parentheses, "
+                "e.g. (1 mi to km) + 1"
+            )
+        return translated
+
+    def _wrap_matrix_literals(self, expression):
+        """Turn outermost [...] literals into matrix([...]) calls; m[0] stays an index"""
+        output = []
+        # One flag per open bracket: True if it started a matrix literal
+        stack = []
+        previous = ''
+        for char in expression:
+            if char == '[':
+                literal = not stack and not (previous.isalnum() or previous in ('_', ')', ']'))
+                stack.append(literal)
+                output.append('matrix([' if literal else '[')
+            elif char == ']':
+                output.append('])' if stack.pop() else ']')
+            else:
+                output.append(char)
+            if not char.isspace():
+                previous = char
+        return ''.join(output)
+
+    def _run(self, code, bindings):
+        """Evaluate compiled code with variable bindings (safe after validation)"""
+        if self.functions or self.cells:
+            # Variables shadow user-defined functions, which shadow cells
+            bindings = ChainMap(bindings, self.functions, self.cells)
+        return eval(code, self.namespace, bindings)
+
+    def use_functions(self, functions):
+        """
+        Resolve user-defined function names from a mapping
+        
+        Args:
+            functions: Dict of name -> callable, e.g. Memory.functions,
+                shared so later definitions are visible immediately
+        """
+        self.functions = functions
+
+    def use_cells(self, cells):
+        """
+        Resolve named cell values from a mapping
+        
+        Args:
+            cells: Dict of name -> value, e.g. CellSheet.values, shared so
+                recomputed cells are visible immediately
+        """
+        self.cells = cells
+
+    def use_random(self, stream):
+        """
+        Draw rand(), randint() and normal() from a random stream
+        
+        Args:
+            stream: RandomStream, e.g. Memory.random, so each session
+                has its own seeded sequence
+        """
+        self.random = stream
+        for name in RANDOM_FUNCTIONS:
+            self.namespace[name] = getattr(stream, name)
+
+    def uses_random(self, compiled):
+        """
+        Check whether evaluating a compiled expression draws random numbers,
+        directly or through a user-defined function (re-evaluating it, as
+        adaptive precision or a closed form would, gives a different value)
+        """
+        pending = [compiled]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            if calls_random(current.source):
+                return True
+            for name in current.code.co_names:
+                if name in self.functions and name not in seen:
+                    seen.add(name)
+                    pending.append(self.functions[name])
+        return False
+
+    def is_heavy(self, compiled):
+        """
+        Check whether evaluating a compiled expression may take long,
+        directly or through a user-defined function: it calls a function
+        flagged heavy in the registry, evaluates a series or raises to a
+        computed or large exponent
+        """
+        heavy = self.registry.heavy_targets() | _HEAVY_NAMES
+        pending = [compiled]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            names = current.code.co_names
+            if not heavy.isdisjoint(names):
+                return True
+            if '_pow' in names and _large_power(current.source):
+                return True
+            for name in names:
+                if name in self.functions and name not in seen:
+                    seen.add(name)
+                    pending.append(self.functions[name])
+        return False
+
+    def builtin_names(self):
+        """Names bound by the namespace, including packs not loaded yet"""
+        return set(self.namespace) | self.registry.targets()
+
+    def reserved_names(self):
+        """Names that cannot be redefined: constants, built-in functions and 'ans'"""
+        return self.builtin_names() | self.registry.names() | {'ans'}
+
+    def free_names(self, compiled):
+        """
+        Names a compiled expression reads besides its variables and built-ins
+        
+        Args:
+            compiled: CompiledExpression
             
-            # Create safe namespace with math functions and custom functions
-            safe_dict = {
-                'math': math,
-                'abs': abs,
-                'sin_deg': self.advanced.sine,
-                'cos_deg': self.advanced.cosine,
-                'tan_deg': self.advanced.tangent,
-                'asin_deg': self.advanced.arcsine,
-                'acos_deg': self.advanced.arccosine,
-                'atan_deg': self.advanced.arctangent,
-                '__builtins__': {}
-            }
-            
-            # Evaluate using eval (safe after validation)
-            result = eval(expression, safe_dict)
+        Returns:
+            Set of names (user-defined functions, cells or undefined names)
+        """
+        import ast
+        reserved = self.reserved_names()
+        return {
+            node.id for node in ast.walk(ast.parse(compiled.source, mode='eval'))
+            if isinstance(node, ast.Name)
+            and node.id not in reserved and node.id not in compiled.variables
+        }
+
+    def is_definition(self, text):
+        """Check whether text looks like a function definition 'f(x) = ...'"""
+        return _DEFINITION.match(str(text)) is not None
+
+    def define(self, definition):
+        """
+        Compile a function definition such as "f(x, y) = x^2 + y"
+        
+        The body is translated and compiled once; calling the result
+        only binds the arguments and runs the compiled code.
+        
+        Args:
+            definition: Definition text
             
-            self.last_result = result
-            return result
+        Returns:
+            Tuple (name, CompiledExpression) with the parameters as its variables
             
-        except ZeroDivisionError:
-            raise ValueError("Cannot divide by zero")
-        except ValueError as e:
-            raise ValueError(f"Invalid expression: {str(e)}")
-        except SyntaxError as e:
-            raise SyntaxError(f"Syntax error in expression: {str(e)}")
-        except Exception as e:
-            raise ValueError(f"Error evaluating expression: {str(e)}")
+        Raises:
+            ValueError: If the definition is malformed, uses a reserved
+                name or exceeds the size limits
+            SyntaxError: If the body has syntax errors
+        """
+        match = _DEFINITION.match(str(definition))
+        if not match:
+            raise ValueError("Function definitions look like: f(x, y) = x^2 + y")
+        
+        name, params, body = match.group(1), match.group(2).strip(), match.group(3).strip()
+        parameters = [p.strip() for p in params.split(',')] if params else []
+        
+        reserved = self.reserved_names()
+        if name in reserved:
+            raise ValueError(f"Cannot redefine built-in name: '{name}'")
+        if name in self.cells:
+            raise ValueError(f"'{name}' is already a cell name")
+        for parameter in parameters:
+            if not parameter.isidentifier() or parameter in reserved:
+                raise ValueError(f"Invalid parameter name: '{parameter}'")
+        if len(set(parameters)) != len(parameters):
+            raise ValueError("Duplicate parameter names")
+        if len(parameters) > MAX_FUNCTION_PARAMETERS:
+            raise ValueError(f"Functions may have at most {MAX_FUNCTION_PARAMETERS} parameters")
+        if not body:
+            raise ValueError("Function body cannot be empty")
+        if len(body) > MAX_FUNCTION_BODY_LENGTH:
+            raise ValueError(f"Function body is limited to {MAX_FUNCTION_BODY_LENGTH} characters")
+        
+        compiled = self.compile(body, parameters)
+        if name in self._called_functions(compiled):
+            raise ValueError("Recursive function definitions are not supported")
+        return name, compiled
+
+    def _called_functions(self, compiled):
+        """Names of user-defined functions reachable from a compiled body"""
+        reached = set()
+        pending = [compiled]
+        while pending:
+            current = pending.pop()
+            for name in current.code.co_names:
+                if name in current.variables or name in reached:
+                    continue
+                reached.add(name)
+                if name in self.functions:
+                    pending.append(self.functions[name])
+        return reached
+
+    def clear_cache(self):
+        """Discard all cached compiled expressions and check results"""
+        self._cache.clear()
+        self._checks.clear()
 
     def _replace_functions(self, expression):
-        """Replace function calls with Python equivalents"""
-        
-        # Process functions in order - longest first to avoid conflicts
-        # Replace ln() before log() to avoid matching "ln" inside "log"
-        functions = [
-            ('ln', 'math.log'),
-            ('log2', 'math.log2'),
-            ('log', 'math.log10'),
-            ('sqrt', 'math.sqrt'),
-            ('sin', 'sin_deg'),
-            ('cos', 'cos_deg'),
-            ('tan', 'tan_deg'),
-            ('asin', 'asin_deg'),
-            ('acos', 'acos_deg'),
-            ('atan', 'atan_deg'),
-            ('exp', 'math.exp'),
-            ('abs', 'abs'),
-            ('fact', 'math.factorial'),
-        ]
-        
-        for func_name, replacement in functions:
-            # Match function call pattern: function( 
-            # Use negative lookbehind to ensure it's not already preceded by "math."
-            pattern = rf'(?<!\.)\b{func_name}\s*\('
-            expression = re.sub(pattern, f'{replacement}(', expression)
+        """
+        Replace function calls with Python equivalents in one pass
         
-        return expression
+        Each call name is one registry lookup; the argument count is
+        checked against the function's arity, and the function's pack is
+        loaded on first use. Unknown names are left for user-defined
+        functions.
+        
+        Raises:
+            ExpressionSyntaxError: If a built-in function gets the wrong
+                number of arguments
+        """
+        def replace(match):
+            spec = self.registry.lookup(match.group(1))
+            if spec is None:
+                return match.group(0)
+            split = _split_arguments(expression, match.end())
+            if split is not None:
+                arguments, _ = split
+                empty = len(arguments) == 1 and not arguments[0].strip()
+                try:
+                    spec.check_arity(0 if empty else len(arguments))
+                except ValueError as e:
+                    raise ExpressionSyntaxError(str(e), match.start(1))
+            if spec.pack is not None:
+                self._load_pack(spec.pack)
+            return f'{spec.target}{match.group(2)}('
+        
+        return _FUNCTION_CALL.sub(replace, expression)
 
     def _validate_expression(self, expression):
         """
         Validate expression for safety and correctness
         
+        Characters, bracket nesting and operator sequences are checked in
+        one tokenizing pass (see calculator.tokenizer).
+        
         Args:
             expression: Expression to validate
             
+        Returns:
+            TokenState of the expression
+            
         Raises:
-            ValueError: If expression is invalid
+            ExpressionSyntaxError: If expression is invalid, with the
+                position of the offending character
         """
-        # Check for balanced parentheses
-        if expression.count('(') != expression.count(')'):
-            raise ValueError("Unbalanced parentheses")
-        
-        # Check for balanced brackets
-        if expression.count('[') != expression.count(']'):
-            raise ValueError("Unbalanced brackets")
-        
-        # Check for valid characters
-        valid_chars = set('0123456789+-*/%().^,. ')
-        valid_chars.update('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
-        
-        for char in expression:
-            if char not in valid_chars:
-                raise ValueError(f"Invalid character: '{char}'")
-        
-        # Check for consecutive operators (but allow -- for negative numbers)
-        if re.search(r'[+\-%/]{2,}', expression):
-            raise ValueError("Invalid consecutive operators")
-        
-        # Check for ** (exponentiation) - this is valid
-        # Just ensure it's not used incorrectly
-        if '**' in expression:
-            parts = expression.split('**')
-            if len(parts) > 1 and (not parts[-1].strip() or parts[-1].strip()[0] in '+-%/*'):
-                raise ValueError("Invalid exponentiation syntax")
+        return tokenize(expression)
 
     def validate_only(self, expression):
         """
@@ -176,6 +807,40 @@ class ExpressionParser:
         except Exception as e:
             raise ValueError(f"Invalid expression: {str(e)}")
 
+    def check(self, expression):
+        """
+        Check that an expression translates and compiles, without
+        evaluating it (history, 'ans' and memory are not touched)
+        
+        Results are cached, and a valid expression is also left in the
+        compile cache, so evaluating it afterwards skips compilation.
+        
+        Args:
+            expression: Expression to check
+            
+        Returns:
+            Tuple (error, position): (None, None) if the expression is
+            valid, otherwise the error message and the 0-based index of
+            the offending character (None if no single character is at fault)
+        """
+        expression = str(expression).strip()
+        result = self._checks.get(expression)
+        if result is not None:
+            self._checks.move_to_end(expression)
+            return result
+        
+        try:
+            with _evaluation_errors():
+                self._compile(expression)
+            result = (None, None)
+        except (ValueError, SyntaxError) as e:
+            result = (str(e), getattr(e, 'position', None))
+        
+        self._checks[expression] = result
+        if len(self._checks) > CHECK_CACHE_SIZE:
+            self._checks.popitem(last=False)
+        return result
+
     def get_last_result(self):
         """Get the last calculation result"""
         return self.last_result
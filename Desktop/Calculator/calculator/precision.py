@@ -0,0 +1,473 @@
+"""
+Adaptive precision module for high-precision results
+Handles: detecting when a float result cannot support the requested
+decimal places (too many places, or digits lost to catastrophic
+cancellation) and re-evaluating the expression with decimal.Decimal at
+the precision needed, with cached contexts and constants per precision
+
+Float evaluation stays the fast path; this module is imported only when
+the adaptive precision mode is on.
+"""
+
+import math
+import re
+from collections import ChainMap
+from decimal import Context, Decimal, localcontext
+from functools import lru_cache
+
+from . import combinatorics, number_theory
+from .rendering import FLOAT_DIGITS
+
+# Extra digits carried through a Decimal evaluation
+GUARD_DIGITS = 10
+
+# Upper bound on the Decimal precision used
+MAX_PRECISION = 1000
+
+# Digits treated as lost when a sum cancels to exactly zero
+_TOTAL_LOSS = FLOAT_DIGITS + 2
+
+# Numeric literals in translated source (not digits inside names like log10)
+_NUMBER = re.compile(r'(?<![\w.])(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?(?![\w.])')
+
+
+@lru_cache(maxsize=256)
+def _rewritten_code(source, floats_only):
+    """
+    Compile source with numeric literals turned into _N('text') calls
+
+    Keeps Python from folding constant subexpressions (which would hide
+    cancellation) and lets Decimal see literals exactly as typed.
+    """
+    def wrap(match):
+        text = match.group(0)
+        if floats_only and not any(c in text for c in '.eE'):
+            return text
+        return f"_N('{text}')"
+    from .parser import compile_source
+    return compile_source(_NUMBER.sub(wrap, source))
+
+
+class _Watched(float):
+    """A float that remembers the most digits lost to cancellation on its way"""
+
+    def __new__(cls, value, lost=0.0):
+        self = super().__new__(cls, value)
+        self.lost = lost
+        return self
+
+
+def _lost(*values):
+    return max(getattr(value, 'lost', 0.0) for value in values)
+
+
+def _is_real(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _cancellation(a, b, result):
+    """Digits lost when a sum of a and b comes out as result"""
+    big = max(abs(a), abs(b))
+    if result == 0:
+        return _TOTAL_LOSS if big else 0.0
+    if big > abs(result):
+        return math.log10(big / abs(result))
+    return 0.0
+
+
+def _sum_operator(function, reverse=False):
+    def operator(self, other):
+        if not _is_real(other):
+            return NotImplemented
+        a, b = (float(other), float(self)) if reverse else (float(self), float(other))
+        result = function(a, b)
+        return _Watched(result, max(_lost(self, other), _cancellation(a, b, result)))
+    return operator
+
+
+def _plain_operator(function, reverse=False):
+    def operator(self, other):
+        if not _is_real(other):
+            return NotImplemented
+        a, b = (float(other), float(self)) if reverse else (float(self), float(other))
+        result = function(a, b)
+        if not isinstance(result, float):
+            return result
+        return _Watched(result, _lost(self, other))
+    return operator
+
+
+_Watched.__add__ = _sum_operator(float.__add__)
+_Watched.__radd__ = _sum_operator(float.__add__, reverse=True)
+_Watched.__sub__ = _sum_operator(float.__sub__)
+_Watched.__rsub__ = _sum_operator(float.__sub__, reverse=True)
+for _name in ('mul', 'truediv', 'floordiv', 'mod', 'pow'):
+    _function = getattr(float, f'__{_name}__')
+    setattr(_Watched, f'__{_name}__', _plain_operator(_function))
+    setattr(_Watched, f'__r{_name}__', _plain_operator(_function, reverse=True))
+_Watched.__neg__ = lambda self: _Watched(-float(self), self.lost)
+_Watched.__pos__ = lambda self: self
+_Watched.__abs__ = lambda self: _Watched(abs(float(self)), self.lost)
+
+
+def _watch_function(function):
+    """Wrap a function so float results carry the loss of their arguments"""
+    def call(*args):
+        result = function(*args)
+        if isinstance(result, float):
+            return _Watched(result, _lost(*args) if args else 0.0)
+        return result
+    return call
+
+
+class _WatchedMath:
+    """Stand-in for the 'math' module while measuring cancellation"""
+
+    pi = _Watched(math.pi)
+    e = _Watched(math.e)
+
+    def __getattr__(self, name):
+        return _watch_function(getattr(math, name))
+
+
+@lru_cache(maxsize=8)
+def _watched_namespace(parser, packs):
+    """
+    A parser's namespace with every function wrapped to track losses
+    (packs, the parser's loaded function packs, keys the cache)
+    """
+    namespace = {
+        name: _watch_function(value) if callable(value) else value
+        for name, value in parser.namespace.items()
+    }
+    namespace.update({
+        'math': _WatchedMath(),
+        'pi': _Watched(math.pi),
+        'e': _Watched(math.e),
+        '_N': lambda text: _Watched(float(text)),
+    })
+    return namespace
+
+
+def digits_lost(compiled, bindings):
+    """
+    Estimate the significant digits a float evaluation lost to cancellation
+
+    Re-runs the expression with floats that track, along every path to
+    the result, how far each addition or subtraction fell below the
+    size of its operands.
+
+    Args:
+        compiled: CompiledExpression
+        bindings: Variable bindings, including 'ans'
+
+    Returns:
+        Digits lost (0.0 if nothing cancelled or it cannot be measured)
+    """
+    if '+' not in compiled.source and '-' not in compiled.source:
+        return 0.0
+    parser = compiled.parser
+    try:
+        code = _rewritten_code(compiled.source, True)
+        result = eval(code, _watched_namespace(parser, parser.loaded_packs),
+                      ChainMap(bindings, parser.functions, parser.cells))
+    except Exception:
+        return 0.0
+    return getattr(result, 'lost', 0.0)
+
+
+def required_digits(result, decimal_places):
+    """Significant digits needed to show result with decimal_places places"""
+    if result == 0 or not math.isfinite(result):
+        return decimal_places
+    return decimal_places + max(0, math.floor(math.log10(abs(result))) + 1)
+
+
+@lru_cache(maxsize=32)
+def decimal_context(digits):
+    """Decimal context with the given precision (cached per precision)"""
+    return Context(prec=digits)
+
+
+@lru_cache(maxsize=32)
+def decimal_constants(digits):
+    """
+    pi and e to the given precision (cached per precision)
+
+    Returns:
+        Tuple (pi, e) of Decimals
+    """
+    with localcontext(decimal_context(digits + 2)):
+        # Series from the decimal module documentation
+        three = Decimal(3)
+        lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+        e = Decimal(1).exp()
+    with localcontext(decimal_context(digits)):
+        return +s, +e
+
+
+def _sine_series(x):
+    """Taylor series of sin at x (|x| <= pi)"""
+    i, last, total, term = 1, None, x, x
+    while total != last:
+        last = total
+        term = -term * x * x / ((i + 1) * (i + 2))
+        total += term
+        i += 2
+    return total
+
+
+def _atan(x):
+    """Arctangent by argument halving and its Taylor series"""
+    halvings = 0
+    while abs(x) > Decimal('0.1'):
+        x = x / (1 + (1 + x * x).sqrt())
+        halvings += 1
+    last, total, power, k = None, x, x, 1
+    while total != last:
+        last = total
+        power = -power * x * x
+        k += 2
+        total += power / k
+    return total * (2 ** halvings)
+
+
+# Exact sines at multiples of 30 degrees (the rest are irrational)
+_EXACT_SINES = {0: 0, 30: Decimal('0.5'), 90: 1, 150: Decimal('0.5'),
+                180: 0, 210: Decimal('-0.5'), 270: -1, 330: Decimal('-0.5')}
+
+
+class _DecimalTrig:
+    """Trigonometric functions on Decimals honouring the angle mode"""
+
+    def __init__(self, advanced, pi):
+        self.advanced = advanced
+        self.pi = pi
+
+    def _degrees(self):
+        return self.advanced.angle_mode == 'degrees'
+
+    def sin(self, x):
+        if self._degrees():
+            reduced = x % 360
+            if reduced < 0:
+                reduced += 360
+            if reduced in _EXACT_SINES:
+                return Decimal(_EXACT_SINES[reduced])
+            x = reduced * self.pi / 180
+        else:
+            x = x % (2 * self.pi)
+        # Fold into [-pi, pi] so the series converges quickly
+        if x > self.pi:
+            x -= 2 * self.pi
+        elif x < -self.pi:
+            x += 2 * self.pi
+        return +_sine_series(x)
+
+    def cos(self, x):
+        if self._degrees():
+            return self.sin(x + 90)
+        return self.sin(x + self.pi / 2)
+
+    def tan(self, x):
+        cosine = self.cos(x)
+        if cosine == 0:
+            raise ValueError(f"Tangent is undefined at {x}")
+        return self.sin(x) / cosine
+
+    def _angle(self, radians):
+        return radians * 180 / self.pi if self._degrees() else radians
+
+    def atan(self, x):
+        return self._angle(_atan(x))
+
+    def asin(self, x):
+        if abs(x) > 1:
+            raise ValueError("Input must be between -1 and 1")
+        if abs(x) == 1:
+            return self._angle(x * self.pi / 2)
+        return self._angle(_atan(x / (1 - x * x).sqrt()))
+
+    def acos(self, x):
+        if abs(x) > 1:
+            raise ValueError("Input must be between -1 and 1")
+        return self._angle(self.pi / 2) - self.asin(x)
+
+
+class _DecimalMath:
+    """Stand-in for the 'math' module in Decimal evaluations"""
+
+    def __init__(self, pi, e):
+        self.pi = pi
+        self.e = e
+
+    @staticmethod
+    def sqrt(x):
+        return Decimal(x).sqrt()
+
+    @staticmethod
+    def exp(x):
+        return Decimal(x).exp()
+
+    @staticmethod
+    def log10(x):
+        return Decimal(x).log10()
+
+    @staticmethod
+    def log2(x):
+        return Decimal(x).ln() / Decimal(2).ln()
+
+    @staticmethod
+    def log(x, base=None):
+        if base is None:
+            return Decimal(x).ln()
+        return Decimal(x).ln() / Decimal(base).ln()
+
+
+def _integral(function):
+    """Pass integral Decimals to an integer function as ints"""
+    def call(*args):
+        return function(*(int(arg) if isinstance(arg, Decimal) and arg == arg.to_integral_value()
+                          else arg for arg in args))
+    return call
+
+
+def _values(args, name):
+    if len(args) == 1 and isinstance(args[0], (list, tuple)):
+        args = args[0]
+    if not args:
+        raise ValueError(f"{name} requires at least one value")
+    return [Decimal(arg) for arg in args]
+
+
+def _mean(*args):
+    values = _values(args, "mean")
+    return sum(values) / len(values)
+
+
+def _variance(*args):
+    values = _values(args, "var")
+    if len(values) < 2:
+        raise ValueError("Variance requires at least two values")
+    mean = sum(values) / len(values)
+    return sum((v - mean) * (v - mean) for v in values) / (len(values) - 1)
+
+
+def _median(*args):
+    ordered = sorted(_values(args, "median"))
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+@lru_cache(maxsize=32)
+def decimal_namespace(parser, digits, packs=()):
+    """
+    Build the namespace that evaluates rewritten code on Decimals
+    (cached per parser, precision and loaded function packs)
+
+    Args:
+        parser: ExpressionParser whose namespace to mirror
+        digits: Working precision
+        packs: The parser's loaded function packs (part of the cache key)
+
+    Returns:
+        Namespace dict
+    """
+    pi, e = decimal_constants(digits)
+    trig = _DecimalTrig(parser.advanced, pi)
+    namespace = dict(parser.namespace)
+    namespace.update({
+        'math': _DecimalMath(pi, e),
+        'pi': pi,
+        'e': e,
+        '_N': Decimal,
+        'sin_deg': trig.sin,
+        'cos_deg': trig.cos,
+        'tan_deg': trig.tan,
+        'asin_deg': trig.asin,
+        'acos_deg': trig.acos,
+        'atan_deg': trig.atan,
+        'fact': _integral(combinatorics.factorial),
+        'nPr': _integral(combinatorics.permutation),
+        'nCr': _integral(combinatorics.combination),
+        'sum': lambda *args: sum(_values(args, "sum")),
+        'prod': lambda *args: math.prod(_values(args, "prod")),
+        'mean': _mean,
+        'var': _variance,
+        'stdev': lambda *args: _variance(*args).sqrt(),
+        'min': lambda *args: min(_values(args, "min")),
+        'max': lambda *args: max(_values(args, "max")),
+        'median': _median,
+        'powmod': _integral(number_theory.powmod),
+        'gcd': _integral(number_theory.gcd),
+        'lcm': _integral(number_theory.lcm),
+        'isprime': _integral(parser.arithmetic.isprime),
+        'prime_pi': _integral(number_theory.prime_pi),
+    })
+    return namespace
+
+
+def evaluate_decimal(compiled, bindings, digits):
+    """
+    Evaluate a compiled expression with Decimal arithmetic
+
+    Args:
+        compiled: CompiledExpression
+        bindings: Variable bindings (floats are converted by their repr)
+        digits: Significant digits of the result
+
+    Returns:
+        Decimal result (carrying GUARD_DIGITS beyond digits, so a later
+        'ans' keeps them), or None if the expression cannot be evaluated
+        with Decimals (e.g. it uses matrices)
+    """
+    parser = compiled.parser
+    scope = {
+        name: Decimal(repr(value)) if isinstance(value, float) else value
+        for name, value in bindings.items()
+    }
+    working = digits + GUARD_DIGITS
+    try:
+        with localcontext(decimal_context(working)):
+            namespace = decimal_namespace(parser, working, parser.loaded_packs)
+            code = _rewritten_code(compiled.source, False)
+            result = eval(code, namespace, ChainMap(scope, parser.functions, parser.cells))
+    except Exception:
+        return None
+    if not isinstance(result, Decimal) or not result.is_finite():
+        return None
+    return result
+
+
+def refine(compiled, result, bindings, decimal_places, exact=None):
+    """
+    Re-evaluate with Decimal if a float result cannot support the
+    requested decimal places
+
+    Args:
+        compiled: CompiledExpression that produced result
+        result: Float result of the fast path
+        bindings: Variable bindings used for it, including 'ans'
+        decimal_places: Decimal places that will be displayed
+        exact: Optional Decimal values replacing bindings in the Decimal
+            evaluation (e.g. the previous result before float rounding)
+
+    Returns:
+        A Decimal when escalation was needed and succeeded, None otherwise
+    """
+    lost = digits_lost(compiled, bindings)
+    needed = required_digits(result, decimal_places)
+    if needed <= FLOAT_DIGITS - lost:
+        return None
+    digits = min(needed + math.ceil(lost), MAX_PRECISION)
+    if exact:
+        bindings = dict(bindings, **exact)
+    return evaluate_decimal(compiled, bindings, digits)
@@ -0,0 +1,176 @@
+"""
+Live preview module for evaluating expressions as they are typed
+Handles: completing a partial expression (trailing operators dropped,
+open brackets closed) and evaluating it without recording history or
+changing 'ans'
+
+Each client session keeps the token states of the prefixes it typed, so
+a keystroke resumes tokenizing from the longest earlier prefix (after
+a backspace too) and only scans the new characters. A keystroke that
+leaves the completed expression unchanged, such as typing an operator,
+reuses the previous result without evaluating.
+"""
+
+from collections import OrderedDict
+
+from .tokenizer import ExpressionSyntaxError, scan
+
+# Client sessions kept (least recently used are dropped)
+MAX_PREVIEW_SESSIONS = 1000
+
+# Prefix states kept per session
+MAX_PREFIX_STATES = 128
+
+# Trailing tokens dropped to complete a partial expression
+_INCOMPLETE = frozenset(('operator', 'power', 'comma', 'open', 'dot'))
+
+_CLOSING = {'(': ')', '[': ']'}
+
+
+def complete(state):
+    """
+    Complete a scanned partial expression
+
+    Args:
+        state: TokenState of the partial text
+
+    Returns:
+        Expression text with trailing operators dropped and open
+        brackets closed ('' if nothing is left)
+    """
+    tokens = state.tokens
+    index = len(tokens) - 1
+    while index >= 0 and tokens[index][0] in _INCOMPLETE:
+        index -= 1
+    if index < 0:
+        return ''
+    _, value, start = tokens[index]
+    closing = ''.join(_CLOSING[bracket] for bracket, _ in reversed(state.stacks[index]))
+    return state.text[:start + len(value)] + closing
+
+
+class _Session:
+    """Prefix states and the last preview of one client"""
+
+    __slots__ = ('states', 'source', 'preview')
+
+    def __init__(self):
+        self.states = []
+        self.source = None
+        self.preview = None
+
+
+class Previewer:
+    """Evaluate partial expressions for many client sessions"""
+
+    def __init__(self, parser, max_sessions=MAX_PREVIEW_SESSIONS):
+        """
+        Initialize previewer
+
+        Args:
+            parser: ExpressionParser to compile and evaluate with
+            max_sessions: Client sessions kept (default: MAX_PREVIEW_SESSIONS)
+        """
+        self.parser = parser
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+
+    def _session(self, key):
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = _Session()
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(key)
+        return session
+
+    def _scan(self, session, text):
+        """Tokenize text, resuming from the session's longest prefix state"""
+        states = session.states
+        while states and not text.startswith(states[-1].text):
+            states.pop()
+        state = scan(text, states[-1] if states else None)
+        if not states or states[-1].text != text:
+            states.append(state)
+            if len(states) > MAX_PREFIX_STATES:
+                del states[0]
+        return state
+
+    def preview(self, session_key, expression):
+        """
+        Evaluate a partial expression for a preview
+
+        Nothing is recorded: history, 'ans' and the random stream are
+        unchanged. Expressions drawing random numbers get no preview, nor
+        do ones that may take long to evaluate (see
+        ExpressionParser.is_heavy), so typing 9^9^9 cannot stall the
+        previewer.
+
+        Args:
+            session_key: Identifies the client session typing the expression
+            expression: Expression text typed so far
+
+        Returns:
+            Dict with 'expression' (the completed text evaluated, or None),
+            'result' (None if there is no preview), 'complete' (True if
+            the text evaluated as typed), 'error' and 'position' (the
+            error message and offending index, or None)
+        """
+        session = self._session(session_key)
+        text = str(expression).strip()
+        try:
+            state = self._scan(session, text)
+        except ExpressionSyntaxError as e:
+            return self._result(None, None, text, f"Invalid expression: {e}", e.position)
+
+        source = complete(state)
+        if source == session.source:
+            return dict(session.preview, complete=source == text)
+
+        if not source:
+            preview, reusable = self._result(None, None, text), True
+        else:
+            preview, reusable = self._evaluate(source, text)
+        session.source = source if reusable else None
+        session.preview = preview
+        return preview
+
+    def _evaluate(self, source, text):
+        """
+        Evaluate a completed expression without side effects
+
+        Returns:
+            Tuple (preview, reusable): reusable is False when the result
+            may change without the text changing (it reads 'ans', a cell
+            or a user-defined function, or failed or was skipped)
+        """
+        parser = self.parser
+        try:
+            compiled = parser.compile(source)
+            if parser.uses_random(compiled) or parser.is_heavy(compiled):
+                return self._result(source, None, text), False
+            result = compiled.evaluate()
+        except (ValueError, SyntaxError) as e:
+            return self._result(source, None, text, str(e), getattr(e, 'position', None)), False
+        if callable(result):
+            return self._result(source, None, text), False
+        reusable = not any(
+            name == 'ans' or name in parser.functions or name in parser.cells
+            for name in compiled.code.co_names
+        )
+        return self._result(source, result, text), reusable
+
+    @staticmethod
+    def _result(source, result, text, error=None, position=None):
+        return {
+            'expression': source,
+            'result': result,
+            'complete': source == text,
+            'error': error,
+            'position': position,
+        }
+
+    def discard(self, session_key):
+        """Forget a client session"""
+        self._sessions.pop(session_key, None)
@@ -0,0 +1,192 @@
+"""
+History recorder module for recording calculations off the request path
+Handles: a bounded queue of calculations drained by a background thread
+into Memory's history in batches, optional persistence of each batch
+as JSON lines, and the back-pressure policy when the queue is full
+
+Recording a calculation only appends (expression, result, time) to the
+queue; formatting the timestamp, building the history entry and any
+file write happen on the recorder's thread. Readers call flush() first
+so history they return includes every calculation recorded before.
+"""
+
+import atexit
+import json
+import threading
+import time
+from collections import deque
+
+from .rendering import render_value
+
+# Calculations waiting to be recorded before the back-pressure policy applies
+MAX_PENDING = 10_000
+
+# Most calculations written to history (and persisted) in one batch
+BATCH_SIZE = 256
+
+# Seconds allowed at exit to persist calculations still queued
+EXIT_TIMEOUT = 2.0
+
+# What record() does when the queue is full
+POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class JsonLinesSink:
+    """Append history entries to a file, one JSON object per line"""
+
+    def __init__(self, path):
+        """
+        Initialize sink
+
+        Args:
+            path: File to append to (created if missing)
+        """
+        self.path = path
+
+    def __call__(self, entries):
+        """Write a batch of entries with a single write"""
+        lines = ''.join(
+            json.dumps(dict(entry, result=render_value(entry['result'])), default=str) + '\n'
+            for entry in entries
+        )
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(lines)
+
+
+class HistoryRecorder:
+    """Record calculations into a Memory's history on a background thread"""
+
+    def __init__(self, memory, max_pending=MAX_PENDING, batch_size=BATCH_SIZE,
+                 policy='drop_oldest', sink=None):
+        """
+        Initialize recorder
+
+        Args:
+            memory: Memory whose history receives the entries
+            max_pending: Queue capacity (default: MAX_PENDING)
+            batch_size: Most entries per batch (default: BATCH_SIZE)
+            policy: When the queue is full, 'drop_oldest' discards the
+                oldest waiting calculation (history keeps the newest
+                anyway), 'drop_newest' discards the new one and 'block'
+                waits for room (default: 'drop_oldest')
+            sink: Optional callable receiving each batch of history
+                entries for persistence, e.g. JsonLinesSink
+
+        Raises:
+            ValueError: If policy or a size is invalid
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Policy must be one of: {', '.join(POLICIES)}")
+        if max_pending < 1 or batch_size < 1:
+            raise ValueError("max_pending and batch_size must be positive")
+        self.memory = memory
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.policy = policy
+        self.sink = sink
+        self.dropped = 0
+        self.errors = 0
+        self._pending = deque()
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def _start(self):
+        """Start the recorder thread on first use (called with the lock held)"""
+        self._thread = threading.Thread(target=self._run, name='history-recorder', daemon=True)
+        self._thread.start()
+        if self.sink is not None:
+            # Persist what is still queued when the process exits
+            atexit.register(self.close, EXIT_TIMEOUT)
+
+    def record(self, expression, result):
+        """
+        Queue a calculation for history
+
+        Args:
+            expression: The expression evaluated
+            result: Its result
+
+        Returns:
+            True if queued, False if dropped (queue full under
+            'drop_newest', or recorder closed)
+        """
+        item = (str(expression), result, time.time())
+        with self._condition:
+            if self._closed:
+                return False
+            if self._thread is None:
+                self._start()
+            if len(self._pending) >= self.max_pending:
+                if self.policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                if self.policy == 'drop_oldest':
+                    self._pending.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._pending) >= self.max_pending and not self._closed:
+                        self._condition.wait()
+            self._pending.append(item)
+            self._condition.notify_all()
+        return True
+
+    def _run(self):
+        """Drain the queue into history in batches until closed"""
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._pending and not self._closed:
+                    condition.wait()
+                if not self._pending:
+                    return
+                batch = [self._pending.popleft()
+                         for _ in range(min(len(self._pending), self.batch_size))]
+                self._busy = True
+                # Wake writers blocked on a full queue
+                condition.notify_all()
+            try:
+                entries = self.memory.add_history_batch(batch)
+                if self.sink is not None:
+                    self.sink(entries)
+            except Exception:
+                # Keep recording; only this batch is lost
+                self.errors += 1
+            finally:
+                with condition:
+                    self._busy = False
+                    condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued calculation is in history
+
+        Args:
+            timeout: Seconds to wait at most (None waits until done)
+
+        Returns:
+            True if the queue was drained, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._busy, timeout
+            )
+
+    def pending(self):
+        """Number of calculations waiting to be recorded"""
+        return len(self._pending)
+
+    def close(self, timeout=None):
+        """
+        Record what is queued, then stop the recorder thread
+
+        Args:
+            timeout: Seconds to wait for the thread (None waits until done)
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,235 @@
+"""
+Function registry module for expression functions
+Handles: the names expressions may call, the namespace name each one
+translates to, its arity (checked when an expression is compiled) and
+where its implementation comes from
+
+Core functions (math, trigonometry from AdvancedMath, combinatorics,
+random numbers) are bound into every parser's namespace up front.
+Functions in packs (statistics, linear algebra, number theory) are
+installed the first time a parser compiles a call to one of them, so
+their modules are imported only when used. Lookups are dictionary
+lookups, whatever the number of registered functions.
+"""
+
+import importlib
+from functools import reduce
+
+from . import combinatorics
+
+
+class FunctionSpec:
+    """One expression function"""
+
+    __slots__ = ('name', 'target', 'min_args', 'max_args', 'pack', 'bind', 'attribute', 'heavy',
+                 'dual')
+
+    def __init__(self, name, target, min_args, max_args, pack, bind, attribute, heavy=False,
+                 dual=False):
+        """
+        Initialize function spec
+
+        Args:
+            name: Name used in expressions, e.g. 'ln'
+            target: Name the call translates to, e.g. 'math.log'
+            min_args: Fewest arguments accepted
+            max_args: Most arguments accepted (None for any number)
+            pack: Name of the pack providing it, or None for core functions
+            bind: For core functions, callable(parser) returning the
+                implementation (None when target is provided otherwise,
+                e.g. 'math.log')
+            attribute: For pack functions, dotted attribute path in the
+                pack's module
+            heavy: True if a call may take long enough (large factorials,
+                prime sieves, matrix inversion) to be evaluated off a
+                server's event loop
+            dual: True if the implementation also works on the dual numbers
+                of calculator.autodiff, passing derivatives through (e.g.
+                abs); gradients of other functions use the implementations
+                in calculator.autodiff, or report them as not differentiable
+        """
+        self.name = name
+        self.target = target
+        self.min_args = min_args
+        self.max_args = max_args
+        self.pack = pack
+        self.bind = bind
+        self.attribute = attribute
+        self.heavy = heavy
+        self.dual = dual
+
+    def check_arity(self, count):
+        """
+        Check an argument count
+
+        Raises:
+            ValueError: If count is outside the accepted range
+        """
+        if self.min_args <= count and (self.max_args is None or count <= self.max_args):
+            return
+        if self.max_args is None:
+            expected = f"at least {self.min_args}"
+        elif self.min_args == self.max_args:
+            expected = str(self.min_args)
+        else:
+            expected = f"{self.min_args} to {self.max_args}"
+        bound = self.min_args if self.max_args is None else self.max_args
+        plural = '' if bound == 1 else 's'
+        raise ValueError(f"{self.name}() takes {expected} argument{plural} ({count} given)")
+
+
+class FunctionRegistry:
+    """Expression functions by name, with lazily loaded packs"""
+
+    def __init__(self):
+        """Initialize empty registry"""
+        self._specs = {}
+        self._packs = {}
+        self._loaded = {}
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def lookup(self, name):
+        """
+        Get the spec of a function
+
+        Args:
+            name: Name used in expressions
+
+        Returns:
+            FunctionSpec, or None if name is not a registered function
+        """
+        return self._specs.get(name)
+
+    def names(self):
+        """Names of all registered functions"""
+        return set(self._specs)
+
+    def targets(self):
+        """Namespace names that registered functions translate to"""
+        return {spec.target.split('.')[0] for spec in self._specs.values()}
+
+    def heavy_targets(self):
+        """Namespace names of functions flagged heavy"""
+        return {spec.target for spec in self._specs.values() if spec.heavy}
+
+    def specs(self):
+        """Specs of all registered functions"""
+        return list(self._specs.values())
+
+    def core(self):
+        """Specs of core functions (bound into every namespace up front)"""
+        return [spec for spec in self._specs.values() if spec.pack is None]
+
+    def register_pack(self, pack, module):
+        """
+        Declare a pack of functions implemented in one module
+
+        Args:
+            pack: Pack name
+            module: Absolute module name, imported on first use
+        """
+        self._packs[pack] = module
+
+    def register(self, name, target=None, min_args=1, max_args=1, pack=None,
+                 bind=None, attribute=None, heavy=False, dual=False):
+        """
+        Register an expression function
+
+        Args:
+            name: Name used in expressions
+            target: Namespace name it translates to (default: name)
+            min_args: Fewest arguments accepted (default: 1)
+            max_args: Most arguments accepted, None for any (default: 1)
+            pack: Pack providing it (default: None, a core function)
+            bind: For core functions, callable(parser) -> implementation
+            attribute: For pack functions, attribute path in the pack's
+                module (default: target)
+            heavy: True if a call may be slow (default: False)
+            dual: True if the implementation works on dual numbers
+                (default: False)
+
+        Raises:
+            ValueError: If the pack is unknown
+        """
+        if pack is not None and pack not in self._packs:
+            raise ValueError(f"Unknown function pack: {pack}")
+        target = target or name
+        self._specs[name] = FunctionSpec(
+            name, target, min_args, max_args, pack, bind,
+            (attribute or target) if pack is not None else None, heavy, dual
+        )
+
+    def load_pack(self, pack):
+        """
+        Import a pack's module (once) and resolve its functions
+
+        Args:
+            pack: Pack name
+
+        Returns:
+            Dict of namespace name -> implementation
+        """
+        if pack not in self._loaded:
+            module = importlib.import_module(self._packs[pack])
+            self._loaded[pack] = {
+                spec.target: reduce(getattr, spec.attribute.split('.'), module)
+                for spec in self._specs.values() if spec.pack == pack
+            }
+        return self._loaded[pack]
+
+
+def _register_builtins(registry):
+    """The calculator's built-in functions"""
+    core = registry.register
+    core('ln', 'math.log', max_args=2)
+    core('log2', 'math.log2')
+    core('log', 'math.log10')
+    core('sqrt', 'math.sqrt')
+    core('exp', 'math.exp')
+    core('sin', 'sin_deg', bind=lambda parser: parser.advanced.sine)
+    core('cos', 'cos_deg', bind=lambda parser: parser.advanced.cosine)
+    core('tan', 'tan_deg', bind=lambda parser: parser.advanced.tangent)
+    core('asin', 'asin_deg', bind=lambda parser: parser.advanced.arcsine)
+    core('acos', 'acos_deg', bind=lambda parser: parser.advanced.arccosine)
+    core('atan', 'atan_deg', bind=lambda parser: parser.advanced.arctangent)
+    core('abs', bind=lambda parser: abs, dual=True)
+    core('fact', bind=lambda parser: combinatorics.factorial, heavy=True)
+    core('nPr', min_args=2, max_args=2, bind=lambda parser: combinatorics.permutation,
+         heavy=True)
+    core('nCr', min_args=2, max_args=3, bind=lambda parser: combinatorics.combination,
+         heavy=True)
+    core('rand', min_args=0, bind=lambda parser: parser.random.rand)
+    core('randint', min_args=2, max_args=3, bind=lambda parser: parser.random.randint)
+    core('normal', min_args=0, max_args=3, bind=lambda parser: parser.random.normal)
+
+    registry.register_pack('stats', 'calculator.stats')
+    for name, attribute in (('sum', 'total'), ('prod', 'product'), ('mean', 'mean'),
+                            ('var', 'variance'), ('stdev', 'stdev'), ('min', 'minimum'),
+                            ('max', 'maximum'), ('median', 'median')):
+        registry.register(name, max_args=None, pack='stats', attribute=attribute)
+
+    registry.register_pack('linalg', 'calculator.linalg')
+    registry.register('matrix', pack='linalg')
+    registry.register('dot', min_args=2, max_args=2, pack='linalg', heavy=True)
+    registry.register('det', pack='linalg', heavy=True)
+    registry.register('inv', pack='linalg', heavy=True)
+    registry.register('transpose', pack='linalg')
+    registry.register('solve', min_args=2, max_args=2, pack='linalg', heavy=True)
+
+    # The Arithmetic wrappers import calculator.number_theory on first call
+    registry.register_pack('number_theory', 'calculator.arithmetic')
+    for name, min_args, max_args, heavy in (('powmod', 3, 3, True), ('gcd', 1, None, False),
+                                            ('lcm', 1, None, False), ('isprime', 1, 1, False),
+                                            ('factor', 1, 1, True), ('primes', 2, 2, True)):
+        registry.register(name, min_args=min_args, max_args=max_args, pack='number_theory',
+                          attribute=f'Arithmetic.{name}', heavy=heavy)
+    # pi(n) counts primes; pi without parentheses is the constant
+    registry.register('pi', 'prime_pi', pack='number_theory', attribute='Arithmetic.prime_pi',
+                      heavy=True)
+
+
+# Registry used by parsers unless given another
+DEFAULT_REGISTRY = FunctionRegistry()
+_register_builtins(DEFAULT_REGISTRY)
@@ -0,0 +1,234 @@
+"""
+Result rendering module for very large integer results
+Handles: digit counts and leading-digit summaries computed with
+logarithms instead of full decimal conversion, and streamed output of
+the full digits on explicit request
+"""
+
+import sys
+from functools import lru_cache
+
+# Integers with more digits than this are summarised instead of printed
+SUMMARY_DIGITS = 1000
+
+# Significant digits shown in a summary
+LEADING_DIGITS = 15
+
+# Significant decimal digits a float result can be trusted to
+FLOAT_DIGITS = 15
+
+# Chunks of at most this many bits (about 3010 digits, well under
+# CPython's int-to-str limit) are converted with str() directly; splits
+# happen at multiples of _BASE_DIGITS, so every remainder fits a chunk
+_BASE_BITS = 10000
+_BASE_DIGITS = 3000
+
+# Relative error bound of _log10-based estimates (64-bit truncation)
+_TOLERANCE = '1e-17'
+
+
+def is_big_integer(value, limit=SUMMARY_DIGITS):
+    """
+    Check whether a value is an integer too large to print in full
+
+    Args:
+        value: Any result
+        limit: Digit count above which integers are summarised
+
+    Returns:
+        True if value is an int with more than limit digits
+    """
+    if not isinstance(value, int) or isinstance(value, bool):
+        return False
+    # Cheap bit-length screen before counting digits
+    if value.bit_length() <= limit * 3.32:
+        return False
+    return digit_count(value) > limit
+
+
+@lru_cache(maxsize=None)
+def _decimal():
+    """Decimal context and log10(2), imported on first use to keep startup fast"""
+    from decimal import Decimal, Context, ROUND_FLOOR
+    context = Context(prec=50, rounding=ROUND_FLOOR)
+    return context, context.log10(Decimal(2))
+
+
+def _log10(n):
+    """High-precision log10 of a positive int from its leading 64 bits"""
+    context, log10_2 = _decimal()
+    shift = max(n.bit_length() - 64, 0)
+    top = n >> shift
+    return context.add(context.log10(top), context.multiply(shift, log10_2))
+
+
+def digit_count(n):
+    """
+    Count the decimal digits of an integer without converting it to a string
+
+    Args:
+        n: Integer
+
+    Returns:
+        Number of digits (ignoring sign)
+    """
+    n = abs(n)
+    if n < 10 ** 15:
+        return len(str(n))
+
+    log = _log10(n)
+    digits = int(log) + 1
+    # Truncating to 64 bits can land just below an exact power of ten
+    if log - int(log) > 0.999999999999:
+        if n >= _power_of_ten(digits):
+            digits += 1
+    return digits
+
+
+class IntegerSummary:
+    """Leading digits, exponent and digit count of a large integer"""
+
+    def __init__(self, negative, digits, leading, exponent):
+        """
+        Initialize summary
+
+        Args:
+            negative: True if the integer is negative
+            digits: Total number of decimal digits
+            leading: Leading significant digits as a string
+            exponent: Power of ten of the first digit
+        """
+        self.negative = negative
+        self.digits = digits
+        self.leading = leading
+        self.exponent = exponent
+
+    @property
+    def text(self):
+        """Scientific-style text, e.g. '4.22857792660554e+16325'"""
+        sign = '-' if self.negative else ''
+        mantissa = self.leading[0] + ('.' + self.leading[1:] if len(self.leading) > 1 else '')
+        return f"{sign}{mantissa}e+{self.exponent}"
+
+    def to_dict(self):
+        """Summary fields for JSON responses"""
+        return {
+            'summary': self.text,
+            'digits': self.digits,
+            'leading_digits': self.leading,
+            'exponent': self.exponent,
+            'negative': self.negative
+        }
+
+
+def summarize(n, significant=LEADING_DIGITS):
+    """
+    Summarise an integer by its leading digits and exponent
+
+    Args:
+        n: Integer
+        significant: Number of leading digits to keep (truncated, not rounded)
+
+    Returns:
+        IntegerSummary
+    """
+    negative = n < 0
+    n = abs(n)
+    digits = digit_count(n)
+
+    if digits <= significant:
+        leading = str(n)
+    else:
+        context, _ = _decimal()
+        shift = digits - significant
+        scaled = context.power(10, _log10(n) - shift)
+        leading = int(scaled)
+        # The logarithm is a hair low, so a value just under the next
+        # integer may really be it (e.g. exact powers of ten); check exactly
+        if leading + 1 - scaled < scaled * context.create_decimal(_TOLERANCE):
+            if n >= (leading + 1) * _power_of_ten(shift):
+                leading += 1
+        leading = str(leading)[:significant].ljust(significant, '0')
+
+    return IntegerSummary(negative, digits, leading, digits - 1)
+
+
+def render_value(value):
+    """
+    Make a result safe to print or serialise
+
+    Args:
+        value: Any result
+
+    Returns:
+        Summary text for big integers, nested lists for vectors and
+        matrices, the value unchanged otherwise
+    """
+    if is_big_integer(value):
+        return summarize(value).text
+    if is_matrix(value):
+        return value.tolist()
+    return value
+
+
+def is_matrix(value):
+    """
+    Check whether a value is a vector or matrix result
+
+    Does not import calculator.linalg, which is loaded with the first
+    function that can produce one.
+    """
+    linalg = sys.modules.get(__package__ + '.linalg')
+    return linalg is not None and linalg.is_matrix(value)
+
+
+def is_decimal(value):
+    """
+    Check whether a value is a decimal.Decimal (from adaptive precision)
+
+    Does not import decimal, so float-only sessions never load it.
+    """
+    decimal = sys.modules.get('decimal')
+    return decimal is not None and isinstance(value, decimal.Decimal)
+
+
+@lru_cache(maxsize=64)
+def _power_of_ten(k):
+    return 10 ** k
+
+
+def iter_digits(n):
+    """
+    Stream the full decimal digits of an integer in chunks
+
+    Splits the number by cached powers of ten so that no single str()
+    conversion exceeds CPython's int-to-str digit limit.
+
+    Args:
+        n: Integer
+
+    Yields:
+        Strings whose concatenation is the decimal representation of n
+    """
+    if n < 0:
+        yield '-'
+        n = -n
+    yield from _digits(n, 0)
+
+
+def _digits(n, width):
+    """Digits of n, zero-padded to width (0 for no padding)"""
+    if n.bit_length() <= _BASE_BITS:
+        text = str(n)
+        yield text.zfill(width) if width else text
+        return
+
+    # Split at the largest power-of-two multiple of the base chunk below half the digits
+    half = int(n.bit_length() * 0.30103) // 2
+    k = _BASE_DIGITS
+    while k * 2 <= half:
+        k *= 2
+
+    high, low = divmod(n, _power_of_ten(k))
+    yield from _digits(high, width - k if width else 0)
+    yield from _digits(low, k)
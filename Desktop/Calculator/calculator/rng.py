@@ -0,0 +1,186 @@
+"""
+Random number module for seeded, reproducible draws
+Handles: rand(), randint(a, b) and normal(mu, sigma) in expressions,
+each with an optional count n for bulk draws, from one seeded stream
+per session (kept on Memory) so a seed replays the same results
+
+Single draws come from random.Random. A bulk draw takes one 64-bit
+value from that stream to seed a NumPy generator and produces all n
+values in one vectorised call (a Python loop without NumPy), so bulk
+draws never interleave with, or shift, the single-draw sequence.
+"""
+
+import os
+import re
+
+from .arithmetic import as_integer
+
+# Largest count accepted by rand(n), randint(a, b, n) and normal(mu, sigma, n)
+MAX_DRAWS = 1_000_000
+
+# Seeds are 64-bit unsigned integers
+MAX_SEED = 2 ** 64 - 1
+
+# Names of the random functions, as they appear in translated source
+RANDOM_FUNCTIONS = ('rand', 'randint', 'normal')
+
+_RANDOM_CALL = re.compile(r'(?<![\w.])(?:rand|randint|normal)\s*\(')
+
+
+def calls_random(source):
+    """
+    Check whether translated source calls a random function directly
+    (including inside the body of a series)
+
+    Args:
+        source: Translated expression source
+
+    Returns:
+        True if evaluating it draws random numbers
+    """
+    return _RANDOM_CALL.search(source) is not None
+
+
+def _count(n, name):
+    n = as_integer(n, f"{name} count")
+    if not 1 <= n <= MAX_DRAWS:
+        raise ValueError(f"{name} count must be between 1 and {MAX_DRAWS:,}")
+    return n
+
+
+def _vector(values):
+    """Drawn floats (a list, or a NumPy array from a bulk draw) as a vector result"""
+    from .linalg import Matrix, _numpy, _wrap
+    numpy = _numpy()
+    if numpy is None:
+        return Matrix(values, (len(values),))
+    return _wrap(numpy.asarray(values, dtype=numpy.float64))
+
+
+class RandomStream:
+    """A seeded random number stream for one session"""
+
+    def __init__(self, seed=None):
+        """
+        Initialize stream
+
+        Args:
+            seed: Integer seed in [0, 2^64), or None for a fresh random seed
+        """
+        self._random = None
+        self.seed = None
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """
+        Restart the stream from a seed
+
+        Args:
+            seed: Integer seed in [0, 2^64), or None for a fresh random seed
+
+        Returns:
+            The seed in use
+
+        Raises:
+            ValueError: If seed is not an integer in range
+        """
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), 'big')
+        seed = as_integer(seed, "Seed")
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError("Seed must be between 0 and 2^64 - 1")
+        self.seed = seed
+        # random.Random is created on first draw, so sessions that never
+        # draw do not import the random module
+        self._random = None
+        return seed
+
+    def _generator(self):
+        if self._random is None:
+            import random
+            self._random = random.Random(self.seed)
+        return self._random
+
+    def _bulk(self):
+        """A NumPy generator for one bulk draw, or None without NumPy"""
+        from .linalg import _numpy
+        numpy = _numpy()
+        if numpy is None:
+            return None
+        return numpy.random.Generator(numpy.random.PCG64(self._generator().getrandbits(64)))
+
+    def rand(self, n=None):
+        """
+        Uniform random numbers in [0, 1)
+
+        Args:
+            n: Count for a bulk draw (default: one number)
+
+        Returns:
+            A float, or a vector of n floats
+        """
+        if n is None:
+            return self._generator().random()
+        n = _count(n, "rand")
+        bulk = self._bulk()
+        if bulk is not None:
+            return _vector(bulk.random(n))
+        generator = self._generator()
+        return _vector([generator.random() for _ in range(n)])
+
+    def randint(self, low, high, n=None):
+        """
+        Uniform random integers in [low, high]
+
+        Args:
+            low: Smallest value
+            high: Largest value
+            n: Count for a bulk draw (default: one number)
+
+        Returns:
+            An int, or a vector of n integers (as floats)
+
+        Raises:
+            ValueError: If the bounds are not integers or low > high
+        """
+        low = as_integer(low, "randint bounds")
+        high = as_integer(high, "randint bounds")
+        if low > high:
+            raise ValueError("randint requires low <= high")
+        if n is None:
+            return self._generator().randint(low, high)
+        n = _count(n, "randint")
+        if max(abs(low), abs(high)) < 2 ** 62:
+            bulk = self._bulk()
+            if bulk is not None:
+                return _vector(bulk.integers(low, high, size=n, endpoint=True))
+        generator = self._generator()
+        return _vector([float(generator.randint(low, high)) for _ in range(n)])
+
+    def normal(self, mu=0.0, sigma=1.0, n=None):
+        """
+        Normally distributed random numbers
+
+        Args:
+            mu: Mean (default: 0)
+            sigma: Standard deviation (default: 1)
+            n: Count for a bulk draw (default: one number)
+
+        Returns:
+            A float, or a vector of n floats
+
+        Raises:
+            ValueError: If sigma is negative
+        """
+        mu = float(mu)
+        sigma = float(sigma)
+        if sigma < 0:
+            raise ValueError("normal requires sigma >= 0")
+        if n is None:
+            return self._generator().gauss(mu, sigma)
+        n = _count(n, "normal")
+        bulk = self._bulk()
+        if bulk is not None:
+            return _vector(bulk.normal(mu, sigma, n))
+        generator = self._generator()
+        return _vector([generator.gauss(mu, sigma) for _ in range(n)])
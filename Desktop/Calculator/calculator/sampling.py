@@ -0,0 +1,278 @@
+"""
+Adaptive function sampling module for plotting
+Samples an expression in one variable over an interval, refining where
+the curve bends or jumps and spending few points where it is flat
+"""
+
+import bisect
+import heapq
+import math
+
+# Bounds on the number of evaluations a single plot may use
+DEFAULT_MAX_POINTS = 1000
+MAX_POINTS_LIMIT = 100_000
+
+# Points in the initial uniform pass
+INITIAL_POINTS = 33
+
+# Fractions of the interval: jumps are confirmed on intervals this narrow,
+# and domain edges and jumps are located to (and merged within) RESOLUTION
+JUMP_WIDTH = 1e-9
+RESOLUTION = 1e-6
+
+# Values more than this many vertical scales outside the bulk of the curve
+# are off the plot: they are clamped when scoring intervals, and a narrow
+# interval reaching them is searched for a jump by bisection instead of
+# being refined further
+OFF_PLOT_SCALES = 4
+
+
+def _evaluate(compiled, variable, x):
+    """Evaluate at one point, returning NaN where the expression fails"""
+    try:
+        y = float(compiled.evaluate({variable: x}))
+    except (ValueError, SyntaxError, TypeError, OverflowError):
+        return math.nan
+    return y if math.isfinite(y) else math.nan
+
+
+def _robust_range(ys):
+    """
+    Vertical scale of the curve, ignoring extreme values near poles, and
+    the (low, high) band outside which values are off the plot
+    """
+    finite = sorted(y for y in ys if not math.isnan(y))
+    if len(finite) < 2:
+        middle = finite[0] if finite else 0.0
+        return 1.0, middle - OFF_PLOT_SCALES, middle + OFF_PLOT_SCALES
+    low = finite[len(finite) // 20]
+    high = finite[-1 - len(finite) // 20]
+    scale = (high - low) or max(abs(high), 1.0)
+    return scale, low - OFF_PLOT_SCALES * scale, high + OFF_PLOT_SCALES * scale
+
+
+def _clamp(y, low, high):
+    """y limited to [low, high] (NaN stays NaN)"""
+    if math.isnan(y):
+        return y
+    return low if y < low else high if y > high else y
+
+
+def _score(y0, ym, y1, scale, low, high):
+    """
+    How badly the straight line between the ends misses the midpoint,
+    with values clamped to the plot band [low, high]
+    """
+    finite = [not math.isnan(y) for y in (y0, ym, y1)]
+    if not all(finite):
+        # Edge of the domain: refine only where defined and undefined meet
+        return 0.0 if not any(finite) else math.inf
+    y0, ym, y1 = _clamp(y0, low, high), _clamp(ym, low, high), _clamp(y1, low, high)
+    return abs(ym - (y0 + y1) / 2) / scale
+
+
+class SampledCurve:
+    """Sample points of a curve, with NaN y values where it is undefined"""
+
+    def __init__(self, xs, ys, evaluations, discontinuities):
+        """
+        Initialize curve
+
+        Args:
+            xs: Sorted x values
+            ys: y values (NaN for errors and at discontinuity breaks)
+            evaluations: Number of expression evaluations used
+            discontinuities: x positions where the curve jumps
+        """
+        self.xs = xs
+        self.ys = ys
+        self.evaluations = evaluations
+        self.discontinuities = discontinuities
+
+    def __len__(self):
+        return len(self.xs)
+
+    def points(self):
+        """Return [x, y] pairs with None for undefined y"""
+        return [[x, None if math.isnan(y) else y] for x, y in zip(self.xs, self.ys)]
+
+
+def sample_function(compiled, variable, start, stop, max_points=DEFAULT_MAX_POINTS, tolerance=1e-3):
+    """
+    Adaptively sample a compiled expression over [start, stop]
+
+    Starts from a uniform pass, then repeatedly splits the interval whose
+    midpoint deviates most from linear interpolation (relative to the
+    curve's vertical scale) until the deviation is below tolerance or
+    the point budget is spent. Values far outside the bulk of the curve
+    are clamped when scoring, so the steep sides of a pole cost few
+    points; an interval narrower than the average point spacing that
+    reaches off the plot is bisected once to find its jump, if any.
+    Intervals that keep jumping down to the minimum width, and single
+    undefined points between defined ones, are reported as
+    discontinuities (one per jump, e.g. [90.0, 270.0] for tan over
+    0..360) and break the curve. Edges of the domain are located to
+    RESOLUTION, and a jump's neighbourhood is not refined further once
+    it is found.
+
+    Args:
+        compiled: CompiledExpression in the given variable
+        variable: Variable name
+        start: Interval start
+        stop: Interval end
+        max_points: Maximum number of evaluations
+        tolerance: Acceptable deviation as a fraction of the vertical scale
+
+    Returns:
+        SampledCurve
+
+    Raises:
+        ValueError: If the interval or budget is invalid
+    """
+    start, stop = float(start), float(stop)
+    if not (math.isfinite(start) and math.isfinite(stop)) or start >= stop:
+        raise ValueError("Interval start must be less than stop")
+    if not 3 <= max_points <= MAX_POINTS_LIMIT:
+        raise ValueError(f"max_points must be between 3 and {MAX_POINTS_LIMIT}")
+    if tolerance <= 0:
+        raise ValueError("tolerance must be positive")
+
+    # Uniform pass, evaluated in bulk; every other point is a midpoint
+    count = min(INITIAL_POINTS, max_points)
+    if count % 2 == 0:
+        count -= 1
+    width = (stop - start) / (count - 1)
+    xs = [start + i * width for i in range(count)]
+    ys = [math.nan if y is None else y
+          for y in compiled.evaluate_array({variable: xs}).tolist()]
+    points = dict(zip(xs, ys))
+    evaluations = count
+
+    scale, low, high = _robust_range(ys)
+    min_width = (stop - start) * JUMP_WIDTH
+    resolution = (stop - start) * RESOLUTION
+    # Narrower intervals reaching off the plot are searched, not refined
+    fine_width = (stop - start) / max_points
+    # Sorted x positions of jumps found, and the size of each jump
+    jumps = []
+    sizes = {}
+
+    # Max-heap of intervals (x0, xm, x1) keyed by midpoint deviation
+    heap = []
+    for i in range(0, count - 2, 2):
+        x0, xm, x1 = xs[i], xs[i + 1], xs[i + 2]
+        heapq.heappush(heap, (-_score(ys[i], ys[i + 1], ys[i + 2], scale, low, high), x0, xm, x1))
+
+    while heap and evaluations + 2 <= max_points:
+        neg_score, x0, xm, x1 = heapq.heappop(heap)
+        if -neg_score <= tolerance:
+            break
+
+        y0, y1 = points[x0], points[x1]
+        width = x1 - x0
+        if math.isnan(y0) or math.isnan(y1):
+            if width <= resolution:
+                # Domain edge bracketed
+                continue
+        elif width <= fine_width and not (low <= y0 <= high and low <= y1 <= high):
+            jump, size, used = _find_jump(compiled, variable, (x0, xm, x1), points, (low, high),
+                                          scale, min_width, max_points - evaluations)
+            evaluations += used
+            if jump is not None:
+                bisect.insort(jumps, jump)
+                sizes[jump] = size
+            continue
+        elif width <= min_width:
+            bisect.insort(jumps, xm)
+            sizes[xm] = abs(y1 - y0)
+            continue
+        elif width <= resolution and _near(jumps, xm, resolution):
+            # Steep flank of a jump already found
+            continue
+
+        # Split into two halves, each needing a new midpoint
+        for a, b in ((x0, xm), (xm, x1)):
+            mid = (a + b) / 2
+            points[mid] = _evaluate(compiled, variable, mid)
+            evaluations += 1
+            heapq.heappush(heap, (-_score(points[a], points[mid], points[b], scale, low, high),
+                                  a, mid, b))
+
+    ordered = sorted(points)
+    # A single undefined point between bracketing defined ones (1/x at 0)
+    for before, x, after in zip(ordered, ordered[1:], ordered[2:]):
+        if (math.isnan(points[x]) and after - before <= 2 * resolution
+                and not math.isnan(points[before]) and not math.isnan(points[after])):
+            bisect.insort(jumps, x)
+            sizes[x] = math.inf
+    discontinuities = _merge_jumps(jumps, sizes, resolution)
+
+    # Break the curve at discontinuities so plots do not join across them
+    for x in discontinuities:
+        points[x] = math.nan
+
+    ordered = sorted(points)
+    return SampledCurve(ordered, [points[x] for x in ordered], evaluations, discontinuities)
+
+
+def _find_jump(compiled, variable, interval, points, band, scale, min_width, budget):
+    """
+    Bisect an interval reaching off the plot down to min_width, keeping
+    the half whose clamped values differ most, to find a jump in it
+
+    Args:
+        compiled: CompiledExpression being sampled
+        variable: Variable name
+        interval: (x0, xm, x1) with all three already in points
+        points: Dict of x -> y, updated with the new evaluations
+        band: (low, high) plot band values are clamped to
+        scale: Vertical scale of the curve
+        min_width: Width at which the search stops
+        budget: Most evaluations to use
+
+    Returns:
+        Tuple (x, size, evaluations): the jump's position and size, or
+        (None, 0.0, evaluations) if the interval is only steep
+    """
+    low, high = band
+    a, m, b = interval
+    used = 0
+    while True:
+        if math.isnan(points[m]):
+            # Undefined right at the pole
+            return m, math.inf, used
+        ya, ym, yb = (_clamp(points[x], low, high) for x in (a, m, b))
+        if abs(ym - ya) >= abs(yb - ym):
+            b = m
+        else:
+            a = m
+        if b - a <= min_width or used >= budget:
+            break
+        m = (a + b) / 2
+        points[m] = _evaluate(compiled, variable, m)
+        used += 1
+
+    ya, yb = points[a], points[b]
+    if b - a <= min_width and abs(_clamp(yb, low, high) - _clamp(ya, low, high)) >= scale:
+        return (a + b) / 2, abs(yb - ya), used
+    return None, 0.0, used
+
+
+def _near(xs, x, distance):
+    """Check whether sorted xs has a value within distance of x"""
+    index = bisect.bisect_left(xs, x - distance)
+    return index < len(xs) and xs[index] <= x + distance
+
+
+def _merge_jumps(jumps, sizes, distance):
+    """One position per cluster of nearby jumps: the largest jump in it"""
+    merged = []
+    cluster = []
+    for x in jumps:
+        if cluster and x - cluster[-1] > distance:
+            merged.append(max(cluster, key=sizes.get))
+            cluster = []
+        cluster.append(x)
+    if cluster:
+        merged.append(max(cluster, key=sizes.get))
+    return merged
@@ -0,0 +1,416 @@
+"""
+Series module for summation and product operators
+Handles: sum(expr, i, a, b) and prod(expr, i, a, b) over integer ranges,
+using closed forms where the body allows (polynomials by Faulhaber's
+formula, geometric terms, constants) and otherwise evaluating the
+compiled body over the range in vectorised chunks, with a limit on the
+number of terms one call may evaluate
+
+The parser rewrites the four-argument forms into series_sum/series_prod
+calls that carry the body as translated source, so the body is compiled
+once and never evaluated with the index unbound.
+"""
+
+import math
+import operator
+from fractions import Fraction
+from functools import lru_cache, reduce
+
+from .arithmetic import Arithmetic
+from .arithmetic import as_integer
+
+# Largest absolute value accepted for a series bound
+MAX_SERIES_BOUND = 10 ** 18
+
+# Terms evaluated one by one when there is no closed form: with NumPy
+# (in chunks of SERIES_CHUNK_SIZE), and when the body has no array form
+MAX_SERIES_TERMS = 10_000_000
+MAX_SCALAR_TERMS = 100_000
+SERIES_CHUNK_SIZE = 1 << 16
+
+# Highest polynomial degree summed in closed form
+MAX_CLOSED_FORM_DEGREE = 20
+
+# Ranges this short are evaluated term by term (avoids importing NumPy)
+_SHORT_RANGE = 64
+
+# Integer partial sums below this are exact in float64 chunks
+_EXACT_FLOAT = 2 ** 53
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@lru_cache(maxsize=256)
+def _parse(source):
+    import ast
+    return ast.parse(source, mode='eval').body
+
+
+@lru_cache(maxsize=256)
+def _compile_node(text):
+    from .parser import compile_source
+    return compile_source(text, '<series>')
+
+
+@lru_cache(maxsize=None)
+def _bernoulli(index):
+    """Bernoulli number B_index, with B_1 = +1/2"""
+    if index == 0:
+        return Fraction(1)
+    return (index + 1 - sum(math.comb(index + 1, j) * _bernoulli(j)
+                            for j in range(index))) / (index + 1)
+
+
+def _power_sum(k, n):
+    """1^k + 2^k + ... + n^k by Faulhaber's formula (a polynomial, so valid for n < 0)"""
+    total = sum(math.comb(k + 1, j) * _bernoulli(j) * n ** (k + 1 - j) for j in range(k + 1))
+    return int(total / (k + 1))
+
+
+class _Terms:
+    """
+    A series body in closed-form-friendly shape: a polynomial in the index
+    plus geometric terms C * R ** i (kept as {R: C})
+    """
+
+    __slots__ = ('poly', 'geometric')
+
+    def __init__(self, poly, geometric=None):
+        self.poly = poly
+        self.geometric = geometric or {}
+
+    @property
+    def constant(self):
+        """The value if the body does not depend on the index, else None"""
+        if not self.geometric and len(self.poly) == 1:
+            return self.poly[0]
+        return None
+
+    @property
+    def degree(self):
+        return len(self.poly) - 1
+
+    @property
+    def is_geometric(self):
+        return bool(self.geometric) and not any(self.poly)
+
+
+def _add(x, y, sign=1):
+    length = max(len(x.poly), len(y.poly))
+    padded = [x.poly + [0] * (length - len(x.poly)), y.poly + [0] * (length - len(y.poly))]
+    geometric = dict(x.geometric)
+    for ratio, coefficient in y.geometric.items():
+        geometric[ratio] = geometric.get(ratio, 0) + sign * coefficient
+    return _Terms([a + sign * b for a, b in zip(*padded)], geometric)
+
+
+def _scale(x, factor):
+    return _Terms([c * factor for c in x.poly],
+                  {ratio: c * factor for ratio, c in x.geometric.items()})
+
+
+def _multiply(x, y):
+    if x.constant is not None:
+        return _scale(y, x.constant)
+    if y.constant is not None:
+        return _scale(x, y.constant)
+    if not x.geometric and not y.geometric:
+        if x.degree + y.degree > MAX_CLOSED_FORM_DEGREE:
+            return None
+        poly = [0] * (len(x.poly) + len(y.poly) - 1)
+        for i, a in enumerate(x.poly):
+            for j, b in enumerate(y.poly):
+                poly[i + j] += a * b
+        return _Terms(poly)
+    if x.is_geometric and y.is_geometric:
+        # C1 R1^i * C2 R2^i = C1 C2 (R1 R2)^i
+        geometric = {}
+        for r1, c1 in x.geometric.items():
+            for r2, c2 in y.geometric.items():
+                geometric[r1 * r2] = geometric.get(r1 * r2, 0) + c1 * c2
+        return _Terms([0], geometric)
+    return None
+
+
+def _power(base, exponent):
+    if base.constant is not None and exponent.constant is not None:
+        return _Terms([Arithmetic.power(base.constant, exponent.constant)])
+    if exponent.constant is not None:
+        k = exponent.constant
+        if not isinstance(k, int) or isinstance(k, bool) or not 0 <= k <= MAX_CLOSED_FORM_DEGREE:
+            return None
+        result = _Terms([1])
+        for _ in range(k):
+            result = _multiply(result, base)
+            if result is None:
+                return None
+        return result
+    if base.constant is not None and not exponent.geometric and exponent.degree == 1:
+        # b ** (p * i + q) = b ** q * (b ** p) ** i
+        b = base.constant
+        q, p = exponent.poly
+        coefficient, ratio = _exact_power(b, q), _exact_power(b, p)
+        if not _is_number(coefficient) or not _is_number(ratio) or ratio == 0:
+            return None
+        return _Terms([0], {ratio: coefficient})
+    return None
+
+
+def _analyse(node, variable, namespace, scope):
+    """Body as _Terms, or None if it has no closed form here"""
+    import ast
+    if isinstance(node, ast.Constant):
+        return _Terms([node.value]) if _is_number(node.value) else None
+    if isinstance(node, ast.Name):
+        if node.id == variable:
+            return _Terms([0, 1])
+        value = scope[node.id] if node.id in scope else namespace.get(node.id)
+        return _Terms([value]) if _is_number(value) else None
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _analyse(node.operand, variable, namespace, scope)
+        if operand is None or isinstance(node.op, ast.UAdd):
+            return operand
+        return _scale(operand, -1)
+    if isinstance(node, ast.BinOp):
+        left = _analyse(node.left, variable, namespace, scope)
+        right = _analyse(node.right, variable, namespace, scope)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, ast.Add):
+            return _add(left, right)
+        if isinstance(node.op, ast.Sub):
+            return _add(left, right, -1)
+        if isinstance(node.op, ast.Mult):
+            return _multiply(left, right)
+        if isinstance(node.op, ast.Div):
+            if right.constant is None or right.constant == 0:
+                return None
+            return _scale(left, 1 / right.constant)
+        if isinstance(node.op, ast.Pow):
+            return _power(left, right)
+        return None
+    if not any(isinstance(child, ast.Name) and child.id == variable for child in ast.walk(node)):
+        # Anything else that does not mention the index is one constant
+        value = eval(_compile_node(ast.unparse(node)), namespace, scope)
+        return _Terms([value]) if _is_number(value) else None
+    return None
+
+
+def _exact_power(base, exponent):
+    """
+    base ** exponent, exact for integers
+
+    Raises:
+        ValueError: If an integer result would be too large (see
+            Arithmetic.power) or a float result overflows
+    """
+    try:
+        return Arithmetic.power(base, exponent)
+    except OverflowError:
+        raise ValueError("Result overflowed")
+
+
+def _geometric_sum(ratio, a, n):
+    """ratio^a + ratio^(a+1) + ... (n terms)"""
+    if ratio == 1:
+        return n
+    first = _exact_power(ratio, a)
+    if isinstance(ratio, int) and a >= 0:
+        power = _exact_power(ratio, n)
+        if isinstance(power, int):
+            return first * (power - 1) // (ratio - 1)
+    if isinstance(ratio, float) and ratio > 0:
+        # expm1/log1p keep ratios close to 1 accurate
+        return first * math.expm1(n * math.log1p(ratio - 1)) / (ratio - 1)
+    return first * (_exact_power(ratio, n) - 1) / (ratio - 1)
+
+
+def _closed_sum(terms, a, b):
+    n = b - a + 1
+    total = 0
+    for k, coefficient in enumerate(terms.poly):
+        if coefficient:
+            total += coefficient * (_power_sum(k, b) - _power_sum(k, a - 1))
+    for ratio, coefficient in terms.geometric.items():
+        if coefficient:
+            total += coefficient * _geometric_sum(ratio, a, n)
+    return total
+
+
+def _closed_product(terms, a, b):
+    n = b - a + 1
+    if terms.constant is not None:
+        return _exact_power(terms.constant, n)
+    if not terms.is_geometric or len(terms.geometric) != 1:
+        return None
+    # prod C R^i = C^n * R^(a + ... + b)
+    (ratio, coefficient), = terms.geometric.items()
+    return _exact_power(coefficient, n) * _exact_power(ratio, n * (a + b) // 2)
+
+
+def _closed_form(kind, compiled, a, b, namespace, scope):
+    """
+    Closed-form value of the series, or None if the body has none
+
+    Raises:
+        ValueError: If the value is too large for an exact integer or
+            overflows a float
+    """
+    try:
+        terms = _analyse(_parse(compiled.source), compiled.variables[0], namespace, scope)
+    except Exception:
+        # Term-by-term evaluation raises whatever error applies
+        return None
+    if terms is None:
+        return None
+    try:
+        if kind == 'sum':
+            return _checked(_closed_sum(terms, a, b))
+        return _checked(_closed_product(terms, a, b))
+    except OverflowError:
+        raise ValueError("Result overflowed")
+
+
+def _checked(value):
+    """The value, unless it is a float that overflowed"""
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError("Result overflowed")
+    return value
+
+
+def _accumulate(kind, values):
+    values = list(values)
+    if kind == 'prod':
+        return reduce(operator.mul, values, 1)
+    if all(_is_number(v) for v in values) and not all(isinstance(v, int) for v in values):
+        return math.fsum(values)
+    return sum(values)
+
+
+def _evaluate_terms(kind, compiled, a, b, namespace, scope):
+    """Evaluate the body once per index value"""
+    parser = compiled.parser
+    variable = compiled.variables[0]
+    code = compiled.code
+
+    def term(i):
+        local = dict(scope)
+        local[variable] = i
+        if namespace is None:
+            return parser._run(code, local)
+        return eval(code, namespace, local)
+
+    return _accumulate(kind, (term(i) for i in range(a, b + 1)))
+
+
+def _evaluate_chunks(kind, compiled, a, b, scope):
+    """
+    Evaluate the body over the range in NumPy chunks
+
+    Integer bodies stay exact: their sums are taken from the float64
+    chunks only while every partial sum is below 2^53, and their
+    products are left to term-by-term evaluation.
+
+    Returns:
+        The result, or None if the body cannot be evaluated on arrays
+        (or not exactly)
+
+    Raises:
+        ValueError: If a float result overflows
+    """
+    from .vectorized import HAS_NUMPY, np, vector_namespace
+    if not HAS_NUMPY or not all(_is_number(value) for value in scope.values()):
+        return None
+    exact = type(_evaluate_terms(kind, compiled, a, a, None, scope)) is int
+    if exact and kind == 'prod':
+        return None
+
+    parser = compiled.parser
+    namespace = vector_namespace(parser)
+    variable = compiled.variables[0]
+    partials = []
+    for start in range(a, b + 1, SERIES_CHUNK_SIZE):
+        stop = min(start + SERIES_CHUNK_SIZE, b + 1)
+        local = dict(scope)
+        local[variable] = np.arange(start, stop, dtype=np.float64)
+        try:
+            with np.errstate(all='ignore'):
+                values = eval(compiled.code, namespace, local)
+            values = np.broadcast_to(np.asarray(values, dtype=np.float64), (stop - start,))
+        except Exception:
+            return None
+        bad = np.flatnonzero(~np.isfinite(values))
+        if bad.size:
+            # Array functions flag domain errors as NaN; the scalar term
+            # raises the calculator's error for the first one
+            _evaluate_terms(kind, compiled, start + int(bad[0]), start + int(bad[0]), None, scope)
+        if exact:
+            if (np.abs(values).max() * values.size >= _EXACT_FLOAT
+                    or not np.array_equal(values, np.round(values))):
+                return None
+            partials.append(int(np.sum(values)))
+            continue
+        with np.errstate(all='ignore'):
+            partials.append(float(np.prod(values) if kind == 'prod' else np.sum(values)))
+    if exact:
+        return sum(partials)
+    return _checked(math.prod(partials) if kind == 'prod' else math.fsum(partials))
+
+
+def evaluate_series(parser, kind, source, variable, low, high, scope, namespace=None):
+    """
+    Evaluate sum(expr, i, a, b) or prod(expr, i, a, b)
+
+    Args:
+        parser: ExpressionParser that compiled the expression
+        kind: 'sum' or 'prod'
+        source: Translated source of the body
+        variable: Index name
+        low: First index value (inclusive)
+        high: Last index value (inclusive)
+        scope: Values of the other names the body reads
+        namespace: Namespace to evaluate the body in (default: the
+            parser's; autodiff passes its dual-number namespace)
+
+    Returns:
+        Sum or product (0 or 1 for an empty range)
+
+    Raises:
+        ValueError: If a bound is not an integer or too large, the range
+            has more terms than can be evaluated without a closed form, or
+            the result overflows (integer results are exact, up to the
+            size limit of Arithmetic.power)
+    """
+    a = as_integer(low, "Series bounds")
+    b = as_integer(high, "Series bounds")
+    if max(abs(a), abs(b)) > MAX_SERIES_BOUND:
+        raise ValueError(f"Series bounds are limited to {MAX_SERIES_BOUND:.0e}")
+    if b < a:
+        return 0 if kind == 'sum' else 1
+
+    compiled = parser._series_body(source, variable)
+    # Bodies that draw random numbers need a fresh draw for every term
+    random = parser.uses_random(compiled)
+    if not random:
+        result = _closed_form(kind, compiled, a, b,
+                              parser.namespace if namespace is None else namespace, scope)
+        if result is not None:
+            return result
+
+    terms = b - a + 1
+    if terms <= _SHORT_RANGE:
+        return _checked(_evaluate_terms(kind, compiled, a, b, namespace, scope))
+    if terms > MAX_SERIES_TERMS:
+        raise ValueError(f"{kind}() without a closed form is limited to {MAX_SERIES_TERMS:,} terms")
+    if namespace is None and not random:
+        result = _evaluate_chunks(kind, compiled, a, b, scope)
+        if result is not None:
+            return result
+    if terms > MAX_SCALAR_TERMS:
+        raise ValueError(
+            f"{kind}() over this body is limited to {MAX_SCALAR_TERMS:,} terms "
+            f"(it has no closed form or exact array evaluation)"
+        )
+    return _checked(_evaluate_terms(kind, compiled, a, b, namespace, scope))
@@ -0,0 +1,198 @@
+"""
+Asyncio line-protocol server for high-throughput local evaluation
+
+A lighter alternative to the Flask API for services on the same host:
+no HTTP or JSON, many concurrent connections on one event loop, and
+pipelined requests that are answered as soon as each one completes.
+
+Line protocol (UTF-8, newline terminated):
+    client -> server:  <id> <expression>
+    server -> client:  <id> OK <formatted result>
+                       <id> ERR <error message>
+The id is any token without spaces; replies may arrive out of order.
+Requests are independent, so 'ans' is always 0.
+
+Usage:
+    python -m calculator.server [port] [host]
+"""
+
+import asyncio
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import CalculatorConfig
+from .daemon import evaluate_line
+from .parser import ExpressionParser
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7878
+
+# Translated expressions longer than this are also treated as heavy
+HEAVY_LENGTH = 200
+
+# Maximum number of requests in flight per connection
+MAX_PENDING = 256
+
+# Warm parser of each executor worker process
+_worker_parser = None
+_worker_config = None
+
+
+def _init_worker():
+    """Create the warm parser of an executor worker process"""
+    global _worker_parser, _worker_config
+    _worker_parser = ExpressionParser()
+    _worker_config = CalculatorConfig()
+
+
+def _evaluate_in_worker(expression):
+    """Evaluate one expression in an executor worker process"""
+    ok, text, _ = evaluate_line(_worker_parser, _worker_config, expression)
+    return ok, text
+
+
+class CalculatorServer:
+    """Pipelined line-protocol calculator server on one asyncio event loop"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+        """
+        Initialize server
+
+        Args:
+            host: Interface to listen on (default: 127.0.0.1)
+            port: TCP port to listen on (default: 7878, 0 for any free port)
+            workers: Number of processes for heavy evaluations (default: CPU count)
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.parser = ExpressionParser()
+        self.config = CalculatorConfig()
+        self.executor = None
+        self.server = None
+
+    def is_heavy(self, expression):
+        """
+        Decide whether an expression should be evaluated off the event loop
+        (see ExpressionParser.is_heavy; long expressions count as heavy too)
+
+        Args:
+            expression: Expression string
+
+        Returns:
+            True if the expression may take long to evaluate
+        """
+        try:
+            compiled = self.parser.compile(expression)
+        except (ValueError, SyntaxError):
+            return False
+        return len(compiled.source) > HEAVY_LENGTH or self.parser.is_heavy(compiled)
+
+    async def evaluate(self, expression):
+        """
+        Evaluate an expression, offloading heavy ones to the executor
+
+        Args:
+            expression: Expression string
+
+        Returns:
+            Tuple (ok, text)
+        """
+        expression = expression.replace('^', '**')
+        if self.is_heavy(expression):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _evaluate_in_worker, expression)
+
+        ok, text, _ = evaluate_line(self.parser, self.config, expression)
+        return ok, text
+
+    async def handle_connection(self, reader, writer):
+        """Serve pipelined requests from one client connection"""
+        pending = asyncio.Semaphore(MAX_PENDING)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(request_id, expression):
+            try:
+                ok, text = await self.evaluate(expression)
+            except Exception as e:
+                ok, text = False, str(e)
+            text = ' '.join(text.split())
+            reply = f"{request_id} {'OK' if ok else 'ERR'} {text}\n"
+            try:
+                async with write_lock:
+                    writer.write(reply.encode('utf-8'))
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                pending.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request_id, _, expression = line.decode('utf-8', errors='replace').strip().partition(' ')
+                if not request_id:
+                    continue
+
+                await pending.acquire()
+                task = asyncio.create_task(respond(request_id, expression))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self):
+        """Start listening; returns once the socket is bound"""
+        # Spawned (not forked) workers do not inherit client sockets, which
+        # would otherwise keep closed connections open
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop listening and shut down the executor"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        """Start the server and run until cancelled"""
+        await self.start()
+        print(f"Calculator server listening on {self.host}:{self.port}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+
+def main():
+    """Run the server from the command line"""
+    args = sys.argv[1:]
+    port = int(args[0]) if args else DEFAULT_PORT
+    host = args[1] if len(args) > 1 else DEFAULT_HOST
+
+    try:
+        asyncio.run(CalculatorServer(host, port).serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Statistics module for aggregate functions
+Handles: single-pass running statistics (Welford variance, compensated
+sum and mean), the list-taking expression functions sum, prod, mean,
+var, stdev, min, max and median, and incremental parsing of number streams
+"""
+
+import math
+import re
+
+from .linalg import flatten, is_matrix
+
+# Bytes read from a stream at a time
+STREAM_CHUNK_SIZE = 65536
+
+# Longest token a stream may hold, so input without separators cannot
+# grow the carried-over token without bound
+MAX_TOKEN_SIZE = 65536
+
+_SEPARATORS = re.compile(rb'[\s,]+')
+
+
+class RunningStats:
+    """Count, sum, mean, variance, min and max of a series in O(1) memory"""
+
+    def __init__(self):
+        """Initialize empty accumulators"""
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._sum = 0.0
+        self._compensation = 0.0
+
+    def add(self, value):
+        """
+        Add one value
+
+        Args:
+            value: Finite number
+
+        Raises:
+            ValueError: If value is not a finite number
+        """
+        x = float(value)
+        if not math.isfinite(x):
+            raise ValueError("Statistics inputs must be finite numbers")
+
+        # Welford's update for mean and sum of squared deviations
+        self.count += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+
+        # Neumaier's variant of Kahan summation
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._compensation += (self._sum - total) + x
+        else:
+            self._compensation += (x - total) + self._sum
+        self._sum = total
+
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+    def extend(self, values):
+        """Add every value of an iterable"""
+        for value in values:
+            self.add(value)
+        return self
+
+    @property
+    def total(self):
+        """
+        Compensated sum of all values
+
+        Raises:
+            ValueError: If the sum overflows
+        """
+        return _finite(self._sum + self._compensation)
+
+    @property
+    def mean(self):
+        """
+        Mean of all values, from the compensated sum (more accurate than
+        Welford's running mean, which is used when the sum overflows but
+        the mean does not)
+
+        Raises:
+            ValueError: If no values were added, or the mean overflows
+        """
+        if not self.count:
+            raise ValueError("Mean requires at least one value")
+        total = self._sum + self._compensation
+        if math.isfinite(total):
+            return total / self.count
+        return _finite(self._mean)
+
+    def variance(self):
+        """
+        Sample variance (n - 1 denominator)
+
+        Raises:
+            ValueError: If fewer than two values were added, or the
+                variance overflows
+        """
+        if self.count < 2:
+            raise ValueError("Variance requires at least two values")
+        return _finite(self._m2 / (self.count - 1))
+
+    def stdev(self):
+        """Sample standard deviation"""
+        return math.sqrt(self.variance())
+
+    def to_dict(self):
+        """Summary for JSON responses (None where undefined)"""
+        enough = self.count >= 2
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.mean if self.count else None,
+            'variance': self.variance() if enough else None,
+            'stdev': self.stdev() if enough else None,
+            'min': self.min,
+            'max': self.max
+        }
+
+
+def _finite(value):
+    """
+    Check a result of the running sums
+
+    Raises:
+        ValueError: If it overflowed (to inf, or NaN from inf - inf)
+    """
+    if not math.isfinite(value):
+        raise ValueError("Result overflowed")
+    return value
+
+
+def _values(args, name):
+    """
+    Arguments as a list, accepting f(1, 2, 3), f([1, 2, 3]) or matrices
+    (whose elements count as arguments, so max([1, 2], 3) is 3)
+    """
+    if any(is_matrix(arg) for arg in args):
+        args = [x for arg in args for x in (flatten(arg) if is_matrix(arg) else (arg,))]
+    elif len(args) == 1 and isinstance(args[0], (list, tuple)):
+        args = args[0]
+    if not args:
+        raise ValueError(f"{name} requires at least one value")
+    return args
+
+
+def _accumulate(args, name):
+    return RunningStats().extend(_values(args, name))
+
+
+def total(*args):
+    """Sum of the arguments (exact for integers, compensated otherwise)"""
+    values = _values(args, "sum")
+    if all(isinstance(v, int) for v in values):
+        return sum(values)
+    return _accumulate(values, "sum").total
+
+
+def product(*args):
+    """Product of the arguments (exact for integers)"""
+    return math.prod(_values(args, "prod"))
+
+
+def mean(*args):
+    """Arithmetic mean of the arguments"""
+    return _accumulate(args, "mean").mean
+
+
+def variance(*args):
+    """Sample variance of the arguments"""
+    return _accumulate(args, "var").variance()
+
+
+def stdev(*args):
+    """Sample standard deviation of the arguments"""
+    return _accumulate(args, "stdev").stdev()
+
+
+def minimum(*args):
+    """Smallest argument"""
+    return min(_values(args, "min"))
+
+
+def maximum(*args):
+    """Largest argument"""
+    return max(_values(args, "max"))
+
+
+def median(*args):
+    """Median of the arguments (mean of the middle two for an even count)"""
+    ordered = sorted(_values(args, "median"))
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def iter_numbers(stream, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Parse numbers separated by whitespace or commas from a binary stream
+
+    Reads fixed-size chunks and limits tokens to MAX_TOKEN_SIZE bytes,
+    so memory use does not grow with the input.
+
+    Args:
+        stream: File-like object with read(size) returning bytes
+        chunk_size: Bytes per read
+
+    Yields:
+        Numbers as floats
+
+    Raises:
+        ValueError: If a token is not a number or is too long
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        tokens = _SEPARATORS.split(pending + chunk)
+        # The last token may continue in the next chunk
+        pending = tokens.pop()
+        if len(pending) > MAX_TOKEN_SIZE:
+            preview = pending[:20].decode('utf-8', 'replace')
+            raise ValueError(f"Invalid number: '{preview}...' is longer than {MAX_TOKEN_SIZE:,} bytes")
+        for token in tokens:
+            if token:
+                yield _parse_number(token)
+    if pending:
+        yield _parse_number(pending)
+
+
+def _parse_number(token):
+    try:
+        return float(token)
+    except ValueError:
+        raise ValueError(f"Invalid number: '{token.decode('utf-8', 'replace')}'")
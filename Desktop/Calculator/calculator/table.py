@@ -0,0 +1,176 @@
+"""
+Table evaluation module: one expression over many variable bindings
+Handles: value lists, start/stop/step ranges, cartesian products of several
+variables, and bulk evaluation of the expression compiled once
+"""
+
+import itertools
+import math
+
+from .vectorized import HAS_NUMPY, np
+
+# Upper bound on the number of rows a single table may produce
+MAX_TABLE_ROWS = 1_000_000
+
+
+def expand_values(spec):
+    """
+    Expand a variable specification into a list of values
+
+    Args:
+        spec: A number, a list of numbers, or a dict with 'start', 'stop'
+              and optional 'step' (default 1); ranges include stop
+
+    Returns:
+        List of float values
+
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    if isinstance(spec, dict):
+        try:
+            start = float(spec['start'])
+            stop = float(spec['stop'])
+            step = float(spec.get('step', 1))
+        except KeyError as e:
+            raise ValueError(f"Range is missing {str(e)}")
+        except (TypeError, ValueError):
+            raise ValueError("Range start, stop and step must be numbers")
+
+        if step == 0 or not all(math.isfinite(v) for v in (start, stop, step)):
+            raise ValueError("Range step must be a non-zero finite number")
+        if (stop - start) * step < 0:
+            raise ValueError("Range step points away from stop")
+
+        # Tolerance keeps 'stop' despite floating-point rounding of the count
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        if count > MAX_TABLE_ROWS:
+            raise ValueError(f"Range produces more than {MAX_TABLE_ROWS} values")
+        return [start + i * step for i in range(count)]
+
+    if isinstance(spec, (list, tuple)):
+        try:
+            return [float(v) for v in spec]
+        except (TypeError, ValueError):
+            raise ValueError("Variable values must be numbers")
+
+    try:
+        return [float(spec)]
+    except (TypeError, ValueError):
+        raise ValueError("Variable values must be a number, a list or a range")
+
+
+def parse_spec(text):
+    """
+    Parse a command-line variable specification
+
+    Args:
+        text: 'start:stop[:step]' for a range or 'v1,v2,...' for a list
+
+    Returns:
+        Specification accepted by expand_values
+    """
+    text = text.strip()
+    try:
+        if ':' in text:
+            parts = [float(p) for p in text.split(':')]
+            if len(parts) not in (2, 3):
+                raise ValueError
+            spec = {'start': parts[0], 'stop': parts[1]}
+            if len(parts) == 3:
+                spec['step'] = parts[2]
+            return spec
+        return [float(p) for p in text.split(',') if p.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid values '{text}'. Use start:stop[:step] or v1,v2,...")
+
+
+class TableResult:
+    """Result table: one column per variable plus the results"""
+
+    def __init__(self, expression, names, columns, results):
+        """
+        Initialize table
+
+        Args:
+            expression: Evaluated expression
+            names: Variable names, in column order
+            columns: Dict mapping each name to its flattened column of values
+            results: ArrayResult aligned with the columns
+        """
+        self.expression = expression
+        self.names = names
+        self.columns = columns
+        self.results = results
+
+    def __len__(self):
+        return len(self.results)
+
+    def rows(self):
+        """Return rows as [v1, v2, ..., result] with None for failed results"""
+        columns = [_tolist(self.columns[name]) for name in self.names]
+        return [list(row) for row in zip(*columns, self.results.tolist())]
+
+
+def _tolist(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def build_grid(variables):
+    """
+    Build the cartesian product of all variable values as flat columns
+
+    Args:
+        variables: Dict mapping variable names to specifications
+
+    Returns:
+        Tuple (names, columns)
+
+    Raises:
+        ValueError: If the table would exceed MAX_TABLE_ROWS
+    """
+    names = list(variables)
+    values = [expand_values(variables[name]) for name in names]
+
+    size = 1
+    for column in values:
+        size *= len(column)
+    if size > MAX_TABLE_ROWS:
+        raise ValueError(f"Table would have {size} rows (limit {MAX_TABLE_ROWS})")
+
+    if HAS_NUMPY:
+        grids = np.meshgrid(*values, indexing='ij') if values else []
+        return names, {name: grid.ravel() for name, grid in zip(names, grids)}
+
+    rows = list(itertools.product(*values))
+    return names, {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+
+def evaluate_table(parser, expression, variables):
+    """
+    Evaluate an expression over every combination of variable values
+
+    The expression is compiled once and evaluated in bulk.
+
+    Args:
+        parser: ExpressionParser
+        expression: Expression using the variable names
+        variables: Dict mapping variable names to value specifications
+
+    Returns:
+        TableResult
+
+    Raises:
+        ValueError: If the expression or variable specifications are invalid
+    """
+    if not variables:
+        raise ValueError("At least one variable is required")
+    for name in variables:
+        if not str(name).isidentifier():
+            raise ValueError(f"Invalid variable name: '{name}'")
+        if name in parser.builtin_names():
+            raise ValueError(f"Variable name '{name}' is reserved")
+
+    names, columns = build_grid(variables)
+    compiled = parser.compile(expression, names)
+    return TableResult(compiled.expression, names, columns, compiled.evaluate_array(columns))
@@ -0,0 +1,177 @@
+"""
+Tokenizer module for validating expression text in one pass
+Handles: splitting calculator syntax into tokens while checking
+characters, bracket nesting and operator sequences, with the position of
+the first offending character
+
+A scan can resume from the state of a prefix of the text, so a longer
+text that extends it only costs its new tokens.
+"""
+
+import re
+
+# One token at a position; only ASCII names, and spaces but no other whitespace
+_TOKEN = re.compile(r'''
+    (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*|π)
+  | (?P<power>\*\*|\^)
+  | (?P<operator>[-+*/%])
+  | (?P<open>[(\[])
+  | (?P<close>[)\]])
+  | (?P<comma>,)
+  | (?P<dot>\.)
+  | (?P<space>\ +)
+''', re.VERBOSE)
+
+_CLOSING = {'(': ')', '[': ']'}
+
+# Operators that may not directly follow one another (a sign after '*' may)
+_NO_REPEAT = frozenset('+-%/')
+
+
+class ExpressionSyntaxError(ValueError):
+    """A ValueError at a known position of the expression text"""
+
+    def __init__(self, message, position):
+        """
+        Initialize error
+
+        Args:
+            message: Error message
+            position: 0-based index of the offending character
+        """
+        super().__init__(message)
+        self.position = position
+
+
+class TokenState:
+    """Tokens of a scanned text, and the brackets still open after each one"""
+
+    __slots__ = ('text', 'tokens', 'stacks')
+
+    def __init__(self, text='', tokens=(), stacks=()):
+        """
+        Initialize state
+
+        Args:
+            text: Text scanned so far
+            tokens: List of (kind, text, position) tuples, spaces omitted
+            stacks: For each token, the open brackets after it as a tuple
+                of (bracket, position) pairs
+        """
+        self.text = text
+        self.tokens = list(tokens)
+        self.stacks = list(stacks)
+
+    @property
+    def open_brackets(self):
+        """Brackets left open, innermost last, as (bracket, position) pairs"""
+        return self.stacks[-1] if self.stacks else ()
+
+
+def scan(text, state=None):
+    """
+    Tokenize text, checking characters, closing brackets and operator pairs
+
+    Args:
+        text: Expression text
+        state: TokenState of an earlier scan; if text extends its text,
+            scanning resumes at its last token (which may grow, e.g. a
+            number gaining digits), otherwise it starts over
+
+    Returns:
+        TokenState for text (a new one; state is not changed)
+
+    Raises:
+        ExpressionSyntaxError: At the first invalid character, unmatched
+            closing bracket or repeated operator
+    """
+    if state is not None and text.startswith(state.text) and state.tokens:
+        tokens = state.tokens[:-1]
+        stacks = state.stacks[:-1]
+        position = state.tokens[-1][2]
+    else:
+        tokens, stacks, position = [], [], 0
+    stack = stacks[-1] if stacks else ()
+    previous_end = -1
+    if tokens:
+        _, value, start = tokens[-1]
+        previous_end = start + len(value)
+
+    length = len(text)
+    while position < length:
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ExpressionSyntaxError(f"Invalid character: '{text[position]}'", position)
+        kind = match.lastgroup
+        value = match.group()
+        position = match.end()
+        if kind == 'space':
+            continue
+        start = match.start()
+
+        if kind == 'open':
+            stack = stack + ((value, start),)
+        elif kind == 'close':
+            if not stack:
+                noun = 'parentheses' if value == ')' else 'brackets'
+                raise ExpressionSyntaxError(f"Unbalanced {noun}", start)
+            if _CLOSING[stack[-1][0]] != value:
+                raise ExpressionSyntaxError(f"Mismatched '{stack[-1][0]}' and '{value}'", start)
+            stack = stack[:-1]
+        elif (kind == 'operator' and value in _NO_REPEAT and previous_end == start
+              and tokens[-1][0] == 'operator' and tokens[-1][1] in _NO_REPEAT):
+            raise ExpressionSyntaxError("Invalid consecutive operators", start)
+
+        tokens.append((kind, value, start))
+        stacks.append(stack)
+        previous_end = position
+
+    return TokenState(text, tokens, stacks)
+
+
+def check_complete(state):
+    """
+    Check that a scanned text is a complete expression: every bracket is
+    closed, it does not end in an operator and the last exponent has an
+    operand
+
+    Args:
+        state: TokenState from scan()
+
+    Raises:
+        ExpressionSyntaxError: At the unclosed bracket, trailing operator
+            or '^'
+    """
+    if state.open_brackets:
+        bracket, position = state.open_brackets[-1]
+        noun = 'parentheses' if bracket == '(' else 'brackets'
+        raise ExpressionSyntaxError(f"Unbalanced {noun}", position)
+    tokens = state.tokens
+    if tokens and tokens[-1][0] == 'operator':
+        raise ExpressionSyntaxError("Incomplete expression", tokens[-1][2])
+    for index in range(len(tokens) - 1, -1, -1):
+        if tokens[index][0] == 'power':
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+            if following is None or following[0] in ('operator', 'power'):
+                raise ExpressionSyntaxError("Invalid exponentiation syntax", tokens[index][2])
+            break
+
+
+def tokenize(text, state=None):
+    """
+    Tokenize and validate a complete expression in one pass
+
+    Args:
+        text: Expression text
+        state: Optional TokenState of a prefix to resume from (see scan)
+
+    Returns:
+        TokenState
+
+    Raises:
+        ExpressionSyntaxError: At the first problem found
+    """
+    state = scan(text, state)
+    check_complete(state)
+    return state
@@ -0,0 +1,233 @@
+"""
+Unit conversion module for "5 km to mi" expressions
+Handles: length, mass, time, temperature, data size and angle units
+
+Units are declared as edges of a graph ("1 mi = 5280 ft"), and the
+closure of that graph - every unit expressed against its dimension's base
+unit, with exact fractions - is computed once at import. A conversion
+between two units then is one cached (scale, offset) pair, which
+the parser inlines into the compiled expression, so unknown units and
+mismatched dimensions are reported at compile time and evaluation pays
+only a multiply (and an add for temperatures).
+"""
+
+import math
+import re
+from fractions import Fraction
+from functools import lru_cache
+
+# Base unit of each dimension
+BASE_UNITS = {
+    'length': 'm',
+    'mass': 'kg',
+    'time': 's',
+    'temperature': 'K',
+    'data': 'B',
+    'angle': 'rad',
+}
+
+# Edges of the conversion graph: (unit, scale, offset, reference), read as
+# "value in unit * scale + offset = value in reference"
+_EDGES = (
+    # Length
+    ('km', 1000, 0, 'm'),
+    ('cm', Fraction(1, 100), 0, 'm'),
+    ('mm', Fraction(1, 1000), 0, 'm'),
+    ('um', Fraction(1, 10 ** 6), 0, 'm'),
+    ('nm', Fraction(1, 10 ** 9), 0, 'm'),
+    ('in', Fraction(254, 100), 0, 'cm'),
+    ('ft', 12, 0, 'in'),
+    ('yd', 3, 0, 'ft'),
+    ('mi', 5280, 0, 'ft'),
+    ('nmi', 1852, 0, 'm'),
+    ('au', 149597870700, 0, 'm'),
+    ('ly', 9460730472580800, 0, 'm'),
+    # Mass
+    ('g', Fraction(1, 1000), 0, 'kg'),
+    ('mg', Fraction(1, 1000), 0, 'g'),
+    ('t', 1000, 0, 'kg'),
+    ('lb', Fraction(45359237, 10 ** 8), 0, 'kg'),
+    ('oz', Fraction(1, 16), 0, 'lb'),
+    ('st', 14, 0, 'lb'),
+    # Time
+    ('ns', Fraction(1, 10 ** 9), 0, 's'),
+    ('us', Fraction(1, 10 ** 6), 0, 's'),
+    ('ms', Fraction(1, 1000), 0, 's'),
+    ('min', 60, 0, 's'),
+    ('h', 60, 0, 'min'),
+    ('day', 24, 0, 'h'),
+    ('week', 7, 0, 'day'),
+    ('year', Fraction(36525, 100), 0, 'day'),
+    # Temperature (affine)
+    ('degC', 1, Fraction(27315, 100), 'K'),
+    ('degF', Fraction(5, 9), Fraction(-160, 9), 'degC'),
+    ('degR', Fraction(5, 9), 0, 'K'),
+    # Data sizes
+    ('bit', Fraction(1, 8), 0, 'B'),
+    ('KB', 1000, 0, 'B'),
+    ('MB', 1000, 0, 'KB'),
+    ('GB', 1000, 0, 'MB'),
+    ('TB', 1000, 0, 'GB'),
+    ('PB', 1000, 0, 'TB'),
+    ('KiB', 1024, 0, 'B'),
+    ('MiB', 1024, 0, 'KiB'),
+    ('GiB', 1024, 0, 'MiB'),
+    ('TiB', 1024, 0, 'GiB'),
+    ('PiB', 1024, 0, 'TiB'),
+    ('kbit', 1000, 0, 'bit'),
+    ('Mbit', 1000, 0, 'kbit'),
+    ('Gbit', 1000, 0, 'Mbit'),
+    # Angles
+    ('deg', Fraction(math.pi) / 180, 0, 'rad'),
+    ('grad', Fraction(9, 10), 0, 'deg'),
+    ('turn', 360, 0, 'deg'),
+    ('arcmin', Fraction(1, 60), 0, 'deg'),
+    ('arcsec', Fraction(1, 60), 0, 'arcmin'),
+)
+
+# Alternative spellings
+ALIASES = {
+    'meter': 'm', 'meters': 'm', 'inch': 'in', 'inches': 'in',
+    'foot': 'ft', 'feet': 'ft', 'mile': 'mi', 'miles': 'mi',
+    'gram': 'g', 'grams': 'g', 'lbs': 'lb', 'tonne': 't',
+    'sec': 's', 'hr': 'h', 'hour': 'h', 'hours': 'h', 'days': 'day',
+    'weeks': 'week', 'years': 'year',
+    'celsius': 'degC', 'fahrenheit': 'degF', 'kelvin': 'K',
+    'byte': 'B', 'bytes': 'B', 'bits': 'bit',
+    'degree': 'deg', 'degrees': 'deg', 'radian': 'rad', 'radians': 'rad',
+}
+
+# "<value> <unit> to <unit>" (the value may be empty, meaning 1)
+_CONVERSION = re.compile(
+    r'^(?P<value>.*?)\s*(?<![A-Za-z_])(?P<source>[A-Za-z_]\w*)\s+to\s+(?P<target>[A-Za-z_]\w*)\s*$',
+    re.DOTALL,
+)
+
+
+def _closure():
+    """Every unit as (dimension, scale, offset) against its dimension's base"""
+    edges = {unit: (Fraction(scale), Fraction(offset), reference)
+             for unit, scale, offset, reference in _EDGES}
+    resolved = {base: (dimension, Fraction(1), Fraction(0))
+                for dimension, base in BASE_UNITS.items()}
+
+    def resolve(unit):
+        if unit not in resolved:
+            scale, offset, reference = edges[unit]
+            dimension, reference_scale, reference_offset = resolve(reference)
+            # (v * scale + offset) * reference_scale + reference_offset
+            resolved[unit] = (dimension, scale * reference_scale,
+                              offset * reference_scale + reference_offset)
+        return resolved[unit]
+
+    for unit in edges:
+        resolve(unit)
+    return resolved
+
+
+_UNITS = _closure()
+
+
+def _lookup(unit):
+    unit = ALIASES.get(unit, unit)
+    if unit not in _UNITS:
+        raise ValueError(f"Unknown unit: '{unit}'")
+    return _UNITS[unit]
+
+
+@lru_cache(maxsize=1024)
+def conversion(source, target):
+    """
+    Scale and offset converting values from one unit to another
+
+    Args:
+        source: Unit converted from
+        target: Unit converted to
+
+    Returns:
+        Tuple (scale, offset) of Fractions: target = value * scale + offset
+
+    Raises:
+        ValueError: If a unit is unknown or the dimensions differ
+    """
+    source_dimension, source_scale, source_offset = _lookup(source)
+    target_dimension, target_scale, target_offset = _lookup(target)
+    if source_dimension != target_dimension:
+        raise ValueError(
+            f"Cannot convert {source} ({source_dimension}) to {target} ({target_dimension})"
+        )
+    scale = source_scale / target_scale
+    offset = (source_offset - target_offset) / target_scale
+    return scale, offset
+
+
+def _literal(value):
+    """A positive Fraction as source: p / q while exact and small, else a float"""
+    if value.denominator == 1:
+        return repr(value.numerator)
+    if value.denominator <= 10 ** 12 and value.numerator <= 10 ** 18:
+        return f"{value.numerator} / {value.denominator}"
+    return repr(float(value))
+
+
+def _signed(value):
+    return f" - {_literal(-value)}" if value < 0 else f" + {_literal(value)}"
+
+
+def conversion_source(value, source, target):
+    """
+    Python source converting a translated value expression between units
+
+    Multiplying by the integers of an exact ratio rounds once, so e.g.
+    100 degC to degF gives exactly 212. Temperature offsets that are a
+    whole number of source degrees are added before scaling, so
+    212 degF to degC gives exactly 100.
+
+    Args:
+        value: Translated source of the value
+        source: Unit converted from
+        target: Unit converted to
+
+    Returns:
+        Source text
+
+    Raises:
+        ValueError: If a unit is unknown or the dimensions differ
+    """
+    scale, offset = conversion(source, target)
+    if not offset:
+        return f"({value}) * {_literal(scale)}"
+    shift = offset / scale
+    if shift.denominator == 1:
+        return f"(({value}){_signed(shift)}) * {_literal(scale)}"
+    return f"({value}) * {_literal(scale)}{_signed(offset)}"
+
+
+def split_conversion(expression):
+    """
+    Split "5 km to mi" into its value expression and units
+
+    Args:
+        expression: Expression text
+
+    Returns:
+        Tuple (value, source, target), with value '1' if it was empty,
+        or None if the expression is not a conversion
+    """
+    match = _CONVERSION.match(expression)
+    if not match:
+        return None
+    return match.group('value').strip() or '1', match.group('source'), match.group('target')
+
+
+def get_units():
+    """
+    List the known units
+
+    Returns:
+        Dict of dimension -> list of unit names (base unit first)
+    """
+    units = {dimension: [base] for dimension, base in BASE_UNITS.items()}
+    for unit, _, _, _ in _EDGES:
+        units[_UNITS[unit][0]].append(unit)
+    return units
@@ -0,0 +1,375 @@
+"""
+Vectorised evaluation backend for arrays of inputs
+Handles: elementwise arithmetic, trigonometric, logarithmic and exponential
+functions, and evaluation of compiled expressions over whole arrays
+
+NumPy is used when installed. Without it, array.array('d') is used and
+each element is evaluated in a Python loop (compiled code is still
+reused). Domain errors (negative sqrt, log of non-positive numbers,
+asin/acos out of range, division by zero) never raise: the offending
+elements are flagged in an error mask instead.
+"""
+
+import math
+import operator
+from array import array
+from collections import ChainMap
+from functools import lru_cache
+
+from .advanced import AdvancedMath, EXACT_DEGREE_TABLE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+@lru_cache(maxsize=None)
+def _exact_degree_columns():
+    """EXACT_DEGREE_TABLE as three NumPy columns (sin, cos, tan), built once"""
+    return tuple(np.array([np.nan if row[index] is None else row[index] for row in EXACT_DEGREE_TABLE])
+                 for index in range(3))
+
+
+class ArrayResult:
+    """Elementwise results with a parallel error mask"""
+
+    def __init__(self, values, errors):
+        """
+        Initialize result
+
+        Args:
+            values: float64 values (numpy array or array('d')); NaN where errors
+            errors: Error flags (numpy bool array or bytearray), true for failed elements
+        """
+        self.values = values
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.values)
+
+    def error_count(self):
+        """Number of elements whose evaluation failed"""
+        return int(sum(self.errors))
+
+    def tolist(self):
+        """Return results as a list with None for failed elements"""
+        return [None if err else float(v) for v, err in zip(self.values, self.errors)]
+
+
+def _finish(values):
+    """Wrap raw values in an ArrayResult, flagging every non-finite element"""
+    if HAS_NUMPY:
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        errors = ~np.isfinite(values)
+        return ArrayResult(np.where(errors, np.nan, values), errors)
+
+    values = array('d', (v if math.isfinite(v) else math.nan for v in values))
+    errors = bytearray(0 if v == v else 1 for v in values)
+    return ArrayResult(values, errors)
+
+
+def _map(func, *columns):
+    """Apply a scalar function elementwise, producing NaN where it raises"""
+    out = array('d')
+    for args in zip(*columns):
+        try:
+            out.append(float(func(*args)))
+        except (ValueError, ZeroDivisionError, OverflowError, TypeError):
+            out.append(math.nan)
+    return out
+
+
+def _as_column(value, length):
+    """Repeat a scalar to the given length, or check a sequence's length"""
+    if isinstance(value, (int, float)):
+        return [value] * length
+    if len(value) != length:
+        raise ValueError("All array inputs must have the same length")
+    return value
+
+
+class VectorMath:
+    """
+    Elementwise versions of Arithmetic and AdvancedMath operations
+
+    Methods accept arrays or scalars and return float64 arrays with NaN
+    where the scalar version would raise a domain error. Use
+    ``VectorMath.mask`` to turn a result into an ArrayResult.
+    """
+
+    def __init__(self, advanced=None):
+        """
+        Initialize with the AdvancedMath instance whose angle mode to follow
+
+        Args:
+            advanced: AdvancedMath instance (default: new one in degrees)
+        """
+        self.advanced = advanced if advanced is not None else AdvancedMath()
+
+    @staticmethod
+    def mask(values):
+        """Wrap values in an ArrayResult with non-finite elements flagged"""
+        return _finish(values)
+
+    def _binary(self, numpy_op, scalar_op, a, b):
+        if HAS_NUMPY:
+            with np.errstate(all='ignore'):
+                return numpy_op(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+        length = max((len(x) for x in (a, b) if not isinstance(x, (int, float))), default=1)
+        return _map(scalar_op, _as_column(a, length), _as_column(b, length))
+
+    def _unary(self, numpy_op, scalar_op, x):
+        if HAS_NUMPY:
+            with np.errstate(all='ignore'):
+                return numpy_op(np.asarray(x, dtype=np.float64))
+        return _map(scalar_op, x)
+
+    # Arithmetic
+
+    def add(self, a, b):
+        """Elementwise a + b"""
+        return self._binary(operator.add, operator.add, a, b)
+
+    def subtract(self, a, b):
+        """Elementwise a - b"""
+        return self._binary(operator.sub, operator.sub, a, b)
+
+    def multiply(self, a, b):
+        """Elementwise a * b"""
+        return self._binary(operator.mul, operator.mul, a, b)
+
+    def divide(self, a, b):
+        """Elementwise a / b; division by zero yields an error element"""
+        def numpy_divide(p, q):
+            return np.where(q == 0, np.nan, p / np.where(q == 0, 1, q))
+        return self._binary(numpy_divide, operator.truediv, a, b)
+
+    def modulo(self, a, b):
+        """Elementwise a % b; modulo by zero yields an error element"""
+        def numpy_modulo(p, q):
+            return np.where(q == 0, np.nan, np.mod(p, np.where(q == 0, 1, q)))
+        return self._binary(numpy_modulo, operator.mod, a, b)
+
+    def power(self, a, b):
+        """Elementwise a ** b"""
+        return self._binary(operator.pow, operator.pow, a, b)
+
+    # Advanced
+
+    def _from_radians(self, x):
+        if self.advanced.angle_mode == 'degrees':
+            return np.degrees(x)
+        return x
+
+    def square_root(self, x):
+        """Elementwise square root; negative inputs are errors"""
+        return self._unary(lambda v: np.where(v < 0, np.nan, np.sqrt(np.abs(v))),
+                           self.advanced.square_root, x)
+
+    def _trig(self, index, numpy_function, v):
+        """Trig in the current angle mode, matching AdvancedMath's degree handling"""
+        if self.advanced.angle_mode != 'degrees':
+            return numpy_function(v)
+        # fmod keeps the sign, so tiny negative angles do not round up to 360
+        reduced = np.fmod(v, 360)
+        reduced = np.where(reduced > 180, reduced - 360,
+                           np.where(reduced < -180, reduced + 360, reduced))
+        values = numpy_function(np.radians(reduced))
+        # Multiples of 15 degrees come from the exact table (tan undefined -> NaN)
+        exact = np.mod(reduced, 15) == 0
+        steps = np.where(exact, reduced // 15, 0).astype(np.intp) % 24
+        return np.where(exact, _exact_degree_columns()[index][steps], values)
+
+    def sine(self, x):
+        """Elementwise sine in the current angle mode"""
+        return self._unary(lambda v: self._trig(0, np.sin, v), self.advanced.sine, x)
+
+    def cosine(self, x):
+        """Elementwise cosine in the current angle mode"""
+        return self._unary(lambda v: self._trig(1, np.cos, v), self.advanced.cosine, x)
+
+    def tangent(self, x):
+        """Elementwise tangent in the current angle mode; undefined angles are errors"""
+        return self._unary(lambda v: self._trig(2, np.tan, v), self.advanced.tangent, x)
+
+    def arcsine(self, x):
+        """Elementwise arcsine; inputs outside [-1, 1] are errors"""
+        return self._unary(
+            lambda v: np.where(np.abs(v) > 1, np.nan, self._from_radians(np.arcsin(np.clip(v, -1, 1)))),
+            self.advanced.arcsine, x)
+
+    def arccosine(self, x):
+        """Elementwise arccosine; inputs outside [-1, 1] are errors"""
+        return self._unary(
+            lambda v: np.where(np.abs(v) > 1, np.nan, self._from_radians(np.arccos(np.clip(v, -1, 1)))),
+            self.advanced.arccosine, x)
+
+    def arctangent(self, x):
+        """Elementwise arctangent"""
+        return self._unary(lambda v: self._from_radians(np.arctan(v)), self.advanced.arctangent, x)
+
+    def _log(self, numpy_log, scalar_log, x):
+        return self._unary(lambda v: np.where(v <= 0, np.nan, numpy_log(np.where(v <= 0, 1, v))),
+                           scalar_log, x)
+
+    def natural_log(self, x, base=None):
+        """Elementwise natural logarithm (or logarithm to base); non-positive inputs are errors"""
+        if base is not None:
+            return self.logarithm(x, base)
+        return self._log(lambda v: np.log(v), self.advanced.natural_log, x)
+
+    def log10(self, x):
+        """Elementwise base-10 logarithm; non-positive inputs are errors"""
+        return self._log(lambda v: np.log10(v), self.advanced.log10, x)
+
+    def log2(self, x):
+        """Elementwise base-2 logarithm; non-positive inputs are errors"""
+        return self._log(lambda v: np.log2(v), self.advanced.log2, x)
+
+    def logarithm(self, x, base=10):
+        """Elementwise logarithm to the given base"""
+        if not HAS_NUMPY:
+            length = len(x) if not isinstance(x, (int, float)) else len(base)
+            return _map(self.advanced.logarithm, _as_column(x, length), _as_column(base, length))
+        base = np.asarray(base, dtype=np.float64)
+        bad_base = (base <= 0) | (base == 1)
+        with np.errstate(all='ignore'):
+            result = self.natural_log(x) / np.log(np.where(bad_base, 2, base))
+        return np.where(bad_base, np.nan, result)
+
+    def exponential(self, x):
+        """Elementwise e^x; overflow yields an error element"""
+        return self._unary(lambda v: np.exp(v), self.advanced.exponential, x)
+
+    def factorial(self, x):
+        """Elementwise factorial of non-negative integers; other inputs are errors"""
+        if not HAS_NUMPY:
+            return _map(lambda v: math.factorial(int(v)) if v == int(v) and v >= 0 else math.nan, x)
+        x = np.asarray(x, dtype=np.float64)
+        valid = (x >= 0) & (x == np.floor(x)) & (x <= 170)
+        out = np.full(x.shape, np.nan)
+        out[valid] = [float(math.factorial(int(v))) for v in x[valid]]
+        return out
+
+    def absolute_value(self, x):
+        """Elementwise absolute value"""
+        return self._unary(lambda v: np.abs(v), abs, x)
+
+
+class _VectorMathModule:
+    """Stand-in for the 'math' module inside vectorised expressions"""
+
+    def __init__(self, vector):
+        self.log = vector.natural_log
+        self.log2 = vector.log2
+        self.log10 = vector.log10
+        self.sqrt = vector.square_root
+        self.exp = vector.exponential
+
+
+def vector_namespace(parser):
+    """
+    The namespace that evaluates a parser's compiled code over arrays,
+    built once per parser until it loads a function pack or changes
+    random stream
+
+    Args:
+        parser: ExpressionParser whose scalar namespace to mirror
+
+    Returns:
+        Namespace dict (NumPy only)
+    """
+    return _vector_namespace(parser, parser.loaded_packs, parser.random)
+
+
+@lru_cache(maxsize=8)
+def _vector_namespace(parser, packs, random):
+    """vector_namespace, cached by the parser's loaded packs and random stream"""
+    vector = VectorMath(parser.advanced)
+    namespace = dict(parser.namespace)
+    namespace.update({
+        'math': _VectorMathModule(vector),
+        'abs': vector.absolute_value,
+        'sin_deg': vector.sine,
+        'cos_deg': vector.cosine,
+        'tan_deg': vector.tangent,
+        'asin_deg': vector.arcsine,
+        'acos_deg': vector.arccosine,
+        'atan_deg': vector.arctangent,
+        'fact': vector.factorial,
+    })
+    return namespace
+
+
+def evaluate_array(compiled, bindings):
+    """
+    Evaluate a compiled expression elementwise over arrays of inputs
+
+    Args:
+        compiled: CompiledExpression
+        bindings: Dict mapping variable names to arrays or scalars
+
+    Returns:
+        ArrayResult
+
+    Raises:
+        ValueError: If array inputs have different lengths
+    """
+    parser = compiled.parser
+
+    if HAS_NUMPY:
+        columns = {name: np.asarray(value, dtype=np.float64) for name, value in bindings.items()}
+        try:
+            shape = np.broadcast_shapes(*(c.shape for c in columns.values())) if columns else ()
+        except ValueError:
+            raise ValueError("All array inputs must have the same length")
+
+        # Random draws evaluated on arrays would be one draw broadcast to
+        # every element, so those expressions are evaluated per element
+        if not parser.uses_random(compiled):
+            scope = {'ans': parser.last_result}
+            scope.update(columns)
+            try:
+                with np.errstate(all='ignore'):
+                    # Same validated code and name lookup as scalar evaluation,
+                    # with array-aware functions
+                    values = eval(compiled.code, vector_namespace(parser),
+                                  ChainMap(scope, parser.functions, parser.cells))
+                return _finish(np.broadcast_to(np.asarray(values, dtype=np.float64), shape))
+            except (TypeError, ValueError, ArithmeticError):
+                # A function that only takes scalars, or a scalar part of the
+                # expression that fails, which the elementwise pass masks
+                pass
+        # Functions without an array implementation: evaluate per element
+        columns = {name: np.broadcast_to(c, shape).ravel().tolist() for name, c in columns.items()}
+        return _finish(np.reshape(_evaluate_elementwise(compiled, columns), shape))
+
+    columns = {}
+    lengths = {len(v) for v in bindings.values() if not isinstance(v, (int, float))}
+    if len(lengths) > 1:
+        raise ValueError("All array inputs must have the same length")
+    length = lengths.pop() if lengths else 1
+    for name, value in bindings.items():
+        columns[name] = _as_column(value, length)
+    return _finish(_evaluate_elementwise(compiled, columns))
+
+
+def _evaluate_elementwise(compiled, columns):
+    """Evaluate compiled scalar code once per element, NaN where it fails"""
+    parser = compiled.parser
+    names = list(columns)
+    length = len(next(iter(columns.values()))) if columns else 1
+    rows = zip(*columns.values()) if columns else [()] * length
+
+    out = array('d')
+    for row in rows:
+        scope = {'ans': parser.last_result}
+        scope.update(zip(names, row))
+        try:
+            out.append(float(parser._run(compiled.code, scope)))
+        except (TypeError, ValueError, ArithmeticError):
+            out.append(math.nan)
+    return out
@@ -0,0 +1,4 @@
+"""
+pytest configuration: makes the calculator and api packages importable
+when the tests are run from this directory
+"""
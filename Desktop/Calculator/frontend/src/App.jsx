@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import Display from './components/Display'
 import Keypad from './components/Keypad'
 import History from './components/History'
@@ -15,6 +15,10 @@ export default function App() {
   const [notation, setNotation] = useState('standard')
   const [justCalculated, setJustCalculated] = useState(false)
   const [showSettings, setShowSettings] = useState(false)
+  const [hint, setHint] = useState(null)
+  const [preview, setPreview] = useState(null)
+  // Identifies this tab to /api/preview, which resumes from its last input
+  const previewSession = useRef(Math.random().toString(36).slice(2))
 
   // Fetch initial config from backend
   useEffect(() => {
@@ -22,6 +26,38 @@ export default function App() {
     fetchHistory()
   }, [])
 
+  // Preview the result as the expression is typed (debounced); the
+  // preview's error doubles as the syntax hint
+  useEffect(() => {
+    if (!expression || justCalculated) {
+      setPreview(null)
+      setHint(null)
+      return
+    }
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch('/api/preview', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ session: previewSession.current, expression }),
+          signal: controller.signal
+        })
+        const data = await res.json()
+        setPreview(data.success && data.result !== null ? data.formatted_result : null)
+        setHint(data.success ? data.error : null)
+      } catch (err) {
+        if (err.name !== 'AbortError') {
+          console.error('Preview error:', err)
+        }
+      }
+    }, 120)
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [expression, justCalculated])
+
   const fetchConfig = async () => {
     try {
       const res = await fetch('/api/config')
@@ -240,6 +276,8 @@ export default function App() {
 
         <Display 
           display={display} 
+          hint={hint}
+          preview={preview}
           memory={memory}
           onMemoryAdd={handleMemoryAdd}
           onMemoryClear={handleMemoryClear}
@@ -1,7 +1,7 @@
 import React from 'react'
 import './Display.css'
 
-export default function Display({ display, memory, onMemoryAdd, onMemoryClear }) {
+export default function Display({ display, hint, preview, memory, onMemoryAdd, onMemoryClear }) {
   return (
     <div className="display-container">
       {memory !== 0 && (
@@ -13,6 +13,8 @@ export default function Display({ display, memory, onMemoryAdd, onMemoryClear })
       <div className="display">
         {display}
       </div>
+      {preview != null && <div className="display-preview">= {preview}</div>}
+      {hint && <div className="display-hint">{hint}</div>}
       <button onClick={onMemoryAdd} className="memory-add-btn">M+</button>
     </div>
   )
@@ -0,0 +1,104 @@
+"""
+Tests for degree-mode trigonometry and its exact-angle table
+"""
+
+import math
+from decimal import Decimal
+
+import pytest
+
+from calculator.advanced import AdvancedMath, EXACT_DEGREE_TABLE
+from calculator.parser import ExpressionParser
+from calculator.vectorized import HAS_NUMPY
+
+
+@pytest.fixture
+def advanced():
+    return AdvancedMath('degrees')
+
+
+class TestExactAngles:
+    """Test multiples of 15 degrees against the table"""
+
+    @pytest.mark.parametrize('angle', range(-720, 721, 15))
+    def test_table_angles(self, advanced, angle):
+        sine, cosine, tangent = EXACT_DEGREE_TABLE[angle // 15 % 24]
+        assert advanced.sine(angle) == sine
+        assert advanced.cosine(angle) == cosine
+        if tangent is not None:
+            assert advanced.tangent(angle) == tangent
+
+    def test_common_values(self, advanced):
+        assert advanced.sine(30) == 0.5
+        assert advanced.sine(180) == 0.0
+        assert advanced.cosine(60.0) == 0.5
+        assert advanced.tangent(45) == 1.0
+        assert advanced.tangent(-45.0) == -1.0
+
+    def test_large_integer_angles_are_exact(self, advanced):
+        # 10**30 is 280 modulo 360, beyond what a float conversion keeps
+        assert advanced.sine(10 ** 30 + 20) == EXACT_DEGREE_TABLE[20][0]
+        assert advanced.cosine(360 * 10 ** 25 + 60) == 0.5
+
+    @pytest.mark.parametrize('angle', [90, 270, -90, 450.0, 90 + 360 * 10 ** 20])
+    def test_undefined_tangent(self, advanced, angle):
+        with pytest.raises(ValueError, match="Tangent is undefined"):
+            advanced.tangent(angle)
+
+
+class TestOtherAngles:
+    """Test angles outside the table"""
+
+    @pytest.mark.parametrize('angle', [0.3, 10.5, -179.9, 200.25, 359.9, -719.7, 1234.5, 31])
+    def test_matches_radians(self, advanced, angle):
+        assert advanced.sine(angle) == pytest.approx(math.sin(math.radians(angle)), abs=1e-12)
+        assert advanced.cosine(angle) == pytest.approx(math.cos(math.radians(angle)), abs=1e-12)
+        assert advanced.tangent(angle) == pytest.approx(math.tan(math.radians(angle)), rel=1e-9)
+
+    @pytest.mark.parametrize('angle', [-1e-20, 1e-20, -5e-324])
+    def test_tiny_angles_stay_tiny(self, advanced, angle):
+        assert advanced.sine(angle) == math.radians(angle)
+        assert advanced.tangent(angle) == math.radians(angle)
+        assert advanced.cosine(angle) == 1.0
+
+    def test_near_full_turn_keeps_precision(self, advanced):
+        # Reduced exactly to about -0.1 degrees before converting, which
+        # avoids the rounding error of radians(359.9) near a full turn
+        assert advanced.sine(359.9) == math.sin(math.radians(359.9 - 360))
+        assert advanced.sine(359.9) != math.sin(math.radians(359.9))
+
+    def test_decimal_angle(self, advanced):
+        assert advanced.sine(Decimal('30')) == 0.5
+
+    @pytest.mark.parametrize('angle', [math.inf, -math.inf, math.nan])
+    @pytest.mark.parametrize('name', ['sine', 'cosine', 'tangent'])
+    def test_non_finite(self, advanced, name, angle):
+        with pytest.raises(ValueError, match="finite"):
+            getattr(advanced, name)(angle)
+
+    def test_radians_mode(self):
+        advanced = AdvancedMath('radians')
+        assert advanced.sine(math.pi / 6) == pytest.approx(0.5)
+        assert advanced.sine(30) == math.sin(30)
+
+    def test_vector_argument(self):
+        parser = ExpressionParser()
+        with pytest.raises(ValueError, match="not a vector or matrix"):
+            parser.evaluate('sin([30.5, 90])')
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="NumPy not installed")
+class TestArrayTrig:
+    """Test elementwise degree trig against the scalar path"""
+
+    def test_matches_scalar(self, advanced):
+        angles = [-1e-20, 0, 30, 89.5, 180, 359.9, -720, 1234.5]
+        compiled = ExpressionParser().compile('sin(x)')
+        values = compiled.evaluate_array({'x': angles}).tolist()
+        assert values == pytest.approx([advanced.sine(angle) for angle in angles], abs=1e-15)
+        assert values[0] != 0.0
+
+    def test_undefined_tangent(self):
+        compiled = ExpressionParser().compile('tan(x)')
+        result = compiled.evaluate_array({'x': [45, 90, -270]})
+        assert result.tolist() == [1.0, None, None]
@@ -0,0 +1,129 @@
+"""
+Tests for forward-mode automatic differentiation
+"""
+
+import math
+
+import pytest
+
+from calculator.parser import ExpressionParser
+from calculator.registry import FunctionRegistry
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+def gradient(parser, expression, **point):
+    return parser.compile(expression, tuple(point)).gradient(point)
+
+
+def central_difference(parser, expression, point, name, step=1e-6):
+    compiled = parser.compile(expression, tuple(point))
+    high = compiled.evaluate(dict(point, **{name: point[name] + step}))
+    low = compiled.evaluate(dict(point, **{name: point[name] - step}))
+    return (high - low) / (2 * step)
+
+
+class TestGradients:
+    """Test derivatives against analytic values and finite differences"""
+
+    def test_polynomial(self, parser):
+        value, grad = gradient(parser, 'x^3 + 2*x*y - y', x=2.0, y=5.0)
+        assert value == 23
+        assert grad == {'x': pytest.approx(22), 'y': pytest.approx(3)}
+
+    def test_power_in_both(self, parser):
+        value, grad = gradient(parser, 'x^y', x=2.0, y=3.0)
+        assert value == 8
+        assert grad['x'] == pytest.approx(12)
+        assert grad['y'] == pytest.approx(8 * math.log(2))
+
+    @pytest.mark.parametrize('expression', [
+        'sin(x) * cos(x)', 'tan(x / 2)', 'ln(x) + log(x) + log2(x)', 'exp(x / 100)',
+        'sqrt(x) / (1 + x)', 'abs(x - 50)', 'asin(x / 100)', 'atan(x)', '2^(x / 10)',
+    ])
+    def test_against_finite_differences(self, parser, expression):
+        point = {'x': 37.0}
+        _, grad = gradient(parser, expression, **point)
+        assert grad['x'] == pytest.approx(central_difference(parser, expression, point, 'x'),
+                                          rel=1e-5, abs=1e-9)
+
+    def test_constant(self, parser):
+        assert gradient(parser, '2 + 3', x=1.0) == (5, {'x': 0.0})
+
+    def test_statistics(self, parser):
+        _, grad = gradient(parser, 'mean(x, y, 3) + max(x, y)', x=1.0, y=2.0)
+        assert grad == {'x': pytest.approx(1 / 3), 'y': pytest.approx(4 / 3)}
+
+    def test_series(self, parser):
+        _, grad = gradient(parser, 'sum(x^i, i, 1, 3)', x=2.0)
+        assert grad['x'] == pytest.approx(1 + 4 + 12)
+
+    def test_user_function(self, parser):
+        functions = {}
+        parser.use_functions(functions)
+        name, compiled = parser.define('f(t) = t^2 + 1')
+        functions[name] = compiled
+        _, grad = gradient(parser, 'f(3*x)', x=2.0)
+        assert grad['x'] == pytest.approx(36)
+
+
+class TestErrors:
+    """Test points and functions without a derivative"""
+
+    @pytest.mark.parametrize('point', [{'x': -2.0, 'y': 2.0}, {'x': 0.0, 'y': 2.0}])
+    def test_power_with_nonpositive_base(self, parser, point):
+        with pytest.raises(ValueError, match='not differentiable'):
+            gradient(parser, 'x^y', **point)
+
+    def test_negative_constant_base(self, parser):
+        with pytest.raises(ValueError, match='not differentiable'):
+            gradient(parser, '(-2)^y', y=2.0)
+
+    def test_power_with_constant_exponent(self, parser):
+        assert gradient(parser, 'x^2', x=-3.0) == (9.0, {'x': -6.0})
+
+    @pytest.mark.parametrize('expression, name', [
+        ('fact(x)', 'fact'), ('factor(x)', 'factor'), ('primes(1, x)', 'primes'),
+        ('pi(x)', 'pi'), ('gcd(x, 4)', 'gcd'), ('randint(x, 10)', 'randint'),
+    ])
+    def test_integer_functions(self, parser, expression, name):
+        with pytest.raises(ValueError, match=f'{name} is not differentiable'):
+            gradient(parser, expression, x=12.0)
+
+    def test_integer_functions_of_constants(self, parser):
+        assert gradient(parser, 'x * factor(12)[1]', x=2.0) == (4.0, {'x': 2.0})
+
+    def test_sqrt_at_zero(self, parser):
+        with pytest.raises(ValueError, match='not differentiable at 0'):
+            gradient(parser, 'sqrt(x)', x=0.0)
+
+    def test_missing_value(self, parser):
+        with pytest.raises(ValueError, match='Missing values for: y'):
+            parser.compile('x + y', ('x', 'y')).gradient({'x': 1})
+
+
+class TestRegistryFunctions:
+    """Test gradients through the functions of a custom registry"""
+
+    @pytest.fixture
+    def parser(self):
+        registry = FunctionRegistry()
+        registry.register('cube', bind=lambda parser: lambda x: x * x * x, dual=True)
+        registry.register('triple', bind=lambda parser: lambda x: 3 * x)
+        registry.register('gamma', 'math.gamma')
+        registry.register('sqrt', 'math.sqrt')
+        return ExpressionParser(registry=registry)
+
+    def test_dual_implementation(self, parser):
+        assert gradient(parser, 'cube(x)', x=2.0) == (8.0, {'x': 12.0})
+
+    @pytest.mark.parametrize('expression', ['triple(x)', 'gamma(x)'])
+    def test_without_derivative(self, parser, expression):
+        with pytest.raises(ValueError, match='not differentiable'):
+            gradient(parser, expression, x=2.0)
+
+    def test_math_function_with_derivative(self, parser):
+        assert gradient(parser, 'sqrt(x) + gamma(3)', x=4.0) == (4.0, {'x': 0.25})
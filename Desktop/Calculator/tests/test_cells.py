@@ -0,0 +1,170 @@
+"""
+Tests for named cells and their recalculation
+"""
+
+import pytest
+
+from calculator.memory import Memory
+from calculator.parser import ExpressionParser
+
+
+@pytest.fixture
+def memory():
+    return Memory()
+
+
+@pytest.fixture
+def parser(memory):
+    parser = ExpressionParser()
+    parser.use_functions(memory.functions)
+    parser.use_cells(memory.cells.values)
+    return parser
+
+
+def define(parser, memory, definition):
+    name, function = parser.define(definition)
+    memory.define_function(name, function)
+    return memory.cells.functions_changed(parser, [name])
+
+
+def names(cells):
+    return [cell.name for cell in cells]
+
+
+class TestRecalculation:
+    """Test values and recalculation order"""
+
+    def test_formula(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'price', '100')
+        sheet.set(parser, 'rate', '0.05')
+        (total,) = sheet.set(parser, 'total', 'price * (1 + rate)')
+        assert total.value == pytest.approx(105)
+        assert total.dependencies == {'price', 'rate'}
+        assert parser.evaluate('total * 2') == pytest.approx(210)
+
+    def test_topological_order(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'a', '1')
+        sheet.set(parser, 'b', 'a + 1')
+        sheet.set(parser, 'c', 'a + b')
+        sheet.set(parser, 'd', 'c * 2')
+        sheet.set(parser, 'other', '7')
+        updated = sheet.set(parser, 'a', '10')
+        assert names(updated) == ['a', 'b', 'c', 'd']
+        assert sheet.get('d').value == 42
+
+    def test_error_propagates(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'a', '1')
+        sheet.set(parser, 'b', '1 / a')
+        sheet.set(parser, 'c', 'b + 1')
+        updated = sheet.set(parser, 'a', '0')
+        assert updated[1].error and 'divide' in updated[1].error
+        assert "Depends on 'b'" in updated[2].error
+        assert 'c' not in sheet.values
+
+    def test_delete(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'a', '1')
+        sheet.set(parser, 'b', 'a + 1')
+        (b,) = sheet.delete(parser, 'a')
+        assert b.error
+        with pytest.raises(ValueError):
+            sheet.delete(parser, 'a')
+
+
+class TestErrors:
+    """Test rejected cells"""
+
+    def test_circular(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'a', '1')
+        sheet.set(parser, 'b', 'a + 1')
+        with pytest.raises(ValueError, match='Circular reference: a -> b -> a'):
+            sheet.set(parser, 'a', 'b * 2')
+        assert sheet.get('a').value == 1
+
+    @pytest.mark.parametrize('name, formula', [
+        ('sin', '1'), ('2x', '1'), ('x', ''), ('x', '1 +* 2'),
+    ])
+    def test_invalid(self, parser, memory, name, formula):
+        with pytest.raises((ValueError, SyntaxError)):
+            memory.cells.set(parser, name, formula)
+
+    def test_limit(self, parser):
+        from calculator.cells import CellSheet
+        sheet = CellSheet(max_cells=1)
+        sheet.set(parser, 'a', '1')
+        with pytest.raises(ValueError, match='limit'):
+            sheet.set(parser, 'b', '2')
+
+
+class TestFunctions:
+    """Test cells that call user-defined functions"""
+
+    def test_dependencies_through_function(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'price', '100')
+        define(parser, memory, 'g(x) = x + price')
+        (u,) = sheet.set(parser, 'u', 'g(1)')
+        assert u.value == 101
+        assert u.dependencies == {'g', 'price'}
+        updated = sheet.set(parser, 'price', '200')
+        assert names(updated) == ['price', 'u']
+        assert sheet.get('u').value == 201
+
+    def test_nested_functions(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'k', '3')
+        define(parser, memory, 'h(x) = x * k')
+        define(parser, memory, 'g(x) = h(x) + 1')
+        sheet.set(parser, 'u', 'g(2)')
+        assert sheet.get('u').dependencies == {'g', 'h', 'k'}
+        sheet.set(parser, 'k', '5')
+        assert sheet.get('u').value == 11
+
+    def test_redefinition(self, parser, memory):
+        sheet = memory.cells
+        sheet.set(parser, 'price', '100')
+        sheet.set(parser, 'rate', '0.5')
+        define(parser, memory, 'g(x) = x + price')
+        sheet.set(parser, 'u', 'g(1)')
+        updated = define(parser, memory, 'g(x) = x * rate')
+        assert names(updated) == ['u']
+        assert sheet.get('u').value == 0.5
+        sheet.set(parser, 'rate', '2')
+        assert sheet.get('u').value == 2
+
+    def test_redefinition_cycle(self, parser, memory):
+        sheet = memory.cells
+        define(parser, memory, 'g(x) = x')
+        sheet.set(parser, 'u', 'g(1)')
+        (u,) = define(parser, memory, 'g(x) = x + u')
+        assert 'Circular' in u.error
+        assert 'u' not in sheet.values
+
+    def test_deleted_function(self, parser, memory):
+        sheet = memory.cells
+        define(parser, memory, 'g(x) = 2 * x')
+        sheet.set(parser, 'u', 'g(4)')
+        memory.delete_function('g')
+        (u,) = memory.cells.functions_changed(parser, ['g'])
+        assert u.error
+
+
+class TestDerivatives:
+    """Test derivatives of expressions that read cells"""
+
+    def test_cell_in_gradient(self, parser, memory):
+        memory.cells.set(parser, 'rate', '0.5')
+        value, gradient = parser.compile('x * rate', ('x',)).gradient({'x': 4})
+        assert value == 2
+        assert gradient == {'x': 0.5}
+
+    def test_cell_in_function_gradient(self, parser, memory):
+        memory.cells.set(parser, 'rate', '3')
+        define(parser, memory, 'g(x) = x^2 * rate')
+        value, gradient = parser.compile('g(x)', ('x',)).gradient({'x': 2})
+        assert value == 12
+        assert gradient == {'x': 12}
@@ -0,0 +1,180 @@
+"""
+Tests for factorials, permutations and (modular) combinations
+"""
+
+import math
+import time
+from collections import OrderedDict
+
+import pytest
+
+from calculator import combinatorics
+from calculator.combinatorics import (ModularTables, combination, combination_mod, factorial,
+                                      modular_tables, permutation)
+from calculator.parser import ExpressionParser
+
+
+class TestFactorial:
+    """Test cached factorials"""
+
+    @pytest.mark.parametrize('n', [0, 1, 5, 20, 170, 500])
+    def test_values(self, n):
+        assert factorial(n) == math.factorial(n)
+
+    def test_integral_float(self):
+        assert factorial(5.0) == 120
+        assert isinstance(factorial(5.0), int)
+
+    def test_only_small_results_cached(self):
+        combinatorics._cached_factorial.cache_clear()
+        factorial(combinatorics.MAX_CACHED_FACTORIAL)
+        factorial(combinatorics.MAX_CACHED_FACTORIAL + 1)
+        assert combinatorics._cached_factorial.cache_info().currsize == 1
+
+    def test_size_limit(self):
+        assert factorial(60_000).bit_length() < combinatorics.MAX_POWER_BITS
+        with pytest.raises(ValueError, match='Factorial too large'):
+            factorial(100_000)
+        with pytest.raises(ValueError, match='Factorial too large'):
+            factorial(10 ** 400)
+
+    @pytest.mark.parametrize('n, message', [
+        (-1, 'non-negative'),
+        (2.5, 'must be an integer'),
+        (True, 'must be an integer'),
+    ])
+    def test_invalid(self, n, message):
+        with pytest.raises(ValueError, match=message):
+            factorial(n)
+
+
+class TestPermutationsAndCombinations:
+    """Test P(n, r) and C(n, r)"""
+
+    @pytest.mark.parametrize('n, r', [(0, 0), (5, 2), (10, 10), (100, 37)])
+    def test_values(self, n, r):
+        assert permutation(n, r) == math.perm(n, r)
+        assert combination(n, r) == math.comb(n, r)
+
+    @pytest.mark.parametrize('n, r', [(5, 6), (-1, 0), (5, -1), (5.5, 2)])
+    def test_invalid(self, n, r):
+        with pytest.raises(ValueError):
+            permutation(n, r)
+        with pytest.raises(ValueError):
+            combination(n, r)
+
+    @pytest.mark.parametrize('n, r', [(10 ** 400, 1), (10 ** 400, 3), (10 ** 20, 2), (200_000, 199_990)],
+                             ids=['10^400,1', '10^400,3', '10^20,2', '200000,199990'])
+    def test_large_n_small_results(self, n, r):
+        assert combination(n, r) == math.comb(n, r)
+        assert permutation(n, n - r if n < 10 ** 6 else r) == math.perm(n, n - r if n < 10 ** 6 else r)
+
+    @pytest.mark.parametrize('function, n, r', [
+        (permutation, 10 ** 6, 10 ** 6),
+        (permutation, 10 ** 20, 10 ** 5),
+        (combination, 4 * 10 ** 6, 2 * 10 ** 6),
+        (combination, 10 ** 400, 10 ** 6 + 1),
+    ])
+    def test_size_limit(self, function, n, r):
+        with pytest.raises(ValueError, match='too large'):
+            function(n, r)
+
+    @pytest.mark.parametrize('n, r', [(2000, 1000), (2001, 1000), (30000, 11111), (50000, 48000)])
+    def test_factored_matches_math_comb(self, n, r):
+        assert combination(n, r) == math.comb(n, r)
+
+    def test_central_binomial_is_fast(self):
+        # math.comb takes seconds here; the factored product does not
+        start = time.perf_counter()
+        combination(1_000_010, 500_005)
+        assert time.perf_counter() - start < 3
+
+    def test_size_estimate_is_close(self):
+        # Just under and just over the budget
+        assert combination(1_000_010, 500_005).bit_length() <= combinatorics.MAX_POWER_BITS
+        with pytest.raises(ValueError, match='too large'):
+            combination(1_000_030, 500_015)
+
+    def test_with_modulus(self):
+        assert combination(10, 3, 7) == math.comb(10, 3) % 7
+
+
+class TestModularCombinations:
+    """Test C(n, r) mod p against exact values"""
+
+    @pytest.mark.parametrize('p', [2, 3, 7, 13, 101])
+    def test_matches_exact(self, p):
+        for n in range(0, 60):
+            for r in range(0, n + 1, 3):
+                assert combination_mod(n, r, p) == math.comb(n, r) % p
+
+    def test_lucas_for_large_n(self):
+        p = 10007
+        n, r = 10 ** 12 + 39, 10 ** 6 + 3
+        expected = 1
+        a, b = n, r
+        while a or b:
+            expected = expected * math.comb(a % p, b % p) % p
+            a //= p
+            b //= p
+        assert combination_mod(n, r, p) == expected
+
+    def test_large_prime(self):
+        p = 1_000_000_007
+        assert combination_mod(1000, 500, p) == math.comb(1000, 500) % p
+
+    def test_not_prime(self):
+        with pytest.raises(ValueError, match='prime'):
+            combination_mod(10, 3, 8)
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match='Invalid combination'):
+            combination_mod(3, 4, 7)
+
+
+class TestModularTables:
+    """Test the cached factorial tables"""
+
+    def test_grow_on_demand(self):
+        tables = ModularTables(101)
+        tables.ensure(10)
+        assert len(tables.fact) == 11
+        tables.ensure(5)
+        assert len(tables.fact) == 11
+        tables.ensure(50)
+        for i in range(51):
+            assert tables.fact[i] == math.factorial(i) % 101
+            assert tables.fact[i] * tables.inv_fact[i] % 101 == 1
+
+    def test_cached_per_modulus(self):
+        assert modular_tables(13) is modular_tables(13)
+
+    def test_total_entries_bounded(self, monkeypatch):
+        monkeypatch.setattr(combinatorics, '_tables', OrderedDict())
+        monkeypatch.setattr(combinatorics, 'MAX_TABLE_ENTRIES', 100)
+        for p in (61, 67, 71):
+            assert combination_mod(60, 7, p) == math.comb(60, 7) % p
+        assert list(combinatorics._tables) == [71]
+        combination_mod(20, 7, 23)
+        combination_mod(20, 7, 29)
+        assert list(combinatorics._tables) == [23, 29]
+
+    def test_table_size_limit(self, monkeypatch):
+        monkeypatch.setattr(combinatorics, 'MAX_TABLE_SIZE', 100)
+        with pytest.raises(ValueError, match='limited to 100'):
+            ModularTables(1_000_000_007).ensure(500)
+
+
+class TestExpressions:
+    """Test the functions through the parser"""
+
+    @pytest.mark.parametrize('expression, expected', [
+        ('fact(6)', 720), ('nPr(6, 2)', 30), ('nCr(6, 2)', 15), ('nCr(10, 3, 7)', 1),
+    ])
+    def test_values(self, expression, expected):
+        assert ExpressionParser().evaluate(expression) == expected
+
+    @pytest.mark.parametrize('expression', ['fact(-1)', 'nCr(5, 6)', 'nCr(10, 3, 8)', 'nPr(2.5, 1)'])
+    def test_errors(self, expression):
+        with pytest.raises(ValueError):
+            ExpressionParser().evaluate(expression)
@@ -0,0 +1,190 @@
+"""
+Tests for the calculator daemon and its thin client
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from calculator import daemon
+from calculator.config import CalculatorConfig
+from calculator.parser import ExpressionParser
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'calc.sock')
+
+
+def _start_daemon(socket_path):
+    """Start a daemon process and wait until it listens on socket_path"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'calculator', '--daemon', socket_path],
+        cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env=dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    )
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            pytest.fail(f"daemon did not start: {process.stderr.read().decode()}")
+        time.sleep(0.01)
+    return process
+
+
+def _stop_daemon(process):
+    """Interrupt a daemon as Ctrl+C would"""
+    process.send_signal(signal.SIGINT)
+    process.wait(timeout=10)
+
+
+@pytest.fixture
+def running_daemon(socket_path):
+    process = _start_daemon(socket_path)
+    yield process
+    _stop_daemon(process)
+
+
+class TestEvaluateLine:
+    """Test the reply for a single protocol line"""
+
+    def test_ok(self):
+        ok, text, result = daemon.evaluate_line(ExpressionParser(), CalculatorConfig(), '2^10')
+        assert (ok, text, result) == (True, '1024', 1024)
+
+    def test_ans(self):
+        ok, text, _ = daemon.evaluate_line(ExpressionParser(), CalculatorConfig(), 'ans / 4', 10)
+        assert (ok, text) == (True, '2.5')
+
+    def test_error_is_one_line(self):
+        ok, text, result = daemon.evaluate_line(ExpressionParser(), CalculatorConfig(), '1 / 0')
+        assert not ok and result is None
+        assert '\n' not in text
+
+    def test_evaluate_local_chains_ans(self):
+        replies = daemon.evaluate_local(['3 * 4', 'ans + 1', 'sqrt(-1)', 'ans'])
+        assert replies[:2] == [(True, '12'), (True, '13')]
+        assert replies[2][0] is False
+        # A failed line leaves ans unchanged
+        assert replies[3] == (True, '13')
+
+
+class TestSocketPath:
+    """Test where the client and daemon look for the socket"""
+
+    def test_argument_wins(self, monkeypatch):
+        monkeypatch.setenv('CALCULATOR_SOCKET', '/tmp/from-env.sock')
+        assert daemon.get_socket_path('/tmp/given.sock') == '/tmp/given.sock'
+        assert daemon.get_socket_path() == '/tmp/from-env.sock'
+
+    def test_default(self, monkeypatch):
+        monkeypatch.delenv('CALCULATOR_SOCKET', raising=False)
+        assert daemon.get_socket_path() == daemon.DEFAULT_SOCKET_PATH
+
+
+class TestDaemon:
+    """Test a running daemon over its socket"""
+
+    def test_round_trip(self, running_daemon, socket_path):
+        replies = daemon.evaluate_remote(['2 + 3', 'ans * 2', '1 / 0'], socket_path)
+        assert replies[:2] == [(True, '5'), (True, '10')]
+        assert replies[2][0] is False
+
+    def test_ans_per_connection(self, running_daemon, socket_path):
+        daemon.evaluate_remote(['100'], socket_path)
+        assert daemon.evaluate_remote(['ans + 1'], socket_path) == [(True, '1')]
+
+    def test_newlines_stay_in_one_expression(self, running_daemon, socket_path):
+        assert daemon.evaluate_remote(['1 +\n2'], socket_path) == [(True, '3')]
+
+    def test_run_client_uses_daemon(self, running_daemon, socket_path, capsys):
+        assert daemon.run_client(['6 * 7'], socket_path) == 0
+        assert capsys.readouterr().out.strip() == '42'
+
+    def test_second_daemon_refused(self, running_daemon, socket_path):
+        with pytest.raises(OSError, match='already listening'):
+            daemon._remove_stale_socket(socket_path)
+
+    def test_slow_expression_does_not_block_others(self, running_daemon, socket_path):
+        start = time.monotonic()
+        slow = threading.Thread(target=daemon.evaluate_remote, args=(
+            ['sum(sin(i), i, 1, 10^7)'], socket_path, 60))
+        slow.start()
+        time.sleep(0.2)
+        assert daemon.evaluate_remote(['1 + 1'], socket_path) == [(True, '2')]
+        fast_done = time.monotonic()
+        slow.join(60)
+        assert fast_done - start < (time.monotonic() - start) / 2
+
+    def test_socket_removed_on_exit(self, socket_path):
+        _stop_daemon(_start_daemon(socket_path))
+        assert not os.path.exists(socket_path)
+
+
+@pytest.fixture
+def broken_daemon(socket_path):
+    """Start a listener that accepts connections and replies to one line of two"""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+
+    def serve():
+        connection, _ = listener.accept()
+        with connection:
+            connection.makefile('rb').readline()
+            connection.sendall(b'OK 4\n')
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    yield socket_path
+    thread.join(10)
+    listener.close()
+
+
+class TestClientFallback:
+    """Test the client without a daemon"""
+
+    def test_no_socket(self, socket_path, capsys):
+        assert daemon.run_client(['2 + 2', '1 / 0'], socket_path) == 1
+        captured = capsys.readouterr()
+        assert captured.out.strip() == '4'
+        assert captured.err.startswith('Error: ')
+
+    def test_stale_socket(self, socket_path, capsys):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        assert daemon.run_client(['2 + 2'], socket_path) == 0
+        assert capsys.readouterr().out.strip() == '4'
+        daemon._remove_stale_socket(socket_path)
+        assert not os.path.exists(socket_path)
+
+    def test_remote_without_daemon(self, socket_path):
+        with pytest.raises(OSError):
+            daemon.evaluate_remote(['1'], socket_path)
+
+    def test_failure_after_sending_is_reported(self, broken_daemon, capsys):
+        assert daemon.run_client(['2 + 2', '3 + 3'], broken_daemon) == 1
+        captured = capsys.readouterr()
+        assert captured.out == ''
+        assert 'closed the connection early' in captured.err
+
+    def test_timeout_is_reported(self, socket_path, capsys):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with listener:
+            listener.bind(socket_path)
+            listener.listen()
+            assert daemon.run_client(['2 + 2'], socket_path, timeout=0.1) == 1
+        captured = capsys.readouterr()
+        assert captured.out == ''
+        assert 'timed out' in captured.err
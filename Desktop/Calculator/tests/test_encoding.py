@@ -0,0 +1,124 @@
+"""
+Tests for the binary encoding of bulk numeric results
+"""
+
+import math
+import struct
+from array import array
+
+import pytest
+
+from calculator import encoding
+from calculator.encoding import MAGIC, pack_columns, unpack_columns
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    """Encode with NumPy (when installed) and with array('d')"""
+    if request.param == 'numpy' and not encoding.HAS_NUMPY:
+        pytest.skip("NumPy not installed")
+    if request.param == 'python':
+        monkeypatch.setattr(encoding, 'HAS_NUMPY', False)
+    return request.param
+
+
+class TestRoundTrip:
+    """Test that decoding returns what was encoded"""
+
+    def test_columns_and_errors(self, backend):
+        xs = [0.0, 0.5, 1.0, -2.25]
+        ys = [1.0, math.nan, 3.5, math.nan]
+        data = pack_columns(['x', 'y'], [xs, ys], [False, True, False, True])
+        names, columns, errors = unpack_columns(data)
+        assert names == ['x', 'y']
+        assert list(columns[0]) == xs
+        assert [v if v == v else None for v in columns[1]] == [1.0, None, 3.5, None]
+        assert errors == [False, True, False, True]
+
+    def test_array_input(self, backend):
+        values = array('d', [1.5, 2.5])
+        _, columns, _ = unpack_columns(pack_columns(['v'], [values], [False, False]))
+        assert columns == [values]
+
+    def test_bitmap_spans_bytes(self, backend):
+        errors = [i % 3 == 0 for i in range(19)]
+        data = pack_columns(['r'], [[float(i) for i in range(19)]], errors)
+        assert unpack_columns(data)[2] == errors
+
+    def test_unicode_names(self, backend):
+        names, _, _ = unpack_columns(pack_columns(['θ', 'résultat'], [[1.0], [2.0]], [False]))
+        assert names == ['θ', 'résultat']
+
+    def test_empty(self, backend):
+        assert unpack_columns(pack_columns([], [], [])) == ([], [], [])
+        names, columns, errors = unpack_columns(pack_columns(['x'], [[]], []))
+        assert (names, list(columns[0]), errors) == (['x'], [], [])
+
+
+class TestLayout:
+    """Test the documented byte layout"""
+
+    def test_header_and_alignment(self, backend):
+        data = pack_columns(['x', 'y'], [[1.0, 2.0], [3.0, 4.0]], [False, True])
+        magic, version, count, rows, names_size = struct.unpack_from('<4sHHQI', data)
+        assert (magic, version, count, rows, names_size) == (MAGIC, 1, 2, 2, 3)
+        # The float data starts 8-byte aligned, column by column
+        offset = 20 + 3 + 1
+        assert struct.unpack_from('<4d', data, offset) == (1.0, 2.0, 3.0, 4.0)
+        assert data[offset + 32:] == b'\x02'
+
+    def test_same_bytes_on_both_backends(self, monkeypatch):
+        args = (['a', 'b'], [[1.0, -0.5, 1e300], [math.nan, 2.0, 3.0]], [True, False, False])
+        expected = pack_columns(*args)
+        monkeypatch.setattr(encoding, 'HAS_NUMPY', False)
+        assert pack_columns(*args) == expected
+
+
+class TestErrors:
+    """Test invalid input"""
+
+    def test_unequal_columns(self, backend):
+        with pytest.raises(ValueError, match='same length'):
+            pack_columns(['x', 'y'], [[1.0, 2.0], [1.0]], [False, False])
+
+    @pytest.mark.parametrize('data, message', [
+        (b'CAL', 'too short for header'),
+        (b'NOPE' + bytes(16), 'Unsupported'),
+        (struct.pack('<4sHHQI', MAGIC, 2, 0, 0, 0), 'Unsupported'),
+    ])
+    def test_bad_header(self, data, message):
+        with pytest.raises(ValueError, match=message):
+            unpack_columns(data)
+
+    def test_truncated(self, backend):
+        data = pack_columns(['x'], [[1.0, 2.0, 3.0]], [False] * 3)
+        with pytest.raises(ValueError, match='too short for its columns'):
+            unpack_columns(data[:-9])
+
+
+class TestBinaryResponses:
+    """Test that bulk endpoints answer in the binary format on request"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        return create_app().test_client()
+
+    def test_accept_header(self, client):
+        response = client.post('/api/table', json={'expression': '1 / x', 'variables': {'x': [1, 0, 4]}},
+                               headers={'Accept': encoding.MEDIA_TYPE})
+        assert response.mimetype == encoding.MEDIA_TYPE
+        names, columns, errors = unpack_columns(response.data)
+        assert names == ['x', 'result']
+        assert list(columns[0]) == [1.0, 0.0, 4.0]
+        assert errors == [False, True, False]
+
+    def test_query_parameter(self, client):
+        response = client.post('/api/table?format=binary',
+                               json={'expression': 'x', 'variables': {'x': [2]}})
+        assert unpack_columns(response.data)[1][1][0] == 2.0
+
+    def test_json_by_default(self, client):
+        response = client.post('/api/table', json={'expression': 'x', 'variables': {'x': [2]}})
+        assert response.get_json()['rows'] == [[2.0, 2.0]]
@@ -0,0 +1,160 @@
+"""
+Tests for user-defined functions
+"""
+
+import pytest
+
+from calculator.memory import Memory
+from calculator.parser import ExpressionParser
+
+
+@pytest.fixture
+def memory():
+    return Memory()
+
+
+@pytest.fixture
+def parser(memory):
+    parser = ExpressionParser()
+    parser.use_functions(memory.functions)
+    return parser
+
+
+def _define(parser, memory, definition):
+    name, function = parser.define(definition)
+    memory.define_function(name, function)
+    return function
+
+
+class TestDefine:
+    """Test compiling and calling definitions"""
+
+    def test_call(self, parser, memory):
+        function = _define(parser, memory, 'f(x, y) = x^2 + y')
+        assert function.variables == ('x', 'y')
+        assert parser.evaluate('f(3, 4)') == 13
+        assert parser.evaluate('2 * f(1, 1) + 1') == 5
+
+    def test_no_parameters(self, parser, memory):
+        _define(parser, memory, 'two() = 1 + 1')
+        assert parser.evaluate('two() * 3') == 6
+
+    def test_calls_other_functions(self, parser, memory):
+        _define(parser, memory, 'sq(x) = x^2')
+        _define(parser, memory, 'hyp(a, b) = sqrt(sq(a) + sq(b))')
+        assert parser.evaluate('hyp(3, 4)') == 5
+
+    def test_replacing_a_function(self, parser, memory):
+        _define(parser, memory, 'g(x) = x + 1')
+        _define(parser, memory, 'g(x) = x + 2')
+        assert parser.evaluate('g(1)') == 3
+        assert len(memory.functions) == 1
+
+    @pytest.mark.parametrize('expression', ['f(1)', 'f(1, 2, 3)'])
+    def test_wrong_argument_count(self, parser, memory, expression):
+        _define(parser, memory, 'f(x, y) = x + y')
+        with pytest.raises(ValueError, match='Expected 2 values'):
+            parser.evaluate(expression)
+
+    @pytest.mark.parametrize('definition, message', [
+        ('f = x + 1', 'look like'),
+        ('sin(x) = x', 'Cannot redefine built-in name'),
+        ('f(x, 2y) = x', 'Invalid parameter name'),
+        ('f(pi) = 1', 'Invalid parameter name'),
+        ('f(x, x) = x', 'Duplicate parameter names'),
+        ('f(a, b, c, d, g, h, i, j, k) = a', 'at most 8 parameters'),
+        ('f(x) = ', 'body cannot be empty'),
+        ('f(x) = ' + '+'.join(['x'] * 300), 'limited to 500 characters'),
+        ('f(x) = f(x - 1)', 'Recursive'),
+    ])
+    def test_invalid(self, parser, definition, message):
+        with pytest.raises(ValueError, match=message):
+            parser.define(definition)
+
+    def test_mutual_recursion(self, parser, memory):
+        _define(parser, memory, 'a(x) = x')
+        _define(parser, memory, 'b(x) = a(x)')
+        with pytest.raises(ValueError, match='Recursive'):
+            parser.define('a(x) = b(x)')
+
+    def test_cell_name(self, parser, memory):
+        parser.use_cells(memory.cells.values)
+        memory.cells.set(parser, 'rate', '0.05')
+        with pytest.raises(ValueError, match='already a cell name'):
+            parser.define('rate(x) = x')
+
+    def test_body_syntax_error(self, parser):
+        with pytest.raises((SyntaxError, ValueError)):
+            parser.define('f(x) = x +* 2')
+
+
+class TestMemoryFunctions:
+    """Test storing, listing and deleting functions"""
+
+    def test_listing(self, parser, memory):
+        _define(parser, memory, 'f(x, y) = x^2 + y')
+        assert memory.get_functions() == [
+            {'name': 'f', 'parameters': ['x', 'y'], 'body': 'x^2 + y'}]
+
+    def test_limit(self, parser):
+        memory = Memory(max_functions=2)
+        parser.use_functions(memory.functions)
+        _define(parser, memory, 'a(x) = x')
+        _define(parser, memory, 'b(x) = x')
+        with pytest.raises(ValueError, match=r'Function limit reached \(2\)'):
+            _define(parser, memory, 'c(x) = x')
+        # Replacing an existing function is still allowed
+        _define(parser, memory, 'a(x) = 2 * x')
+        assert parser.evaluate('a(3)') == 6
+
+    def test_delete(self, parser, memory):
+        _define(parser, memory, 'f(x) = x')
+        memory.delete_function('f')
+        with pytest.raises(ValueError):
+            parser.evaluate('f(1)')
+        with pytest.raises(ValueError, match='Unknown function: f'):
+            memory.delete_function('f')
+
+    def test_clear(self, parser, memory):
+        _define(parser, memory, 'f(x) = x')
+        memory.clear_functions()
+        assert memory.get_functions() == []
+
+
+class TestFunctionRoutes:
+    """Test /api/functions"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        from api import routes
+        yield create_app().test_client()
+        routes.memory.clear_functions()
+
+    def test_define_list_and_call(self, client):
+        response = client.post('/api/functions', json={'definition': 'f(x, y) = x^2 + y'})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert (data['name'], data['parameters'], data['updated']) == ('f', ['x', 'y'], [])
+        listing = client.get('/api/functions').get_json()
+        assert listing['count'] == 1
+        assert listing['functions'][0]['name'] == 'f'
+        result = client.post('/api/calculate', json={'expression': 'f(3, 4)'}).get_json()
+        assert result['result'] == 13
+
+    def test_missing_definition(self, client):
+        assert client.post('/api/functions', json={}).status_code == 400
+
+    @pytest.mark.parametrize('definition', ['sqrt(x) = x', 'f(x) = x +* 2', 'nonsense'])
+    def test_invalid_definition(self, client, definition):
+        response = client.post('/api/functions', json={'definition': definition})
+        assert response.status_code == 422
+        assert response.get_json()['success'] is False
+
+    def test_delete(self, client):
+        client.post('/api/functions', json={'definition': 'f(x) = x'})
+        response = client.delete('/api/functions/f')
+        assert response.status_code == 200
+        assert response.get_json()['message'] == "Function 'f' deleted"
+        assert client.delete('/api/functions/f').status_code == 404
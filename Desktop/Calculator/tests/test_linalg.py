@@ -0,0 +1,118 @@
+"""
+Tests for vector and matrix expressions, with and without NumPy
+"""
+
+import math
+
+import pytest
+
+from calculator import linalg
+from calculator.parser import ExpressionParser
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def parser(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(linalg, '_numpy', lambda: None)
+    return ExpressionParser()
+
+
+def evaluate(parser, expression):
+    result = parser.evaluate(expression)
+    return linalg.to_list(result) if linalg.is_matrix(result) else result
+
+
+class TestOperations:
+    """Test results are the same on both backends"""
+
+    @pytest.mark.parametrize('expression, expected', [
+        ('[1, 2] + [3, 4]', [4.0, 6.0]),
+        ('[1, 2] * 3', [3.0, 6.0]),
+        ('1 / [2, 4]', [0.5, 0.25]),
+        ('[4, 9]^0.5', [2.0, 3.0]),
+        ('2^[1, 2]', [2.0, 4.0]),
+        ('-[1, 2]', [-1.0, -2.0]),
+        ('dot([[1, 2], [3, 4]], [1, 1])', [3.0, 7.0]),
+        ('solve([[2, 0], [0, 4]], [2, 4])', [1.0, 1.0]),
+        ('[[1, 2], [3, 4]][1]', [3.0, 4.0]),
+    ])
+    def test_values(self, parser, expression, expected):
+        assert evaluate(parser, expression) == pytest.approx(expected)
+
+    def test_transpose(self, parser):
+        assert evaluate(parser, 'transpose([[1, 2], [3, 4]])') == [[1.0, 3.0], [2.0, 4.0]]
+
+    def test_det_inv(self, parser):
+        assert evaluate(parser, 'det([[1, 2], [3, 4]])') == pytest.approx(-2)
+        assert evaluate(parser, 'det([[1, 2], [2, 4]])') == pytest.approx(0)
+        assert evaluate(parser, 'inv([[1, 2], [3, 4]])') == [
+            pytest.approx([-2, 1]), pytest.approx([1.5, -0.5])]
+
+    def test_dot_vectors(self, parser):
+        assert evaluate(parser, 'dot([1, 2], [3, 4])') == 11
+
+    def test_statistics(self, parser):
+        assert evaluate(parser, 'sum([[1, 2], [3, 4]])') == 10
+        assert evaluate(parser, 'max([1, 2], 3)') == 3
+        assert evaluate(parser, 'min([5, 2], [4])') == 2
+        assert evaluate(parser, 'mean([1, 2], 6)') == 3
+
+
+class TestErrors:
+    """Test both backends raise the scalar path's errors"""
+
+    @pytest.mark.parametrize('expression', ['[1, 2] / 0', '[1, 2] / [1, 0]', '[1, 2] % 0'])
+    def test_division_by_zero(self, parser, expression):
+        with pytest.raises(ValueError, match='Cannot divide by zero'):
+            parser.evaluate(expression)
+
+    def test_domain(self, parser):
+        with pytest.raises(ValueError, match='math domain error'):
+            parser.evaluate('[1, -1]^0.5')
+
+    def test_overflow(self, parser):
+        with pytest.raises(ValueError, match='overflowed'):
+            parser.evaluate('[1e308] * 10')
+
+    @pytest.mark.parametrize('expression', ['[1, 2] * [[1], [2]]', '[1, 2] + [1, 2, 3]'])
+    def test_no_broadcasting(self, parser, expression):
+        with pytest.raises(ValueError, match='do not match'):
+            parser.evaluate(expression)
+
+    @pytest.mark.parametrize('expression', ['sin([30, 90])', 'sqrt([4, 9])', 'ln([1, 2])'])
+    def test_scalar_functions(self, parser, expression):
+        with pytest.raises(ValueError, match='not a vector or matrix'):
+            parser.evaluate(expression)
+
+    @pytest.mark.parametrize('expression', [
+        'inv([[1, 2], [2, 4]])', 'det([1, 2])', 'solve([[1, 0], [0, 1]], [1, 2, 3])',
+        '[[1, 2], [3]]', '[[[1]]]',
+    ])
+    def test_invalid_matrices(self, parser, expression):
+        with pytest.raises(ValueError):
+            parser.evaluate(expression)
+
+
+class TestDerivatives:
+    """Test matrices in differentiated expressions"""
+
+    @pytest.mark.parametrize('expression', ['det([[x, 1], [2, 3]])', 'dot([x, 1], [1, 1])'])
+    def test_not_differentiable(self, expression):
+        parser = ExpressionParser()
+        with pytest.raises(ValueError, match='not differentiable'):
+            parser.compile(expression, ('x',)).gradient({'x': 2})
+
+    def test_constant_matrix(self):
+        parser = ExpressionParser()
+        value, gradient = parser.compile('x * det([[1, 2], [3, 4]])', ('x',)).gradient({'x': 2})
+        assert value == pytest.approx(-4)
+        assert gradient['x'] == pytest.approx(-2)
+
+
+def test_random_vectors():
+    parser = ExpressionParser()
+    values = linalg.to_list(parser.evaluate('rand(5) * 2'))
+    assert len(values) == 5 and all(0 <= v < 2 for v in values)
+    with pytest.raises(ValueError, match='Cannot divide by zero'):
+        parser.evaluate('rand(3) / 0')
+    assert not math.isnan(parser.evaluate('sum(normal(0, 1, 100))'))
@@ -0,0 +1,92 @@
+"""
+Tests for one-shot evaluation and lazy package imports
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from calculator.__main__ import main, run_once
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch, tmp_path):
+    """Point the client at a socket that does not exist, so it evaluates in-process"""
+    monkeypatch.setenv('CALCULATOR_SOCKET', str(tmp_path / 'missing.sock'))
+
+
+def _run(*args):
+    """Run python with args from the project root"""
+    return subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True,
+                          env=dict(os.environ, PYTHONPATH=PROJECT_ROOT))
+
+
+class TestRunOnce:
+    """Test one-shot evaluation of command-line expressions"""
+
+    def test_prints_each_result(self, capsys):
+        assert run_once(['2 + 3 * sqrt(16)', '2^10']) == 0
+        assert capsys.readouterr().out.splitlines() == ['14', '1024']
+
+    def test_ans_chains_between_arguments(self, capsys):
+        assert run_once(['6 * 7', 'ans + 1']) == 0
+        assert capsys.readouterr().out.splitlines() == ['42', '43']
+
+    def test_error_sets_status(self, capsys):
+        assert run_once(['1 / 0', '1 + 1']) == 1
+        captured = capsys.readouterr()
+        assert captured.out.splitlines() == ['2']
+        assert captured.err.startswith('Error: ')
+
+    def test_main_dispatches_arguments(self, capsys):
+        assert main(['sin(30)']) == 0
+        assert capsys.readouterr().out.strip() == '0.5'
+
+    def test_module_entry_point(self):
+        process = _run('-m', 'calculator', '2 + 3', 'ans * 2')
+        assert process.returncode == 0
+        assert process.stdout.splitlines() == ['5', '10']
+
+    def test_module_entry_point_error(self):
+        process = _run('-m', 'calculator', 'nosuchname')
+        assert process.returncode == 1
+        assert 'Error:' in process.stderr
+
+
+class TestLazyImports:
+    """Test that importing the package defers its submodules"""
+
+    def test_import_loads_no_submodules(self):
+        process = _run('-c', (
+            "import sys, calculator\n"
+            "print(sorted(m for m in sys.modules if m.startswith('calculator.')))"
+        ))
+        assert process.stdout.strip() == '[]'
+
+    def test_one_shot_skips_heavy_modules(self):
+        process = _run('-c', (
+            "import sys, io, contextlib\n"
+            "from calculator.__main__ import run_once\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    run_once(['2 + 3'])\n"
+            "print(' '.join(m for m in ('calculator.cli', 'calculator.linalg', 'numpy', 'decimal')\n"
+            "               if m in sys.modules))"
+        ))
+        assert process.returncode == 0
+        assert process.stdout.strip() == ''
+
+    def test_attribute_access_imports(self):
+        import calculator
+        from calculator.parser import ExpressionParser
+        assert calculator.ExpressionParser is ExpressionParser
+        assert 'AdvancedMath' in dir(calculator)
+
+    def test_unknown_attribute(self):
+        import calculator
+        with pytest.raises(AttributeError, match='no attribute'):
+            calculator.NoSuchThing
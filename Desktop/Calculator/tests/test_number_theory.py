@@ -0,0 +1,95 @@
+"""
+Tests for number theory functions and the integer power guard
+"""
+
+import pytest
+
+from calculator import number_theory
+from calculator.arithmetic import Arithmetic, MAX_POWER_BITS
+from calculator.parser import ExpressionParser
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+class TestNumberTheory:
+    """Test number_theory functions"""
+
+    def test_powmod(self):
+        assert number_theory.powmod(2, 10, 1000) == 24
+        assert number_theory.powmod(3, -1, 7) == 5
+
+    def test_powmod_errors(self):
+        with pytest.raises(ValueError):
+            number_theory.powmod(2, 3, 0)
+        with pytest.raises(ValueError):
+            number_theory.powmod(2, -1, 4)
+        with pytest.raises(ValueError):
+            number_theory.powmod(2.5, 3, 7)
+
+    def test_gcd_lcm(self):
+        assert number_theory.gcd(12, 18, 30) == 6
+        assert number_theory.lcm(4, 6) == 12
+        with pytest.raises(ValueError):
+            number_theory.gcd()
+
+    def test_is_prime(self):
+        assert number_theory.is_prime(2)
+        assert number_theory.is_prime(2 ** 61 - 1)
+        assert not number_theory.is_prime(1)
+        assert not number_theory.is_prime(561)
+
+    def test_factor(self):
+        assert number_theory.factor(360) == [2, 2, 2, 3, 3, 5]
+        assert number_theory.factor(600851475143) == [71, 839, 1471, 6857]
+        with pytest.raises(ValueError):
+            number_theory.factor(0)
+
+    def test_primes_and_pi(self):
+        assert number_theory.primes(10, 30) == [11, 13, 17, 19, 23, 29]
+        assert number_theory.prime_pi(100) == 25
+        assert number_theory.prime_pi(10 ** 6) == 78498
+
+    def test_primes_span_limit(self):
+        with pytest.raises(ValueError):
+            number_theory.primes(0, number_theory.MAX_PRIMES_SPAN * 2)
+
+
+class TestExpressions:
+    """Test number theory through the parser"""
+
+    def test_functions(self, parser):
+        assert parser.evaluate("powmod(2, 10, 1000)") == 24
+        assert parser.evaluate("isprime(97)") == 1
+        assert parser.evaluate("pi(100)") == 25
+
+    def test_pi_constant_unchanged(self, parser):
+        assert parser.evaluate("2 * pi") == pytest.approx(6.283185307179586)
+
+    def test_caret_is_power(self, parser):
+        assert parser.evaluate("2^10") == 1024
+        assert parser.evaluate("2^10000") == 2 ** 10000
+
+
+class TestPowerGuard:
+    """Test the limit on exact integer powers"""
+
+    def test_huge_power_raises(self, parser):
+        with pytest.raises(ValueError, match="too large"):
+            parser.evaluate("9^9^9")
+
+    def test_huge_base_raises(self, parser):
+        with pytest.raises(ValueError, match="too large"):
+            parser.evaluate("(10^100000)^1000")
+
+    def test_limit(self):
+        assert Arithmetic.power(2, MAX_POWER_BITS) == 1 << MAX_POWER_BITS
+        with pytest.raises(ValueError):
+            Arithmetic.power(2, MAX_POWER_BITS + 1)
+
+    def test_other_powers_unchanged(self):
+        assert Arithmetic.power(2.0, 0.5) == pytest.approx(2 ** 0.5)
+        assert Arithmetic.power(-1, 10 ** 12) == 1
+        assert Arithmetic.power(2, -2) == 0.25
@@ -0,0 +1,105 @@
+"""
+Tests for adaptive precision and how its results are formatted
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from calculator.config import CalculatorConfig
+from calculator.parser import ExpressionParser
+from calculator.precision import digits_lost, refine
+
+
+@pytest.fixture
+def parser():
+    parser = ExpressionParser()
+    parser.set_precision_mode('adaptive')
+    parser.set_decimal_places(30)
+    return parser
+
+
+@pytest.fixture
+def config():
+    config = CalculatorConfig()
+    config.set_precision_mode('adaptive')
+    config.set_decimal_places(30)
+    return config
+
+
+class TestRefinement:
+    """Test when float results are re-evaluated with Decimal"""
+
+    def test_many_places(self, parser, config):
+        result = parser.evaluate('1/3')
+        assert isinstance(result, Decimal)
+        assert config.format_result(result) == '0.' + '3' * 30
+
+    @pytest.mark.parametrize('expression, expected', [
+        ('0.1 + 0.2 - 0.3', '0'),
+        ('1e16 + 1 - 1e16', '1'),
+    ])
+    def test_cancellation(self, parser, config, expression, expected):
+        parser.set_decimal_places(4)
+        config.set_decimal_places(4)
+        assert config.format_result(parser.evaluate(expression)) == expected
+
+    def test_cancellation_is_measured(self, parser):
+        compiled = parser.compile('1e16 + 1 - 1e16')
+        assert digits_lost(compiled, {'ans': 0}) > 15
+        assert digits_lost(parser.compile('2 * 3'), {'ans': 0}) == 0.0
+
+    def test_few_places_stay_float(self, parser):
+        parser.set_decimal_places(4)
+        assert isinstance(parser.evaluate('1/3'), float)
+        assert refine(parser.compile('1/3'), 1 / 3, {'ans': 0}, 4) is None
+
+    def test_ans_keeps_decimal_digits(self, parser, config):
+        parser.evaluate('sqrt(2)')
+        assert config.format_result(parser.evaluate('ans * ans')) == '2'
+
+    def test_exact_degree_sine(self, parser):
+        assert parser.evaluate('sin(30)') == Decimal('0.5')
+
+    def test_random_is_not_refined(self, parser):
+        assert isinstance(parser.evaluate('rand() / 3'), float)
+
+    def test_float_mode(self):
+        parser = ExpressionParser()
+        parser.set_decimal_places(30)
+        assert isinstance(parser.evaluate('1/3'), float)
+
+    def test_invalid_mode(self, parser, config):
+        with pytest.raises(ValueError, match="Precision mode"):
+            parser.set_precision_mode('exact')
+        with pytest.raises(ValueError, match="Precision mode"):
+            config.set_precision_mode('exact')
+
+
+class TestUnrefinedResults:
+    """Test that float results shown in adaptive mode carry no rounding noise"""
+
+    def test_vector(self, parser, config):
+        result = parser.evaluate('[1, 2] / 3')
+        assert config.format_result(result) == '[0.333333333333333, 0.666666666666667]'
+
+    def test_matrix(self, parser, config):
+        result = parser.evaluate('inv([[1, 2], [3, 4]])')
+        assert config.format_result(result) == '[[-2, 1], [1.5, -0.5]]'
+
+    def test_places_follow_magnitude(self, config):
+        assert config.format_result(12345.678901234567) == '12345.6789012346'
+        assert config.format_result(2e-5 / 3) == '0.00000666666666666667'
+
+    def test_fewer_places_are_kept(self, config):
+        config.set_decimal_places(3)
+        assert config.format_result(1 / 3) == '0.333'
+
+    def test_scientific(self, parser, config):
+        config.set_notation('scientific')
+        result = parser.evaluate('[1, 2] / 3')
+        assert config.format_result(result) == '[3.33333333333333e-01, 6.66666666666667e-01]'
+
+    def test_float_mode_shows_every_place(self, config):
+        config.set_precision_mode('float')
+        assert config.format_result(1 / 3) == '0.333333333333333314829616256247'
@@ -0,0 +1,97 @@
+"""
+Tests for live previews of partial expressions
+"""
+
+import time
+
+import pytest
+
+from calculator.parser import ExpressionParser
+from calculator.preview import Previewer, complete
+from calculator.tokenizer import scan
+
+
+@pytest.fixture
+def previewer():
+    return Previewer(ExpressionParser())
+
+
+class TestComplete:
+    """Test completing partial expressions"""
+
+    @pytest.mark.parametrize('text, expected', [
+        ('2 + 3 * (4', '2 + 3 * (4)'),
+        ('2 +', '2'),
+        ('sqrt(16', 'sqrt(16)'),
+        ('[1, [2,', '[1, [2]]'),
+        ('(', ''),
+        ('', ''),
+    ])
+    def test_complete(self, text, expected):
+        assert complete(scan(text)) == expected
+
+
+class TestPreviewer:
+    """Test Previewer results, reuse and skipped expressions"""
+
+    def test_partial(self, previewer):
+        preview = previewer.preview('s', '2 + 3 * (4')
+        assert preview['result'] == 14
+        assert preview['expression'] == '2 + 3 * (4)'
+        assert preview['complete'] is False
+        assert preview['error'] is None
+
+    def test_complete_text(self, previewer):
+        preview = previewer.preview('s', '1 + 2')
+        assert preview['result'] == 3
+        assert preview['complete'] is True
+
+    def test_reuses_result(self, previewer):
+        first = previewer.preview('s', '6 * 7')
+        second = previewer.preview('s', '6 * 7 +')
+        assert second['result'] == first['result'] == 42
+        assert second['complete'] is False
+
+    def test_backspace(self, previewer):
+        previewer.preview('s', '12 + 34')
+        assert previewer.preview('s', '12 + 3')['result'] == 15
+
+    def test_syntax_error_position(self, previewer):
+        preview = previewer.preview('s', '2 + $')
+        assert preview['result'] is None
+        assert preview['position'] == 4
+        assert 'Invalid character' in preview['error']
+
+    def test_evaluation_error(self, previewer):
+        preview = previewer.preview('s', '1/0')
+        assert preview['result'] is None
+        assert preview['error']
+
+    def test_no_side_effects(self, previewer):
+        parser = previewer.parser
+        previewer.preview('s', '5 * 5')
+        assert parser.get_last_result() == 0
+
+    def test_random_skipped(self, previewer):
+        preview = previewer.preview('s', 'rand() + 1')
+        assert preview['result'] is None
+        assert preview['error'] is None
+
+    @pytest.mark.parametrize('text', ['9^9^9', '2^10^7 +', 'fact(100000)', 'sum(i, i, 1, 10^9)'])
+    def test_heavy_skipped(self, previewer, text):
+        start = time.perf_counter()
+        preview = previewer.preview('s', text)
+        assert time.perf_counter() - start < 1
+        assert preview['result'] is None
+        assert preview['error'] is None
+
+    def test_sessions_independent(self, previewer):
+        previewer.preview('a', '1 + 1')
+        assert previewer.preview('b', '2 + 2')['result'] == 4
+        assert previewer.preview('a', '1 + 1 +')['result'] == 2
+
+    def test_session_limit(self):
+        previewer = Previewer(ExpressionParser(), max_sessions=2)
+        for key in 'abc':
+            previewer.preview(key, '1')
+        assert list(previewer._sessions) == ['b', 'c']
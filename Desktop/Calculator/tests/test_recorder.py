@@ -0,0 +1,212 @@
+"""
+Tests for recording history on a background thread
+"""
+
+import json
+import threading
+
+import pytest
+
+from calculator.memory import Memory
+from calculator.recorder import HistoryRecorder, JsonLinesSink
+
+TIMEOUT = 5.0
+
+
+class GatedMemory(Memory):
+    """Memory whose history writes wait until the gate is opened"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def add_history_batch(self, records):
+        self.entered.set()
+        self.gate.wait(TIMEOUT)
+        return super().add_history_batch(records)
+
+
+def _expressions(memory):
+    return [entry['expression'] for entry in memory.get_history()]
+
+
+@pytest.fixture
+def memory():
+    return GatedMemory()
+
+
+@pytest.fixture
+def stalled(memory):
+    """Start a recorder of two pending calculations whose thread is stuck writing 'a'"""
+    recorders = []
+
+    def start(policy):
+        recorder = HistoryRecorder(memory, max_pending=2, batch_size=1, policy=policy)
+        recorders.append(recorder)
+        recorder.record('a', 1)
+        assert memory.entered.wait(TIMEOUT)
+        assert recorder.record('b', 2)
+        assert recorder.record('c', 3)
+        return recorder
+
+    yield start
+    memory.gate.set()
+    for recorder in recorders:
+        recorder.close(TIMEOUT)
+
+
+class TestRecording:
+    """Test that calculations reach history"""
+
+    def test_flush(self):
+        memory = Memory()
+        recorder = HistoryRecorder(memory, batch_size=3)
+        for i in range(10):
+            assert recorder.record(f'{i} + 0', i)
+        assert recorder.flush(TIMEOUT)
+        assert [entry['result'] for entry in memory.get_history()] == list(range(10))
+        assert recorder.pending() == 0
+        recorder.close(TIMEOUT)
+
+    def test_entries(self):
+        memory = Memory()
+        recorder = HistoryRecorder(memory)
+        recorder.record(2, 5)
+        recorder.flush(TIMEOUT)
+        entry = memory.get_history()[0]
+        assert (entry['expression'], entry['result']) == ('2', 5)
+        assert len(entry['timestamp']) == len('2025-12-24 10:30:45')
+        recorder.close(TIMEOUT)
+
+    def test_flush_timeout(self, memory):
+        recorder = HistoryRecorder(memory)
+        recorder.record('a', 1)
+        assert not recorder.flush(0.05)
+        memory.gate.set()
+        assert recorder.flush(TIMEOUT)
+        recorder.close(TIMEOUT)
+
+    def test_no_thread_until_used(self):
+        recorder = HistoryRecorder(Memory())
+        assert recorder.flush(TIMEOUT)
+        recorder.close(TIMEOUT)
+        assert recorder._thread is None
+
+    def test_close_records_pending(self, memory):
+        recorder = HistoryRecorder(memory, batch_size=1)
+        for name in 'abc':
+            recorder.record(name, 0)
+        memory.gate.set()
+        recorder.close(TIMEOUT)
+        assert _expressions(memory) == ['a', 'b', 'c']
+        assert not recorder.record('d', 0)
+
+    @pytest.mark.parametrize('kwargs, message', [
+        ({'policy': 'drop_all'}, 'Policy must be one of'),
+        ({'max_pending': 0}, 'must be positive'),
+        ({'batch_size': 0}, 'must be positive'),
+    ])
+    def test_invalid_arguments(self, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            HistoryRecorder(Memory(), **kwargs)
+
+
+class TestBackPressure:
+    """Test the policies applied when the queue is full"""
+
+    def test_drop_oldest(self, memory, stalled):
+        recorder = stalled('drop_oldest')
+        assert recorder.record('d', 4)
+        assert recorder.dropped == 1
+        memory.gate.set()
+        recorder.flush(TIMEOUT)
+        assert _expressions(memory) == ['a', 'c', 'd']
+
+    def test_drop_newest(self, memory, stalled):
+        recorder = stalled('drop_newest')
+        assert not recorder.record('d', 4)
+        assert recorder.dropped == 1
+        memory.gate.set()
+        recorder.flush(TIMEOUT)
+        assert _expressions(memory) == ['a', 'b', 'c']
+
+    def test_block(self, memory, stalled):
+        recorder = stalled('block')
+        writer = threading.Thread(target=recorder.record, args=('d', 4))
+        writer.start()
+        writer.join(0.1)
+        assert writer.is_alive()
+        memory.gate.set()
+        writer.join(TIMEOUT)
+        assert not writer.is_alive()
+        recorder.flush(TIMEOUT)
+        assert _expressions(memory) == ['a', 'b', 'c', 'd']
+        assert recorder.dropped == 0
+
+    def test_close_releases_blocked_writer(self, memory, stalled):
+        recorder = stalled('block')
+        results = []
+        writer = threading.Thread(target=lambda: results.append(recorder.record('d', 4)))
+        writer.start()
+        writer.join(0.1)
+        memory.gate.set()
+        recorder.close(TIMEOUT)
+        writer.join(TIMEOUT)
+        assert not writer.is_alive()
+        assert len(results) == 1
+
+
+class TestSinks:
+    """Test persisting batches"""
+
+    def test_json_lines(self, tmp_path):
+        path = tmp_path / 'history.jsonl'
+        recorder = HistoryRecorder(Memory(), sink=JsonLinesSink(str(path)))
+        recorder.record('2 + 3', 5)
+        recorder.record('fact(1000)', 3 ** 3000)
+        recorder.close(TIMEOUT)
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert [line['expression'] for line in lines] == ['2 + 3', 'fact(1000)']
+        assert lines[0]['result'] == 5
+        assert lines[1]['result'].endswith('e+1431')
+
+    def test_appends(self, tmp_path):
+        path = tmp_path / 'history.jsonl'
+        path.write_text('{"expression": "old"}\n', encoding='utf-8')
+        JsonLinesSink(str(path))([{'expression': 'new', 'result': 1, 'timestamp': 't'}])
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 2
+
+    def test_sink_errors_are_counted(self):
+        memory = Memory()
+        calls = []
+
+        def sink(entries):
+            calls.append(entries)
+            if len(calls) == 1:
+                raise OSError("disk full")
+
+        recorder = HistoryRecorder(memory, batch_size=1, sink=sink)
+        recorder.record('a', 1)
+        recorder.flush(TIMEOUT)
+        recorder.record('b', 2)
+        recorder.flush(TIMEOUT)
+        recorder.close(TIMEOUT)
+        assert recorder.errors == 1
+        assert len(calls) == 2
+        assert _expressions(memory) == ['a', 'b']
+
+
+class TestHistoryRoute:
+    """Test that API reads see calculations recorded before them"""
+
+    def test_history_after_calculate(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        from api import routes
+        client = create_app().test_client()
+        routes.memory.clear_history()
+        client.post('/api/calculate', json={'expression': '6 * 7'})
+        history = client.get('/api/history').get_json()['history']
+        assert history[-1]['expression'] == '6 * 7'
+        assert history[-1]['result'] == 42
@@ -0,0 +1,159 @@
+"""
+Tests for the expression function registry
+"""
+
+import importlib
+import math
+import os
+import subprocess
+import sys
+
+import pytest
+
+from calculator import registry as registry_module
+from calculator.parser import ExpressionParser
+from calculator.registry import DEFAULT_REGISTRY, FunctionRegistry, FunctionSpec
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def registry():
+    registry = FunctionRegistry()
+    registry.register('double', bind=lambda parser: lambda x: 2 * x)
+    registry.register('sqrt', 'math.sqrt')
+    registry.register_pack('geometry', 'cmath')
+    registry.register('modulus', pack='geometry', attribute='polar')
+    registry.register('phase', 'argument', pack='geometry', attribute='phase', heavy=True)
+    return registry
+
+
+@pytest.fixture
+def imports(monkeypatch):
+    """Record the modules imported by registries"""
+    imported = []
+    original = importlib.import_module
+
+    def import_module(name):
+        imported.append(name)
+        return original(name)
+
+    monkeypatch.setattr(registry_module.importlib, 'import_module', import_module)
+    return imported
+
+
+class TestArity:
+    """Test argument count checks"""
+
+    @pytest.mark.parametrize('spec, count, message', [
+        (('sin', 'sin_deg', 1, 1), 2, r'sin\(\) takes 1 argument \(2 given\)'),
+        (('dot', 'dot', 2, 2), 0, r'dot\(\) takes 2 arguments \(0 given\)'),
+        (('nCr', 'nCr', 2, 3), 4, r'nCr\(\) takes 2 to 3 arguments \(4 given\)'),
+        (('sum', 'sum', 1, None), 0, r'sum\(\) takes at least 1 argument \(0 given\)'),
+        (('rand', 'rand', 0, 1), 2, r'rand\(\) takes 0 to 1 argument \(2 given\)'),
+    ])
+    def test_messages(self, spec, count, message):
+        with pytest.raises(ValueError, match=message):
+            FunctionSpec(*spec, None, None, None).check_arity(count)
+
+    def test_accepted(self):
+        spec = FunctionSpec('max', 'max', 1, None, None, None, None)
+        for count in (1, 2, 100):
+            spec.check_arity(count)
+
+    @pytest.mark.parametrize('expression', ['sin()', 'sqrt(1, 2)', 'nCr(1)', 'mean()', 'powmod(1, 2)'])
+    def test_checked_at_compile_time(self, expression):
+        with pytest.raises(ValueError, match='takes'):
+            ExpressionParser().compile(expression)
+
+
+class TestRegistry:
+    """Test registering and looking up functions"""
+
+    def test_lookup(self, registry):
+        spec = registry.lookup('modulus')
+        assert (spec.name, spec.target, spec.pack, spec.attribute) == ('modulus', 'modulus', 'geometry', 'polar')
+        assert registry.lookup('missing') is None
+        assert 'double' in registry and 'missing' not in registry
+
+    def test_names_and_targets(self, registry):
+        assert registry.names() == {'double', 'sqrt', 'modulus', 'phase'}
+        assert registry.targets() == {'double', 'math', 'modulus', 'argument'}
+
+    def test_core_and_heavy(self, registry):
+        assert [spec.name for spec in registry.core()] == ['double', 'sqrt']
+        assert registry.heavy_targets() == {'argument'}
+
+    def test_unknown_pack(self, registry):
+        with pytest.raises(ValueError, match='Unknown function pack: matrices'):
+            registry.register('det', pack='matrices')
+
+    def test_load_pack_once(self, registry, imports):
+        functions = registry.load_pack('geometry')
+        assert functions['modulus'](3 + 4j) == (5.0, pytest.approx(math.atan2(4, 3)))
+        assert functions['argument'](-1) == pytest.approx(math.pi)
+        assert registry.load_pack('geometry') is functions
+        assert imports == ['cmath']
+
+    def test_default_registry(self):
+        assert DEFAULT_REGISTRY.lookup('ln').target == 'math.log'
+        assert DEFAULT_REGISTRY.lookup('pi').target == 'prime_pi'
+        assert {'fact', 'det', 'factor'} <= {name.split('.')[0] for name in DEFAULT_REGISTRY.heavy_targets()}
+        assert all(spec.pack is None for spec in DEFAULT_REGISTRY.core())
+        assert [spec.name for spec in DEFAULT_REGISTRY.specs() if spec.dual] == ['abs']
+
+
+class TestParserIntegration:
+    """Test parsers built on a registry"""
+
+    def test_custom_registry(self, registry, imports):
+        parser = ExpressionParser(registry=registry)
+        assert parser.evaluate('double(sqrt(16))') == 8
+        assert imports == []
+        assert parser.evaluate('phase(-1)') == pytest.approx(math.pi)
+        assert imports == ['cmath']
+        assert parser.loaded_packs == ('geometry',)
+
+    def test_unregistered_function(self, registry):
+        parser = ExpressionParser(registry=registry)
+        with pytest.raises(ValueError):
+            parser.evaluate('sin(30)')
+
+    def test_packs_load_on_first_call(self, imports):
+        parser = ExpressionParser()
+        assert 'mean' not in parser.namespace
+        parser.evaluate('2 + 2')
+        assert parser.loaded_packs == ()
+        assert parser.evaluate('mean(1, 2, 3)') == 2
+        assert 'stats' in parser.loaded_packs
+        assert parser.evaluate('gcd(12, 18)') == 6
+        assert 'number_theory' in parser.loaded_packs
+
+    def test_pack_modules_imported_on_first_call(self):
+        process = subprocess.run([sys.executable, '-c', (
+            "import sys\n"
+            "from calculator.parser import ExpressionParser\n"
+            "parser = ExpressionParser()\n"
+            "parser.evaluate('nCr(5, 2) + rand() * 0')\n"
+            "packs = ('calculator.number_theory', 'calculator.stats', 'calculator.linalg')\n"
+            "print(' '.join(m for m in packs if m in sys.modules))\n"
+            "parser.evaluate('gcd(12, 18)')\n"
+            "print(' '.join(m for m in packs if m in sys.modules))"
+        )], cwd=PROJECT_ROOT, capture_output=True, text=True,
+            env=dict(os.environ, PYTHONPATH=PROJECT_ROOT))
+        assert process.returncode == 0, process.stderr
+        assert process.stdout.splitlines() == ['', 'calculator.number_theory']
+
+    def test_reserved_names(self):
+        parser = ExpressionParser()
+        assert {'det', 'mean', 'ans', 'pi'} <= parser.reserved_names()
+
+    def test_heavy_expressions(self, registry):
+        parser = ExpressionParser(registry=registry)
+        assert parser.is_heavy(parser.compile('phase(1)'))
+        assert not parser.is_heavy(parser.compile('double(1)'))
+
+    def test_pi_constant_and_function(self):
+        parser = ExpressionParser()
+        assert parser.evaluate('pi') == math.pi
+        assert parser.evaluate('pi(100)') == 25
@@ -0,0 +1,122 @@
+"""
+Tests for rendering huge integer results without full decimal conversion
+"""
+
+import math
+import sys
+
+import pytest
+
+from calculator.config import CalculatorConfig
+from calculator.rendering import (SUMMARY_DIGITS, digit_count, is_big_integer, iter_digits,
+                                  render_value, summarize)
+
+
+@pytest.fixture
+def unlimited_str():
+    """Allow str() of huge ints so results can be checked against it"""
+    if not hasattr(sys, 'set_int_max_str_digits'):
+        yield
+        return
+    previous = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    yield
+    sys.set_int_max_str_digits(previous)
+
+
+class TestDigitCount:
+    """Test digit counts against str()"""
+
+    @pytest.mark.parametrize('k', [1, 15, 16, 100, 4300, 20000])
+    def test_powers_of_ten(self, unlimited_str, k):
+        for n in (10 ** k - 1, 10 ** k, 10 ** k + 1):
+            assert digit_count(n) == len(str(n))
+
+    def test_powers_of_two(self, unlimited_str):
+        for bits in range(40, 5000, 97):
+            n = 2 ** bits
+            assert digit_count(n) == len(str(n))
+            assert digit_count(-n) == len(str(n))
+
+    def test_small(self):
+        assert digit_count(0) == 1
+        assert digit_count(-999) == 3
+
+
+class TestSummary:
+    """Test leading-digit summaries"""
+
+    @pytest.mark.parametrize('n', [3 ** 5000, 10 ** 3000, 10 ** 3000 - 1, 7 * 10 ** 2000 + 1],
+                             ids=['3^5000', '10^3000', '10^3000-1', '7e2000+1'])
+    def test_leading_digits(self, unlimited_str, n):
+        text = str(n)
+        summary = summarize(n)
+        assert summary.digits == len(text)
+        assert summary.exponent == len(text) - 1
+        assert summary.leading == text[:15]
+
+    def test_text_and_dict(self):
+        summary = summarize(-(10 ** 1500))
+        assert summary.text == '-1.00000000000000e+1500'
+        assert summary.to_dict() == {
+            'summary': summary.text, 'digits': 1501, 'leading_digits': '1' + '0' * 14,
+            'exponent': 1500, 'negative': True,
+        }
+
+    def test_short_integer(self):
+        assert summarize(12345).text == '1.2345e+4'
+        assert summarize(7, 3).text == '7e+0'
+
+
+class TestBigIntegers:
+    """Test which values are summarised"""
+
+    def test_threshold(self):
+        assert not is_big_integer(10 ** (SUMMARY_DIGITS - 1))
+        assert is_big_integer(10 ** SUMMARY_DIGITS)
+        assert not is_big_integer(1e300)
+        assert not is_big_integer(True)
+
+    def test_render_value(self):
+        assert render_value(10 ** 2000) == summarize(10 ** 2000).text
+        assert render_value(42) == 42
+        assert render_value('x') == 'x'
+
+    def test_config_summary(self):
+        config = CalculatorConfig()
+        config.set_decimal_places(4)
+        assert config.format_result(2 ** 10000) == summarize(2 ** 10000, 5).text
+
+
+class TestStreamedDigits:
+    """Test the full digits streamed on request"""
+
+    @pytest.mark.parametrize('n', [0, 7, -12345, 2 ** 10000, -(3 ** 40000), 10 ** 30000],
+                             ids=['0', '7', '-12345', '2^10000', '-3^40000', '10^30000'])
+    def test_matches_str(self, unlimited_str, n):
+        assert ''.join(iter_digits(n)) == str(n)
+
+    def test_chunks_fit_str_limit(self):
+        chunks = list(iter_digits(7 ** 60000))
+        assert len(chunks) > 1
+        assert max(len(chunk) for chunk in chunks) <= 4300
+
+
+class TestCalculateRoute:
+    """Test big integer results in POST /api/calculate"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        return create_app().test_client()
+
+    def test_summary(self, client):
+        data = client.post('/api/calculate', json={'expression': 'fact(1000)'}).get_json()
+        assert data['result'] == data['big_integer']['summary']
+        assert data['big_integer']['digits'] == 2568
+
+    def test_full_digits(self, client, unlimited_str):
+        response = client.post('/api/calculate', json={'expression': 'fact(2000)', 'full_digits': True})
+        assert response.mimetype == 'text/plain'
+        assert response.get_data(as_text=True) == str(math.factorial(2000))
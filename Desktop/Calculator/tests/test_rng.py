@@ -0,0 +1,91 @@
+"""
+Tests for seeded random streams and random draws in expressions
+"""
+
+import pytest
+
+from calculator.parser import ExpressionParser
+from calculator.rng import MAX_DRAWS, RandomStream, calls_random
+
+
+@pytest.fixture
+def parser():
+    parser = ExpressionParser()
+    parser.use_random(RandomStream(42))
+    return parser
+
+
+class TestRandomStream:
+    """Test seeding, ranges and bulk draws"""
+
+    def test_seed_replays(self):
+        first, second = RandomStream(7), RandomStream(7)
+        assert [first.rand() for _ in range(5)] == [second.rand() for _ in range(5)]
+        first.reseed(7)
+        assert first.rand() == RandomStream(7).rand()
+
+    def test_ranges(self):
+        stream = RandomStream(1)
+        assert all(0 <= stream.rand() < 1 for _ in range(100))
+        assert {stream.randint(1, 3) for _ in range(200)} == {1, 2, 3}
+
+    def test_bulk_does_not_shift_single_draws(self):
+        plain, bulk = RandomStream(3), RandomStream(3)
+        plain.rand()
+        bulk.rand(1000)
+        assert plain.rand() == bulk.rand()
+
+    def test_bulk_values(self):
+        stream = RandomStream(5)
+        values = stream.randint(1, 6, 500)
+        assert len(values) == 500
+        assert set(float(v) for v in values) <= {1.0, 2.0, 3.0, 4.0, 5.0, 6.0}
+
+    @pytest.mark.parametrize('call', [
+        lambda s: s.randint(3, 1), lambda s: s.randint(1.5, 2), lambda s: s.normal(0, -1),
+        lambda s: s.rand(0), lambda s: s.rand(MAX_DRAWS + 1), lambda s: s.reseed(-1),
+    ])
+    def test_errors(self, call):
+        with pytest.raises(ValueError):
+            call(RandomStream(1))
+
+    def test_calls_random(self):
+        assert calls_random('rand() + 1')
+        assert calls_random("series_sum('randint(1, 6)', 'i', 1, 3, {})")
+        assert not calls_random('operand(2)')
+
+
+class TestExpressions:
+    """Test random draws inside evaluated expressions"""
+
+    def test_uses_random_through_function(self, parser):
+        functions = {}
+        parser.use_functions(functions)
+        name, compiled = parser.define('roll(n) = randint(1, n)')
+        functions[name] = compiled
+        assert parser.uses_random(parser.compile('roll(6) + 1'))
+        assert not parser.uses_random(parser.compile('2 + 1'))
+
+    def test_array_draws_per_element(self, parser):
+        compiled = parser.compile('x + rand()', ('x',))
+        values = compiled.evaluate_array({'x': [0.0] * 200}).tolist()
+        assert all(0 <= value < 1 for value in values)
+        assert len(set(values)) > 150
+
+    def test_array_without_variables(self, parser):
+        compiled = parser.compile('x * 0 + normal()', ('x',))
+        values = compiled.evaluate_array({'x': [1.0] * 50}).tolist()
+        assert len(set(values)) == 50
+
+    def test_array_draws_reproducible(self):
+        results = []
+        for _ in range(2):
+            parser = ExpressionParser()
+            parser.use_random(RandomStream(11))
+            compiled = parser.compile('randint(1, 100) + x', ('x',))
+            results.append(compiled.evaluate_array({'x': list(range(20))}).tolist())
+        assert results[0] == results[1]
+
+    def test_series_redraws(self, parser):
+        value = parser.evaluate('sum(randint(0, 1000000), i, 1, 10)')
+        assert value != 10 * parser.evaluate('randint(0, 1000000)')
@@ -0,0 +1,113 @@
+"""
+Tests for adaptive function sampling and discontinuity detection
+"""
+
+import math
+
+import pytest
+
+from calculator.parser import ExpressionParser
+from calculator.sampling import sample_function
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+def sample(parser, expression, start, stop, **options):
+    return sample_function(parser.compile(expression, ('x',)), 'x', start, stop, **options)
+
+
+class TestSampling:
+    """Test point placement and budgets"""
+
+    def test_flat_curve_uses_few_points(self, parser):
+        curve = sample(parser, '2*x + 1', -1, 1)
+        assert len(curve) < 40
+        assert curve.discontinuities == []
+
+    def test_points_sorted_and_on_curve(self, parser):
+        curve = sample(parser, 'x^2', -2, 2)
+        assert curve.xs == sorted(curve.xs)
+        for x, y in zip(curve.xs, curve.ys):
+            assert y == pytest.approx(x * x)
+
+    def test_budget(self, parser):
+        curve = sample(parser, 'sin(x*100)', 0, 360, max_points=200)
+        assert curve.evaluations <= 200
+
+    def test_undefined_region(self, parser):
+        curve = sample(parser, 'sqrt(x)', -1, 1)
+        assert curve.discontinuities == []
+        assert all(math.isnan(y) for x, y in zip(curve.xs, curve.ys) if x < 0)
+        edge = min(x for x, y in zip(curve.xs, curve.ys) if not math.isnan(y))
+        assert edge < 1e-5
+        assert curve.evaluations < 200
+
+    def test_points_json(self, parser):
+        points = sample(parser, 'sqrt(x)', -1, 1).points()
+        assert points[0] == [-1.0, None]
+        assert points[-1] == [1.0, 1.0]
+
+
+class TestDiscontinuities:
+    """Test jumps are reported once each"""
+
+    def test_tan(self, parser):
+        curve = sample(parser, 'tan(x)', 0, 360)
+        assert curve.discontinuities == pytest.approx([90.0, 270.0])
+        assert sum(math.isnan(y) for y in curve.ys) == 2
+
+    def test_tan_off_grid(self, parser):
+        curve = sample(parser, 'tan(x)', 1, 359)
+        assert curve.discontinuities == pytest.approx([90.0, 270.0])
+
+    def test_reciprocal(self, parser):
+        assert sample(parser, '1/x', -1, 1).discontinuities == [0.0]
+        assert sample(parser, '1/x', -1, 1.3).discontinuities == pytest.approx([0.0], abs=1e-6)
+
+    def test_shifted_pole(self, parser):
+        curve = sample(parser, '1/(x - 0.3)', 0, 1)
+        assert curve.discontinuities == pytest.approx([0.3])
+
+    @pytest.mark.parametrize('expression, start, stop, poles, width', [
+        ('tan(x)', 0, 360, [90, 270], 0.36),
+        ('tan(x)', 1, 359, [90, 270], 0.36),
+        ('1/x', -1, 1, [0], 0.002),
+        ('1/(x - 0.3)', 0, 1, [0.3], 0.001),
+    ])
+    def test_poles_do_not_take_the_budget(self, parser, expression, start, stop, poles, width):
+        curve = sample(parser, expression, start, stop)
+        near = [x for x in curve.xs if any(abs(x - pole) <= width for pole in poles)]
+        assert len(near) < len(curve) / 5
+        assert curve.discontinuities == pytest.approx(poles, abs=1e-6)
+
+    def test_reciprocal_spends_points_on_the_visible_curve(self, parser):
+        curve = sample(parser, '1/x', -1, 1)
+        assert curve.evaluations < 600
+        assert sum(abs(x) > 0.05 for x in curve.xs) > 100
+
+    def test_steep_but_continuous(self, parser):
+        curve = sample(parser, 'x^9', -3, 3)
+        assert curve.discontinuities == []
+
+    def test_curve_broken_at_jump(self, parser):
+        curve = sample(parser, '1/(x - 0.3)', 0, 1)
+        (jump,) = curve.discontinuities
+        assert math.isnan(curve.ys[curve.xs.index(jump)])
+
+
+class TestErrors:
+    """Test invalid arguments"""
+
+    @pytest.mark.parametrize('start, stop', [(1, 1), (2, 1), (0, math.inf)])
+    def test_interval(self, parser, start, stop):
+        with pytest.raises(ValueError):
+            sample(parser, 'x', start, stop)
+
+    @pytest.mark.parametrize('options', [{'max_points': 2}, {'max_points': 10 ** 6},
+                                         {'tolerance': 0}])
+    def test_options(self, parser, options):
+        with pytest.raises(ValueError):
+            sample(parser, 'x', 0, 1, **options)
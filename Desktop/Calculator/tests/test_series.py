@@ -0,0 +1,116 @@
+"""
+Tests for series sums and products
+"""
+
+import math
+import warnings
+
+import pytest
+
+from calculator.parser import ExpressionParser
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+def term_by_term(kind, body, low, high):
+    """Reference value: the body evaluated for each index in Python"""
+    values = [body(i) for i in range(low, high + 1)]
+    return sum(values) if kind == 'sum' else math.prod(values)
+
+
+class TestClosedForms:
+    """Test closed forms against term-by-term evaluation"""
+
+    @pytest.mark.parametrize('expression, kind, body, low, high', [
+        ('sum(i, i, 1, 100)', 'sum', lambda i: i, 1, 100),
+        ('sum(i^3 - 2*i, i, -50, 70)', 'sum', lambda i: i ** 3 - 2 * i, -50, 70),
+        ('sum(3^i, i, 0, 200)', 'sum', lambda i: 3 ** i, 0, 200),
+        ('sum(2^i, i, 1, 4000)', 'sum', lambda i: 2 ** i, 1, 4000),
+        ('sum(5, i, 1, 1000)', 'sum', lambda i: 5, 1, 1000),
+        ('prod(2, i, 1, 300)', 'prod', lambda i: 2, 1, 300),
+        ('prod(2^i, i, 1, 40)', 'prod', lambda i: 2 ** i, 1, 40),
+        ('prod(i, i, 1, 65)', 'prod', lambda i: i, 1, 65),
+        ('prod(i, i, 1, 171)', 'prod', lambda i: i, 1, 171),
+        ('sum(i % 7, i, 1, 100000)', 'sum', lambda i: i % 7, 1, 100000),
+    ])
+    def test_exact(self, parser, expression, kind, body, low, high):
+        result = parser.evaluate(expression)
+        assert type(result) is int
+        assert result == term_by_term(kind, body, low, high)
+
+    def test_float_body(self, parser):
+        expected = math.fsum(math.sqrt(i) for i in range(1, 10001))
+        assert parser.evaluate('sum(sqrt(i), i, 1, 10000)') == pytest.approx(expected)
+        assert parser.evaluate('sum(0.5^i, i, 0, 100)') == pytest.approx(2)
+
+    def test_empty_range(self, parser):
+        assert parser.evaluate('sum(i, i, 5, 1)') == 0
+        assert parser.evaluate('prod(i, i, 5, 1)') == 1
+
+    def test_nested(self, parser):
+        assert parser.evaluate('sum(sum(i*j, j, 1, 3), i, 1, 3)') == 36
+
+
+class TestOverflow:
+    """Test overflowing series raise instead of returning inf"""
+
+    @pytest.mark.parametrize('expression', [
+        'prod(i*1.0, i, 1, 171)', 'sum(2.0^i, i, 1, 2000)', 'prod(1.5, i, 1, 10000)',
+    ])
+    def test_float_overflow(self, parser, expression):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            with pytest.raises(ValueError, match='overflowed'):
+                parser.evaluate(expression)
+
+    @pytest.mark.parametrize('expression', [
+        'sum(2^i, i, 1, 10^7)', 'prod(2, i, 1, 10^7)', 'sum(9^9^9, i, 1, 2)',
+    ])
+    def test_integer_too_large(self, parser, expression):
+        with pytest.raises(ValueError, match='too large'):
+            parser.evaluate(expression)
+
+
+class TestListMeaning:
+    """Test four-argument sum/prod calls that are not series"""
+
+    def test_constant_second_argument(self, parser):
+        assert parser.evaluate('sum(1, 2, 3, 4)') == 10
+
+    def test_function_parameters(self, parser):
+        functions = {}
+        parser.use_functions(functions)
+        name, compiled = parser.define('f(a, b, c, d) = sum(a, b, c, d)')
+        functions[name] = compiled
+        assert parser.evaluate('f(1, 2, 3, 4)') == 10
+
+    def test_cells(self, parser):
+        cells = {'x': 1}
+        parser.use_cells(cells)
+        # y is unbound, so it is the index: x + x
+        assert parser.evaluate('sum(x, y, 1, 2)') == 2
+        cells['y'] = 2
+        assert parser.evaluate('sum(x, y, 1, 2)') == 6
+
+    def test_variables(self, parser):
+        compiled = parser.compile('prod(x, y, 2, 3)', ('x', 'y'))
+        assert compiled.evaluate({'x': 1, 'y': 5}) == 30
+
+
+class TestErrors:
+    """Test series argument errors"""
+
+    def test_fractional_bound(self, parser):
+        with pytest.raises(ValueError):
+            parser.evaluate('sum(i, i, 1.5, 3)')
+
+    def test_bound_limit(self, parser):
+        with pytest.raises(ValueError):
+            parser.evaluate('sum(i, i, 1, 10^19)')
+
+    def test_term_limit(self, parser):
+        with pytest.raises(ValueError, match='limited'):
+            parser.evaluate('sum(sqrt(i), i, 1, 10^8)')
@@ -0,0 +1,83 @@
+"""
+Tests for the line-protocol server and its heavy-expression check
+"""
+
+import asyncio
+
+import pytest
+
+from calculator.parser import ExpressionParser
+from calculator.registry import DEFAULT_REGISTRY
+from calculator.server import CalculatorServer
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+class TestHeavyFunctions:
+    """Test the heavy flag of registered functions"""
+
+    def test_flagged_functions(self):
+        heavy = DEFAULT_REGISTRY.heavy_targets()
+        for target in ('fact', 'nPr', 'nCr', 'primes', 'factor', 'prime_pi', 'inv', 'solve'):
+            assert target in heavy
+        for target in ('math.sqrt', 'sin_deg', 'gcd', 'transpose', 'rand'):
+            assert target not in heavy
+
+    @pytest.mark.parametrize('expression', [
+        'fact(100)', 'nCr(50, 3)', 'primes(1, 1000)', 'factor(360)', 'pi(1000)',
+        'det([[1,2],[3,4]])', 'inv([[1,2],[3,4]])', 'solve([[1,0],[0,1]], [1,2])',
+        'sum(i^2, i, 1, 100)', 'prod(i, i, 1, 20)', '2^x', '10^100000', '2^(3^4)',
+    ])
+    def test_heavy(self, parser, expression):
+        variables = ('x',) if 'x' in expression else ()
+        assert parser.is_heavy(parser.compile(expression, variables))
+
+    @pytest.mark.parametrize('expression', [
+        '1 + 2', 'sqrt(2) * sin(30)', 'sum(1, 2, 3)', '2^10', '2.5^0.5', 'pi * 2', 'gcd(12, 18)',
+    ])
+    def test_light(self, parser, expression):
+        assert not parser.is_heavy(parser.compile(expression))
+
+    def test_through_user_function(self, parser):
+        functions = {}
+        parser.use_functions(functions)
+        for definition in ('f(n) = fact(n) + 1', 'g(n) = n + 1'):
+            name, compiled = parser.define(definition)
+            functions[name] = compiled
+        assert parser.is_heavy(parser.compile('f(3)'))
+        assert not parser.is_heavy(parser.compile('g(3)'))
+
+
+class TestServer:
+    """Test the server's heavy check and replies"""
+
+    def test_is_heavy(self):
+        server = CalculatorServer()
+        assert server.is_heavy('fact(20)')
+        assert server.is_heavy('primes(1, 100)')
+        assert server.is_heavy(' + '.join(['1'] * 150))
+        assert not server.is_heavy('1 + 2')
+        assert not server.is_heavy('1 +* 2')
+
+    def test_round_trip(self):
+        async def run():
+            server = CalculatorServer(port=0, workers=1)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                writer.write(b'a 1 + 2\nb fact(5)\nc 1/0\n')
+                await writer.drain()
+                replies = [(await reader.readline()).decode() for _ in range(3)]
+                writer.close()
+                await writer.wait_closed()
+            finally:
+                await server.close()
+            return {line.split(' ', 1)[0]: line.split(' ', 2)[1:] for line in replies}
+
+        replies = asyncio.run(run())
+        assert replies['a'] == ['OK', '3\n']
+        assert replies['b'] == ['OK', '120\n']
+        assert replies['c'][0] == 'ERR'
@@ -0,0 +1,174 @@
+"""
+Tests for root finding and numeric integration
+"""
+
+import math
+
+import pytest
+
+from calculator import solver
+from calculator.parser import ExpressionParser
+from calculator.solver import compile_function, find_root, integrate
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+def _root(parser, expression, start, stop, **kwargs):
+    return find_root(compile_function(parser, expression), 'x', start, stop, **kwargs)
+
+
+def _integral(parser, expression, start, stop, **kwargs):
+    return integrate(compile_function(parser, expression), 'x', start, stop, **kwargs)
+
+
+class TestCompileFunction:
+    """Test expressions and equations in one variable"""
+
+    def test_equation(self, parser):
+        compiled = compile_function(parser, 'x^2 = 2')
+        assert compiled.evaluate({'x': 3}) == 7
+
+    def test_other_variable(self, parser):
+        compiled = compile_function(parser, 't * 2', 't')
+        assert compiled.evaluate({'t': 4}) == 8
+
+    @pytest.mark.parametrize('variable', ['2x', 'pi', 'e'])
+    def test_invalid_variable(self, parser, variable):
+        with pytest.raises(ValueError, match='Invalid variable name'):
+            compile_function(parser, '1', variable)
+
+
+class TestFindRoot:
+    """Test Brent's and Newton's methods"""
+
+    def test_brent(self, parser):
+        result = _root(parser, 'x^2 = 2', 0, 2)
+        assert result.method == 'brent'
+        assert result.converged
+        assert result.root == pytest.approx(math.sqrt(2), abs=1e-12)
+        assert result.evaluations < 20
+
+    def test_brent_transcendental(self, parser):
+        result = _root(parser, 'exp(-x) = x', 0, 1)
+        assert result.root == pytest.approx(0.5671432904097838, abs=1e-12)
+
+    def test_root_at_endpoint(self, parser):
+        result = _root(parser, 'x - 1', 1, 3)
+        assert (result.root, result.value, result.evaluations) == (1.0, 0.0, 2)
+
+    def test_newton_without_sign_change(self, parser):
+        result = _root(parser, '(x - 1)^2 - 0.01', 0.5, 1.4)
+        assert result.method == 'newton'
+        assert result.root == pytest.approx(0.9, abs=1e-9)
+
+    def test_newton_leaves_interval(self, parser):
+        with pytest.raises(ValueError, match='No root found'):
+            _root(parser, 'x^2 + 1', -1, 3)
+
+    def test_derivative_vanishes(self, parser):
+        with pytest.raises(ValueError, match='Derivative vanished'):
+            _root(parser, '5', 0, 2)
+
+    def test_budget_exhausted(self, parser):
+        result = _root(parser, 'x^3 - 2', 0, 2, max_evaluations=5)
+        assert not result.converged
+        assert result.evaluations == 5
+        assert result.value == pytest.approx(result.root ** 3 - 2)
+        assert abs(result.value) < 2
+
+    def test_not_finite(self, parser):
+        with pytest.raises(ValueError, match='not finite'):
+            _root(parser, 'x * 1e308 - 1', 0, 10)
+
+    @pytest.mark.parametrize('kwargs, message', [
+        ({'start': 2, 'stop': 1}, 'start must be less than stop'),
+        ({'start': 0, 'stop': math.inf}, 'start must be less than stop'),
+        ({'start': 0, 'stop': 1, 'tolerance': 0}, 'tolerance must be positive'),
+        ({'start': 0, 'stop': 1, 'max_evaluations': 0}, 'max_evaluations must be between'),
+    ])
+    def test_invalid_arguments(self, parser, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            _root(parser, 'x', **kwargs)
+
+    def test_to_dict(self, parser):
+        assert set(_root(parser, 'x', -1, 1).to_dict()) == {
+            'root', 'value', 'evaluations', 'converged', 'method'}
+
+
+class TestIntegrate:
+    """Test adaptive Gauss-Kronrod quadrature"""
+
+    @pytest.mark.parametrize('expression, start, stop, expected', [
+        ('x^2', 0, 3, 9.0),
+        ('exp(-x^2)', -10, 10, math.sqrt(math.pi)),
+        ('1 / x', 1, math.e, 1.0),
+        ('sqrt(x)', 0, 1, 2 / 3),
+    ])
+    def test_values(self, parser, expression, start, stop, expected):
+        result = _integral(parser, expression, start, stop)
+        assert result.converged
+        assert result.value == pytest.approx(expected, rel=1e-10, abs=1e-10)
+        assert result.error_estimate <= 1e-10 * max(1.0, abs(result.value))
+
+    def test_polynomial_in_one_panel(self, parser):
+        result = _integral(parser, '3*x^5 - x + 2', -1, 2)
+        assert result.evaluations == 15
+        assert result.value == pytest.approx(36.0)
+
+    def test_budget_exhausted(self, parser):
+        result = _integral(parser, 'sin(1 / x)', 1e-3, 1, max_evaluations=60)
+        assert not result.converged
+        assert result.evaluations <= 60
+
+    def test_not_finite(self, parser):
+        with pytest.raises(ValueError, match='not finite'):
+            _integral(parser, 'x * 1e308', 0, 10)
+
+    def test_small_budget(self, parser):
+        with pytest.raises(ValueError, match='at least 15'):
+            _integral(parser, 'x', 0, 1, max_evaluations=14)
+
+    def test_budget_limit(self, parser):
+        with pytest.raises(ValueError, match='max_evaluations must be between'):
+            _integral(parser, 'x', 0, 1, max_evaluations=solver.MAX_EVALUATIONS_LIMIT + 1)
+
+
+class TestSolverRoutes:
+    """Test POST /api/solve and /api/integrate"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        return create_app().test_client()
+
+    def test_solve(self, client):
+        response = client.post('/api/solve', json={'expression': 'x^2 = 2', 'start': 0, 'stop': 2})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['root'] == pytest.approx(math.sqrt(2))
+        assert (data['method'], data['variable'], data['converged']) == ('brent', 'x', True)
+
+    def test_integrate(self, client):
+        response = client.post('/api/integrate', json={
+            'expression': 't^2', 'variable': 't', 'start': 0, 'stop': 3})
+        assert response.status_code == 200
+        assert response.get_json()['value'] == pytest.approx(9.0)
+
+    @pytest.mark.parametrize('path', ['/api/solve', '/api/integrate'])
+    def test_missing_fields(self, client, path):
+        assert client.post(path, json={'expression': 'x', 'start': 0}).status_code == 400
+
+    @pytest.mark.parametrize('path, body', [
+        ('/api/solve', {'expression': 'x', 'start': 'a', 'stop': 1}),
+        ('/api/solve', {'expression': 'x^2 + 1', 'start': -1, 'stop': 3}),
+        ('/api/integrate', {'expression': 'x', 'start': 1, 'stop': 0}),
+        ('/api/integrate', {'expression': 'x +* 2', 'start': 0, 'stop': 1}),
+    ])
+    def test_invalid(self, client, path, body):
+        response = client.post(path, json=body)
+        assert response.status_code == 422
+        assert response.get_json()['success'] is False
@@ -0,0 +1,116 @@
+"""
+Tests for running statistics and the statistics functions
+"""
+
+import io
+import math
+import statistics
+
+import pytest
+
+from calculator import stats
+from calculator.stats import RunningStats, iter_numbers
+
+
+class TestRunningStats:
+    """Test single-pass accumulators against the statistics module"""
+
+    def test_summary(self):
+        values = [2.5, -1.0, 4.0, 10.25, 3.0]
+        running = RunningStats().extend(values)
+        assert running.count == 5
+        assert running.total == pytest.approx(sum(values))
+        assert running.mean == pytest.approx(statistics.mean(values))
+        assert running.variance() == pytest.approx(statistics.variance(values))
+        assert running.stdev() == pytest.approx(statistics.stdev(values))
+        assert (running.min, running.max) == (-1.0, 10.25)
+
+    def test_compensated_sum(self):
+        running = RunningStats().extend([1e16, 1.0, -1e16] * 3)
+        assert running.total == 3.0
+
+    def test_large_mean_uses_running_mean(self):
+        running = RunningStats().extend([1e308] * 3)
+        assert running.mean == pytest.approx(1e308)
+
+    def test_cancelling_large_values(self):
+        running = RunningStats().extend([1e308, -1e308])
+        assert running.total == 0.0
+        assert running.mean == 0.0
+
+    def test_sum_overflow(self):
+        running = RunningStats().extend([1e308] * 3)
+        with pytest.raises(ValueError, match='overflowed'):
+            running.total
+        with pytest.raises(ValueError, match='overflowed'):
+            running.to_dict()
+
+    def test_variance_overflow(self):
+        running = RunningStats().extend([1e308, -1e308])
+        with pytest.raises(ValueError, match='overflowed'):
+            running.variance()
+
+    def test_errors(self):
+        running = RunningStats()
+        with pytest.raises(ValueError):
+            running.mean
+        running.add(1)
+        with pytest.raises(ValueError):
+            running.variance()
+        with pytest.raises(ValueError):
+            running.add(math.inf)
+
+    def test_to_dict(self):
+        assert RunningStats().add(4) is None
+        summary = RunningStats().extend([4]).to_dict()
+        assert summary == {'count': 1, 'sum': 4.0, 'mean': 4.0, 'variance': None,
+                           'stdev': None, 'min': 4.0, 'max': 4.0}
+
+
+class TestFunctions:
+    """Test the list-taking expression functions"""
+
+    def test_forms(self):
+        assert stats.total(1, 2, 3) == stats.total([1, 2, 3]) == 6
+        assert stats.product(2, 3, 4) == 24
+        assert stats.median(3, 1, 2) == 2
+        assert stats.median(4, 1, 2, 3) == 2.5
+        assert stats.minimum([3, 1, 2]) == 1
+        assert stats.maximum(3, 1, 2) == 3
+
+    def test_integer_sum_exact(self):
+        assert stats.total(10 ** 20, 1, -10 ** 20) == 1
+
+    def test_mean_overflow(self):
+        assert stats.mean(1e308, 1e308) == pytest.approx(1e308)
+        with pytest.raises(ValueError, match='overflowed'):
+            stats.total(1e308, 1e308)
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            stats.mean()
+
+
+class TestNumberStream:
+    """Test incremental parsing of number streams"""
+
+    def test_chunk_boundaries(self):
+        data = b'1, 2.5\n3e2  -4,5'
+        for size in (1, 2, 3, 64):
+            assert list(iter_numbers(io.BytesIO(data), size)) == [1.0, 2.5, 300.0, -4.0, 5.0]
+
+    def test_invalid_token(self):
+        with pytest.raises(ValueError, match="Invalid number: 'x'"):
+            list(iter_numbers(io.BytesIO(b'1 x 2')))
+
+    def test_token_size_limit(self):
+        class Endless:
+            def read(self, size):
+                return b'1' * size
+
+        with pytest.raises(ValueError, match="Invalid number: '1111.*longer than 65,536 bytes"):
+            next(iter_numbers(Endless(), 1000))
+
+    def test_longest_token(self):
+        data = b'0' * (stats.MAX_TOKEN_SIZE - 1) + b'7 8'
+        assert list(iter_numbers(io.BytesIO(data), 1000)) == [7.0, 8.0]
@@ -0,0 +1,135 @@
+"""
+Tests for table evaluation over variable lists and ranges
+"""
+
+import pytest
+
+from calculator import table
+from calculator.parser import ExpressionParser
+from calculator.table import build_grid, evaluate_table, expand_values, parse_spec
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+class TestExpandValues:
+    """Test variable specifications"""
+
+    def test_range_includes_stop(self):
+        assert expand_values({'start': 0, 'stop': 1, 'step': 0.1})[-1] == pytest.approx(1.0)
+        assert len(expand_values({'start': 0, 'stop': 1, 'step': 0.1})) == 11
+
+    def test_default_step_and_descending(self):
+        assert expand_values({'start': 1, 'stop': 3}) == [1.0, 2.0, 3.0]
+        assert expand_values({'start': 3, 'stop': 1, 'step': -1}) == [3.0, 2.0, 1.0]
+
+    def test_list_and_scalar(self):
+        assert expand_values([1, '2.5']) == [1.0, 2.5]
+        assert expand_values(4) == [4.0]
+
+    @pytest.mark.parametrize('spec, message', [
+        ({'start': 0}, 'missing'),
+        ({'start': 0, 'stop': 'x'}, 'must be numbers'),
+        ({'start': 0, 'stop': 1, 'step': 0}, 'non-zero'),
+        ({'start': 0, 'stop': float('inf')}, 'non-zero finite'),
+        ({'start': 0, 'stop': 1, 'step': -1}, 'points away'),
+        ([1, 'a'], 'must be numbers'),
+        ('abc', 'a number, a list or a range'),
+    ])
+    def test_invalid(self, spec, message):
+        with pytest.raises(ValueError, match=message):
+            expand_values(spec)
+
+    def test_row_limit(self, monkeypatch):
+        monkeypatch.setattr(table, 'MAX_TABLE_ROWS', 10)
+        with pytest.raises(ValueError, match='more than 10 values'):
+            expand_values({'start': 0, 'stop': 10})
+
+
+class TestParseSpec:
+    """Test command-line specifications"""
+
+    def test_range(self):
+        assert parse_spec('0:10:2') == {'start': 0.0, 'stop': 10.0, 'step': 2.0}
+        assert parse_spec(' 1:3 ') == {'start': 1.0, 'stop': 3.0}
+
+    def test_list(self):
+        assert parse_spec('1, 2,3') == [1.0, 2.0, 3.0]
+
+    @pytest.mark.parametrize('text', ['1:2:3:4', 'a:b', '1,x'])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError, match='start:stop'):
+            parse_spec(text)
+
+
+class TestEvaluateTable:
+    """Test evaluating an expression over a grid"""
+
+    def test_cartesian_product(self, parser):
+        result = evaluate_table(parser, 'x^2 + y', {'x': {'start': 0, 'stop': 2}, 'y': [10, 20]})
+        assert result.names == ['x', 'y']
+        assert len(result) == 6
+        assert result.rows() == [
+            [0.0, 10.0, 10.0], [0.0, 20.0, 20.0],
+            [1.0, 10.0, 11.0], [1.0, 20.0, 21.0],
+            [2.0, 10.0, 14.0], [2.0, 20.0, 24.0],
+        ]
+
+    def test_failed_rows(self, parser):
+        result = evaluate_table(parser, 'sqrt(x) / (x - 1)', {'x': [4, 1, -1]})
+        assert [row[-1] for row in result.rows()] == [pytest.approx(2 / 3), None, None]
+        assert result.results.error_count() == 2
+
+    def test_history_and_ans_untouched(self, parser):
+        parser.evaluate('7')
+        evaluate_table(parser, 'x + ans', {'x': [1, 2]})
+        assert parser.last_result == 7
+
+    def test_grid_limit(self, monkeypatch):
+        monkeypatch.setattr(table, 'MAX_TABLE_ROWS', 100)
+        with pytest.raises(ValueError, match='would have 121 rows'):
+            build_grid({'x': {'start': 0, 'stop': 10}, 'y': {'start': 0, 'stop': 10}})
+
+    @pytest.mark.parametrize('variables, message', [
+        ({}, 'At least one variable'),
+        ({'2x': [1]}, 'Invalid variable name'),
+        ({'pi': [1]}, 'reserved'),
+    ])
+    def test_invalid_variables(self, parser, variables, message):
+        with pytest.raises(ValueError, match=message):
+            evaluate_table(parser, '1', variables)
+
+    def test_unknown_name(self, parser):
+        with pytest.raises(ValueError, match="name 'z' is not defined"):
+            evaluate_table(parser, 'x + z', {'x': [1, 2]})
+
+
+class TestTableRoute:
+    """Test POST /api/table"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        return create_app().test_client()
+
+    def test_json(self, client):
+        response = client.post('/api/table', json={'expression': 'x * y',
+                                                   'variables': {'x': [1, 2], 'y': [3]}})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert (data['count'], data['error_count']) == (2, 0)
+        assert data['rows'] == [[1.0, 3.0, 3.0], [2.0, 3.0, 6.0]]
+
+    def test_missing_fields(self, client):
+        assert client.post('/api/table', json={'expression': 'x'}).status_code == 400
+        response = client.post('/api/table', json={'expression': 'x', 'variables': [1]})
+        assert response.status_code == 400
+
+    def test_invalid_range(self, client):
+        response = client.post('/api/table', json={
+            'expression': 'x', 'variables': {'x': {'start': 0, 'stop': 1, 'step': 0}}})
+        assert response.status_code == 422
+        assert response.get_json()['success'] is False
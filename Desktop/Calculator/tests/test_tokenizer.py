@@ -0,0 +1,174 @@
+"""
+Tests for single-pass tokenizing and expression validation
+"""
+
+import pytest
+
+from calculator import parser as parser_module
+from calculator.parser import ExpressionParser
+from calculator.tokenizer import ExpressionSyntaxError, check_complete, scan, tokenize
+
+
+def _error(text):
+    with pytest.raises(ExpressionSyntaxError) as info:
+        tokenize(text)
+    return str(info.value), info.value.position
+
+
+class TestTokens:
+    """Test how text is split into tokens"""
+
+    def test_kinds(self):
+        state = tokenize('sin(2.5e-3) ** x_1 ^ [1, .5] % π')
+        assert [(kind, value) for kind, value, _ in state.tokens] == [
+            ('name', 'sin'), ('open', '('), ('number', '2.5e-3'), ('close', ')'),
+            ('power', '**'), ('name', 'x_1'), ('power', '^'), ('open', '['),
+            ('number', '1'), ('comma', ','), ('number', '.5'), ('close', ']'),
+            ('operator', '%'), ('name', 'π'),
+        ]
+
+    def test_positions_skip_spaces(self):
+        state = tokenize('  12 +  x')
+        assert state.tokens == [('number', '12', 2), ('operator', '+', 5), ('name', 'x', 8)]
+
+    def test_open_brackets(self):
+        state = scan('(1 + [2')
+        assert state.open_brackets == (('(', 0), ('[', 5))
+        assert scan('').open_brackets == ()
+
+    def test_signs_after_operators(self):
+        tokenize('2 * -3')
+        tokenize('-(-1)')
+
+    def test_is_a_value_error(self):
+        assert issubclass(ExpressionSyntaxError, ValueError)
+
+
+class TestErrorPositions:
+    """Test the message and position of the first problem"""
+
+    @pytest.mark.parametrize('text, message, position', [
+        ('2 & 3', "Invalid character: '&'", 2),
+        ('1 +\t2', "Invalid character: '\t'", 3),
+        ('x = 1', "Invalid character: '='", 2),
+        ('1 + 2)', 'Unbalanced parentheses', 5),
+        ('[1]]', 'Unbalanced brackets', 3),
+        ('(1 + 2]', "Mismatched '(' and ']'", 6),
+        ('[(1])', "Mismatched '(' and ']'", 3),
+        ('2 +- 3', 'Invalid consecutive operators', 3),
+        ('2 // 3', 'Invalid consecutive operators', 3),
+        ('4 %% 3', 'Invalid consecutive operators', 3),
+    ])
+    def test_scan_errors(self, text, message, position):
+        assert _error(text) == (message, position)
+
+    @pytest.mark.parametrize('text, message, position', [
+        ('2 * (3 + 4', 'Unbalanced parentheses', 4),
+        ('((1)', 'Unbalanced parentheses', 0),
+        ('[1, (2)', 'Unbalanced brackets', 0),
+        ('2 -', 'Incomplete expression', 2),
+        ('2 ^', 'Invalid exponentiation syntax', 2),
+        ('2 ** * 3', 'Invalid exponentiation syntax', 2),
+        ('2 ^ 3 ^', 'Invalid exponentiation syntax', 6),
+    ])
+    def test_completeness_errors(self, text, message, position):
+        assert _error(text) == (message, position)
+
+    def test_operators_apart_are_left_to_compiling(self):
+        tokenize('2 / / 3')
+
+    def test_first_error_wins(self):
+        assert _error('2 & (3 +') == ("Invalid character: '&'", 2)
+
+    def test_incomplete_prefix_scans(self):
+        state = scan('2 * (3 +')
+        with pytest.raises(ExpressionSyntaxError):
+            check_complete(state)
+
+
+class TestResume:
+    """Test resuming a scan from the state of a prefix"""
+
+    @pytest.mark.parametrize('prefix, text', [
+        ('2 + 3', '2 + 345'),
+        ('1.', '1.5e3 * x'),
+        ('(si', '(sin(30) + 1)'),
+        ('2 *', '2 ** 3'),
+        ('', '7 - 1'),
+    ])
+    def test_matches_full_scan(self, prefix, text):
+        resumed = scan(text, scan(prefix))
+        full = scan(text)
+        assert resumed.tokens == full.tokens
+        assert resumed.stacks == full.stacks
+
+    def test_prefix_state_unchanged(self):
+        prefix = scan('(1 + 2')
+        scan('(1 + 2) * 3', prefix)
+        assert prefix.text == '(1 + 2'
+        assert prefix.open_brackets == (('(', 0),)
+
+    def test_other_text_starts_over(self):
+        assert scan('5 - 1', scan('(1 + 2')).tokens == scan('5 - 1').tokens
+
+    def test_error_in_new_text(self):
+        with pytest.raises(ExpressionSyntaxError) as info:
+            scan('(1 + 2)) * 3', scan('(1 + 2'))
+        assert info.value.position == 7
+
+
+class TestCheck:
+    """Test ExpressionParser.check"""
+
+    def test_valid(self):
+        assert ExpressionParser().check('2 * (3 + 4)') == (None, None)
+
+    @pytest.mark.parametrize('text, position', [('2 & 3', 2), ('2 * (3 + ', 4), (' 1 + 2)', 5)])
+    def test_invalid(self, text, position):
+        error, found = ExpressionParser().check(text)
+        assert error.startswith('Invalid expression')
+        assert found == position
+
+    def test_syntax_error_without_position(self):
+        error, position = ExpressionParser().check('1 2')
+        assert error.startswith('Syntax error')
+        assert position is None
+
+    def test_does_not_evaluate(self):
+        parser = ExpressionParser()
+        parser.evaluate('5')
+        assert parser.check('ans * 2') == (None, None)
+        assert parser.last_result == 5
+
+    def test_cached(self):
+        parser = ExpressionParser()
+        assert parser.check('1 +') is parser.check('1 +')
+
+    def test_cache_size(self, monkeypatch):
+        monkeypatch.setattr(parser_module, 'CHECK_CACHE_SIZE', 2)
+        parser = ExpressionParser()
+        for text in ('1', '2', '3'):
+            parser.check(text)
+        assert list(parser._checks) == ['2', '3']
+
+
+class TestValidateRoute:
+    """Test POST /api/validate"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        return create_app().test_client()
+
+    def test_valid(self, client):
+        data = client.post('/api/validate', json={'expression': 'sqrt(16) + 1'}).get_json()
+        assert data == {'success': True, 'valid': True, 'error': None, 'position': None}
+
+    def test_invalid(self, client):
+        data = client.post('/api/validate', json={'expression': '2 * (3 + '}).get_json()
+        assert (data['success'], data['valid'], data['position']) == (True, False, 4)
+        assert 'Unbalanced parentheses' in data['error']
+
+    def test_missing_expression(self, client):
+        assert client.post('/api/validate', json={}).status_code == 400
@@ -0,0 +1,154 @@
+"""
+Tests for unit conversions
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from calculator.parser import ExpressionParser
+from calculator.units import BASE_UNITS, conversion, conversion_source, get_units, split_conversion
+
+
+@pytest.fixture
+def parser():
+    return ExpressionParser()
+
+
+class TestConversion:
+    """Test the precomputed (scale, offset) pairs"""
+
+    @pytest.mark.parametrize('source, target, scale', [
+        ('km', 'm', Fraction(1000)),
+        ('mi', 'ft', Fraction(5280)),
+        ('in', 'm', Fraction(254, 10000)),
+        ('mi', 'km', Fraction(1609344, 10 ** 6)),
+        ('lb', 'oz', Fraction(16)),
+        ('week', 's', Fraction(604800)),
+        ('GiB', 'B', Fraction(2 ** 30)),
+        ('B', 'bit', Fraction(8)),
+        ('turn', 'grad', Fraction(400)),
+    ])
+    def test_exact_scales(self, source, target, scale):
+        assert conversion(source, target) == (scale, 0)
+
+    def test_inverse(self):
+        scale, _ = conversion('ft', 'mi')
+        assert scale == 1 / conversion('mi', 'ft')[0]
+
+    def test_temperature_offsets(self):
+        assert conversion('degC', 'degF') == (Fraction(9, 5), Fraction(32))
+        assert conversion('degC', 'K') == (Fraction(1), Fraction(27315, 100))
+        scale, offset = conversion('degF', 'degR')
+        assert -40 * scale + offset == Fraction(41967, 100)
+
+    def test_aliases(self):
+        assert conversion('miles', 'feet') == conversion('mi', 'ft')
+        assert conversion('celsius', 'kelvin') == conversion('degC', 'K')
+
+    def test_unknown_unit(self):
+        with pytest.raises(ValueError, match="Unknown unit: 'parsec'"):
+            conversion('parsec', 'm')
+        with pytest.raises(ValueError, match="Unknown unit: 'furlong'"):
+            conversion('m', 'furlong')
+
+    @pytest.mark.parametrize('source, target', [('km', 'kg'), ('s', 'deg'), ('degC', 'B')])
+    def test_incompatible_dimensions(self, source, target):
+        with pytest.raises(ValueError, match=f'Cannot convert {source} .* to {target}'):
+            conversion(source, target)
+
+
+class TestSource:
+    """Test the source inlined into compiled expressions"""
+
+    def test_scale_only(self):
+        assert conversion_source('5', 'km', 'm') == '(5) * 1000'
+        assert conversion_source('x', 'cm', 'in') == '(x) * 50 / 127'
+
+    def test_whole_offset_added_before_scaling(self):
+        assert conversion_source('212', 'degF', 'degC') == '((212) - 32) * 5 / 9'
+
+    def test_fractional_offset(self):
+        assert conversion_source('0', 'degC', 'degF') == '(0) * 9 / 5 + 32'
+
+    def test_split(self):
+        assert split_conversion('5 km to mi') == ('5', 'km', 'mi')
+        assert split_conversion('km to mi') == ('1', 'km', 'mi')
+        assert split_conversion('(2 + 3) h to min') == ('(2 + 3)', 'h', 'min')
+        assert split_conversion('5 + 3') is None
+        assert split_conversion('tomato') is None
+
+
+class TestExpressions:
+    """Test conversions through the parser"""
+
+    @pytest.mark.parametrize('expression, expected', [
+        ('5 km to m', 5000),
+        ('100 degC to degF', 212),
+        ('212 degF to degC', 100),
+        ('-40 degF to celsius', -40),
+        ('(1 + 1) h to min', 120),
+        ('1 GiB to MB', 1073.741824),
+        ('km to m', 1000),
+    ])
+    def test_values(self, parser, expression, expected):
+        assert parser.evaluate(expression) == pytest.approx(expected, rel=1e-15)
+
+    def test_variables_in_value(self, parser):
+        compiled = parser.compile('x mi to km', ('x',))
+        assert compiled.evaluate({'x': 2}) == pytest.approx(3.218688)
+
+    @pytest.mark.parametrize('expression, message', [
+        ('1 km to kg', 'Cannot convert km'),
+        ('1 foo to m', "Unknown unit: 'foo'"),
+        ('(1 km to kg) * 2', 'Cannot convert km'),
+    ])
+    def test_errors(self, parser, expression, message):
+        with pytest.raises(ValueError, match=message):
+            parser.evaluate(expression)
+
+
+class TestSubexpressions:
+    """Test conversions inside larger expressions"""
+
+    @pytest.mark.parametrize('expression, expected', [
+        ('(5 km to m) * 2', 10000),
+        ('(1 mi to km) + 1', 2.609344),
+        ('2 * (3 ft to in)^2', 2592),
+        ('(100 degC to degF) - 2', 210),
+        ('((1 + 1) h to min) / 60', 2),
+        ('max(1 km to m, 2)', 1000),
+        ('((1 km to m) cm to mm)', 10000),
+    ])
+    def test_values(self, parser, expression, expected):
+        assert parser.evaluate(expression) == pytest.approx(expected, rel=1e-15)
+
+    def test_function_argument(self):
+        assert ExpressionParser(angle_mode='radians').evaluate('sin(90 deg to rad)') == pytest.approx(1)
+
+    @pytest.mark.parametrize('expression', ['1 mi to km + 1', '2 * (1 km to m + 1)', '2 to 3'])
+    def test_not_a_whole_group(self, parser, expression):
+        with pytest.raises(ValueError, match='must be the whole expression or in parentheses'):
+            parser.evaluate(expression)
+
+    def test_variables(self, parser):
+        compiled = parser.compile('(x km to m) + x', ('x',))
+        assert compiled.evaluate({'x': 2}) == 2002
+
+
+class TestUnitListing:
+    """Test the list of known units"""
+
+    def test_base_units_first(self):
+        units = get_units()
+        assert set(units) == set(BASE_UNITS)
+        for dimension, base in BASE_UNITS.items():
+            assert units[dimension][0] == base
+        assert 'mi' in units['length'] and 'degF' in units['temperature']
+
+    def test_route(self):
+        pytest.importorskip('flask')
+        from app import create_app
+        response = create_app().test_client().get('/api/units')
+        assert response.status_code == 200
+        assert response.get_json()['units'] == get_units()
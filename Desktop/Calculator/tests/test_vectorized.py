@@ -0,0 +1,166 @@
+"""
+Tests for elementwise evaluation over arrays, with and without NumPy
+"""
+
+import math
+
+import pytest
+
+from calculator import vectorized
+from calculator.parser import ExpressionParser
+from calculator.vectorized import VectorMath
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    """Run each test on the NumPy backend (when installed) and the array('d') fallback"""
+    if request.param == 'numpy' and not vectorized.HAS_NUMPY:
+        pytest.skip("NumPy not installed")
+    if request.param == 'python':
+        monkeypatch.setattr(vectorized, 'HAS_NUMPY', False)
+    return request.param
+
+
+@pytest.fixture
+def vector(backend):
+    return VectorMath()
+
+
+def _values(result):
+    return VectorMath.mask(result).tolist()
+
+
+class TestVectorMath:
+    """Test elementwise operations against their scalar versions"""
+
+    def test_arithmetic(self, vector):
+        assert _values(vector.add([1, 2, 3], 10)) == [11.0, 12.0, 13.0]
+        assert _values(vector.subtract([1, 2], [3, 5])) == [-2.0, -3.0]
+        assert _values(vector.multiply(2, [1.5, -2])) == [3.0, -4.0]
+        assert _values(vector.power([2, 3], 2)) == [4.0, 9.0]
+
+    def test_division_by_zero_is_an_error_element(self, vector):
+        assert _values(vector.divide([1, 2, 3], [2, 0, 4])) == [0.5, None, 0.75]
+        assert _values(vector.modulo([7, 7], [0, 4])) == [None, 3.0]
+
+    def test_domain_errors(self, vector):
+        assert _values(vector.square_root([4, -1])) == [2.0, None]
+        assert _values(vector.natural_log([math.e, 0, -1])) == [pytest.approx(1.0), None, None]
+        assert _values(vector.log10([100, -5])) == [2.0, None]
+        assert _values(vector.arcsine([0.5, 2])) == [pytest.approx(30.0), None]
+        assert _values(vector.factorial([5, 2.5, -1])) == [120.0, None, None]
+        assert _values(vector.exponential([0, 1000])) == [1.0, None]
+
+    def test_logarithm_base(self, vector):
+        assert _values(vector.logarithm([8, 9], [2, 3])) == [pytest.approx(3.0), pytest.approx(2.0)]
+        assert _values(vector.logarithm([8, 8], [1, -2])) == [None, None]
+
+    def test_degree_trig_is_exact(self, vector):
+        assert _values(vector.sine([30, 180, 45.5])) == [
+            0.5, 0.0, pytest.approx(math.sin(math.radians(45.5)))]
+        assert _values(vector.tangent([45, 90])) == [1.0, None]
+
+    def test_radians_mode(self, backend):
+        from calculator.advanced import AdvancedMath
+        vector = VectorMath(AdvancedMath('radians'))
+        assert _values(vector.cosine([0.0, math.pi])) == [1.0, pytest.approx(-1.0)]
+        assert _values(vector.arctangent([1.0])) == [pytest.approx(math.pi / 4)]
+
+    def test_mismatched_lengths(self, backend, vector):
+        if backend == 'numpy':
+            pytest.skip("NumPy reports shape errors itself")
+        with pytest.raises(ValueError, match='same length'):
+            vector.add([1, 2], [1, 2, 3])
+
+
+class TestEvaluateArray:
+    """Test compiled expressions evaluated over arrays of inputs"""
+
+    @pytest.mark.parametrize('expression', [
+        'x^2 + 3*x - 1', 'sqrt(x) + ln(x)', 'sin(x) * cos(x)', 'x % 4 + abs(-x)', 'fact(x)',
+    ])
+    def test_matches_scalar(self, backend, expression):
+        parser = ExpressionParser()
+        compiled = parser.compile(expression, ('x',))
+        xs = [1, 2, 3.5, 10, 30]
+        expected = []
+        for x in xs:
+            try:
+                expected.append(float(compiled.evaluate({'x': x})))
+            except ValueError:
+                expected.append(None)
+        assert compiled.evaluate_array({'x': xs}).tolist() == pytest.approx(expected)
+
+    def test_errors_are_masked(self, backend):
+        compiled = ExpressionParser().compile('1 / x + sqrt(x)', ('x',))
+        result = compiled.evaluate_array({'x': [1, 0, -4, 4]})
+        assert result.tolist() == [2.0, None, None, 2.25]
+        assert result.error_count() == 2
+        assert len(result) == 4
+
+    def test_scalar_binding_broadcasts(self, backend):
+        compiled = ExpressionParser().compile('a * x + b', ('a', 'x', 'b'))
+        result = compiled.evaluate_array({'a': 2, 'x': [1, 2, 3], 'b': 0.5})
+        assert result.tolist() == [2.5, 4.5, 6.5]
+
+    def test_mismatched_lengths(self, backend):
+        compiled = ExpressionParser().compile('x + y', ('x', 'y'))
+        with pytest.raises(ValueError, match='same length'):
+            compiled.evaluate_array({'x': [1, 2], 'y': [1, 2, 3]})
+
+    def test_function_without_array_form(self, backend):
+        compiled = ExpressionParser().compile('nCr(x, 2) + gcd(x, 4)', ('x',))
+        assert compiled.evaluate_array({'x': [4, 5, 6]}).tolist() == [10.0, 11.0, 17.0]
+
+    def test_ans(self, backend):
+        parser = ExpressionParser()
+        parser.evaluate('10')
+        compiled = parser.compile('ans + x', ('x',))
+        assert compiled.evaluate_array({'x': [1, 2]}).tolist() == [11.0, 12.0]
+
+
+class TestArrayNamespace:
+    """Test the names and errors seen by the array pass"""
+
+    @pytest.fixture
+    def numpy_only(self, monkeypatch):
+        """Fail if evaluation falls back to the elementwise pass"""
+        if not vectorized.HAS_NUMPY:
+            pytest.skip("NumPy not installed")
+
+        def elementwise(compiled, columns):
+            raise AssertionError("evaluated per element")
+
+        monkeypatch.setattr(vectorized, '_evaluate_elementwise', elementwise)
+
+    def test_cells_and_functions(self, numpy_only):
+        parser = ExpressionParser()
+        name, function = parser.define('f(t) = 2 * t')
+        parser.use_functions({name: function})
+        parser.use_cells({'k': 3})
+        compiled = parser.compile('f(x) + k', ('x',))
+        assert compiled.evaluate_array({'x': [1, 2]}).tolist() == [5.0, 7.0]
+
+    def test_variables_shadow_cells(self, numpy_only):
+        parser = ExpressionParser()
+        parser.use_cells({'x': 100})
+        compiled = parser.compile('x + 1', ('x',))
+        assert compiled.evaluate_array({'x': [1, 2]}).tolist() == [2.0, 3.0]
+
+    def test_unknown_name_raises(self, backend):
+        compiled = ExpressionParser().compile('x + y', ('x',))
+        with pytest.raises(ValueError, match="name 'y' is not defined"):
+            compiled.evaluate_array({'x': [1, 2]})
+
+    def test_scalar_error_is_masked(self, backend):
+        compiled = ExpressionParser().compile('x + 1 / 0', ('x',))
+        assert compiled.evaluate_array({'x': [1, 2]}).tolist() == [None, None]
+
+    def test_namespace_built_once_per_pack_set(self):
+        if not vectorized.HAS_NUMPY:
+            pytest.skip("NumPy not installed")
+        parser = ExpressionParser()
+        namespace = vectorized.vector_namespace(parser)
+        assert vectorized.vector_namespace(parser) is namespace
+        parser.evaluate('mean(1, 2)')
+        assert 'mean' in vectorized.vector_namespace(parser)